@@ -0,0 +1,314 @@
+# A local on-disk cache of problem instances from the mqlibinstances bucket,
+# shared by the cloud runner and the download scripts.
+#
+# Each cached object is stored under its own name in the cache directory,
+# alongside a "<name>.md5" file recording its checksum, and entries are keyed
+# by name plus checksum: an entry is only used if the file's contents still
+# match its recorded checksum and that matches the source's current checksum
+# for the name (looked up if the caller doesn't provide it; a cached copy is
+# used as is only when the source can't be reached). A file without a .md5
+# file (e.g. copied in by hand) is hashed rather than fetched again. Downloads
+# go to a temporary file in the cache directory, are verified, and are then
+# renamed into place, so an interrupted download never leaves a truncated
+# entry. Failed downloads are retried with backoff, except when the object
+# doesn't exist.
+#
+# The source of instances is pluggable: S3Backend talks to the real bucket
+# (or to a local S3-compatible stand-in, given a host), and DirectoryBackend
+# serves objects from a local folder. default_backend() picks one from the
+# MQLIB_INSTANCE_SOURCE environment variable:
+#   (unset)                  the public mqlibinstances S3 bucket
+#   http://host:port         an S3-compatible server (bucket from
+#                            MQLIB_INSTANCE_BUCKET, default mqlibinstances)
+#   /path/to/folder          a local folder of instance archives
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+DEFAULT_BUCKET = "mqlibinstances"
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MQLIB_INSTANCE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "mqlib", "instances"))
+
+def file_md5(filename):
+    """
+    Return the hex MD5 checksum of a file's contents.
+    """
+    h = hashlib.md5()
+    with open(filename, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class MissingInstanceError(IOError):
+    """
+    The source has no object with the requested name (a permanent error, so
+    it is not retried).
+    """
+    pass
+
+class DirectoryBackend(object):
+    """
+    Serve instances from a local folder (e.g. a copy made with
+    downloadAllGraphs.py), standing in for the bucket in tests.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def list(self):
+        """
+        Return a list of (name, checksum) pairs for all objects.
+        """
+        return [(name, None) for name in sorted(os.listdir(self.root))
+                if os.path.isfile(os.path.join(self.root, name)) and
+                not name.endswith(".md5")]
+
+    def _existing(self, name):
+        path = os.path.join(self.root, name)
+        if not os.path.isfile(path):
+            raise MissingInstanceError("No such instance in %s: %s" %
+                                       (self.root, name))
+        return path
+
+    def checksum(self, name):
+        return file_md5(self._existing(name))
+
+    def fetch(self, name, fp):
+        """
+        Write the contents of object name to the open binary file fp.
+        """
+        with open(self._existing(name), "rb") as src:
+            for block in iter(lambda: src.read(1 << 20), b""):
+                fp.write(block)
+
+class S3Backend(object):
+    """
+    Serve instances from an S3 bucket with anonymous access. Passing a host
+    (and port) targets an S3-compatible server instead of AWS.
+    """
+    def __init__(self, bucket=DEFAULT_BUCKET, host=None, port=None,
+                 is_secure=True):
+        self.bucket = bucket
+        self.host = host
+        self.port = port
+        self.is_secure = is_secure
+        self._local = threading.local()  # boto connections aren't thread-safe
+
+    def _get_bucket(self):
+        if not hasattr(self._local, "bucket"):
+            import boto
+            import boto.s3.connection
+            if self.host:
+                conn = boto.connect_s3(
+                    anon=True, host=self.host, port=self.port,
+                    is_secure=self.is_secure,
+                    calling_format=boto.s3.connection.OrdinaryCallingFormat())
+            else:
+                conn = boto.connect_s3(anon=True)
+            self._local.bucket = conn.get_bucket(self.bucket, validate=False)
+        return self._local.bucket
+
+    @staticmethod
+    def _etag_md5(etag):
+        # The ETag of a non-multipart upload is the MD5 of the contents;
+        # multipart ETags contain a "-" and can't be checked this way.
+        if etag is None:
+            return None
+        etag = etag.strip('"')
+        return None if "-" in etag else etag
+
+    def list(self):
+        return [(k.key, self._etag_md5(k.etag)) for k in
+                self._get_bucket().list()]
+
+    def checksum(self, name):
+        k = self._get_bucket().get_key(name)
+        if k is None:
+            raise MissingInstanceError("No such instance in bucket %s: %s" %
+                                       (self.bucket, name))
+        return self._etag_md5(k.etag)
+
+    def fetch(self, name, fp):
+        import boto.exception
+        import boto.s3.key
+        k = boto.s3.key.Key(self._get_bucket())
+        k.key = name
+        try:
+            k.get_contents_to_file(fp)
+        except boto.exception.S3ResponseError as err:
+            if err.status == 404:
+                raise MissingInstanceError("No such instance in bucket %s: %s" %
+                                           (self.bucket, name))
+            raise
+
+def default_backend():
+    """
+    Build the backend named by the MQLIB_INSTANCE_SOURCE environment variable
+    (see the top of this file).
+    """
+    source = os.environ.get("MQLIB_INSTANCE_SOURCE", "")
+    bucket = os.environ.get("MQLIB_INSTANCE_BUCKET", DEFAULT_BUCKET)
+    if not source:
+        return S3Backend(bucket)
+    if source.startswith("http://") or source.startswith("https://"):
+        is_secure = source.startswith("https://")
+        hostport = source.split("://", 1)[1].rstrip("/")
+        if ":" in hostport:
+            host, port = hostport.split(":", 1)
+            port = int(port)
+        else:
+            host, port = hostport, None
+        return S3Backend(bucket, host, port, is_secure)
+    return DirectoryBackend(source)
+
+class InstanceCache(object):
+    def __init__(self, backend=None, cache_dir=DEFAULT_CACHE_DIR, retries=10,
+                 retry_wait=1.0, verify=True):
+        self.backend = backend if backend is not None else default_backend()
+        self.cache_dir = cache_dir
+        self.retries = retries
+        self.retry_wait = retry_wait
+        self.verify = verify
+        if not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except OSError:
+                if not os.path.isdir(cache_dir):  # Lost a creation race?
+                    raise
+
+    def path(self, name):
+        """
+        Location of object name in the cache (whether or not it's cached).
+        """
+        return os.path.join(self.cache_dir, name)
+
+    def cached_checksum(self, name):
+        """
+        Return the checksum of a valid cached copy of object name, or None if
+        there is no such copy.
+        """
+        path = self.path(name)
+        try:
+            with open(path + ".md5", "r") as fp:
+                recorded = fp.read().strip()
+        except (IOError, OSError):
+            return None
+        if not os.path.isfile(path):
+            return None
+        if self.verify and file_md5(path) != recorded:
+            return None  # Corrupted or modified since it was cached
+        return recorded
+
+    def get(self, name, checksum=None):
+        """
+        Return the local path of object name, downloading it only if there is
+        no valid cached copy with the source's checksum (checksum, if
+        provided, e.g. from a listing; otherwise it is looked up). Raises
+        MissingInstanceError at once if the source has no such object, and
+        IOError if it can't be fetched and verified after self.retries
+        attempts.
+        """
+        if checksum is None:
+            try:
+                checksum = self.backend.checksum(name)
+            except MissingInstanceError:
+                raise
+            except Exception:
+                # Can't reach the source: use any valid cached copy (the
+                # attempts below look the checksum up again)
+                if self.cached_checksum(name) is not None:
+                    return self.path(name)
+        if self._cached(name, checksum):
+            return self.path(name)
+
+        last_error = None
+        for attempt in range(self.retries):
+            if attempt > 0:
+                time.sleep(min(self.retry_wait * 2 ** (attempt - 1), 60.0))
+            try:
+                if checksum is None:
+                    checksum = self.backend.checksum(name)
+                self._download(name, checksum)
+                return self.path(name)
+            except MissingInstanceError:
+                raise
+            except Exception as err:
+                last_error = err
+        raise IOError("Failed to download %s after %d attempts: %s" %
+                      (name, self.retries, last_error))
+
+    def get_many(self, names, threads=8, on_done=None):
+        """
+        Fetch many objects concurrently. names can contain object names or
+        (name, checksum) pairs. Returns a dictionary from name to local path;
+        objects that could not be fetched map to None. If provided, on_done
+        is called with (name, path) as each object completes.
+        """
+        def work(item):
+            name, checksum = item if isinstance(item, tuple) else (item, None)
+            try:
+                path = self.get(name, checksum)
+            except IOError:
+                path = None
+            if on_done:
+                on_done(name, path)
+            return name, path
+
+        pool = ThreadPool(max(1, threads))
+        try:
+            return dict(pool.map(work, list(names)))
+        finally:
+            pool.close()
+            pool.join()
+
+    def _cached(self, name, checksum):
+        # Whether there is a valid cached copy of name matching checksum (any
+        # valid copy if checksum is None). A file with no .md5 file is hashed
+        # and, if it matches, recorded.
+        path = self.path(name)
+        if not os.path.isfile(path):
+            return False
+        if not os.path.isfile(path + ".md5"):
+            actual = file_md5(path)
+            if checksum is not None and actual != checksum:
+                return False
+            self._atomic_write(path + ".md5", actual + "\n")
+            return True
+        cached = self.cached_checksum(name)
+        return cached is not None and (checksum is None or cached == checksum)
+
+    def _download(self, name, checksum):
+        # Download to a temporary file in the cache directory (so the final
+        # rename is atomic), check it, then move the file and its checksum
+        # into place.
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=".partial-")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                self.backend.fetch(name, fp)
+            actual = file_md5(tmp)
+            if checksum is not None and actual != checksum:
+                raise IOError("Checksum mismatch for %s: expected %s, got %s" %
+                              (name, checksum, actual))
+            self._atomic_write(self.path(name) + ".md5", actual + "\n")
+            self._replace(tmp, self.path(name))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _atomic_write(self, path, text):
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=".partial-")
+        with os.fdopen(fd, "w") as fp:
+            fp.write(text)
+        self._replace(tmp, path)
+
+    @staticmethod
+    def _replace(src, dst):
+        # os.rename is atomic on POSIX but fails on Windows if dst exists
+        try:
+            os.rename(src, dst)
+        except OSError:
+            os.remove(dst)
+            os.rename(src, dst)
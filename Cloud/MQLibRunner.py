@@ -1,49 +1,64 @@
-import boto
 import datetime
 import os
 import shutil
 import subprocess
 import sys
+import threading
 import zipfile
 import CloudSetup
+import InstanceCache
+import ResultsSink
+
+# Local cache of instance archives, so a node that is re-run after a failure
+# doesn't download its graphs again (see InstanceCache.py for the settings)
+INSTANCE_CACHE = InstanceCache.InstanceCache()
 
 def get_graph(graph):
     """
-    Abstracts out the process of pulling the graph from main test loop
+    Abstracts out the process of pulling the graph from main test loop. The
+    archive is kept compressed in the local instance cache (so re-running a
+    node doesn't download it again); run_mqlib streams it to MQLib. Returns
+    the path of the cached archive.
     """
     print("Acquiring graph %s..."%graph)
-    conn = boto.connect_s3(anon=True)
-    b = conn.get_bucket("mqlibinstances", validate=False)
-    k = boto.s3.key.Key(b)
-    k.key = graph
-    k.get_contents_to_filename("curgraph.zip")
-    with zipfile.ZipFile("curgraph.zip", "r") as z:
-        for name in z.namelist():
-            outloc = z.extract(name)
-            shutil.move(outloc, "curgraph")
+    path = INSTANCE_CACHE.get(graph)
     print("    done!")
     sys.stdout.flush()
+    return path
 
-def chunks(l, n):
-    """
-    Break up a string l into chunks of length at most n, returning a list of
-    all the chunks.
-    """
-
-    if n < 1:
-        n = 1
-    return [l[i:i + n] for i in range(0, len(l), n)]
-
-def filterOutput(output, consec, ending):
+def run_mqlib(torun, graph_path):
     """
-    Filter the output of a heuristic by only reporting every "consec" new best solution,
-    as well as the last "ending" solutions.
+    Run the MQLib command torun (which should read its instance from "-") with
+    the graph archive graph_path decompressed straight into its standard input,
+    avoiding a write and re-read of the extracted graph on every run. Returns
+    the combined stdout and stderr of the run.
     """
-    intro = output.split("[")[0]
-    toFilter = output.strip().split("[")[1][:-1].split(";")
-    filterIdx = range(0, len(toFilter)-ending, consec) + range(len(toFilter)-ending, len(toFilter))
-    filtered = [toFilter[x] for x in filterIdx]
-    return intro + "[" + ";".join(filtered) + "]"
+    print(torun)
+    sys.stdout.flush()
+    z = zipfile.ZipFile(graph_path, "r")
+    member = [name for name in z.namelist() if not name.endswith("/")][0]
+    src = z.open(member)
+    p = subprocess.Popen(torun, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                         stderr=subprocess.STDOUT)
+
+    def feed():
+        try:
+            shutil.copyfileobj(src, p.stdin, 1 << 17)
+        except (IOError, OSError):
+            pass  # MQLib exited early; its output explains why
+        try:
+            p.stdin.close()
+        except (IOError, OSError):
+            pass
+
+    feeder = threading.Thread(target=feed)
+    feeder.start()
+    output = p.stdout.read()
+    p.wait()
+    feeder.join()
+    src.close()
+    z.close()
+    return output
 
 def run_tasks():
     """
@@ -90,8 +105,8 @@ def run_tasks():
         print(SEEDS)
         sys.stdout.flush()
 
-    # Get ready for SimpleDB comms
-    sdb, dom = CloudSetup.setup_sdb_domain(SDB_DOMAIN)
+    # Get ready for SimpleDB comms; results are written in batches
+    sink = ResultsSink.default_sink(SDB_DOMAIN)
     
     # Log progress to a file so we can be monitored easily
     log_fp = open("PROGRESS","w")
@@ -99,21 +114,24 @@ def run_tasks():
     for gidx in range(len(GRAPHS)):
         graph = GRAPHS[gidx]
         if sys.argv[1] == "FULL":
-            # First, acquire or build the graph and place in local folder
-            # as 'curgraph'
-            get_graph(graph)
+            # See how much work we've done on this graph before, with a single
+            # query for all heuristics and seeds
+            done = set((x["heuristic"], int(x["run"])) for x in
+                       sink.completed(graph))
+            if all((heur, seed) in done for heur in HEURS for seed in SEEDS):
+                print("Skipping %s" % graph)
+                continue
+
+            # First, acquire the graph archive from the local instance cache
+            graph_path = get_graph(graph)
             log_fp.write(graph + ", " + str(datetime.datetime.now()))
             log_fp.flush()
 
             # Run the baseline to figure out the runtime limit
             torun = ["timeout", "10000", "../bin/MQLib", "-fM",
-                     "curgraph", "-h", "BASELINE", "-r",
+                     "-", "-h", "BASELINE", "-r",
                      sys.argv[3], "-s", "144"]
-            print(torun)
-            sys.stdout.flush()
-            p = subprocess.Popen(torun, stdout=subprocess.PIPE,
-                                 stderr=subprocess.STDOUT)
-            baseline_output = p.stdout.read()
+            baseline_output = run_mqlib(torun, graph_path)
             runtime = baseline_output.split(",")[4]
 
             if int(sys.argv[5]) >= 0:
@@ -128,33 +146,18 @@ def run_tasks():
             print(runtime)
             
             for heur in HEURS:
-                # See how much work we've done for this heuristic before
-                reps_to_do = {}
-                for seed in SEEDS:
-                    reps_to_do[seed] = True
-                query = 'SELECT * FROM `%s` WHERE heuristic="%s" AND graphname="%s"'%(SDB_DOMAIN,heur,graph)
-                #print(query)
-                query_results = dom.select(query)
-                for q_r in query_results:
-                    #print(q_r)
-                    reps_to_do[int(q_r["run"])] = False
-
                 # Do the reps we haven't done yet
                 for seed in SEEDS:
-                    if not reps_to_do[seed]:
+                    if (heur, seed) in done:
                         print("Skipping rep %d for %s - %s"%(seed,graph,heur))
                         continue
 
                     # Run the program
                     print("Running rep %d for %s - %s"%(seed,graph,heur))
                     torun = ["timeout", "10000", "../bin/MQLib", "-fM",
-                             "curgraph", "-h", heur, "-r", runtime, "-s",
+                             "-", "-h", heur, "-r", runtime, "-s",
                              str(seed)]
-                    print(torun)
-                    sys.stdout.flush()
-                    p = subprocess.Popen(torun, stdout=subprocess.PIPE,
-                                         stderr=subprocess.STDOUT)
-                    mqlib_output = p.stdout.read()
+                    mqlib_output = run_mqlib(torun, graph_path)
 
                     key = "%s-%s-%d"%(graph,heur,seed)
                     value = {   "graphname" : graph,
@@ -162,58 +165,36 @@ def run_tasks():
                                 "run"       : str(seed),
                                 "timestamp" : str(datetime.datetime.now())
                             }
+                    sink.put(key, value, mqlib_output)
 
-                    # Because mqlib_output might exceed the limit of length of
-                    # 1024 for sdb attributes, we'll split it up into
-                    # 1000-character chunks and add each chunk as attributes
-                    # output000, output001, ...
-                    parts = chunks(mqlib_output, 1000)
-
-                    # If the output is too large, filter the solutions to take
-                    # every "consec" reported value, as well as the last 10.
-                    # Keep increasing "consec" until the output is of acceptable
-                    # size (aka won't cause an error when loaded into the SimpleDB).
-                    consec = 1
-                    while len(parts) >= 55:
-                        consec += 1
-                        parts = chunks(filterOutput(mqlib_output, consec, 10), 1000)
-
-                    for num in range(len(parts)):
-                        attr = "output" + str(num).zfill(3)
-                        value[attr] = parts[num]
-
-                    dom.put_attributes(key, value)
+            # A graph's runs take a while, so don't hold them in memory past
+            # the end of the graph
+            sink.flush()
         else:
             # Metrics run
-            query = 'SELECT * FROM `%s` WHERE graphname="%s"'%(SDB_DOMAIN,graph)
-            query_results = dom.select(query)
-            if next(query_results, None):
+            if sink.completed(graph):
                 print("Skipping %s" % graph)
                 continue
 
-            # First, acquire or build the graph and place in local folder
-            # as 'curgraph'
-            get_graph(graph)
+            # First, acquire the graph archive from the local instance cache
+            graph_path = get_graph(graph)
             log_fp.write(graph + ", " + str(datetime.datetime.now()))
             log_fp.flush()
 
             # No need to set seed on metrics run because the metrics code always
             # sets the seed to 0 before running.
-            torun = ["../bin/MQLib", "-fM", "curgraph", "-m"]
-            sys.stdout.flush()
-            p = subprocess.Popen(torun, stdout=subprocess.PIPE,
-                                 stderr=subprocess.STDOUT)
-            mqlib_output = p.stdout.read()
+            torun = ["../bin/MQLib", "-fM", "-", "-m"]
+            mqlib_output = run_mqlib(torun, graph_path)
             value = {"graphname" : graph,
-                     "output"    : mqlib_output,
                      "timestamp" : str(datetime.datetime.now())
                      }
-            dom.put_attributes(graph, value)
+            sink.put(graph, value, mqlib_output)
 
         log_fp.write(", " + str(datetime.datetime.now()) + "\n")
         log_fp.flush()
 
     log_fp.close()
+    sink.close()
 
     # Self-terminate at completion
     CloudSetup.terminate_instance(sys.argv[2])
@@ -0,0 +1,263 @@
+# Storage for the results of MQLibRunner, shared by the runner and the scripts
+# that read results back (grabFullRuns.py and grabGraphInfo.py).
+#
+# A sink stores one record per run: a key, a few short attributes (graphname,
+# heuristic, run, timestamp) and the full MQLib output. Outputs are stored
+# zlib-compressed and base64-encoded, so the complete history of new best
+# solutions is kept instead of being thinned out to fit. Writes are buffered
+# and sent in batches, and completed(graph) answers "what has already been
+# run on this graph?" with a single query.
+#
+# Two sinks are provided: SimpleDBSink (the SimpleDB domains used by cloud
+# runs) and SQLiteSink (a local database file, for offline testing).
+# default_sink() uses SQLite if the MQLIB_RESULTS_DB environment variable
+# names a database file, and SimpleDB otherwise.
+import base64
+import os
+import sqlite3
+import time
+import zlib
+
+# SimpleDB limits: 1024 characters per attribute value, 256 attributes per
+# item, 25 items and 1 MB per batch_put_attributes call.
+SDB_CHUNK = 1000
+SDB_MAX_CHUNKS = 250
+SDB_BATCH_ITEMS = 25
+SDB_BATCH_BYTES = 900000
+
+def encode_output(output):
+    """
+    Compress an MQLib output string into a base64 string.
+    """
+    data = output if isinstance(output, bytes) else output.encode("utf-8")
+    return base64.b64encode(zlib.compress(data, 9)).decode("ascii")
+
+def decode_output(encoded):
+    """
+    Invert encode_output.
+    """
+    data = zlib.decompress(base64.b64decode(encoded))
+    return data if isinstance(data, str) else data.decode("utf-8")
+
+def output_from_attributes(item):
+    """
+    Recover the MQLib output from a SimpleDB item, handling compressed
+    outputs (zoutput000, zoutput001, ...) as well as the plain "output"
+    attribute and output000, output001, ... chunks written by older runs.
+    """
+    if "zoutput000" in item:
+        return decode_output("".join(_chunk_values(item, "zoutput")))
+    if "output" in item:
+        return item["output"]
+    return "".join(_chunk_values(item, "output"))
+
+def _chunk_values(item, prefix):
+    values = []
+    for idx in range(1000):
+        key = prefix + str(idx).zfill(3)
+        if key not in item:
+            break  # We have exhausted all the output fields
+        values.append(item[key])
+    return values
+
+def filter_output(output, consec, ending):
+    """
+    Filter the output of a heuristic by only reporting every "consec" new best
+    solution, as well as the last "ending" solutions.
+    """
+    intro = output.split("[")[0]
+    toFilter = output.strip().split("[")[1][:-1].split(";")
+    filterIdx = list(range(0, len(toFilter)-ending, consec)) + \
+        list(range(max(len(toFilter)-ending, 0), len(toFilter)))
+    filtered = [toFilter[x] for x in filterIdx]
+    return intro + "[" + ";".join(filtered) + "]"
+
+class ResultsSink(object):
+    """
+    Base class handling write buffering. Subclasses implement _write (store a
+    list of (key, attributes, output) records), completed and items.
+    """
+    def __init__(self, batch_size, flush_seconds=300.0):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._pending = []
+        self._pending_since = None
+
+    def put(self, key, attributes, output):
+        """
+        Store the output of a run with the given short attributes. The write
+        happens once a batch fills up, flush_seconds have passed since the
+        oldest unwritten run, or flush is called.
+        """
+        if not self._pending:
+            self._pending_since = time.time()
+        self._pending.append((key, dict(attributes), output))
+        if len(self._pending) >= self.batch_size or \
+                time.time() - self._pending_since >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._write(self._pending)
+            self._pending = []
+
+    def close(self):
+        self.flush()
+
+    def completed(self, graph):
+        """
+        Return the attributes (without outputs) of all stored runs on graph.
+        """
+        raise NotImplementedError
+
+    def items(self, part=0, num_parts=1):
+        """
+        Iterate over (attributes, output) for all stored runs. With num_parts
+        greater than 1, only iterate over the part-th of num_parts disjoint
+        parts of the runs (so they can be processed in parallel).
+        """
+        raise NotImplementedError
+
+    def count(self, part=0, num_parts=1):
+        """
+        Return the number of runs items(part, num_parts) iterates over.
+        """
+        raise NotImplementedError
+
+    def _write(self, records):
+        raise NotImplementedError
+
+class SimpleDBSink(ResultsSink):
+    def __init__(self, domain_name, flush_seconds=300.0):
+        ResultsSink.__init__(self, SDB_BATCH_ITEMS, flush_seconds)
+        import CloudSetup
+        self.domain_name = domain_name
+        self.sdb, self.dom = CloudSetup.setup_sdb_domain(domain_name)
+
+    def completed(self, graph):
+        query = 'SELECT graphname, heuristic, run, timestamp FROM `%s` ' \
+            'WHERE graphname="%s"' % (self.domain_name, graph)
+        return [dict(x) for x in self.dom.select(query)]
+
+    def items(self, part=0, num_parts=1):
+        if num_parts != 1:
+            raise ValueError("SimpleDB results can't be read in parts")
+        query = 'SELECT * FROM `%s`' % self.domain_name
+        for x in self.dom.select(query):
+            attributes = dict((k, v) for k, v in x.items() if
+                              not k.startswith("output") and
+                              not k.startswith("zoutput"))
+            yield attributes, output_from_attributes(x)
+
+    def count(self, part=0, num_parts=1):
+        if num_parts != 1:
+            raise ValueError("SimpleDB results can't be read in parts")
+        query = 'SELECT count(*) FROM `%s`' % self.domain_name
+        return sum(int(x["Count"]) for x in self.dom.select(query))
+
+    def _write(self, records):
+        batch = {}
+        batch_bytes = 0
+        for key, attributes, output in records:
+            value = self._to_item(attributes, output)
+            size = sum(len(k) + len(v) for k, v in value.items())
+            if batch and batch_bytes + size > SDB_BATCH_BYTES:
+                self.dom.batch_put_attributes(batch)
+                batch, batch_bytes = {}, 0
+            batch[key] = value
+            batch_bytes += size
+        if batch:
+            self.dom.batch_put_attributes(batch)
+
+    @staticmethod
+    def _to_item(attributes, output):
+        # The compressed output is split across 1000-character attributes
+        # zoutput000, zoutput001, ... In the rare case it still doesn't fit
+        # in an item, keep every "consec" new best solution (and the last 10)
+        # until it does.
+        encoded = encode_output(output)
+        consec = 1
+        while len(encoded) > SDB_CHUNK * SDB_MAX_CHUNKS:
+            consec += 1
+            encoded = encode_output(filter_output(output, consec, 10))
+        value = dict(attributes)
+        for num in range(0, len(encoded), SDB_CHUNK):
+            value["zoutput" + str(num // SDB_CHUNK).zfill(3)] = \
+                encoded[num:num + SDB_CHUNK]
+        return value
+
+class SQLiteSink(ResultsSink):
+    def __init__(self, filename, table="runs", batch_size=100,
+                 flush_seconds=300.0):
+        ResultsSink.__init__(self, batch_size, flush_seconds)
+        self.table = table
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS %s (key TEXT PRIMARY "
+                          "KEY, graphname TEXT, heuristic TEXT, run TEXT, "
+                          "timestamp TEXT, output TEXT)" % table)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS %s_graphname ON "
+                          "%s (graphname)" % (table, table))
+        self.conn.commit()
+
+    def completed(self, graph):
+        rows = self.conn.execute("SELECT graphname, heuristic, run, timestamp "
+                                 "FROM %s WHERE graphname = ?" % self.table,
+                                 (graph,))
+        return [self._attributes(row) for row in rows]
+
+    def items(self, part=0, num_parts=1):
+        where, params = self._part_range(part, num_parts)
+        rows = self.conn.execute("SELECT graphname, heuristic, run, timestamp, "
+                                 "output FROM %s %s ORDER BY rowid" %
+                                 (self.table, where), params)
+        for row in rows:
+            yield self._attributes(row), decode_output(row[4])
+
+    def count(self, part=0, num_parts=1):
+        where, params = self._part_range(part, num_parts)
+        return self.conn.execute("SELECT COUNT(*) FROM %s %s" %
+                                 (self.table, where), params).fetchone()[0]
+
+    def _part_range(self, part, num_parts):
+        # Parts are contiguous ranges of rowids, so each is read sequentially
+        if num_parts == 1:
+            return "", ()
+        lo, hi = self.conn.execute("SELECT MIN(rowid), MAX(rowid) FROM %s" %
+                                   self.table).fetchone()
+        if lo is None:
+            return "WHERE 0", ()
+        size = (hi - lo + num_parts) // num_parts
+        return "WHERE rowid BETWEEN ? AND ?", (lo + part * size,
+                                               lo + (part + 1) * size - 1)
+
+    def close(self):
+        ResultsSink.close(self)
+        self.conn.close()
+
+    def _write(self, records):
+        with self.conn:  # One transaction per batch
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO %s VALUES (?, ?, ?, ?, ?, ?)" %
+                self.table,
+                [(key, attributes.get("graphname"),
+                  attributes.get("heuristic"), attributes.get("run"),
+                  attributes.get("timestamp"), encode_output(output))
+                 for key, attributes, output in records])
+
+    @staticmethod
+    def _attributes(row):
+        # Metrics runs have no heuristic or run; leave those attributes out,
+        # as SimpleDB would
+        names = ["graphname", "heuristic", "run", "timestamp"]
+        return dict((n, v) for n, v in zip(names, row) if v is not None)
+
+def default_sink(domain_name):
+    """
+    Build the sink for the SimpleDB domain domain_name, or a SQLite sink if
+    the MQLIB_RESULTS_DB environment variable is set (see the top of this
+    file). In SQLite, each domain is a table of the same name.
+    """
+    filename = os.environ.get("MQLIB_RESULTS_DB", "")
+    if filename:
+        return SQLiteSink(filename, domain_name.replace("-", "_"))
+    return SimpleDBSink(domain_name)
@@ -1,81 +1,225 @@
-# python grabFullRuns.py
+# python grabFullRuns.py ALL|BEST
+#     [[or]]
+# python grabFullRuns.py COLUMNAR [numWorkers]
+#
+# COLUMNAR writes the BEST summary to ../data/resultsN.csv and, in the same
+# pass, every new best solution to compressed NumPy files
+# ../data/trajectoriesN/part-PPP-NNNNN.npz. Each of these holds three
+# equal-length arrays: "run" (the 0-based row of the run in resultsN.csv,
+# not counting the header), "objective" and "runtime". Parts are written
+# every BLOCK_ROWS solutions, so memory use doesn't grow with the number of
+# runs. When results are read from a local SQLite database (MQLIB_RESULTS_DB,
+# see ResultsSink.py), numWorkers processes each handle a slice of the runs.
 import csv
+import multiprocessing
 import os
+import shutil
 import sys
-import CloudSetup
-
-if len(sys.argv) != 2 or not sys.argv[1] in ["ALL", "BEST"]:
-    print("Usage: python grabFullRuns.py ALL|BEST")
-    exit(1)
-
-suffixes = [""] + [str(x) for x in range(1, 10000)]
-resultsFile = None
-errorsFile = None
-for s in suffixes:
-    if not os.path.exists("../data/results" + s + ".csv") and not os.path.exists("../data/errors" + s + ".txt"):
-        resultsFile = "../data/results" + s + ".csv"
-        errorsFile = "../data/errors" + s + ".txt"
-        break
-if resultsFile is None or errorsFile is None:
-    print("Could not allocate results or errors file")
-    exit(1)
-print("Outputting results to", resultsFile)
-print("Outputting errors to", errorsFile)
-
-sdb, dom = CloudSetup.setup_sdb_domain("mqlib-domain2")
-rs = dom.select('select * from `mqlib-domain2`')
-dat = {}  # graphname -> output
-writer = csv.writer(open(resultsFile, "w"))
-if sys.argv[1] == "ALL":
-    writer.writerow(["timestamp", "graphname", "heuristic", "seed", "limit", "objective",
-                     "runtime"])
-else:
-    writer.writerow(["timestamp", "graphname", "heuristic", "seed", "limit", "objective"])
-
-errorOut = open(errorsFile, "w")
-for result in rs:
-    graphname = result["graphname"].strip()
-    heuristic = result["heuristic"].strip()
-    timestamp = result["timestamp"].strip()
-    seed = result["run"].strip()
-    output = ""
-    for idx in range(1000):
-        key = "output" + str(idx).zfill(3)
-        if key in result:
-            output += result[key]
-        else:
-            break  # We have exhausted all the output fields
-    output = output.strip()
+import ResultsSink
+
+BLOCK_ROWS = 1 << 20
+DOMAIN = "mqlib-domain2"
 
+def parse_history(output):
+    """
+    Parse a heuristic's output. Returns None if it is oddly formatted, and
+    otherwise (limit, solutions), where solutions iterates over the
+    (objective, runtime) strings of the new best solutions found within the
+    runtime limit, without splitting the whole history up front.
+    """
     # The heuristic history is between the []'s and is of the form
     # objective1:runtime1;objective2:runtime2;...
     start = output.find("[")
     end = output.find("]")
     if start < 0 or end < 0 or start >= end-1:
-        # Error in output; just report the solution of 0 at 0 seconds and log
-        # to the errors file.
-        if sys.argv[1] == "ALL":
-            writer.writerow([timestamp, graphname, heuristic, seed, "-1", "0", "0"])
-        else:
-            writer.writerow([timestamp, graphname, heuristic, seed, "-1", "0"])
-        errorOut.write("************ Oddly formatted heuristic output for " +
-                       graphname + " (" + heuristic + ")\n")
-        errorOut.write("timestamp: " + timestamp + "\n")
-        errorOut.write(output + "\n")
-    else:
-        limit = output.split(",")[0]
-        part = output[(start+1):end]
-        bestObjective = "0"
-        for piece in part.split(";"):
-            obj = piece.split(":")[0]
-            rt = piece.split(":")[1]
+        return None
+    limit = output.split(",")[0]
+
+    def solutions():
+        flimit = float(limit)
+        pos = start + 1
+        while pos < end:
+            sep = output.find(";", pos, end)
+            if sep < 0:
+                sep = end
+            colon = output.find(":", pos, sep)
+            obj = output[pos:colon]
+            rt = output[(colon+1):sep]
+            pos = sep + 1
             if float(obj) == 0:
                 rt = "0"  # We know solution 0 from the very beginning
-            if float(rt) > float(limit):
+            if float(rt) > flimit:
                 continue  # We don't process results after RT limit
-            if sys.argv[1] == "ALL":
-                writer.writerow([timestamp, graphname, heuristic, seed, limit, obj, rt])
+            yield obj, rt
+    return limit, solutions()
+
+def log_error(errorOut, graphname, heuristic, timestamp, output):
+    errorOut.write("************ Oddly formatted heuristic output for " +
+                   graphname + " (" + heuristic + ")\n")
+    errorOut.write("timestamp: " + timestamp + "\n")
+    errorOut.write(output + "\n")
+
+def run_fields(result):
+    return [result["timestamp"].strip(), result["graphname"].strip(),
+            result["heuristic"].strip(), result["run"].strip()]
+
+def grab_csv(mode, resultsFile, errorsFile):
+    sink = ResultsSink.default_sink(DOMAIN)
+    writer = csv.writer(open(resultsFile, "w"))
+    if mode == "ALL":
+        writer.writerow(["timestamp", "graphname", "heuristic", "seed", "limit", "objective",
+                         "runtime"])
+    else:
+        writer.writerow(["timestamp", "graphname", "heuristic", "seed", "limit", "objective"])
+
+    errorOut = open(errorsFile, "w")
+    for result, output in sink.items():
+        fields = run_fields(result)
+        output = output.strip()
+        parsed = parse_history(output)
+        if parsed is None:
+            # Error in output; just report the solution of 0 at 0 seconds and
+            # log to the errors file.
+            if mode == "ALL":
+                writer.writerow(fields + ["-1", "0", "0"])
+            else:
+                writer.writerow(fields + ["-1", "0"])
+            log_error(errorOut, fields[1], fields[2], fields[0], output)
+            continue
+        limit, solutions = parsed
+        bestObjective = "0"
+        for obj, rt in solutions:
+            if mode == "ALL":
+                writer.writerow(fields + [limit, obj, rt])
             elif float(obj) > float(bestObjective):
                 bestObjective = obj
-        if sys.argv[1] == "BEST":
-            writer.writerow([timestamp, graphname, heuristic, seed, limit, bestObjective])
+        if mode == "BEST":
+            writer.writerow(fields + [limit, bestObjective])
+
+def grab_columnar_part(args):
+    """
+    Process the part-th of num_parts parts of the runs, numbering them from
+    first_run. Writes the BEST rows and errors to the passed files and the
+    trajectories to trajDir.
+    """
+    import numpy as np
+    part, num_parts, first_run, bestFile, errorsFile, trajDir = args
+    sink = ResultsSink.default_sink(DOMAIN)
+    best_fp = open(bestFile, "w")
+    writer = csv.writer(best_fp)
+    errorOut = open(errorsFile, "w")
+    runs = np.empty(BLOCK_ROWS, dtype=np.int32)
+    objectives = np.empty(BLOCK_ROWS)
+    runtimes = np.empty(BLOCK_ROWS)
+    state = {"rows": 0, "block": 0}
+
+    def write_block():
+        rows = state["rows"]
+        if rows > 0:
+            np.savez_compressed(
+                os.path.join(trajDir, "part-%03d-%05d.npz" %
+                             (part, state["block"])),
+                run=runs[:rows], objective=objectives[:rows],
+                runtime=runtimes[:rows])
+            state["rows"] = 0
+            state["block"] += 1
+
+    run = first_run
+    for result, output in sink.items(part, num_parts):
+        fields = run_fields(result)
+        output = output.strip()
+        parsed = parse_history(output)
+        if parsed is None:
+            writer.writerow(fields + ["-1", "0"])
+            log_error(errorOut, fields[1], fields[2], fields[0], output)
+        else:
+            limit, solutions = parsed
+            best = 0.0
+            bestObjective = "0"
+            for obj, rt in solutions:
+                if state["rows"] == BLOCK_ROWS:
+                    write_block()
+                idx = state["rows"]
+                runs[idx] = run
+                objectives[idx] = float(obj)
+                runtimes[idx] = float(rt)
+                state["rows"] += 1
+                if objectives[idx] > best:
+                    best = objectives[idx]
+                    bestObjective = obj
+            writer.writerow(fields + [limit, bestObjective])
+        run += 1
+    write_block()
+    best_fp.close()
+    errorOut.close()
+
+def grab_columnar(numWorkers, resultsFile, errorsFile, trajDir):
+    sink = ResultsSink.default_sink(DOMAIN)
+    if not isinstance(sink, ResultsSink.SQLiteSink):
+        numWorkers = 1  # SimpleDB results are read in a single stream
+    os.makedirs(trajDir)
+
+    # Number the runs of each part after those of the previous parts, so the
+    # run indices match the row order of the combined BEST file
+    tasks = []
+    first_run = 0
+    for part in range(numWorkers):
+        tasks.append((part, numWorkers, first_run,
+                      "%s.part%03d" % (resultsFile, part),
+                      "%s.part%03d" % (errorsFile, part), trajDir))
+        first_run += sink.count(part, numWorkers)
+    if numWorkers == 1:
+        grab_columnar_part(tasks[0])
+    else:
+        pool = multiprocessing.Pool(numWorkers)
+        pool.map(grab_columnar_part, tasks)
+        pool.close()
+        pool.join()
+
+    # Combine the parts of the BEST and error files
+    with open(resultsFile, "w") as fp:
+        csv.writer(fp).writerow(["timestamp", "graphname", "heuristic", "seed",
+                                 "limit", "objective"])
+    with open(resultsFile, "ab") as fp:
+        for task in tasks:
+            with open(task[3], "rb") as part_fp:
+                shutil.copyfileobj(part_fp, fp)
+            os.remove(task[3])
+    with open(errorsFile, "wb") as fp:
+        for task in tasks:
+            with open(task[4], "rb") as part_fp:
+                shutil.copyfileobj(part_fp, fp)
+            os.remove(task[4])
+
+def main():
+    if not (len(sys.argv) == 2 and sys.argv[1] in ["ALL", "BEST", "COLUMNAR"]) and \
+       not (len(sys.argv) == 3 and sys.argv[1] == "COLUMNAR" and sys.argv[2].isdigit()):
+        print("Usage: python grabFullRuns.py ALL|BEST\n    [[or]]\n  python grabFullRuns.py COLUMNAR [numWorkers]")
+        exit(1)
+
+    suffixes = [""] + [str(x) for x in range(1, 10000)]
+    resultsFile = None
+    errorsFile = None
+    trajDir = None
+    for s in suffixes:
+        if not os.path.exists("../data/results" + s + ".csv") and not os.path.exists("../data/errors" + s + ".txt") and not os.path.exists("../data/trajectories" + s):
+            resultsFile = "../data/results" + s + ".csv"
+            errorsFile = "../data/errors" + s + ".txt"
+            trajDir = "../data/trajectories" + s
+            break
+    if resultsFile is None or errorsFile is None:
+        print("Could not allocate results or errors file")
+        exit(1)
+    print("Outputting results to " + resultsFile)
+    print("Outputting errors to " + errorsFile)
+
+    if sys.argv[1] == "COLUMNAR":
+        print("Outputting trajectories to " + trajDir)
+        numWorkers = int(sys.argv[2]) if len(sys.argv) == 3 else \
+            multiprocessing.cpu_count()
+        grab_columnar(max(numWorkers, 1), resultsFile, errorsFile, trajDir)
+    else:
+        grab_csv(sys.argv[1], resultsFile, errorsFile)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import csv
 import math
 import subprocess
-import CloudSetup
+import ResultsSink
 
 wMetrics = csv.writer(open("../data/metrics.csv", "w"))
 
@@ -11,10 +11,9 @@ out, err = p.communicate()
 metrics = out.decode("utf-8").strip().split(",")
 wMetrics.writerow(["graphname"] + metrics)
 
-sdb, dom = CloudSetup.setup_sdb_domain("mqlib-metrics")
-rs = dom.select('select * from `mqlib-metrics`')
-for result in rs:
+sink = ResultsSink.default_sink("mqlib-metrics")
+for result, output in sink.items():
     timestamp = result["timestamp"].strip()
     graphname = result["graphname"].strip()
-    output = result["output"].strip().split(",")
+    output = output.strip().split(",")
     wMetrics.writerow([graphname] + output)
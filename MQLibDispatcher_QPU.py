@@ -8,7 +8,8 @@ This script benchmarks the DWAVEQPU heuristic from MQLib on a collection of
 problem instances (QUBO or MAX-CUT).  Unlike the general dispatcher that
 computes a per-instance runtime based on a baseline heuristic, this version
 simply invokes the QPU on each instance once with fixed annealing parameters
-(the QPU backend ignores the MQLib runtime parameter).
+(the QPU backend ignores the MQLib runtime parameter).  The same driver can
+run the DWAVESA heuristic via `--heuristic DWAVESA`.
 
 Features:
 - **Sorts instances by size.**
@@ -27,18 +28,29 @@ Features:
   once. A single seed value (default 0) is recorded for compatibility with
   the analysis pipeline; it has no effect on the QPU’s behavior.
 
+- **Runs instances concurrently.**
+  With `--jobs N`, up to N instances are solved at once in a process pool.
+  Only the main process writes to the results and errors files.
+
+- **Streams graphs from their archives.**
+  The graph is decompressed straight from its `.zip` into MQLib's standard
+  input (`-fQ -` / `-fM -`), so nothing is extracted to disk and concurrent
+  solves share no working files.
+
 - **Results and errors.**
   Results are appended to a CSV file: each row has
   `timestamp,graphname,heuristic,seed,limit,objective`.
   Errors are appended to a separate file.
 
 - **Resumable.**
-  With `--skip_existing`, instances already present in the results file are
-  skipped. This allows easy restarting of partially completed runs.
+  With `--skip_existing`, instances already present in the results file for
+  the selected heuristic are skipped. This allows easy restarting of
+  partially completed runs.
 
 - **Stops on embedding error.**
-  If the QPU cannot embed an instance, the script logs the error and stops,
-  since larger instances will likely also fail.
+  If the QPU cannot embed an instance, the script logs the error and skips
+  every larger instance that has not started yet, since those will likely
+  also fail.  Smaller instances and solves already in flight still finish.
 
 Usage example:
     python3 MQLibDispatcher_QPU.py \
@@ -48,16 +60,27 @@ Usage example:
         --errors_file data/dwaveqpu_errors.txt \
         --skip_existing
 
+    python3 MQLibDispatcher_QPU.py \
+        --heuristic DWAVESA \
+        --jobs 8 \
+        --results_file data/dwavesa_results.csv \
+        --errors_file data/dwavesa_errors.txt \
+        --skip_existing
+
 By default the script expects the instance archives (`<graphname>.zip`) to live
 under `data/zips/`.  If your `.zip` files are elsewhere, pass `--zip_dir`.
 """
 
 import argparse
 import csv
+import os
+import shutil
 import subprocess
 import sys
+import threading
 import time
 import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 
 import pandas as pd
@@ -66,16 +89,175 @@ import pandas as pd
 # ------------------------------------------------------------------------------
 
 
-def extract_graph(zip_path: Path, work_dir: Path) -> None:
-    """Extract a graph archive into work_dir."""
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        zf.extractall(work_dir)
+def find_single_txt(zf: zipfile.ZipFile) -> str:
+    """Return the name of the single .txt member of zf, or None if not exactly one."""
+    txts = [name for name in zf.namelist() if name.endswith(".txt")]
+    return txts[0] if len(txts) == 1 else None
 
 
-def find_single_txt(work_dir: Path) -> Path:
-    """Return the single .txt file inside work_dir, or None if not exactly one."""
-    txts = list(work_dir.glob("*.txt"))
-    return txts[0] if len(txts) == 1 else None
+def run_with_graph(cmd, zf: zipfile.ZipFile, member: str):
+    """
+    Run cmd with the decompressed archive member streamed to its stdin, so the
+    graph is never extracted to disk.  Returns (stdout, stderr) as text.
+    """
+    with zf.open(member) as src:
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        # The feeder thread owns stdin, so communicate() must not touch it.
+        stdin, proc.stdin = proc.stdin, None
+
+        def feed():
+            try:
+                shutil.copyfileobj(src, stdin, 1 << 17)
+            except BrokenPipeError:
+                pass  # MQLib exited early; its output explains why
+            finally:
+                try:
+                    stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        feeder = threading.Thread(target=feed)
+        feeder.start()
+        stdout, stderr = proc.communicate()
+        feeder.join()
+    return stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+def parse_objective(stdout: str, heuristic: str):
+    """
+    Return the best objective from MQLib's result line, or None if absent.
+
+    The result line has the form
+    `limit,heuristic,"filename",best,runtime,[history]`.
+    """
+    for row in csv.reader(stdout.splitlines()):
+        if len(row) >= 5 and row[1] == heuristic:
+            try:
+                return float(row[3])
+            except ValueError:
+                return None
+    return None
+
+
+def solve_instance(graphname: str, problem: str, zip_path: Path,
+                   heuristic: str, seed_value: int):
+    """
+    Run MQLib on a single instance, piping the graph out of its archive.
+
+    Safe to call from worker processes: nothing is written to disk.  Returns
+    a tuple `(objective, messages, embedding_failed)`, where `objective` is
+    None if no result line was produced and `messages` are lines destined for
+    the errors file.
+    """
+    messages = []
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        # Find the .txt member holding the graph
+        member = find_single_txt(zf)
+        if member is None:
+            messages.append(
+                f"Error: {graphname} does not contain a single .txt file"
+            )
+            return None, messages, False
+
+        # Problem flag
+        file_flag = "-fQ" if problem == "QUBO" else "-fM"
+
+        cmd = [
+            "./bin/MQLib",
+            file_flag,
+            "-",  # Instance text arrives on stdin
+            "-h",
+            heuristic,
+            "-r",
+            "1.0",
+            "-s",
+            str(seed_value),
+        ]
+
+        try:
+            stdout, stderr = run_with_graph(cmd, zf, member)
+        except Exception as e:
+            messages.append(f"Error running {graphname}: {e}")
+            return None, messages, True
+
+    # The D-Wave heuristics report solver (e.g. embedding) failures on stderr,
+    # while MQLib itself prints "Error:" lines on stdout.
+    errors = [line for line in stdout.splitlines() if line.startswith("Error:")]
+    errors += [line for line in stderr.splitlines() if "error:" in line.lower()]
+    if errors:
+        messages.extend(f"{graphname} :: {line}" for line in errors)
+        return None, messages, True
+
+    best_obj = parse_objective(stdout, heuristic)
+    if best_obj is None:
+        messages.append(f"Warning: {graphname} produced no objective line.")
+    return best_obj, messages, False
+
+
+def task_failed(task, exc: BaseException):
+    """
+    Result for a task whose solve raised exc (e.g. a corrupt archive): the
+    failure is recorded for that instance only, so it is not treated as an
+    embedding failure and the other tasks continue.
+    """
+    return None, [f"Error running {task[0]}: {exc!r}"], False
+
+
+def run_serial(tasks):
+    """
+    Solve tasks one at a time, yielding `(rank, task, result)`.  After an
+    embedding failure the remaining (larger) tasks are yielded with result
+    None instead of being run.
+    """
+    failed = False
+    for rank, task in enumerate(tasks):
+        if failed:
+            yield rank, task, None
+            continue
+        print(f"Running {task[0]}...")
+        try:
+            result = solve_instance(*task)
+        except Exception as e:
+            result = task_failed(task, e)
+        failed = result[2]
+        yield rank, task, result
+
+
+def run_pool(tasks, jobs: int):
+    """
+    Solve tasks in a pool of `jobs` processes, yielding `(rank, task, result)`
+    in completion order.  Tasks are handed to the pool in rank order, at most
+    `jobs` at a time, so an embedding failure on the task with rank r stops
+    every task of rank greater than r that has not started yet; those are
+    yielded with result None.  Tasks that are already running finish.  A task
+    whose solve raises (e.g. on a corrupt archive) gets an error result, and
+    the others carry on.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        next_rank = 0
+        failed_rank = len(tasks)
+        while running or next_rank < failed_rank:
+            while len(running) < jobs and next_rank < failed_rank:
+                print(f"Running {tasks[next_rank][0]}...")
+                future = pool.submit(solve_instance, *tasks[next_rank])
+                running[future] = next_rank
+                next_rank += 1
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                rank = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = task_failed(tasks[rank], e)
+                if result[2]:
+                    failed_rank = min(failed_rank, rank)
+                yield rank, tasks[rank], result
+    for rank in range(next_rank, len(tasks)):
+        yield rank, tasks[rank], None
 
 
 def main() -> None:
@@ -83,6 +265,14 @@ def main() -> None:
         description="Local dispatcher for running DWAVEQPU on MQLib benchmarks."
     )
 
+    parser.add_argument(
+        "--heuristic",
+        type=str,
+        default="DWAVEQPU",
+        choices=["DWAVEQPU", "DWAVESA"],
+        help="MQLib heuristic code to run. Default: DWAVEQPU.",
+    )
+
     parser.add_argument(
         "--seed",
         type=int,
@@ -131,10 +321,22 @@ def main() -> None:
         ),
     )
 
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Number of instances to solve concurrently.  Use 0 for one per "
+            "CPU core.  Default: 1 (sequential)."
+        ),
+    )
+
     args = parser.parse_args()
 
     seed_value = args.seed
+    heuristic = args.heuristic
     zip_dir = Path(args.zip_dir)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
     # Load list of instances (.zip filenames)
     with open(args.instances_file, "r") as f:
@@ -179,7 +381,7 @@ def main() -> None:
         with open(results_path, "r") as fp:
             reader = csv.reader(fp)
             for row in reader:
-                if row and row[0] != "timestamp":
+                if len(row) > 2 and row[0] != "timestamp" and row[2] == heuristic:
                     existing_graphs.add(row[1])
 
     # Begin writing output
@@ -193,106 +395,48 @@ def main() -> None:
                 ["timestamp", "graphname", "heuristic", "seed", "limit", "objective"]
             )
 
-        # Working directory for extracting graphs
-        work_dir = Path("data/curgraph")
-        work_dir.mkdir(exist_ok=True)
-
-        encountered_error = False
+        def log_error(msg):
+            print(msg)
+            errors_fp.write(msg + "\n")
+            errors_fp.flush()
 
+        # Decide what to run, in ascending size order
+        tasks = []
         for graphname in instances_sorted:
             if args.skip_existing and graphname in existing_graphs:
                 print(f"Skipping {graphname} (already done).")
                 continue
 
-            if encountered_error:
-                print(f"Skipping {graphname} due to previous embedding failure.")
-                continue
-
             problem = problem_map.get(graphname)
             if problem not in ("QUBO", "MAXCUT"):
-                msg = f"Skipping {graphname}: unknown problem type {problem}"
-                print(msg)
-                errors_fp.write(msg + "\n")
-                errors_fp.flush()
+                log_error(f"Skipping {graphname}: unknown problem type {problem}")
                 continue
 
             # ZIP file location
             zip_path = zip_dir / graphname
             if not zip_path.is_file():
-                msg = f"Zip file not found: {zip_path}"
-                print(msg)
-                errors_fp.write(msg + "\n")
-                errors_fp.flush()
+                log_error(f"Zip file not found: {zip_path}")
                 continue
 
-            # Extract
-            for p in work_dir.iterdir():
-                if p.is_file():
-                    p.unlink()
-            extract_graph(zip_path, work_dir)
-
-            # Find extracted .txt file
-            input_path = find_single_txt(work_dir)
-            if input_path is None:
-                msg = f"Error: {graphname} did not extract to a single .txt file"
-                print(msg)
-                errors_fp.write(msg + "\n")
-                errors_fp.flush()
-                continue
+            tasks.append((graphname, problem, zip_path, heuristic, seed_value))
 
-            # Problem flag
-            file_flag = "-fQ" if problem == "QUBO" else "-fM"
-
-            cmd = [
-                "./bin/MQLib",
-                file_flag,
-                str(input_path),
-                "-h",
-                "DWAVEQPU",
-                "-r",
-                "1.0",
-                "-s",
-                str(seed_value),
-            ]
-
-            print(f"Running {graphname}...")
-            try:
-                proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            except Exception as e:
-                msg = f"Error running {graphname}: {e}"
-                print(msg)
-                errors_fp.write(msg + "\n")
-                errors_fp.flush()
-                encountered_error = True
-                continue
+        if jobs == 1:
+            results = run_serial(tasks)
+        else:
+            print(f"Solving {len(tasks)} instances with {jobs} workers.")
+            results = run_pool(tasks, jobs)
 
-            # Process output
-            outlines = (proc.stdout or "").splitlines()
-            best_obj = None
-
-            for line in outlines:
-                if line.startswith("Error:"):
-                    errors_fp.write(f"{graphname} :: {line}\n")
-                    errors_fp.flush()
-                    encountered_error = True
-                    break
-
-                if line.startswith("2,"):
-                    parts = line.split(",")
-                    if len(parts) >= 5:
-                        try:
-                            best_obj = float(parts[4])
-                        except ValueError:
-                            pass
-
-            if encountered_error:
+        # Single writer: results are recorded here as they arrive
+        for rank, task, result in results:
+            graphname = task[0]
+            if result is None:
+                print(f"Skipping {graphname} due to previous embedding failure.")
                 continue
 
+            best_obj, messages, _ = result
+            for msg in messages:
+                log_error(msg)
             if best_obj is None:
-                msg = f"Warning: {graphname} produced no objective line."
-                print(msg)
-                errors_fp.write(msg + "\n")
-                errors_fp.flush()
                 continue
 
             timestamp = time.time()
@@ -300,7 +444,7 @@ def main() -> None:
                 [
                     timestamp,
                     graphname,
-                    "DWAVEQPU",
+                    heuristic,
                     seed_value,
                     0.0,  # QPU does not use MQLib runtime limit
                     best_obj,
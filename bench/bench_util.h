@@ -0,0 +1,147 @@
+#ifndef BENCH_BENCH_UTIL_H_
+#define BENCH_BENCH_UTIL_H_
+
+#include <stdlib.h>
+#include <sys/time.h>
+#include <string>
+#include <utility>
+#include <vector>
+#include "problem/instance.h"
+#include "problem/max_cut_heuristic.h"
+#include "problem/max_cut_instance.h"
+#include "problem/qubo_heuristic.h"
+#include "problem/qubo_instance.h"
+#include "util/random.h"
+
+// Shared helpers for the programs in bench/, which time individual heuristic
+// components on generated instances and output their results in csv format.
+
+// Runtime in seconds since the passed start time
+inline double BenchTime(const struct timeval& start) {
+  struct timeval end;
+  gettimeofday(&end, 0);
+  return (end.tv_sec - start.tv_sec) + 0.000001 * (end.tv_usec - start.tv_usec);
+}
+
+// A Max-Cut heuristic that does nothing, for components (like solution
+// constructors) that need a heuristic to report to
+class BenchMaxCutHeuristic : public MaxCutHeuristic {
+ public:
+  BenchMaxCutHeuristic(const MaxCutInstance& mi) :
+    MaxCutHeuristic(mi, 1e9, false, NULL) {}
+};
+
+// The QUBO counterpart of BenchMaxCutHeuristic
+class BenchQUBOHeuristic : public QUBOHeuristic {
+ public:
+  BenchQUBOHeuristic(const QUBOInstance& qi) :
+    QUBOHeuristic(qi, 1e9, false, NULL) {}
+};
+
+// A generated instance resembling one from the G-set of Helmberg and Rendl,
+// which were produced by the rudy graph generator
+struct BenchGraph {
+  std::string name;
+  int n;
+  std::vector<Instance::InstanceTuple> edges;
+};
+
+// Random graph on n nodes where each edge is present with probability
+// density, with weight 1 or (if signed_weights) weights in {-1, 1}.
+inline BenchGraph RandomBenchGraph(const std::string& name, int n,
+                                   double density, bool signed_weights) {
+  BenchGraph g;
+  g.name = name;
+  g.n = n;
+  for (int i=1; i <= n; ++i) {
+    for (int j=i+1; j <= n; ++j) {
+      if (Random::RandDouble() < density) {
+        double w = (signed_weights && Random::RandDouble() < 0.5) ? -1.0 : 1.0;
+        g.edges.push_back(Instance::InstanceTuple(std::make_pair(i, j), w));
+      }
+    }
+  }
+  return g;
+}
+
+// Toroidal rows x cols grid with weights in {-1, 1}
+inline BenchGraph ToroidalBenchGraph(const std::string& name, int rows,
+                                     int cols) {
+  BenchGraph g;
+  g.name = name;
+  g.n = rows * cols;
+  for (int r=0; r < rows; ++r) {
+    for (int c=0; c < cols; ++c) {
+      int node = r * cols + c + 1;
+      int right = r * cols + (c + 1) % cols + 1;
+      int down = ((r + 1) % rows) * cols + c + 1;
+      double w1 = Random::RandDouble() < 0.5 ? -1.0 : 1.0;
+      double w2 = Random::RandDouble() < 0.5 ? -1.0 : 1.0;
+      g.edges.push_back(Instance::InstanceTuple(std::make_pair(node, right),
+                                                w1));
+      g.edges.push_back(Instance::InstanceTuple(std::make_pair(node, down),
+                                                w2));
+    }
+  }
+  return g;
+}
+
+// Instances with the sizes and structure of G-set graphs G1, G11, G22, G43,
+// G48, G55 and G70 (generated with a fixed seed)
+inline std::vector<BenchGraph> GSetBenchGraphs() {
+  srand(0);
+  std::vector<BenchGraph> graphs;
+  graphs.push_back(RandomBenchGraph("G1", 800, 0.06, false));
+  graphs.push_back(ToroidalBenchGraph("G11", 20, 40));
+  graphs.push_back(RandomBenchGraph("G22", 2000, 0.01, false));
+  graphs.push_back(RandomBenchGraph("G43", 1000, 0.02, false));
+  graphs.push_back(ToroidalBenchGraph("G48", 50, 60));
+  graphs.push_back(RandomBenchGraph("G55", 5000, 0.001, false));
+  graphs.push_back(RandomBenchGraph("G70", 10000, 0.0002, false));
+  return graphs;
+}
+
+// A generated QUBO instance resembling one from the OR-Library (Beasley 1990)
+struct BenchQUBO {
+  std::string name;
+  int n;
+  std::vector<Instance::InstanceTuple> off_diagonal;
+  std::vector<double> main_diagonal;
+};
+
+// Random QUBO instance on n variables where each off-diagonal entry is
+// non-zero with probability density, with integer entries drawn uniformly
+// from [-100, 100].
+inline BenchQUBO RandomBenchQUBO(const std::string& name, int n,
+                                 double density) {
+  BenchQUBO q;
+  q.name = name;
+  q.n = n;
+  for (int i=1; i <= n; ++i) {
+    q.main_diagonal.push_back(Random::RandInt(-100, 100));
+    for (int j=i+1; j <= n; ++j) {
+      if (Random::RandDouble() < density) {
+        q.off_diagonal.push_back(Instance::InstanceTuple(std::make_pair(i, j),
+                                                         Random::RandInt(-100,
+                                                                         100)));
+      }
+    }
+  }
+  return q;
+}
+
+// Instances with the sizes and densities of the OR-Library instances
+// bqp250, bqp500, bqp1000 and bqp2500, plus a sparse one with 5000 variables
+// (generated with a fixed seed)
+inline std::vector<BenchQUBO> BeasleyBenchQUBOs() {
+  srand(0);
+  std::vector<BenchQUBO> instances;
+  instances.push_back(RandomBenchQUBO("bqp250", 250, 0.1));
+  instances.push_back(RandomBenchQUBO("bqp500", 500, 0.1));
+  instances.push_back(RandomBenchQUBO("bqp1000", 1000, 0.1));
+  instances.push_back(RandomBenchQUBO("bqp2500", 2500, 0.1));
+  instances.push_back(RandomBenchQUBO("sparse5000", 5000, 0.001));
+  return instances;
+}
+
+#endif
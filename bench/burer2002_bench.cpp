@@ -0,0 +1,51 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <vector>
+#include "bench_util.h"
+#include "heuristics/maxcut/burer2002.h"
+#include "problem/max_cut_instance.h"
+#include "util/random.h"
+
+// Measure the throughput of the rank-2 relaxation at the core of BURER2002:
+// the number of cuts per second (gradient descent on f(theta) followed by
+// Procedure-CUT, as in Burer2002Solution::Rank2Cut) on generated instances
+// the size of G-set graphs. Each cut after the first starts from a perturbed
+// copy of the previous cut, as in the heuristic.
+//
+// Usage: bin/burer2002_bench [seconds_per_instance]
+int main(int argc, const char* argv[]) {
+  double seconds = argc > 1 ? atof(argv[1]) : 2.0;
+  const double pi = 3.14159265358979323846;
+  std::vector<BenchGraph> graphs = GSetBenchGraphs();
+
+  printf("instance,nodes,edges,cuts,seconds,cuts_per_second\n");
+  for (int g=0; g < (int)graphs.size(); ++g) {
+    MaxCutInstance mi(graphs[g].edges, graphs[g].n);
+    BenchMaxCutHeuristic heuristic(mi);
+    Burer2002Kernel kernel(mi);
+    srand(144);
+    std::vector<double> theta(mi.get_size());
+    for (int ct=0; ct < mi.get_size(); ++ct) {
+      theta[ct] = Random::RandDouble() * 2 * pi;
+    }
+
+    struct timeval start;
+    gettimeofday(&start, 0);
+    int cuts = 0;
+    double elapsed = 0.0;
+    while (elapsed < seconds) {
+      Burer2002Solution x = Burer2002Solution::Rank2Cut(mi, &kernel, &theta,
+                                                        &heuristic);
+      ++cuts;
+      for (int ct=0; ct < mi.get_size(); ++ct) {
+        theta[ct] = pi / 2.0 * (1.0 - x.get_assignments()[ct]) +
+          0.2 * (2 * pi * Random::RandDouble() - pi);
+      }
+      elapsed = BenchTime(start);
+    }
+    printf("%s,%d,%d,%d,%f,%f\n", graphs[g].name.c_str(), mi.get_size(),
+           mi.get_edge_count(), cuts, elapsed, cuts / elapsed);
+  }
+  return 0;
+}
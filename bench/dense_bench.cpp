@@ -0,0 +1,140 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <string>
+#include <vector>
+#include "bench_util.h"
+#include "heuristics/maxcut/max_cut_solution.h"
+#include "heuristics/qubo/qubo_solution.h"
+#include "problem/instance.h"
+#include "problem/max_cut_instance.h"
+#include "problem/qubo_instance.h"
+#include "util/random.h"
+
+// Compare the dense-matrix storage of instances (selected automatically by
+// Instance::UseDense) against the adjacency lists on QUBO and Max-Cut
+// instances of increasing density: the bytes used by each representation,
+// the number of single-variable flips (gain updates) per second and the
+// number of PopulateFromAssignments calls per second. Flips are of random
+// variables, starting from a random solution.
+//
+// Usage: bin/dense_bench [seconds_per_run]
+
+// Copies of the instances without the dense matrix, so the adjacency lists
+// are used
+class SparseQUBOInstance : public QUBOInstance {
+ public:
+  SparseQUBOInstance(const QUBOInstance& qi) : QUBOInstance(qi) {
+    dense_.clear();
+  }
+};
+
+class SparseMaxCutInstance : public MaxCutInstance {
+ public:
+  SparseMaxCutInstance(const MaxCutInstance& mi) : MaxCutInstance(mi) {
+    dense_.clear();
+  }
+};
+
+// Solutions exposing the flip
+class BenchQUBOSolution : public QUBOSolution {
+ public:
+  BenchQUBOSolution(const QUBOInstance& qi, QUBOHeuristic* heuristic) :
+    QUBOSolution(QUBOSolution::RandomSolution(qi, heuristic)) {}
+  void Flip(int i) {  UpdateCutValues(i);  }
+};
+
+class BenchMaxCutSolution : public MaxCutSolution {
+ public:
+  BenchMaxCutSolution(const MaxCutInstance& mi, MaxCutHeuristic* heuristic) :
+    MaxCutSolution(MaxCutSolution::RandomSolution(mi, heuristic)) {}
+  void Flip(int i) {  UpdateCutValues(i);  }
+};
+
+// Bytes used by the adjacency lists and edge list of an instance with n nodes
+// and m edges (each edge is stored three times)
+double SparseBytes(int n, int m) {
+  return n * sizeof(std::vector<std::pair<int, Instance::Weight> >) +
+    2.0 * m * sizeof(std::pair<int, Instance::Weight>) +
+    m * sizeof(Instance::InstanceTuple);
+}
+
+// Time random flips, then PopulateFromAssignments calls, for seconds each
+template <class Solution>
+void TimeSolution(Solution* x, int n, double seconds, double* flipsPerSecond,
+                  double* populatesPerSecond) {
+  srand(144);
+  struct timeval start;
+  gettimeofday(&start, 0);
+  long long flips = 0;
+  double elapsed = 0.0;
+  while (elapsed < seconds) {
+    for (int ct=0; ct < 1000; ++ct) {
+      x->Flip(Random::RandInt(0, n-1));
+    }
+    flips += 1000;
+    elapsed = BenchTime(start);
+  }
+  *flipsPerSecond = flips / elapsed;
+
+  gettimeofday(&start, 0);
+  int populates = 0;
+  elapsed = 0.0;
+  while (elapsed < seconds) {
+    x->PopulateFromAssignments();
+    ++populates;
+    elapsed = BenchTime(start);
+  }
+  *populatesPerSecond = populates / elapsed;
+}
+
+int main(int argc, const char* argv[]) {
+  double seconds = argc > 1 ? atof(argv[1]) : 2.0;
+  const int n = 2000;
+  const double densities[] = {0.1, 0.25, 0.5, 0.75, 1.0};
+
+  printf("problem,nodes,density,storage,megabytes,flips_per_second,"
+         "populates_per_second\n");
+  for (int d=0; d < 5; ++d) {
+    srand(0);
+    BenchQUBO q = RandomBenchQUBO("", n, densities[d]);
+    QUBOInstance qi(q.off_diagonal, q.main_diagonal, q.n);
+    SparseQUBOInstance sparse_qi(qi);
+    for (int s=0; s < 2; ++s) {
+      const QUBOInstance& inst = s == 0 ? sparse_qi : qi;
+      if (s == 1 && !inst.is_dense()) {
+        continue;
+      }
+      BenchQUBOHeuristic heuristic(inst);
+      BenchQUBOSolution x(inst, &heuristic);
+      double flipsPerSecond, populatesPerSecond;
+      TimeSolution(&x, n, seconds, &flipsPerSecond, &populatesPerSecond);
+      double bytes = SparseBytes(n, inst.get_edge_count()) +
+        (s == 1 ? (double)sizeof(Instance::Weight) * n * n : 0.0);
+      printf("QUBO,%d,%.2f,%s,%.1f,%.0f,%.1f\n", n, densities[d],
+             s == 0 ? "sparse" : "dense", bytes / 1e6, flipsPerSecond,
+             populatesPerSecond);
+    }
+
+    srand(0);
+    BenchGraph g = RandomBenchGraph("", n, densities[d], true);
+    MaxCutInstance mi(g.edges, g.n);
+    SparseMaxCutInstance sparse_mi(mi);
+    for (int s=0; s < 2; ++s) {
+      const MaxCutInstance& inst = s == 0 ? sparse_mi : mi;
+      if (s == 1 && !inst.is_dense()) {
+        continue;
+      }
+      BenchMaxCutHeuristic heuristic(inst);
+      BenchMaxCutSolution x(inst, &heuristic);
+      double flipsPerSecond, populatesPerSecond;
+      TimeSolution(&x, n, seconds, &flipsPerSecond, &populatesPerSecond);
+      double bytes = SparseBytes(n, inst.get_edge_count()) +
+        (s == 1 ? (double)sizeof(Instance::Weight) * n * n : 0.0);
+      printf("MaxCut,%d,%.2f,%s,%.1f,%.0f,%.1f\n", n, densities[d],
+             s == 0 ? "sparse" : "dense", bytes / 1e6, flipsPerSecond,
+             populatesPerSecond);
+    }
+  }
+  return 0;
+}
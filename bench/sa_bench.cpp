@@ -0,0 +1,114 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <algorithm>
+#include <string>
+#include <vector>
+#include "bench_util.h"
+#include "heuristics/qubo/alkhamis1998.h"
+#include "heuristics/qubo/beasley1998.h"
+#include "heuristics/qubo/katayama2001.h"
+#include "heuristics/qubo/qubo_solution.h"
+#include "problem/qubo_instance.h"
+#include "util/annealing.h"
+
+// Measure the throughput of the simulated annealing loops of ALKHAMIS1998,
+// BEASLEY1998SA and KATAYAMA2001: the number of sweeps (n trial moves) per
+// second, running each heuristic's annealing schedule from random solutions
+// on generated instances the size of OR-Library instances. accept_rate is the
+// fraction of trial moves that were made.
+//
+// Usage: bin/sa_bench [seconds_per_run]
+
+// Katayama2001: sweeps over random permutations until TERM_COUNT sweeps in a
+// row have no improving move, cooling after every trial move
+void KatayamaAnneal(const QUBOInstance& qi, QUBOHeuristic* heuristic,
+                    Annealer* sa, double seconds, const struct timeval& start) {
+  std::vector<int> RP(qi.get_size());
+  for (int i=0; i < qi.get_size(); ++i) {
+    RP[i] = i;
+  }
+  while (BenchTime(start) < seconds) {
+    Katayama2001Solution x = QUBOSolution::RandomSolution(qi, heuristic);
+    double T = 0.3 * qi.get_size();
+    for (int counter=0; counter < 10 && BenchTime(start) < seconds; ) {
+      ++counter;
+      std::random_shuffle(RP.begin(), RP.end());
+      for (int j=0; j < qi.get_size(); ++j) {
+        sa->set_temperature(T);
+        if (x.SASwap(RP[j], sa)) {
+          counter = 0;
+        }
+        T *= 0.99;
+      }
+    }
+  }
+}
+
+// Beasley1998SA: T* random trial moves, cooling after each one and keeping
+// track of the best solution
+void BeasleyAnneal(const QUBOInstance& qi, QUBOHeuristic* heuristic,
+                   Annealer* sa, double seconds, const struct timeval& start) {
+  const int T_star = std::max(500000, 5000 * qi.get_size());
+  while (BenchTime(start) < seconds) {
+    Beasley1998Solution sol(QUBOSolution::RandomSolution(qi, heuristic));
+    Beasley1998Solution best_sol(sol);
+    double T = qi.get_size();
+    for (int t=1; t <= T_star; ++t) {
+      sa->set_temperature(T);
+      sol.SA(sa);
+      T *= 0.995;
+      if (sol.ImprovesOver(best_sol)) {
+        best_sol = sol;
+      }
+      if (t % 10000 == 0 && BenchTime(start) >= seconds) {
+        break;
+      }
+    }
+  }
+}
+
+// Alkhamis1998: the full annealing procedure from random solutions
+void AlkhamisAnneal(const QUBOInstance& qi, QUBOHeuristic* heuristic,
+                    Annealer* sa, double seconds, const struct timeval& start) {
+  double T_initial = Alkhamis1998Solution::InitialTemperature(qi, 20,
+                                                              heuristic);
+  while (BenchTime(start) < seconds) {
+    Alkhamis1998Solution X(QUBOSolution::RandomSolution(qi, heuristic));
+    X.SA(T_initial, 0, sa);
+  }
+}
+
+int main(int argc, const char* argv[]) {
+  double seconds = argc > 1 ? atof(argv[1]) : 2.0;
+  std::vector<BenchQUBO> instances = BeasleyBenchQUBOs();
+  const char* names[] = {"ALKHAMIS1998", "BEASLEY1998SA", "KATAYAMA2001"};
+
+  printf("heuristic,instance,variables,nonzeros,sweeps,seconds,"
+         "sweeps_per_second,accept_rate\n");
+  for (int q=0; q < (int)instances.size(); ++q) {
+    QUBOInstance qi(instances[q].off_diagonal, instances[q].main_diagonal,
+                    instances[q].n);
+    for (int h=0; h < 3; ++h) {
+      BenchQUBOHeuristic heuristic(qi);
+      srand(144);
+      Annealer sa(qi.get_size());
+      struct timeval start;
+      gettimeofday(&start, 0);
+      if (h == 0) {
+        AlkhamisAnneal(qi, &heuristic, &sa, seconds, start);
+      } else if (h == 1) {
+        BeasleyAnneal(qi, &heuristic, &sa, seconds, start);
+      } else {
+        KatayamaAnneal(qi, &heuristic, &sa, seconds, start);
+      }
+      double elapsed = BenchTime(start);
+      printf("%s,%s,%d,%d,%.1f,%f,%f,%f\n", names[h],
+             instances[q].name.c_str(), qi.get_size(), qi.get_edge_count(),
+             sa.get_sweeps(), elapsed, sa.get_sweeps() / elapsed,
+             sa.get_trials() > 0 ?
+             (double)sa.get_accepted() / sa.get_trials() : 0.0);
+    }
+  }
+  return 0;
+}
@@ -0,0 +1,103 @@
+#ifndef HEURISTICS_ELITE_POOL_H_
+#define HEURISTICS_ELITE_POOL_H_
+
+#include <stddef.h>
+#include <stdint.h>
+#include <unordered_map>
+#include <vector>
+#include "heuristics/base_solution.h"
+
+// Bookkeeping for a fixed number of slots holding the elite solutions of a
+// population-based or tabu heuristic (the solutions themselves are stored by
+// the heuristic). For each slot, the pool keeps a bit-packed copy of the
+// solution (bit i is set if assignment i is 1, so this works for both Max-Cut
+// and QUBO solutions) and a hash of it, and it maintains the matrix of
+// Hamming distances between all pairs of filled slots. If variable weights
+// are provided, it also maintains the matrix of weighted distances (the sum
+// of the weights of the variables in which two solutions differ).
+//
+// Filling a slot only updates that slot's row and column of the matrices, and
+// distances are computed with XOR and popcount over the packed words, so
+// replacing one solution in a pool of p solutions with n variables takes
+// O(p n / 64) time rather than the O(p^2 n) needed to recompute all pairwise
+// distances.
+class ElitePool {
+ public:
+  // A pool of capacity slots for solutions with n variables, tracking
+  // weighted distances if weights is not NULL (it must have n elements).
+  ElitePool(int n, int capacity, const std::vector<double>* weights = NULL);
+
+  int get_capacity() const {  return capacity_;  }
+
+  // Number of filled slots
+  int size() const {  return size_;  }
+
+  // Store x in slot (filling it if it was empty), updating the distances
+  void Set(int slot, const BaseSolution& x);
+
+  // Distances between two filled slots
+  int Distance(int slot1, int slot2) const {
+    return dist_[slot1 * capacity_ + slot2];
+  }
+  double WeightedDistance(int slot1, int slot2) const {
+    return weighted_dist_[slot1 * capacity_ + slot2];
+  }
+
+  // Sum of the Hamming distances over all pairs of filled slots
+  long long get_distance_sum() const {  return dist_sum_;  }
+
+  // Compute the distances from x to the solution in each slot (dist[slot] is
+  // 0 for empty slots). weighted_dist can only be non-NULL if the pool has
+  // variable weights.
+  void Distances(const BaseSolution& x, std::vector<int>* dist,
+                 std::vector<double>* weighted_dist = NULL) const;
+
+  // Return the slot storing a solution with the same assignments as x, or -1
+  // if there is no such slot
+  int Find(const BaseSolution& x) const;
+  bool Contains(const BaseSolution& x) const {  return Find(x) >= 0;  }
+
+ private:
+  // Pack the assignments of x into words, returning the hash of the result
+  uint64_t Pack(const BaseSolution& x, uint64_t* words) const;
+
+  // Distances between packed solutions a and b
+  int PackedDistance(const uint64_t* a, const uint64_t* b) const;
+  double PackedWeightedDistance(const uint64_t* a, const uint64_t* b) const;
+
+  int n_;
+  int capacity_;
+  int words_;  // 64-bit words per packed solution
+  int size_;
+  std::vector<bool> filled_;
+  std::vector<uint64_t> bits_;  // words_ words for each slot
+  std::vector<uint64_t> hash_;
+  std::vector<int> dist_;  // capacity_ x capacity_, symmetric
+  long long dist_sum_;
+  const std::vector<double>* weights_;
+  std::vector<double> weighted_dist_;  // capacity_ x capacity_, symmetric
+  mutable std::vector<uint64_t> scratch_;  // Packed copy of a query solution
+};
+
+// Set of elite solutions for heuristics that only need to detect duplicates:
+// keeps a bit-packed copy and hash of each solution (as ElitePool does) but no
+// distances, so inserting or erasing a solution takes O(n / 64) time.
+class EliteSet {
+ public:
+  explicit EliteSet(int n);
+
+  // Add x to the set, or remove one solution with the same assignments as x
+  void Insert(const BaseSolution& x);
+  void Erase(const BaseSolution& x);
+
+  // Whether the set has a solution with the same assignments as x
+  bool Contains(const BaseSolution& x) const;
+
+ private:
+  int n_;
+  int words_;  // 64-bit words per packed solution
+  std::unordered_multimap<uint64_t, std::vector<uint64_t> > members_;
+  mutable std::vector<uint64_t> scratch_;  // Packed copy of a query solution
+};
+
+#endif
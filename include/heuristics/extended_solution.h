@@ -3,6 +3,7 @@
 
 #include <vector>
 #include "heuristics/base_solution.h"
+#include "util/profile.h"
 
 class ExtendedSolution : public BaseSolution {
  public:
@@ -62,13 +63,29 @@ class ExtendedSolution : public BaseSolution {
 			       std::vector<double>* diff_weights,
 			       double *objective) const = 0;
 
+  // Profile of the associated heuristic (NULL if there is none). Extending
+  // classes must implement.
+  virtual Profile* get_profile() const = 0;
+
+  // Count events in the profile of the associated heuristic, if profiling is
+  // enabled
+  void Count(Profile::Counter counter, long long amount = 1) const {
+    if (Profile::enabled()) {
+      Profile* profile = get_profile();
+      if (profile) {
+        profile->Count(counter, amount);
+      }
+    }
+  }
+
   // Switch the set of update_index, updating class variables assignments_,
   // diff_weights_, and weight_
   void UpdateCutValues(int update_index) {
     UpdateCutValues(update_index, &assignments_, &diff_weights_, &weight_);
   }
 
-  // Amount you would gain from switching sets / flipping variable
+  // Amount you would gain from switching sets / flipping variable (double
+  // even with USE_FLOAT_WEIGHTS, since it is updated incrementally)
   std::vector<double> diff_weights_;
 
  private:
@@ -0,0 +1,84 @@
+#ifndef HEURISTICS_GAIN_INDEX_H_
+#define HEURISTICS_GAIN_INDEX_H_
+
+#include <stdint.h>
+#include <vector>
+
+// Order-statistics index over a subset of the ids 0..n-1, each with a key (the
+// gain of a candidate move in the constructive procedures). Ids are ordered by
+// decreasing key, with ties broken by increasing id, so rank 0 is the id with
+// the largest key. Insertion, removal, key updates, rank selection and
+// counting the ids with key at least some cutoff all take O(log n) expected
+// time, which lets GRASP-style constructions find the best candidate or sample
+// a threshold-based restricted candidate list without scanning all n
+// variables at every step.
+//
+// The index is a treap stored in arrays indexed by id. Node priorities are a
+// fixed hash of the id, so using an index does not draw from the heuristic's
+// random number streams.
+class GainIndex {
+ public:
+  // An empty index over the ids 0..n-1
+  explicit GainIndex(int n);
+
+  // Add id (which must not be in the index) with the given key
+  void Insert(int id, double key);
+
+  // Remove id, which must be in the index
+  void Erase(int id);
+
+  // Change the key of id, if it is in the index
+  void Update(int id, double key);
+
+  bool Contains(int id) const {  return in_[id];  }
+  int size() const {  return root_ < 0 ? 0 : size_[root_];  }
+  double get_key(int id) const {  return key_[id];  }
+
+  // The id with the largest key (smallest id among ties) and the id with the
+  // smallest key, or -1 if the index is empty
+  int Max() const;
+  int Min() const;
+
+  // Number of ids with key >= cutoff; these are the ids of ranks 0 through
+  // CountAtLeast(cutoff)-1.
+  int CountAtLeast(double cutoff) const;
+
+  // The id of rank k (0 <= k < size())
+  int Select(int k) const;
+
+  // Whether maintaining an index is expected to beat scanning all n
+  // variables at each step of a construction on a graph with the given
+  // number of edges: every assignment updates the keys of its neighbors at
+  // O(log n) each, so on dense instances plain scans are cheaper.
+  static bool Worthwhile(int n, int num_edges);
+
+ private:
+  // Does id a come before id b in the index order?
+  bool Before(int a, int b) const {
+    return key_[a] > key_[b] || (key_[a] == key_[b] && a < b);
+  }
+
+  // Split the treap rooted at t into the ids before id (*l) and the rest (*r)
+  void Split(int t, int id, int* l, int* r);
+
+  // Merge treaps l and r, where every id in l comes before every id in r
+  int Merge(int l, int r);
+
+  // Remove id from the treap rooted at t, returning the new root
+  int Erase(int t, int id);
+
+  void Resize(int t) {
+    size_[t] = 1 + (left_[t] < 0 ? 0 : size_[left_[t]]) +
+      (right_[t] < 0 ? 0 : size_[right_[t]]);
+  }
+
+  std::vector<double> key_;
+  std::vector<uint32_t> priority_;
+  std::vector<int> left_;
+  std::vector<int> right_;
+  std::vector<int> size_;  // Size of the subtree rooted at each id
+  std::vector<char> in_;
+  int root_;
+};
+
+#endif
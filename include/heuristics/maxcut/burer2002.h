@@ -1,16 +1,63 @@
 #ifndef HEURISTICS_MAXCUT_BURER_2002_H_
 #define HEURISTICS_MAXCUT_BURER_2002_H_
 
+#include <utility>
 #include <vector>
 #include "heuristics/maxcut/max_cut_solution.h"
 #include "problem/max_cut_heuristic.h"
 
-class Burer2002Solution : public MaxCutSolution {
+// Work space for the rank-2 relaxation of Burer2002, shared by all the cuts
+// of a run so that nothing is reallocated per cut or per gradient step. Edges
+// are stored as separate arrays of endpoints and weights, and the objective,
+// dH and gradient are computed together in a single sweep over the edges.
+class Burer2002Kernel {
  public:
-  static Burer2002Solution Rank2Cut(const MaxCutInstance& mi, double w1norm,
+  Burer2002Kernel(const MaxCutInstance& mi);
+
+  // 1-norm of vec(W), the vectorization of the weight matrix
+  double get_w1norm() const {  return w1norm_;  }
+
+ private:
+  friend class Burer2002Solution;
+
+  // Given a new theta vector, compute the element-wise cosine and sine, and
+  // then with one pass over the edges the weighted sum of the cosines of the
+  // angle differences between paired nodes (returned), dH (the negative of
+  // the cosine differences incident to each node) and the gradient g.
+  double Evaluate(const std::vector<double>& theta);
+
+  int N_;
+  double w1norm_;
+
+  // Edge endpoints and weights, in the order of the instance's edge list
+  std::vector<int> edge_i_;
+  std::vector<int> edge_j_;
+  std::vector<double> edge_w_;
+
+  // Cosine (even indices) and sine (odd indices) of each angle, interleaved
+  // so the values an edge needs for an endpoint share a cache line
+  std::vector<double> cos_sin_;
+
+  // dH (even indices) and gradient g (odd indices), interleaved likewise
+  std::vector<double> dH_g_;
+
+  // Descent direction and candidate angles in the line search
+  std::vector<double> desc_;
+  std::vector<double> new_theta_;
+
+  // Buffers for Procedure-CUT
+  std::vector<std::pair<double, int> > angles_;
+  std::vector<int> curr_assignments_;
+  std::vector<double> curr_diff_weights_;
+};
+
+class Burer2002Solution final : public MaxCutSolution {
+ public:
+  static Burer2002Solution Rank2Cut(const MaxCutInstance& mi,
+				    Burer2002Kernel* kernel,
 				    std::vector<double>* theta,
 				    MaxCutHeuristic *heuristic) {
-    return Burer2002Solution(mi, w1norm, theta, heuristic);
+    return Burer2002Solution(mi, kernel, theta, heuristic);
   }
 
 
@@ -19,27 +66,34 @@ class Burer2002Solution : public MaxCutSolution {
 
  private:
   // Obtain an initial cut using gradient descent to minimize f(theta) from a
-  // random initial theta, followed by Procedure-CUT. w1norm is the 1-norm of
-  // the matrix of weights, and theta is passed as the initial theta vector
+  // random initial theta, followed by Procedure-CUT. kernel holds the edges
+  // and work buffers for mi, and theta is passed as the initial theta vector
   // for the search and returned as the final one.
-  Burer2002Solution(const MaxCutInstance& mi, double w1norm,
+  Burer2002Solution(const MaxCutInstance& mi, Burer2002Kernel* kernel,
 		    std::vector<double>* theta,
 		    MaxCutHeuristic *heuristic);
-
-  // Given a new theta vector, compute the element-wise cosine and sine, as well
-  // as weighted sum of the cosines of the angle differences between paired
-  // nodes (returned through command-line arguments). Return objective.
-  double LoadNewTheta(const std::vector<double>& theta,
-		      std::vector<double>* cos_theta,
-		      std::vector<double>* sin_theta, std::vector<double>* dH);
 };
 
+// Solutions found by worker threads, waiting to be reported (see
+// burer2002.cpp)
+struct Burer2002Shared;
+
 class Burer2002 : public MaxCutHeuristic {
  public:
   // Solves Max-Cut on edge-weighted graph mi, reporting each new best
-  // solution to the reporter.
+  // solution to the reporter. With Heuristic::get_num_threads() > 1, the
+  // random restarts are run on that many threads.
   Burer2002(const MaxCutInstance& mi, double runtime_limit, bool validation,
             MaxCutCallback* mc);
+
+ private:
+  // Run random restarts until termination. On a single-threaded run, shared
+  // and rng are NULL and random numbers come from Random. Otherwise each
+  // thread passes the state of its own random number stream, the main thread
+  // (main_thread true) reports solutions (including those published by the
+  // other threads through shared) and the other threads publish their
+  // improving solutions through shared, stopping once it says to.
+  void Restarts(Burer2002Shared* shared, bool main_thread, unsigned int* rng);
 };
 
 #endif
@@ -11,7 +11,7 @@ class Festa2002PartialSolution : public MaxCutPartialSolution {
   static
     Festa2002PartialSolution AdaptiveGreedySolution(const MaxCutInstance& mi,
 						    double alpha,
-						    const std::vector<std::pair<std::pair<int, int>, double> >& sorted,
+						    const std::vector<Instance::InstanceTuple>& sorted,
 						    MaxCutHeuristic *heuristic) {
     return Festa2002PartialSolution(mi, alpha, sorted, heuristic);
   }
@@ -22,7 +22,7 @@ class Festa2002PartialSolution : public MaxCutPartialSolution {
  private:
   // Initialize using the adaptive greedy function described in Sec. 2.1
   Festa2002PartialSolution(const MaxCutInstance& mi, double alpha,
-			   const std::vector<std::pair<std::pair<int, int>, double> >& sorted,
+			   const std::vector<Instance::InstanceTuple>& sorted,
 			   MaxCutHeuristic *heuristic);
 
 
@@ -0,0 +1,71 @@
+#ifndef HEURISTICS_MAXCUT_KERNEL_HEURISTIC_H_
+#define HEURISTICS_MAXCUT_KERNEL_HEURISTIC_H_
+
+#include <string>
+#include <vector>
+#include "problem/max_cut_heuristic.h"
+#include "problem/max_cut_kernel.h"
+#include "problem/qubo_heuristic.h"
+
+// Runs a heuristic (Max-Cut or QUBO, given by its code) on the instance
+// reduced by MaxCutKernel, reporting every new best solution of the reduced
+// instance as the corresponding solution of the original. QUBO heuristics
+// solve the QUBO form of the reduced instance. If presolve or components is
+// set, the QUBO form is solved with QUBOPresolveHeuristic or
+// QUBOComponentHeuristic (kernelization often leaves several components).
+class MaxCutKernelHeuristic : public MaxCutHeuristic {
+ public:
+  MaxCutKernelHeuristic(const MaxCutInstance& mi, double runtime_limit,
+                        bool validation, MaxCutCallback *mc,
+                        const std::string& code, bool presolve,
+                        bool components);
+
+  // Report a solution of the reduced instance (with cut weight in the reduced
+  // instance) on behalf of the heuristic, with or without an iteration count.
+  bool ReportReduced(const std::vector<int>& assignments, double weight);
+  bool ReportReduced(const std::vector<int>& assignments, double weight,
+                     int iter);
+
+  // Nodes removed by the kernelization
+  int get_num_removed() const {  return kernel_.get_num_removed();  }
+
+ private:
+  // Add the profile of a finished heuristic run on the reduced instance to
+  // ours, and delete it
+  void Finish(Heuristic *h);
+
+  MaxCutKernel kernel_;
+  std::vector<int> lifted_;  // Reused by ReportReduced
+};
+
+// Callbacks passing the solutions of a heuristic run on the reduced instance
+// to MaxCutKernelHeuristic; only new best solutions are converted and
+// reported.
+class KernelMaxCutCallback : public MaxCutCallback {
+ public:
+  KernelMaxCutCallback(MaxCutKernelHeuristic* heuristic);
+  bool Report(const MaxCutSimpleSolution& solution, bool newBest,
+              double runtime);
+  bool Report(const MaxCutSimpleSolution& solution, bool newBest,
+              double runtime, int iter);
+
+ private:
+  MaxCutKernelHeuristic* heuristic_;
+};
+
+class KernelQUBOCallback : public QUBOCallback {
+ public:
+  // reduced is the reduced Max-Cut instance that the QUBO instance being
+  // solved was constructed from
+  KernelQUBOCallback(MaxCutKernelHeuristic* heuristic,
+                     const MaxCutInstance& reduced);
+  bool Report(const QUBOSimpleSolution& solution, bool newBest, double runtime);
+  bool Report(const QUBOSimpleSolution& solution, bool newBest,
+              double runtime, int iter);
+
+ private:
+  MaxCutKernelHeuristic* heuristic_;
+  const MaxCutInstance& reduced_;
+};
+
+#endif
@@ -2,6 +2,7 @@
 #define HEURISTICS_MAXCUT_MAXCUT_PARTIAL_SOLUTION_H_
 
 #include <vector>
+#include "heuristics/gain_index.h"
 #include "problem/max_cut_heuristic.h"
 
 // Some constructive procedures for MAXCUT assign edges one at a time
@@ -32,6 +33,14 @@ class MaxCutPartialSolution {
   // gainS_, gainNS_, assignments_, num_unassigned_, and weight_.
   void UpdateCutValues(int update_index, int new_value);
 
+  // Index the gains of the unassigned nodes, so constructions can find the
+  // best moves without scanning all nodes. Move 2*i assigns node i to S (its
+  // key is gainS_[i]) and move 2*i+1 assigns it to NS (key gainNS_[i]);
+  // group[m] is the index holding move m in gain_index_ (-1 for moves that
+  // are not indexed). From then on UpdateCutValues keeps the keys current and
+  // removes the moves of assigned nodes.
+  void IndexGains(const std::vector<int>& group, int num_groups);
+
   // Problem instance
   const MaxCutInstance& mi_;
   // Associated heuristic
@@ -48,6 +57,14 @@ class MaxCutPartialSolution {
   int num_unassigned_;
   // Objective value
   double weight_;
+  // Gain indices set up by IndexGains (empty if not used), and the index of
+  // each move
+  std::vector<GainIndex> gain_index_;
+  std::vector<int> gain_group_;
+
+ private:
+  // Update the indexed keys of node i's moves after its gains changed
+  void ReindexGains(int i);
 };
 
 #endif
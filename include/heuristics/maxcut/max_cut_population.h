@@ -0,0 +1,54 @@
+#ifndef HEURISTICS_MAXCUT_MAX_CUT_POPULATION_H_
+#define HEURISTICS_MAXCUT_MAX_CUT_POPULATION_H_
+
+#include <stdint.h>
+#include <vector>
+#include "problem/max_cut_instance.h"
+#include "util/random.h"
+
+// A population of random Max-Cut solutions drawn from a vector of vertex
+// probabilities, as used by estimation of distribution and cross-entropy
+// heuristics (deSousa2013, Laguna2009CE).
+//
+// Solutions are stored bit-packed: bit s%64 of word s/64 in a vertex's row
+// is 1 if the vertex is assigned 1 in solution s, and 0 if it is assigned -1.
+// Sampling draws the bits of 64 solutions at once from a few random words,
+// and the cut weights of all solutions are computed in a single sweep over
+// the edges (an edge is cut in the solutions whose bits differ at its two
+// endpoints). Weights are accumulated in the same edge order as
+// MaxCutSimpleSolution::PopulateFromAssignments, so they match its values
+// exactly.
+class MaxCutPopulation {
+ public:
+  MaxCutPopulation(const MaxCutInstance& mi);
+
+  // Replace the population with size new solutions, assigning each vertex i
+  // to 1 with probability p[i] (rounded to a multiple of 2^-16) and to -1
+  // otherwise.
+  void Sample(const std::vector<double>& p, int size);
+
+  int get_size() const {  return size_;  }
+
+  double get_weight(int s) const {  return weights_[s];  }
+
+  // Assignment (-1 or 1) of vertex i in solution s
+  int get_assignment(int s, int i) const {
+    return ((bits_[i * blocks_ + s / 64] >> (s % 64)) & 1) ? 1 : -1;
+  }
+
+  // Store the assignments of solution s in the passed vector
+  void GetAssignments(int s, std::vector<int>* assignments) const;
+
+  // Add to (*counts)[i] the number of solutions assigning vertex i to 1
+  void AddCounts(std::vector<int>* counts) const;
+
+ private:
+  const MaxCutInstance& mi_;
+  int size_;
+  int blocks_;  // Number of 64-bit words per vertex
+  std::vector<uint64_t> bits_;  // Row of blocks_ words for each vertex
+  std::vector<double> weights_;
+  RandomStream rng_;
+};
+
+#endif
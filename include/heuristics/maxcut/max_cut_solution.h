@@ -61,6 +61,10 @@ class MaxCutSolution : public ExtendedSolution {
 
   using ExtendedSolution::UpdateCutValues;  // Unhide single-argument version
 
+  Profile* get_profile() const {
+    return heuristic_ ? &heuristic_->get_profile() : NULL;
+  }
+
   const MaxCutInstance& mi_;
   // The associated heuristic (for reporting purposes)
   MaxCutHeuristic *heuristic_;
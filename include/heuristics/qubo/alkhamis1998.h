@@ -4,6 +4,7 @@
 #include "heuristics/qubo/qubo_solution.h"
 #include "problem/qubo_heuristic.h"
 #include "problem/qubo_instance.h"
+#include "util/annealing.h"
 
 // alkhamis1998 proposed a simulated annealing approach very similar to the one
 // in the appendix of korst1989; it differs mainly in the parameters selected
@@ -15,8 +16,13 @@ class Alkhamis1998Solution : public QUBOSolution {
  Alkhamis1998Solution(const QUBOSolution &x) :
   QUBOSolution(x) {}
 
-  // Run the full SA algorithm from section 2.2 on this solution.
-  void SA(double T_initial, int iteration);
+  // Compute the initial temperature with formula (1), from m random solutions.
+  static double InitialTemperature(const QUBOInstance& qi, int m,
+				   QUBOHeuristic *heuristic);
+
+  // Run the full SA algorithm from section 2.2 on this solution, drawing
+  // random numbers and accepting moves with sa.
+  void SA(double T_initial, int iteration, Annealer* sa);
 };
 
 // Repeated sumulation annealing from random initial solutions
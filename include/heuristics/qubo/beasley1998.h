@@ -2,17 +2,20 @@
 #define HEURISTICS_QUBO_BEASLEY_1998_H_
 
 #include "heuristics/qubo/qubo_solution.h"
+#include "heuristics/qubo/qubo_tabu.h"
 #include "problem/qubo_heuristic.h"
 #include "problem/qubo_instance.h"
+#include "util/annealing.h"
 
 class Beasley1998Solution : public QUBOSolution {
  public:
   // Convert from QUBOSolution to Beasley1998
   Beasley1998Solution(const QUBOSolution &x);
 
-  void SA(double T);
+  // One step of simulated annealing at the temperature of sa
+  void SA(Annealer* sa);
   void LocalSearch(int &t);
-  int TS(std::vector<int> &L, int iter, double vStar, int &t);
+  int TS(QUBOTabu* tabu, double vStar, int &t);
 };
 
 // Simulated Annealing algorithm
@@ -0,0 +1,119 @@
+#ifndef HEURISTICS_QUBO_COMPONENT_HEURISTIC_H_
+#define HEURISTICS_QUBO_COMPONENT_HEURISTIC_H_
+
+#include <atomic>
+#include <mutex>
+#include <string>
+#include <vector>
+#include "problem/max_cut_heuristic.h"
+#include "problem/qubo_components.h"
+#include "problem/qubo_heuristic.h"
+
+// Splits the instance into connected components (see QUBOComponents), solves
+// the acyclic and small ones exactly (the small ones within kExactFraction of
+// the runtime limit), and runs a heuristic (Max-Cut or QUBO,
+// given by its code) on each of the others. Components are run largest first
+// on Heuristic::get_num_threads() threads. When a component starts, it gets a
+// share of the runtime left proportional to its number of variables among
+// the variables of the components not yet started, less the time the
+// components after it are expected to need for their first solution (going
+// by the components run so far). A component stops at the end of its share,
+// or once it has gone without a new best solution for as long as it took to
+// find its last one (and at least a quarter of its share), so time it doesn't
+// use goes to the components after it; once every component has started, the
+// running ones continue to the runtime limit. Every component runs until its
+// first solution, even past the runtime limit, so no component is left with
+// all its variables at 0. Whenever a component finds a new best solution, the
+// solutions of all the components are stitched together and reported as one
+// solution of the original instance, so the history is a single merged
+// history.
+//
+// When components run on several threads, the heuristics share the global
+// random number stream, so runs are not reproducible with a fixed seed, and
+// each heuristic runs single-threaded.
+class QUBOComponentHeuristic : public QUBOHeuristic {
+ public:
+  QUBOComponentHeuristic(const QUBOInstance& qi, double runtime_limit,
+                         bool validation, QUBOCallback *qc,
+                         const std::string& code);
+
+  // Report a new best solution of component c (with objective weight in the
+  // component instance), returning whether the run on c should continue.
+  // Safe to call from any thread.
+  bool ReportComponent(int c, const std::vector<int>& assignments,
+                       double weight, double runtime);
+
+  // Whether the run on component c should continue after the given runtime
+  // (as measured by the heuristic running on c)
+  bool ComponentContinues(int c, double runtime) const;
+
+ private:
+  // Run the heuristic on components taken from next_ until there are none
+  // left
+  void RunComponents();
+
+  // Share of the runtime for component c, which is starting now
+  double Budget(int c);
+
+  // A component stops once the time since its last new best solution is
+  // more than this fraction of its share (and the time to find that solution)
+  static const double kStallFraction;
+
+  // Fraction of the runtime limit for solving small components exactly
+  static const double kExactFraction;
+
+  QUBOComponents components_;
+  std::string code_;
+  int num_threads_used_;  // Components running at a time
+
+  // Set for each component when its run starts (with mutex_ held); written
+  // by ReportComponent (with mutex_ held) only from the thread running it
+  std::vector<double> starts_;  // Runtime (of this heuristic) of the start
+  std::vector<double> budgets_;  // Share of the runtime
+  std::vector<double> last_best_;  // Runtime (on c) of the last new best
+  std::vector<char> reported_;  // Whether there has been a solution yet
+  int variables_left_;  // Variables of the components not yet started
+  double first_time_per_variable_;  // Most time to first solution seen
+
+  std::atomic<int> next_;  // Next component to run
+  std::atomic<bool> stop_;  // Set once the run as a whole should stop
+
+  // Guards the reporting of solutions and the stitched solution
+  std::mutex mutex_;
+  std::vector<int> current_;  // Best solution of every component, stitched
+  std::vector<double> weights_;  // Objective of each component's best
+  double total_;  // Objective of current_
+};
+
+// Callbacks passing the new best solutions of the heuristic run on a component
+// to QUBOComponentHeuristic
+class ComponentQUBOCallback : public QUBOCallback {
+ public:
+  ComponentQUBOCallback(QUBOComponentHeuristic* heuristic, int c);
+  bool Report(const QUBOSimpleSolution& solution, bool newBest, double runtime);
+  bool Report(const QUBOSimpleSolution& solution, bool newBest,
+              double runtime, int iter);
+
+ private:
+  QUBOComponentHeuristic* heuristic_;
+  int c_;
+};
+
+class ComponentMaxCutCallback : public MaxCutCallback {
+ public:
+  // qi is the instance of component c, which the Max-Cut instance being solved
+  // was constructed from
+  ComponentMaxCutCallback(QUBOComponentHeuristic* heuristic, int c,
+                          const QUBOInstance& qi);
+  bool Report(const MaxCutSimpleSolution& solution, bool newBest,
+              double runtime);
+  bool Report(const MaxCutSimpleSolution& solution, bool newBest,
+              double runtime, int iter);
+
+ private:
+  QUBOComponentHeuristic* heuristic_;
+  int c_;
+  const QUBOInstance& qi_;
+};
+
+#endif
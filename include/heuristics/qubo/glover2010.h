@@ -2,6 +2,7 @@
 #define HEURISTICS_QUBO_GLOVER_2010_H_
 
 #include <vector>
+#include "heuristics/elite_pool.h"
 #include "heuristics/qubo/qubo_solution.h"
 #include "problem/qubo_heuristic.h"
 #include "problem/qubo_instance.h"
@@ -65,6 +66,9 @@ class Glover2010Elite {
   // this vector maintains the worst solution as the top of the heap.
   std::vector<Glover2010QUBOSolution> EliteSol_;
 
+  // Packed copies of the elite solutions, used to detect duplicates quickly.
+  EliteSet members_;
+
   // EliteFreq_ vector is the frequency of each variable being 1 in the 
   // EliteSol_ vector.
   std::vector<int> EliteFreq_;
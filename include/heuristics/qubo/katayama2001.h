@@ -4,6 +4,7 @@
 #include "heuristics/qubo/qubo_solution.h"
 #include "problem/qubo_heuristic.h"
 #include "problem/qubo_instance.h"
+#include "util/annealing.h"
 
 class Katayama2001Solution : public QUBOSolution {
  public:
@@ -11,8 +12,9 @@ class Katayama2001Solution : public QUBOSolution {
   Katayama2001Solution(const QUBOSolution &x);
 
   // Like the swap in local search, but has a chance of happening
-  // even if worse
-  bool SASwap(int k, double T);
+  // even if worse (at the temperature of sa). Returns whether the swap
+  // was an improving move.
+  bool SASwap(int k, Annealer* sa);
 };
 
 class Katayama2001 : public QUBOHeuristic {
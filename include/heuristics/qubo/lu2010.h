@@ -1,6 +1,7 @@
 #ifndef HEURISTICS_QUBO_LU_2010_H_
 #define HEURISTICS_QUBO_LU_2010_H_
 
+#include "heuristics/elite_pool.h"
 #include "heuristics/qubo/qubo_partial_solution.h"
 #include "heuristics/qubo/qubo_solution.h"
 #include "problem/qubo_heuristic.h"
@@ -72,23 +73,23 @@ class Lu2010Population {
   // The population size
   int p_;
 
-  // A p x p matrix of Hamming distances; dist(i, j) is stored in position
-  // i*p + j.
-  std::vector<int> HD_;
-
   // The average hamming distance between pairs of solutions
   double avg_HD_;
 
-  // A p x p matrix of distances between solutions in the population (based
-  // on variable importance). dist(i, j) is stored in position i*p + j
-  std::vector<double> NHD_;
-
   // The minimum non-Hamming distance (the variable importance one) from each
   // member of the population to all the other ones.
   std::vector<double> min_NHD_;
 
   // Variable importances
   std::vector<double> VI_;
+
+  // The Hamming distances and the non-Hamming distances (the sum of the
+  // variable importances of the variables that differ) between each pair of
+  // solutions, with solution i of P_ stored in slot i.
+  ElitePool pool_;
+
+  // Recompute avg_HD_ and min_NHD_ from the distances in pool_
+  void UpdateDistanceSummaries();
 };
 
 
@@ -77,6 +77,7 @@ class Merz2004Elite {
   std::vector<Merz2004Solution> P_;
 
   int PS_;  // Population size
+  QUBOHeuristic *heuristic_;
   int stepsSinceImprovement_;  // How many updates since last improvement?
 };
 
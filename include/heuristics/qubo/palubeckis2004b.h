@@ -6,6 +6,8 @@
 #include "problem/qubo_instance.h"
 #include <vector>
 
+class Palubeckis2004bInstance;
+
 // NOTE: In the paper Palubeckis2004b, for a given solution x the authors
 // describe a procedure in which the problem instance is adjusted (via a simple
 // variable substitution) to one for which that solution is all 0s. This enables
@@ -33,9 +35,12 @@ class Palubeckis2004bSolution : public QUBOSolution {
     return Palubeckis2004bSolution(B, pPrime);
   }
 
-  // Runs the PERTURB procedure, used in MST5
-  static Palubeckis2004bSolution Perturb(const Palubeckis2004bSolution& x) {
-    return Palubeckis2004bSolution(x, 0);
+  // Runs the PERTURB procedure, used in MST5. perturbed is overwritten with
+  // the perturbed problem instance; it should be constructed once from the
+  // original instance and reused across calls.
+  static Palubeckis2004bSolution Perturb(const Palubeckis2004bSolution& x,
+					 Palubeckis2004bInstance* perturbed) {
+    return Palubeckis2004bSolution(x, perturbed);
   }
 
   // Runs the SELECT_VARIABLES procedure, used in MST2. This generates n_prime
@@ -74,7 +79,8 @@ class Palubeckis2004bSolution : public QUBOSolution {
   Palubeckis2004bSolution(const std::vector<Palubeckis2004bSolution>& B,
 			  double pPrime);
 
-  Palubeckis2004bSolution(const Palubeckis2004bSolution& x, int ignored);
+  Palubeckis2004bSolution(const Palubeckis2004bSolution& x,
+			  Palubeckis2004bInstance* perturbed);
 
   // Create a solution with the same assignments as the passed solution, but
   // the weights from the passed QUBOInstance.
@@ -82,11 +88,24 @@ class Palubeckis2004bSolution : public QUBOSolution {
 			  const Palubeckis2004bSolution& x);
 };
 
-// Perturbs the QUBOInstance as in Step 2 of PERTURB() from MST5.
+// Perturbs the QUBOInstance as in Step 2 of PERTURB() from MST5. The instance
+// is copied once at construction; each call to Perturb then overwrites the
+// weights in place (starting from the original ones), so repeated
+// perturbations don't copy the instance or rebuild its adjacency lists.
 class Palubeckis2004bInstance : public QUBOInstance {
  public:
-  Palubeckis2004bInstance(const QUBOInstance& qi,
-			  const Palubeckis2004bSolution& x);
+  Palubeckis2004bInstance(const QUBOInstance& qi);
+
+  // Reset the weights to those of the original instance and perturb them
+  // based on solution x.
+  void Perturb(const Palubeckis2004bSolution& x);
+
+ private:
+  // Original weight of each entry of all_nonzero_, and the positions of that
+  // entry in nonzero_[i] and nonzero_[j].
+  std::vector<double> orig_weights_;
+  std::vector<int> pos_i_;
+  std::vector<int> pos_j_;
 };
 
 class Palubeckis2004bMST1 : public QUBOHeuristic {
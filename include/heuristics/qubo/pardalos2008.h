@@ -65,6 +65,11 @@ class Pardalos2008Elite {
 // Maintain the probabilities for each variable, enabling the efficient
 // computation of ptilde_j. We maintain the numerator and denominator for
 // E_{kj}^u.
+//
+// Every solution contributes to either the u=0 or the u=1 sums of each
+// variable, so the u=0 sums are the totals over all solutions (which don't
+// depend on j) minus the u=1 sums. Only the totals and the u=1 sums are
+// stored, and adding a solution only touches the variables set to 1 in it.
 class Pardalos2008Probs {
  public:
   // Initialize with an initial set of solutions
@@ -86,12 +91,18 @@ class Pardalos2008Probs {
   // Number of variables in QUBO problem
   int N_;
 
-  // Numerators and denominators of E_{kj}^u for u=0 and u=1. To access the
-  // value for a given k, access at index k*N_ + j.
-  std::vector<double> numerator0_;
-  std::vector<double> numerator1_;
-  std::vector<double> denominator0_;
-  std::vector<double> denominator1_;
+  // Numerator and denominator of E_{kj}^u summed over all solutions (u=0 and
+  // u=1 together), at index 2*k and 2*k+1.
+  std::vector<double> total_;
+
+  // Numerators and denominators of E_{kj}^1. Each variable's values for all
+  // the stages are contiguous: the numerator for a given k and j is at index
+  // 2*(j*(K_+1) + k), followed by the denominator.
+  std::vector<double> ones_;
+
+  // Stage weights (w * exp(-mu_k w) and exp(-mu_k w)) of the solution being
+  // added, interleaved like the entries of ones_
+  std::vector<double> stage_weights_;
 
   // Frequencies of 1s and total number of solutions (needed to compute
   // p_j(0), which is the proportion of all j indexes with value 1).
@@ -0,0 +1,69 @@
+#ifndef HEURISTICS_QUBO_PRESOLVE_HEURISTIC_H_
+#define HEURISTICS_QUBO_PRESOLVE_HEURISTIC_H_
+
+#include <string>
+#include <vector>
+#include "problem/max_cut_heuristic.h"
+#include "problem/qubo_heuristic.h"
+#include "problem/qubo_presolve.h"
+
+// Runs a heuristic (Max-Cut or QUBO, given by its code) on the instance
+// reduced by QUBOPresolve, reporting every new best solution of the reduced
+// instance as the corresponding solution of the original. The presolve gets
+// at most kPresolveFraction of the runtime limit, and its time counts toward
+// the limit; the history is in terms of the original objective. If components is set, the reduced instance (which may
+// have been split up by the fixing) is solved with QUBOComponentHeuristic.
+class QUBOPresolveHeuristic : public QUBOHeuristic {
+ public:
+  QUBOPresolveHeuristic(const QUBOInstance& qi, double runtime_limit,
+                        bool validation, QUBOCallback *qc,
+                        const std::string& code, bool components);
+
+  // Report a solution of the reduced instance (with objective weight in the
+  // reduced instance) on behalf of the heuristic, with or without an
+  // iteration count.
+  bool ReportReduced(const std::vector<int>& assignments, double weight);
+  bool ReportReduced(const std::vector<int>& assignments, double weight,
+                     int iter);
+
+  // Variables fixed by the presolve
+  int get_num_fixed() const {  return presolve_.get_num_fixed();  }
+
+ private:
+  static const double kPresolveFraction;
+
+  QUBOPresolve presolve_;
+  std::vector<int> lifted_;  // Reused by ReportReduced
+};
+
+// Callbacks passing the solutions of a heuristic run on the reduced instance
+// to QUBOPresolveHeuristic; as with the hyper-heuristic, only new best
+// solutions are converted and reported.
+class PresolveQUBOCallback : public QUBOCallback {
+ public:
+  PresolveQUBOCallback(QUBOPresolveHeuristic* heuristic);
+  bool Report(const QUBOSimpleSolution& solution, bool newBest, double runtime);
+  bool Report(const QUBOSimpleSolution& solution, bool newBest,
+              double runtime, int iter);
+
+ private:
+  QUBOPresolveHeuristic* heuristic_;
+};
+
+class PresolveMaxCutCallback : public MaxCutCallback {
+ public:
+  // reduced is the reduced QUBO instance that the Max-Cut instance being
+  // solved was constructed from
+  PresolveMaxCutCallback(QUBOPresolveHeuristic* heuristic,
+                         const QUBOInstance& reduced);
+  bool Report(const MaxCutSimpleSolution& solution, bool newBest,
+              double runtime);
+  bool Report(const MaxCutSimpleSolution& solution, bool newBest,
+              double runtime, int iter);
+
+ private:
+  QUBOPresolveHeuristic* heuristic_;
+  const QUBOInstance& reduced_;
+};
+
+#endif
@@ -0,0 +1,70 @@
+#ifndef HEURISTICS_QUBO_QUBO_KOPT_H_
+#define HEURISTICS_QUBO_QUBO_KOPT_H_
+
+#include <vector>
+#include "heuristics/qubo/qubo_solution.h"
+
+// Bookkeeping shared by the k-opt local searches (Katayama2000, Merz2002 and
+// Merz2004), which flip variables one at a time during a pass and at the end
+// of the pass return to the best solution seen in it.
+//
+// Instead of copying the whole solution every time it improves on the best,
+// flips are recorded in an undo log, along with the previous values of the
+// diff_weights_ entries they change. Rolling back restores those values in
+// reverse order, so the solution ends up exactly (bit for bit) as it was when
+// it was last the best. The set C of variables not yet flipped in the pass and
+// the random permutation buffer are reused from pass to pass.
+class QUBOKOpt {
+ public:
+  // Local search on x, which must outlive this object
+  explicit QUBOKOpt(QUBOSolution* x);
+
+  // Start a pass from the current solution, which becomes the best solution
+  // of the pass, with all variables in C.
+  void StartPass();
+
+  // Flip variable i, logging the flip and removing i from C
+  void Flip(int i);
+
+  // Make the current solution the best one of the pass
+  void SetBest();
+
+  // Make the current solution the best one of the pass if it improves on it,
+  // returning whether it did.
+  bool UpdateBest();
+
+  // Would flipping variable i improve over the best solution of the pass?
+  bool ImprovesOverBestAfterMove(int i) const {
+    return x_->ImprovesOverAfterMove(best_weight_, i);
+  }
+
+  // Undo the flips made since the best solution of the pass
+  void RollBack();
+
+  // Is variable i in C (not yet flipped in this pass)?
+  bool InC(int i) const {  return inC_[i];  }
+  int get_num_in_C() const {  return numInC_;  }
+
+  // The variable in C with the largest diff_weights_ value (-1 if C is empty)
+  int BestInC() const;
+
+  // A random permutation of the variables, drawn with std::random_shuffle
+  // from the identity permutation (so it matches the permutation a fresh
+  // vector would give).
+  const std::vector<int>& RandomPermutation();
+
+ private:
+  QUBOSolution* x_;
+  int N_;
+  double best_weight_;
+  std::vector<char> inC_;
+  int numInC_;
+  std::vector<int> RP_;
+
+  // Undo log since the best solution: the flipped variables, and the
+  // (index, previous value) of each diff_weights_ entry they changed.
+  std::vector<int> flips_;
+  std::vector<std::pair<int, double> > old_diff_weights_;
+};
+
+#endif
@@ -2,6 +2,7 @@
 #define HEURISTICS_QUBO_QUBO_PARTIAL_SOLUTION_H_
 
 #include <vector>
+#include "heuristics/gain_index.h"
 #include "problem/qubo_heuristic.h"
 
 // Some constructive procedures for QUBO assign fractional values to variables
@@ -31,6 +32,14 @@ class QUBOPartialSolution {
   // diff0_, diff1_, assignments_, num_frac_, and weight_.
   void UpdateCutValues(int update_index, int new_value);
 
+  // Index the gains of the fractional variables, so constructions can find
+  // the best moves without scanning all variables. Move 2*i sets variable i
+  // to 0 (its key is diff0_[i]) and move 2*i+1 sets it to 1 (key diff1_[i]);
+  // group[m] is the index holding move m in gain_index_ (-1 for moves that
+  // are not indexed). From then on UpdateCutValues keeps the keys current and
+  // removes the moves of variables that are no longer fractional.
+  void IndexGains(const std::vector<int>& group, int num_groups);
+
   // Problem instance
   const QUBOInstance& qi_;
   // Associated heuristic
@@ -47,6 +56,14 @@ class QUBOPartialSolution {
   int num_frac_;
   // Objective value
   double weight_;
+  // Gain indices set up by IndexGains (empty if not used), and the index of
+  // each move
+  std::vector<GainIndex> gain_index_;
+  std::vector<int> gain_group_;
+
+ private:
+  // Update the indexed keys of variable i's moves after its gains changed
+  void ReindexGains(int i);
 };
 
 #endif
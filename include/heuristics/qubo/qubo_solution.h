@@ -51,6 +51,11 @@ class QUBOSolution : public ExtendedSolution {
   void PopulateFromAssignments();
 
  protected:
+  // The k-opt and tabu search engines flip and restore solutions through the
+  // members below
+  friend class QUBOKOpt;
+  friend class QUBOTabu;
+
   // Initialize qi and heuristic members but nothing else.
   // ********************** IMPORTANT NOTE ***************************
   // diff_weights_ is not properly set after using this constructor, so you
@@ -66,6 +71,10 @@ class QUBOSolution : public ExtendedSolution {
 
   using ExtendedSolution::UpdateCutValues;  // Unhide single-argument version
 
+  Profile* get_profile() const {
+    return heuristic_ ? &heuristic_->get_profile() : NULL;
+  }
+
   const QUBOInstance& qi_;
   // The associated heuristic (for reporting purposes)
   QUBOHeuristic *heuristic_;
@@ -0,0 +1,117 @@
+#ifndef HEURISTICS_QUBO_QUBO_TABU_H_
+#define HEURISTICS_QUBO_QUBO_TABU_H_
+
+#include <queue>
+#include <utility>
+#include <vector>
+#include "heuristics/qubo/qubo_solution.h"
+
+// Move selection shared by the 1-flip tabu searches of Beasley1998,
+// Glover2010, Hasan2000, Lu2010 and Palubeckis2004b (and so Palubeckis2006).
+//
+// Tabu status is stored as expiry iterations: a variable made tabu for tenure
+// iterations at iteration t is tabu through iteration t+tenure-1. On sparse
+// instances, the gains (diff_weights_) are kept in a tournament tree over the
+// variables, where each node holds the best non-tabu and best tabu gain in its
+// subtree and the number of non-tabu variables. Flipping a variable only marks
+// it and its neighbors dirty; before the next query, the dirty leaves are
+// updated along their paths to the root (or the whole tree is rebuilt when
+// that is cheaper), so selecting a move costs O(deg log n) instead of the O(n)
+// scan of diff_weights_. On dense instances, where a flip changes most gains
+// anyway, the queries scan the variables instead (the same criterion as for
+// the GainIndex of the partial solutions decides).
+//
+// The queries reproduce the move rules of the papers, with ties broken in
+// favor of the smallest index, as the scans they replace did:
+//  - BestNonTabu: the best non-tabu move
+//  - BestMove: the best move that is either non-tabu or aspirated (it would
+//    improve over a given weight)
+//  - BestMoves: all the moves tied with BestMove, for random tie breaking
+//  - FirstNonTabuImprovingOver: the first non-tabu move (by index) improving
+//    over a given weight, counting the non-tabu variables examined
+//  - FirstAspiratedOrImproving: the first move (by index) that is either
+//    aspirated or non-tabu and improving
+class QUBOTabu {
+ public:
+  // Tabu search on x, which must outlive this object. All variables start
+  // non-tabu, at iteration 0.
+  explicit QUBOTabu(QUBOSolution* x);
+
+  int get_iter() const {  return iter_;  }
+  void NextIteration() {
+    ++iter_;
+    scannedBestNonTabu_ = -2;
+  }
+
+  bool IsTabu(int i) const {  return expiry_[i] > iter_;  }
+
+  // Make variable i tabu for the current iteration and the next tenure-1
+  void MakeTabu(int i, int tenure);
+
+  // Flip variable i in the solution
+  void Flip(int i);
+
+  // Call after the solution was changed other than through Flip (for
+  // instance by a local search), so the gains are read again.
+  void Resync();
+
+  // Move queries; each returns -1 if there is no such move.
+  int BestNonTabu();
+  int BestMove(double aspiration);
+  void BestMoves(double aspiration, std::vector<int>* ties);
+  int FirstNonTabuImprovingOver(double weight, int* examined);
+  int FirstAspiratedOrImproving(double aspiration);
+
+ private:
+  struct Node {
+    double free;  // Best gain of a non-tabu variable in the subtree
+    double tabu;  // Best gain of a tabu variable in the subtree
+    int freeId;  // Index of those variables (-1 if none)
+    int tabuId;
+    int numFree;  // Number of non-tabu variables in the subtree
+  };
+
+  void MarkDirty(int i) {
+    if (indexed_ && !dirty_[i]) {
+      dirty_[i] = 1;
+      dirtyList_.push_back(i);
+    }
+  }
+
+  // Bring the tree up to date with the gains and the tabu status
+  void Refresh();
+
+  void SetLeaf(int i);
+  void Combine(int p);
+
+  // The first variable that is either tabu with a gain improving over
+  // tabuWeight or non-tabu with a gain improving over freeWeight, setting
+  // *examined to the number of non-tabu variables up to it (or in total)
+  int First(double tabuWeight, double freeWeight, int* examined);
+
+  QUBOSolution* x_;
+  int N_;
+  bool indexed_;  // Use the tree (otherwise scan)
+  int iter_;
+  std::vector<int> expiry_;
+
+  // When scanning, the best non-tabu move found by the last call to First
+  // that found no move (-2 if the solution or tabu list changed since)
+  int scannedBestNonTabu_;
+
+  // Tabu variables in order of expiry (entries with an outdated expiry are
+  // skipped), so they can be released when the iteration count reaches it
+  std::priority_queue<std::pair<int, int>, std::vector<std::pair<int, int> >,
+    std::greater<std::pair<int, int> > > expiring_;
+
+  // Tournament tree: node 1 is the root, node p has children 2p and 2p+1, and
+  // variable i is at leaf size_+i.
+  int size_;
+  int levels_;
+  std::vector<Node> tree_;
+  std::vector<char> dirty_;
+  std::vector<int> dirtyList_;
+  std::vector<int> stack_;  // Search stack of BestMoves
+};
+
+#endif
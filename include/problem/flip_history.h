@@ -0,0 +1,50 @@
+#ifndef PROBLEM_FLIP_HISTORY_H_
+#define PROBLEM_FLIP_HISTORY_H_
+
+#include <stdint.h>
+#include <vector>
+
+// The sequence of new best solutions reported by a heuristic, stored for
+// validation as a chain of deltas instead of full copies: for each new best
+// solution, the indices whose assignments differ from the previous one,
+// together with a rolling hash of the solution (the XOR of Key(i) over the
+// indices i assigned 1). Validation replays the chain from the initial
+// solution, updating the objective one flip at a time, so every reported
+// objective is checked using O(total flips) memory rather than O(n) per
+// solution. The hashes catch a chain that does not reproduce the reported
+// solutions.
+class FlipHistory {
+ public:
+  // Start the chain from the given assignments
+  explicit FlipHistory(const std::vector<int>& initial);
+
+  // Append a solution to the chain; prev must be the assignments of the last
+  // solution appended (or the initial one).
+  void Append(const std::vector<int>& prev, const std::vector<int>& next);
+
+  // Number of solutions in the chain, including the initial one
+  int size() const {  return hashes_.size();  }
+
+  const std::vector<int>& get_initial() const {  return initial_;  }
+
+  // Indices flipped to get from solution k-1 to solution k (k >= 1)
+  const int* flips_begin(int k) const {  return flips_.data() + offsets_[k-1]; }
+  const int* flips_end(int k) const {  return flips_.data() + offsets_[k];  }
+
+  uint64_t get_hash(int k) const {  return hashes_[k];  }
+
+  // Hash key of index i (a fixed pseudorandom function of i, so building a
+  // history does not draw from the heuristic's random number streams)
+  static uint64_t Key(int i);
+
+  // Hash of a full assignment vector
+  static uint64_t Hash(const std::vector<int>& assignments);
+
+ private:
+  std::vector<int> initial_;
+  std::vector<int> flips_;
+  std::vector<int> offsets_;  // End of each solution's flips in flips_
+  std::vector<uint64_t> hashes_;
+};
+
+#endif
@@ -1,10 +1,11 @@
 #ifndef PROBLEM_HEURISTIC_H_
 #define PROBLEM_HEURISTIC_H_
 
-#include <sys/time.h>
+#include <time.h>
 #include <sstream>
 #include <string>
 #include <vector>
+#include "util/profile.h"
 
 class Heuristic {
  public:
@@ -16,6 +17,17 @@ class Heuristic {
   // Getters
   double get_best() const {  return best_;  }
 
+  // Counters and phase timers for this run (only updated if profiling is
+  // enabled; see Profile)
+  Profile& get_profile() {  return profile_;  }
+  const Profile& get_profile() const {  return profile_;  }
+
+  // Number of threads that heuristics supporting multi-threading (currently
+  // BURER2002) may use. This applies to all heuristics run afterward; the
+  // default of 1 runs everything on the calling thread.
+  static void set_num_threads(int num_threads);
+  static int get_num_threads() {  return num_threads_;  }
+
   /* In this section we have various functions for checking if the heuristic
    *   should keep going or stop. In all cases, the following hierarchy is used
    *   to determine whether to keep going:
@@ -23,6 +35,30 @@ class Heuristic {
    *   2) Runtime-based termination criterion
    */
 
+  // Fast check of the runtime-based termination criterion, for heuristics
+  // that check it every iteration. Rather than reading the clock on every
+  // call, this reads it every check_interval_ calls, adapting the interval so
+  // that reads happen about once per tick of the coarse monotonic clock.
+  // Within a few ticks of the runtime limit, where the coarse clock's lag
+  // would add to the overshoot, it switches to the precise clock read every
+  // kPreciseCheckPeriod seconds, so the limit is noticed at most about that
+  // long (plus the time of one call) after it passes. Once the limit is
+  // reached, every call returns true.
+  bool ShouldStop() {
+    if (--calls_until_check_ > 0) {
+      return false;
+    }
+    return CheckRuntimeLimit();
+  }
+
+  // Check the runtime-based termination criterion against a runtime that was
+  // just measured (e.g. for a new best solution) instead of reading the clock
+  bool ShouldStop(double runtime);
+
+  // How far past the runtime limit the heuristic was when ShouldStop first
+  // noticed that the limit was reached (0 if it never did)
+  double get_overshoot() const {  return overshoot_;  }
+
   // Summary of reported solutions
   std::string History();
   virtual bool IsHistoryValid() = 0;
@@ -31,11 +67,21 @@ class Heuristic {
   virtual ~Heuristic() {};
 
  protected:
-  // Is this a validation run? If so we will store all solutions and evaluate
-  // them after the run is complete.
+  // Is this a validation run? If so we will record the chain of new best
+  // solutions and check their objectives after the run is complete.
   bool validation_;
 
-  struct timeval start_time_;
+  // Check a reported objective value against its recomputed (true) value,
+  // printing both if they differ significantly (based on relative difference)
+  static bool ValidObjective(double true_val, double reported_val);
+
+  // Runtime from start until now according to a coarse monotonic clock,
+  // which is cheaper to read than the one used by Runtime() but only has a
+  // resolution of a few milliseconds on some systems. The coarse clock lags
+  // behind, so this never exceeds Runtime().
+  double CoarseRuntime() const;
+
+  struct timespec start_time_;
   double best_;
   double runtime_limit_;
 
@@ -43,9 +89,34 @@ class Heuristic {
   std::vector<double> past_solution_values_;
   std::vector<double> past_solution_times_;
 
+  Profile profile_;
+
  private:
   // Disable default constructor
   Heuristic();
+
+  // Slow path of ShouldStop: read the clock, check the runtime limit, and
+  // pick the number of calls until the next check.
+  bool CheckRuntimeLimit();
+
+  // Resolution of the coarse clock used by CoarseRuntime (seconds)
+  static double CoarseResolution();
+
+  // Target time between clock reads in ShouldStop once the precise clock is
+  // used (seconds), and how many coarse clock ticks before the limit it is
+  static const double kPreciseCheckPeriod;
+  static const int kPreciseTicks = 2;
+  static const int kMaxCheckInterval = 1 << 20;
+
+  int check_interval_;  // Calls between clock reads, adapted over time
+  int calls_until_check_;
+  int calls_since_check_;  // Calls covered by the next clock read
+  double last_check_time_;
+  bool precise_;  // Reading the precise clock (near the runtime limit)
+  bool limit_reached_;
+  double overshoot_;
+
+  static int num_threads_;
 };
 
 #endif
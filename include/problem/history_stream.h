@@ -0,0 +1,58 @@
+#ifndef PROBLEM_HISTORY_STREAM_H_
+#define PROBLEM_HISTORY_STREAM_H_
+
+#include "problem/max_cut_heuristic.h"
+#include "problem/qubo_heuristic.h"
+
+// Writes new best solutions to a file descriptor as they are found, one
+// NDJSON record per line:
+//   {"value":11612,"time":0.638142,"iter":12}
+// ("iter" is only present when the heuristic reported an iteration count).
+// Each record is written with a single write call as soon as it is produced,
+// so a driver reading from a pipe can follow the run live.
+class HistoryStream {
+ public:
+  explicit HistoryStream(int fd);
+
+  // Write a record, returning false if the write failed (for instance because
+  // the reading end of the pipe was closed).
+  bool Write(double value, double runtime);
+  bool Write(double value, double runtime, int iter);
+
+ private:
+  bool WriteLine(const char* line, int len);
+
+  int fd_;
+};
+
+// Callbacks streaming the new best solutions of a heuristic run. They apply
+// the usual runtime-based termination criterion, and they also stop the run
+// if the stream can no longer be written (so a driver can end a hopeless run
+// early by closing its end of the pipe, provided SIGPIPE is ignored).
+class StreamingMaxCutCallback : public MaxCutCallback {
+ public:
+  StreamingMaxCutCallback(HistoryStream* stream, double runtime_limit);
+  bool Report(const MaxCutSimpleSolution& solution, bool newBest,
+              double runtime);
+  bool Report(const MaxCutSimpleSolution& solution, bool newBest,
+              double runtime, int iter);
+
+ private:
+  HistoryStream* stream_;
+  double runtime_limit_;
+};
+
+class StreamingQUBOCallback : public QUBOCallback {
+ public:
+  StreamingQUBOCallback(HistoryStream* stream, double runtime_limit);
+  bool Report(const QUBOSimpleSolution& solution, bool newBest,
+              double runtime);
+  bool Report(const QUBOSimpleSolution& solution, bool newBest,
+              double runtime, int iter);
+
+ private:
+  HistoryStream* stream_;
+  double runtime_limit_;
+};
+
+#endif
@@ -1,28 +1,65 @@
 #ifndef PROBLEM_INSTANCE_H_
 #define PROBLEM_INSTANCE_H_
 
+#include <istream>
 #include <string>
 #include <utility>
 #include <vector>
 
 class Instance {
  public:
-  typedef std::pair<std::pair<int, int>, double> InstanceTuple;
+  // Type of the stored weights (edge weights and off-diagonal matrix
+  // entries). Building with USE_FLOAT_WEIGHTS=1 stores them in single
+  // precision, which halves the memory of the adjacency lists and the dense
+  // matrix, and integer weights up to 2^24 in magnitude are stored exactly.
+  // The O(n) vectors stay double: QUBOInstance::lin_ holds sums of weights
+  // (a Max-Cut node's total incident weight), which float would round, and
+  // the solutions' diff_weights_ are updated incrementally on every flip, so
+  // float rounding would accumulate into the reported objectives. Neither
+  // is a noticeable part of the memory next to the O(m) weights.
+#ifdef USE_FLOAT_WEIGHTS
+  typedef float Weight;
+#else
+  typedef double Weight;
+#endif
+
+  typedef std::pair<std::pair<int, int>, Weight> InstanceTuple;
 
   static void Load(int dimension,
                    const std::vector<InstanceTuple>& provided,
-                   std::vector<std::vector<std::pair<int, double> > >* links,
+                   std::vector<std::vector<std::pair<int, Weight> > >* links,
 		   std::vector<InstanceTuple>* all,
                    std::vector<double>* selfLinks, bool selfLinkAsError);
 
+  // Load from a file; filename "-" reads standard input, and names ending in
+  // ".gz" or ".zip" are decompressed in memory (requires USE_ZLIB).
   static void Load(const std::string& filename,
-		   std::vector<std::vector<std::pair<int, double> > >* links,
+		   std::vector<std::vector<std::pair<int, Weight> > >* links,
 		   std::vector<InstanceTuple>* all,
 		   std::vector<double>* selfLinks, bool selfLinkAsError);
 
+  // Whether an instance with the given number of nodes and links, which
+  // links at least min_density of the node pairs, is to also be stored as an
+  // n x n matrix (if it is not too large). The gain updates then run over
+  // contiguous matrix rows, which the compiler vectorizes, instead of chasing
+  // the adjacency lists.
+  static bool UseDense(int dimension, int num_links, double min_density);
+
+  // Fill dense with the row-major dimension x dimension matrix of the links
+  // in all (zero diagonal, repeated links summed) if UseDense, and otherwise
+  // leave it empty.
+  static void LoadDense(int dimension, const std::vector<InstanceTuple>& all,
+                        double min_density, std::vector<Weight>* dense);
+
  private:
+  // Parse instance text from an input stream; filename is used in messages.
+  static void LoadStream(std::istream& file, const std::string& filename,
+                         std::vector<std::vector<std::pair<int, Weight> > >* links,
+                         std::vector<InstanceTuple>* all,
+                         std::vector<double>* selfLinks, bool selfLinkAsError);
+
   static void AddLink(int n1, int n2, double weight,
-		      std::vector<std::vector<std::pair<int, double> > >* links,
+		      std::vector<std::vector<std::pair<int, Weight> > >* links,
 		      std::vector<InstanceTuple>* all,
 		      std::vector<double>* selfLinks, bool selfLinkAsError);
 };
@@ -29,10 +29,8 @@ class MaxCutInstance {
   MaxCutInstance& operator=(const MaxCutInstance& mi);
 
   // Populate the passed vector with all the edges, and shuffle.
-  void GetShuffledEdges(std::vector<std::pair<std::pair<int, int>, double> >*
-			to_shuffle) const;
-  void GetSortedEdges(std::vector<std::pair<std::pair<int, int>, double> >*
-		      to_sort) const;
+  void GetShuffledEdges(std::vector<Instance::InstanceTuple>* to_shuffle) const;
+  void GetSortedEdges(std::vector<Instance::InstanceTuple>* to_sort) const;
 
   // Check if the graph has any repeated edges
   bool CheckGraph() const;
@@ -46,25 +44,32 @@ class MaxCutInstance {
   int get_edge_count() const {  return all_edges_.size();  }
   int get_vertex_degree(int idx) const {  return edges_[idx].size();  }
 
-  std::vector<std::vector<std::pair<int, double> > > get_edges() const { return edges_; }
-  std::vector<std::pair<std::pair<int, int>, double> > get_all_edges() const {return all_edges_; }
+  std::vector<std::vector<std::pair<int, Instance::Weight> > > get_edges() const { return edges_; }
+  std::vector<Instance::InstanceTuple> get_all_edges() const {return all_edges_; }
 
 
-  std::vector<std::pair<int, double> >::const_iterator get_edges_begin(int idx)
-    const {
+  std::vector<std::pair<int, Instance::Weight> >::const_iterator
+    get_edges_begin(int idx) const {
     return edges_[idx].begin();
   }
-  std::vector<std::pair<int, double> >::const_iterator get_edges_end(int idx)
-    const {
+  std::vector<std::pair<int, Instance::Weight> >::const_iterator
+    get_edges_end(int idx) const {
     return edges_[idx].end();
   }  
 
-  std::vector<std::pair<std::pair<int, int>, double> >::const_iterator
+  std::vector<Instance::InstanceTuple>::const_iterator
     get_all_edges_begin() const {  return all_edges_.begin();  }
 
-  std::vector<std::pair<std::pair<int, int>, double> >::const_iterator
+  std::vector<Instance::InstanceTuple>::const_iterator
     get_all_edges_end() const {  return all_edges_.end();  }
 
+  // Dense graphs (see Instance::UseDense) also keep the edge weights as a
+  // row-major n x n matrix; row idx holds w_idx,j in column j.
+  bool is_dense() const {  return !dense_.empty();  }
+  const Instance::Weight* get_dense_row(int idx) const {
+    return &dense_[(size_t)idx * edges_.size()];
+  }
+
  protected:
   // During construction from a QUBO instance, add non-zero matrix value q_ij,
   // updating the edge weights as well as the weight to the added "master node."
@@ -72,18 +77,19 @@ class MaxCutInstance {
 		      std::vector<double>* masterNodeWeights);
 
   // Non-const iterators
-  std::vector<std::pair<int, double> >::iterator
+  std::vector<std::pair<int, Instance::Weight> >::iterator
     get_mutable_edges_begin(int idx) {  return edges_[idx].begin();  }
-  std::vector<std::pair<int, double> >::iterator
+  std::vector<std::pair<int, Instance::Weight> >::iterator
     get_mutable_edges_end(int idx) {  return edges_[idx].end();  }
-  std::vector<std::pair<std::pair<int, int>, double> >::iterator
+  std::vector<Instance::InstanceTuple>::iterator
     get_mutable_all_edges_begin() {  return all_edges_.begin();  }
 
-  std::vector<std::pair<std::pair<int, int>, double> >::iterator
+  std::vector<Instance::InstanceTuple>::iterator
     get_mutable_all_edges_end() {  return all_edges_.end();  }
 
-  std::vector<std::vector<std::pair<int, double> > > edges_;
-  std::vector<std::pair<std::pair<int, int>, double> > all_edges_;
+  std::vector<std::vector<std::pair<int, Instance::Weight> > > edges_;
+  std::vector<Instance::InstanceTuple> all_edges_;
+  std::vector<Instance::Weight> dense_;  // Empty unless dense
 };
 
 #endif
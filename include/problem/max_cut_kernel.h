@@ -0,0 +1,62 @@
+#ifndef PROBLEM_MAX_CUT_KERNEL_H_
+#define PROBLEM_MAX_CUT_KERNEL_H_
+
+#include <vector>
+#include "problem/max_cut_instance.h"
+
+// Kernelization of a Max-Cut instance: removes low-degree nodes whose side of
+// an optimal cut is determined by their neighbors, until every remaining node
+// has degree at least 3 (parallel edges are merged and zero-weight edges
+// dropped). For a node v with
+// - no edges: v can go on either side;
+// - one edge (v, u) of weight a: the edge is cut if a > 0, so v adds max(0, a)
+//   to the cut;
+// - two edges (v, u) and (v, t) of weights a and b: v adds max(0, a+b) to the
+//   cut if u and t are on the same side and max(a, b) if they are not, which
+//   is the same as adding max(0, a+b) to the objective and replacing v with an
+//   edge (u, t) of weight max(a, b) - max(0, a+b).
+// The objective of the original instance is get_offset() plus the cut of the
+// reduced instance, for a cut lifted with Lift.
+class MaxCutKernel {
+ public:
+  explicit MaxCutKernel(const MaxCutInstance& mi);
+  ~MaxCutKernel();
+
+  // Getters
+  int get_num_removed() const {  return eliminations_.size();  }
+  int get_num_remaining() const {  return remaining_.size();  }
+  double get_offset() const {  return offset_;  }
+
+  // Reduced instance over the remaining nodes (NULL if every node was
+  // removed); node k of the reduced instance is node get_original_index(k) of
+  // the original.
+  const MaxCutInstance* get_reduced() const {  return reduced_;  }
+  int get_original_index(int k) const {  return remaining_[k];  }
+
+  // Assignments of the original instance for the given assignments of the
+  // reduced instance (pass an empty vector if every node was removed)
+  void Lift(const std::vector<int>& reduced, std::vector<int>* original) const;
+
+ private:
+  // Disable copying (we own the reduced instance)
+  MaxCutKernel(const MaxCutKernel&);
+  MaxCutKernel& operator=(const MaxCutKernel&);
+
+  // A removed node v and the (up to two) neighbors u and t it had when it
+  // was removed (-1 if absent), with edge weights a and b
+  struct Elimination {
+    int v;
+    int u;
+    int t;
+    double a;
+    double b;
+  };
+
+  int num_nodes_;
+  std::vector<Elimination> eliminations_;  // In order of removal
+  std::vector<int> remaining_;  // Original index of each reduced node
+  double offset_;
+  MaxCutInstance* reduced_;
+};
+
+#endif
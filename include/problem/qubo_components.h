@@ -0,0 +1,60 @@
+#ifndef PROBLEM_QUBO_COMPONENTS_H_
+#define PROBLEM_QUBO_COMPONENTS_H_
+
+#include <vector>
+#include "problem/qubo_instance.h"
+
+// Decomposition of a QUBO instance into the connected components of its
+// interaction graph (variables i and j are adjacent if q_ij != 0). The
+// objective is the sum of the objectives of the components, so each can be
+// solved on its own. Acyclic components (isolated variables, single
+// interactions, trees) are solved exactly by dynamic programming, and other
+// components with at most kMaxExactSize variables by enumeration; every other
+// component gets its own instance, largest first, for a heuristic to solve.
+// The enumeration stops at time_limit seconds after the start, leaving the
+// component being enumerated and any later ones to the heuristic.
+// Max-Cut instances converted to QUBO keep their graph, so this also
+// decomposes Max-Cut instances.
+class QUBOComponents {
+ public:
+  QUBOComponents(const QUBOInstance& qi, double time_limit);
+  ~QUBOComponents();
+
+  // Largest cyclic component solved by enumeration (2^kMaxExactSize
+  // assignments)
+  static const int kMaxExactSize = 20;
+
+  // Number of components left to a heuristic
+  int get_num_components() const {  return instances_.size();  }
+
+  // Instance of component c; variable k of the instance is variable
+  // get_variables(c)[k] of the original.
+  const QUBOInstance& get_instance(int c) const {  return *instances_[c];  }
+  const std::vector<int>& get_variables(int c) const {  return variables_[c]; }
+
+  // Optimal assignments of the variables in the components solved exactly (0
+  // for the variables of the other components), and their objective
+  const std::vector<int>& get_exact() const {  return exact_;  }
+  double get_exact_weight() const {  return exact_weight_;  }
+
+ private:
+  // Disable copying (we own the component instances)
+  QUBOComponents(const QUBOComponents&);
+  QUBOComponents& operator=(const QUBOComponents&);
+
+  // Solve the component with the given variables by enumeration, adding its
+  // optimal assignments to exact_ and exact_weight_, unless the deadline (in
+  // seconds on the monotonic clock) is reached first; returns whether it was
+  // solved. index must have -1 for every variable of the instance, and is
+  // left that way.
+  bool SolveByEnumeration(const QUBOInstance& qi,
+                          const std::vector<int>& variables, double deadline,
+                          std::vector<int>* index);
+
+  std::vector<QUBOInstance*> instances_;
+  std::vector<std::vector<int> > variables_;
+  std::vector<int> exact_;
+  double exact_weight_;
+};
+
+#endif
@@ -4,6 +4,7 @@
 #include <vector>
 class QUBOSimpleSolution;
 #include "heuristics/qubo/qubo_simple_solution.h"
+#include "problem/flip_history.h"
 #include "problem/heuristic.h"
 #include "problem/qubo_instance.h"
 
@@ -13,6 +14,10 @@ class QUBOCallback {
                       double runtime) = 0;
   virtual bool Report(const QUBOSimpleSolution& solution, bool newBest,
                         double runtime, int iter) = 0;
+
+  // Callbacks are deleted through base pointers (e.g. in main), so they need
+  // a virtual destructor
+  virtual ~QUBOCallback() {}
 };
 
 class QUBOHeuristic : public Heuristic {
@@ -41,20 +46,29 @@ class QUBOHeuristic : public Heuristic {
 
   // Returns const reference to the best solution encountered
   const QUBOSimpleSolution& get_best_solution() const {
-    return past_solutions_[past_solutions_.size()-1];
+    return best_solution_[0];
   }
 
+  // Returns the chain of new best solutions recorded for validation (only
+  // the initial solution unless validation is on)
+  const FlipHistory& get_history() const {  return history_;  }
+
  protected:
   // Determine if the passed solution is a new best solution; if so, store it
-  // appropriately and return true.
-  bool NewBest(const BaseSolution& solution, double runtime);
+  // (with the current runtime) appropriately and return true.
+  bool NewBest(const BaseSolution& solution);
 
   // Instance to be run
   const QUBOInstance& qi_;
 
-  // If validation_ is false, we only maintain the current best solution in this
-  // vector. Otherwise we maintain all best solutions.
-  std::vector<QUBOSimpleSolution> past_solutions_;
+  // The best solution found so far, as the only element of this vector
+  // (QUBOSimpleSolution is incomplete here). Past best solutions are not kept;
+  // with validation on, they can be rebuilt from history_.
+  std::vector<QUBOSimpleSolution> best_solution_;
+
+  // If validation_ is true, the chain of best solutions (as the flips between
+  // consecutive ones), to be checked by IsHistoryValid
+  FlipHistory history_;
 
   // Callback (NULL for no callback)
   QUBOCallback *qc_;
@@ -32,40 +32,48 @@ class QUBOInstance {
   int get_size() const {  return nonzero_.size();  }
   int get_edge_count() const {  return all_nonzero_.size();  }
 
-  std::vector<std::pair<int, double> >::const_iterator
+  std::vector<std::pair<int, Instance::Weight> >::const_iterator
     get_nonzero_begin(int idx) const {  return nonzero_[idx].begin();  }
 
-  std::vector<std::pair<int, double> >::const_iterator
+  std::vector<std::pair<int, Instance::Weight> >::const_iterator
     get_nonzero_end(int idx) const {  return nonzero_[idx].end();  }
 
-  std::vector<std::pair<std::pair<int, int>, double> >::const_iterator
+  std::vector<Instance::InstanceTuple>::const_iterator
     get_all_nonzero_begin() const {  return all_nonzero_.begin();  }
 
-  std::vector<std::pair<std::pair<int, int>, double> >::const_iterator
+  std::vector<Instance::InstanceTuple>::const_iterator
     get_all_nonzero_end() const {  return all_nonzero_.end();  }
 
   const std::vector<double>& get_lin() const {  return lin_;  }
 
+  // Dense instances (see Instance::UseDense) also keep the off-diagonal
+  // entries as a row-major n x n matrix; row idx holds q_idx,j in column j.
+  bool is_dense() const {  return !dense_.empty();  }
+  const Instance::Weight* get_dense_row(int idx) const {
+    return &dense_[(size_t)idx * nonzero_.size()];
+  }
+
  protected:
   // During construction from a maxcut instance, add edge from i to j with
   // weight w_ij.
   void AddMaxCutEdge(int i, int j, double w_ij);
 
   // Non-const iterators
-  std::vector<std::pair<int, double> >::iterator
+  std::vector<std::pair<int, Instance::Weight> >::iterator
     get_mutable_nonzero_begin(int idx) {  return nonzero_[idx].begin();  }
 
-  std::vector<std::pair<int, double> >::iterator
+  std::vector<std::pair<int, Instance::Weight> >::iterator
     get_mutable_nonzero_end(int idx) {  return nonzero_[idx].end();  }
-  std::vector<std::pair<std::pair<int, int>, double> >::iterator
+  std::vector<Instance::InstanceTuple>::iterator
     get_mutable_all_nonzero_begin() {  return all_nonzero_.begin();  }
 
-  std::vector<std::pair<std::pair<int, int>, double> >::iterator
+  std::vector<Instance::InstanceTuple>::iterator
     get_mutable_all_nonzero_end() {  return all_nonzero_.end();  }
 
-  std::vector<std::vector<std::pair<int, double> > > nonzero_;
-  std::vector<std::pair<std::pair<int, int>, double> > all_nonzero_;
-  std::vector<double> lin_;
+  std::vector<std::vector<std::pair<int, Instance::Weight> > > nonzero_;
+  std::vector<Instance::InstanceTuple> all_nonzero_;
+  std::vector<double> lin_;  // Double even with USE_FLOAT_WEIGHTS (see Weight)
+  std::vector<Instance::Weight> dense_;  // Empty unless dense
 };
 
 #endif
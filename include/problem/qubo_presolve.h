@@ -0,0 +1,89 @@
+#ifndef PROBLEM_QUBO_PRESOLVE_H_
+#define PROBLEM_QUBO_PRESOLVE_H_
+
+#include <vector>
+#include "problem/qubo_instance.h"
+
+// Presolve for a QUBO instance: fixes variables to values they take in some
+// optimal solution and builds the reduced instance over the remaining (free)
+// variables. Two rules are applied until neither fixes anything more (or, for
+// roof duality, time runs out; see below):
+//
+// 1) First-order persistency: flipping x_i from 0 to 1 changes the objective
+//    by c_i + 2 sum_j q_ij x_j. If this is non-negative for every x (c_i plus
+//    twice the negative q_ij is >= 0), x_i = 1 in some optimal solution; if
+//    it is non-positive for every x, x_i = 0 in some optimal solution.
+// 2) Roof duality: the QPBO max-flow construction (Boros & Hammer 2002,
+//    Kolmogorov & Rother 2007) on the doubled implication network of the
+//    remaining variables. Every variable labeled by the minimum cut is fixed;
+//    together these labels are part of some optimal solution.
+//
+// The first-order rule is cheap (each fixing updates the neighbors of the
+// variable), but roof duality needs a max flow over the whole network, so it
+// is bounded by time_limit: a round of it that can't finish within
+// time_limit seconds of the start is abandoned, keeping the variables fixed
+// so far.
+//
+// The objective of the original instance is get_offset() plus the objective
+// of the reduced instance on the free variables, with the fixed variables set
+// as in Lift.
+class QUBOPresolve {
+ public:
+  QUBOPresolve(const QUBOInstance& qi, double time_limit);
+  ~QUBOPresolve();
+
+  // Getters
+  int get_num_fixed() const {  return num_fixed_;  }
+  int get_num_free() const {  return free_.size();  }
+  double get_offset() const {  return offset_;  }
+
+  // Reduced instance over the free variables (NULL if every variable was
+  // fixed); variable k of the reduced instance is variable
+  // get_original_index(k) of the original.
+  const QUBOInstance* get_reduced() const {  return reduced_;  }
+  int get_original_index(int k) const {  return free_[k];  }
+
+  // Assignments of the original instance for the given assignments of the
+  // reduced instance (pass an empty vector if every variable was fixed)
+  void Lift(const std::vector<int>& reduced, std::vector<int>* original) const;
+
+ private:
+  // Disable copying (we own the reduced instance)
+  QUBOPresolve(const QUBOPresolve&);
+  QUBOPresolve& operator=(const QUBOPresolve&);
+
+  // Fix x_i = val and update the bounds on the gains of its free neighbors,
+  // pushing any that may now be fixed onto *candidates
+  void Fix(int i, int val, std::vector<int>* candidates);
+
+  // Current gain c_i + 2 sum_j q_ij x_j of setting free variable i to 1, with
+  // the fixed variables at their values, and its smallest and largest value
+  // over the free variables (computed from scratch).
+  void GainBounds(int i, double* gain, double* lo, double* hi) const;
+
+  // Apply the first-order rule to the variables in *candidates (and any
+  // variables it makes fixable) until it fixes nothing more
+  void FirstOrder(std::vector<int>* candidates);
+
+  // Fix the variables labeled by roof duality (pushing their free neighbors
+  // onto *candidates), returning how many there were (0 if the max flow
+  // could not be finished by the deadline, in seconds on the monotonic clock)
+  int RoofDuality(double deadline, std::vector<int>* candidates);
+
+  const QUBOInstance& qi_;
+  std::vector<int> fixed_;  // -1 for free variables, otherwise the value
+  int num_fixed_;
+
+  // Incrementally maintained bounds on the gain of each free variable, used
+  // to find candidates for the first-order rule (which are then checked with
+  // GainBounds to avoid accumulated rounding error)
+  std::vector<double> lo_;
+  std::vector<double> hi_;
+  std::vector<bool> queued_;
+
+  std::vector<int> free_;  // Original index of each reduced variable
+  double offset_;
+  QUBOInstance* reduced_;
+};
+
+#endif
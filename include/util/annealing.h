@@ -0,0 +1,102 @@
+#ifndef UTIL_ANNEALING_H_
+#define UTIL_ANNEALING_H_
+
+#include <stdint.h>
+#include "util/random.h"
+
+// Acceptance test and random numbers for the inner loop of simulated
+// annealing, shared by the QUBO heuristics that anneal one variable flip at a
+// time (Alkhamis1998, Beasley1998 and Katayama2001).
+//
+// Instead of calling exp() and rand() for every non-improving candidate,
+// Accept looks exp(delta / T) up in a precomputed table (linear interpolation
+// between 64 points per unit, so the acceptance probability has relative
+// error below 4e-5) and rejects without drawing a random number when the
+// probability is below exp(-32). Random numbers come from a fast generator
+// that fills a block at a time; it is seeded from rand(), so runs are still
+// reproducible with a fixed seed (see RandomStream).
+class Annealer {
+ public:
+  // n is the number of variables; a sweep is n trial moves.
+  explicit Annealer(int n);
+
+  void set_temperature(double T) {
+    T_ = T;
+    inv_T_ = 1.0 / T;
+  }
+  double get_temperature() const {  return T_;  }
+
+  // Return a random variable index in [0, n)
+  int RandVariable() {
+    return (int)(((uint64_t)NextRandom() * (uint64_t)n_) >> 32);
+  }
+
+  // Return a random double in [0, 1)
+  double RandDouble() {  return NextRandom() * (1.0 / 4294967296.0);  }
+
+  // Metropolis test for a move that changes the objective (which we are
+  // maximizing) by delta at the current temperature: moves that don't make
+  // the objective worse are always accepted, and others with probability
+  // exp(delta / T). Each call counts as one trial move.
+  bool Accept(double delta) {
+    ++trials_;
+    if (delta >= 0.0) {
+      ++accepted_;
+      return true;
+    }
+    double x = -delta * inv_T_;
+    if (!(x < kExpRange)) {
+      return false;  // Probability below exp(-kExpRange), or T is 0
+    }
+    double pos = x * kExpSteps;
+    int idx = (int)pos;
+    double p = exp_table_[idx] +
+      (pos - idx) * (exp_table_[idx+1] - exp_table_[idx]);
+    if (RandDouble() < p) {
+      ++accepted_;
+      ++accepted_worse_;
+      return true;
+    }
+    return false;
+  }
+
+  // Counters of the trial moves tested with Accept
+  long long get_trials() const {  return trials_;  }
+  long long get_accepted() const {  return accepted_;  }
+  long long get_accepted_worse() const {  return accepted_worse_;  }
+  double get_sweeps() const {  return (double)trials_ / n_;  }
+  void ResetCounters() {
+    trials_ = 0;
+    accepted_ = 0;
+    accepted_worse_ = 0;
+  }
+
+ private:
+  static const int kExpRange = 32;
+  static const int kExpSteps = 64;
+  static const int kBlockSize = 256;
+
+  // Table of exp(-i / kExpSteps) for i = 0, ..., kExpRange * kExpSteps
+  static const double* ExpTable();
+
+  uint32_t NextRandom() {
+    if (block_pos_ == kBlockSize) {
+      RefillBlock();
+    }
+    return block_[block_pos_++];
+  }
+  void RefillBlock();
+
+  int n_;
+  double T_;
+  double inv_T_;
+  const double* exp_table_;
+  RandomStream rng_;
+  uint32_t block_[kBlockSize];
+  int block_pos_;
+  long long trials_;
+  long long accepted_;
+  long long accepted_worse_;
+};
+
+#endif
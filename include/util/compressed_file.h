@@ -0,0 +1,26 @@
+#ifndef UTIL_COMPRESSED_FILE_H_
+#define UTIL_COMPRESSED_FILE_H_
+
+#include <string>
+
+class CompressedFile {
+ public:
+  // Check if the filename names a compressed file that Read can handle (a
+  // gzip file ending in ".gz" or a zip archive ending in ".zip").
+  static bool IsCompressed(const std::string& filename);
+
+  // Decompress the passed file into memory. For a zip archive, the first
+  // member that is not a directory is read (MQLib instance archives hold a
+  // single instance file). Returns false and fills in error on failure,
+  // including when MQLib was built without zlib support (USE_ZLIB).
+  static bool Read(const std::string& filename, std::string* contents,
+                   std::string* error);
+
+ private:
+  static bool ReadGzip(const std::string& filename, std::string* contents,
+                       std::string* error);
+  static bool ReadZip(const std::string& filename, std::string* contents,
+                      std::string* error);
+};
+
+#endif
@@ -0,0 +1,31 @@
+#ifndef UTIL_DENSE_ROWS_H_
+#define UTIL_DENSE_ROWS_H_
+
+// Row kernels for the dense-matrix mode of the instances (see
+// Instance::UseDense). Each loop is branch-free and unrolled by four, which
+// lets the compiler vectorize it at -O2; none of the arrays may overlap. Rows
+// are in double or (for builds with USE_FLOAT_WEIGHTS) single precision,
+// while the sums and gains are always in double precision.
+class DenseRows {
+ public:
+  // sums[j] += row[j] for 0 <= j < n
+  static void Add(const double* row, int n, double* sums);
+  static void Add(const float* row, int n, double* sums);
+
+  // The QUBO gain update after flipping a variable with new value x_i and
+  // matrix row row: diff_weights[j] += 2q_ij if x[j] != x_i and -2q_ij
+  // otherwise (x in {0, 1})
+  static void QUBOFlip(const double* row, const int* x, int x_i, int n,
+                       double* diff_weights);
+  static void QUBOFlip(const float* row, const int* x, int x_i, int n,
+                       double* diff_weights);
+
+  // The Max-Cut gain update after flipping a node with new value x_i and
+  // weight row row: diff_weights[j] += 2 x_i x[j] w_ij (x in {-1, 1})
+  static void MaxCutFlip(const double* row, const int* x, int x_i, int n,
+                         double* diff_weights);
+  static void MaxCutFlip(const float* row, const int* x, int x_i, int n,
+                         double* diff_weights);
+};
+
+#endif
@@ -0,0 +1,117 @@
+#ifndef UTIL_PROFILE_H_
+#define UTIL_PROFILE_H_
+
+#include <atomic>
+#include <string>
+
+// Counters and per-phase timers describing where a heuristic run spends its
+// effort. Every Heuristic owns a Profile; the solution classes count flips
+// (UpdateCutValues calls) and neighborhood evaluations, the Report functions
+// count reports, and heuristics count their restarts and time their phases
+// with ProfilePhase. Not every heuristic is instrumented for every counter
+// and phase (e.g. only some count restarts), so the profile also tracks which
+// counters and phases were recorded at all; ToJSON prints the others as null
+// rather than as a measured 0.
+//
+// Profiling is off by default, in which case each counting point costs one
+// test of a global flag. Counters are atomic so heuristics running on several
+// threads (see Heuristic::set_num_threads) can share a Profile; the time of a
+// phase is summed over the threads running it.
+class Profile {
+ public:
+  enum Counter {
+    FLIPS,  // Variables flipped / nodes switched via UpdateCutValues
+    EVALUATIONS,  // Moves evaluated by the 1-swap and 2-swap local searches
+    RESTARTS,  // Restarts of the search from a new solution
+    REPORTS,  // Calls to the heuristic's Report functions
+    NUM_COUNTERS
+  };
+
+  enum Phase {
+    CONSTRUCTION,
+    LOCAL_SEARCH,
+    PERTURBATION,
+    CROSSOVER,
+    NUM_PHASES
+  };
+
+  Profile();
+
+  // Turn profiling on or off for all heuristics run afterward
+  static void set_enabled(bool enabled) {  enabled_ = enabled;  }
+  static bool enabled() {  return enabled_;  }
+
+  void Count(Counter counter, long long amount = 1) {
+    if (enabled_) {
+      counts_[counter].fetch_add(amount, std::memory_order_relaxed);
+      if (!recorded_[counter].load(std::memory_order_relaxed)) {
+        recorded_[counter].store(true, std::memory_order_relaxed);
+      }
+    }
+  }
+  void AddPhaseTime(Phase phase, long long nanoseconds) {
+    phase_ns_[phase].fetch_add(nanoseconds, std::memory_order_relaxed);
+    phase_recorded_[phase].store(true, std::memory_order_relaxed);
+  }
+
+  // How far past its runtime limit the heuristic was when it noticed the
+  // limit was reached (see Heuristic::get_overshoot)
+  void set_overshoot(double overshoot) {  overshoot_ = overshoot;  }
+
+  // Getters
+  long long get_count(Counter counter) const {  return counts_[counter];  }
+  double get_phase_time(Phase phase) const {  return phase_ns_[phase] * 1e-9; }
+  double get_overshoot() const {  return overshoot_;  }
+
+  // Whether anything counted the counter / timed the phase
+  bool is_recorded(Counter counter) const {  return recorded_[counter];  }
+  bool is_recorded(Phase phase) const {  return phase_recorded_[phase];  }
+
+  // Add the counters and phase times of another profile into this one (the
+  // overshoot is the larger of the two)
+  void Add(const Profile& other);
+
+  // The counters and phase times (in seconds) as a JSON object, with null for
+  // those that were never recorded
+  std::string ToJSON() const;
+
+ private:
+  // Disable copying (the members are atomic)
+  Profile(const Profile&);
+  Profile& operator=(const Profile&);
+
+  static bool enabled_;
+
+  std::atomic<long long> counts_[NUM_COUNTERS];
+  std::atomic<long long> phase_ns_[NUM_PHASES];
+  std::atomic<bool> recorded_[NUM_COUNTERS];
+  std::atomic<bool> phase_recorded_[NUM_PHASES];
+  double overshoot_;
+};
+
+// Add the time from construction to destruction to a phase of a profile (if
+// profiling is enabled), e.g.
+//   {
+//     ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
+//     x.AllBest1Swap();
+//   }
+class ProfilePhase {
+ public:
+  ProfilePhase(Profile* profile, Profile::Phase phase);
+  ~ProfilePhase() {  Stop();  }
+
+  // End the phase before the end of the scope
+  void Stop();
+
+ private:
+  // Disable default constructor and copying
+  ProfilePhase();
+  ProfilePhase(const ProfilePhase&);
+  ProfilePhase& operator=(const ProfilePhase&);
+
+  Profile* profile_;  // NULL if profiling is disabled
+  Profile::Phase phase_;
+  long long start_ns_;
+};
+
+#endif
@@ -1,7 +1,9 @@
 #ifndef UTIL_RANDOM_H_
 #define UTIL_RANDOM_H_
 
+#include <stdint.h>
 #include <stdlib.h>
+#include <vector>
 
 class Random {
  public:
@@ -10,6 +12,12 @@ class Random {
     return ((double)rand()) / (((long)RAND_MAX)+1);
   }
   
+  // Return a random double in [0, 1) from the random number stream with the
+  // passed state (for threads that each need their own reproducible stream)
+  static inline double RandDouble(unsigned int* state) {
+    return ((double)rand_r(state)) / (((long)RAND_MAX)+1);
+  }
+
   // Return a random double in [min_val, max_val)
   static inline double RandDouble(double min_val, double max_val) {
     return min_val + (max_val-min_val) * RandDouble();
@@ -32,4 +40,28 @@ class Random {
 
 };
 
+// A fast stream of random 64-bit words (xorshift64*, Vigna 2016) for inner
+// loops that need many random bits. The stream is seeded from rand(), so
+// runs are still reproducible with a fixed seed.
+class RandomStream {
+ public:
+  RandomStream() {
+    // The state must be non-zero
+    state_ = ((uint64_t)rand() << 32) ^ (uint64_t)rand();
+    if (state_ == 0) {
+      state_ = 0x9E3779B97F4A7C15ULL;
+    }
+  }
+
+  uint64_t Next() {
+    state_ ^= state_ >> 12;
+    state_ ^= state_ << 25;
+    state_ ^= state_ >> 27;
+    return state_ * 2685821657736338717ULL;
+  }
+
+ private:
+  uint64_t state_;
+};
+
 #endif
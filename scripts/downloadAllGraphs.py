@@ -1,29 +1,30 @@
-import boto
 import os
 import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "Cloud"))
+import InstanceCache
 
 if len(sys.argv) != 2:
     print("Usage: python downloadAllGraphs.py outputFolder")
     exit(1)
 
-conn = boto.connect_s3(anon=True)
-b = conn.get_bucket("mqlibinstances", validate=False)
-for k in b.list():
-    name = k.key
-    fname = sys.argv[1] + "/" + name
-    if os.path.isfile(fname):
-        print("[ Skipping ", name, "]")
-        continue
-    print(name, "...")
-    success = False
-    for count in range(10):
-        try:
-            k.get_contents_to_filename(fname)
-            success = True
-        except:
-            print("  download failed")
-        if success:
-            break
-    if not success:
-        print("Failed to download", name)
-        exit(1)
+# The output folder doubles as the instance cache: each graph is stored next
+# to a .md5 file, graphs already present with the bucket's checksum are
+# skipped (a graph without a .md5 file is hashed, not downloaded again), and
+# the rest are downloaded concurrently, verified, and moved into place
+# atomically.
+cache = InstanceCache.InstanceCache(cache_dir=sys.argv[1])
+objects = cache.backend.list()
+
+def report(name, path):
+    if path is None:
+        print("Failed to download %s" % name)
+    else:
+        print(name)
+    sys.stdout.flush()
+
+paths = cache.get_many(objects, threads=8, on_done=report)
+failed = sorted(name for name, path in paths.items() if path is None)
+if failed:
+    print("Failed to download %d graphs" % len(failed))
+    exit(1)
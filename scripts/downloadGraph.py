@@ -1,15 +1,21 @@
-import boto
+import os
+import shutil
 import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "Cloud"))
+import InstanceCache
 
 if len(sys.argv) != 2:
     print("Usage: python downloadGraph.py graphName.txt")
     exit(1)
 
-conn = boto.connect_s3(anon=True)
-b = conn.get_bucket("mqlibinstances", validate=False)
-k = boto.s3.key.Key(b)
-k.key = sys.argv[1]
-if sys.version_info > (3, 0):
-    sys.stdout.buffer.write(k.get_contents_as_string())
-else:
-    sys.stdout.write(k.get_contents_as_string())
+# Fetch through the local instance cache, so repeated requests for the same
+# graph are served from disk
+try:
+    path = InstanceCache.InstanceCache().get(sys.argv[1])
+except IOError as err:
+    sys.stderr.write(str(err) + "\n")
+    exit(1)
+out = sys.stdout.buffer if sys.version_info > (3, 0) else sys.stdout
+with open(path, "rb") as fp:
+    shutil.copyfileobj(fp, out)
@@ -0,0 +1,420 @@
+# A time-to-target benchmark for the MQLib heuristics. This script generates a
+# fixed set of Max-Cut and QUBO instances (the same on every machine, since the
+# random number generator is seeded), runs each heuristic in a list on each
+# instance with several seeds, and records the history of new best solutions
+# of every run. From the histories it computes, for each heuristic and
+# instance:
+#
+# - the time-to-target distribution: the time each run first reached the
+#   target (the best objective found by any run, or within a relative gap of
+#   it), with runs that never reached it counted as failures;
+# - the anytime score: 1 minus the average over the run of the relative gap
+#   between the best objective found so far and the best objective found by
+#   any run (1 is best, 0 means nothing useful was found).
+#
+# Everything runs locally with no network access. Usage (from the scripts
+# folder, after running `make` in the main folder):
+#
+#   python ttt.py run ../data/heuristics.txt results.json
+#   python ttt.py compare old.json new.json
+#   python ttt.py smoke
+#
+# Heuristics in the list that this build of MQLib doesn't have (e.g. DWAVEQPU
+# and DWAVESA, unless it was built with D-Wave support) are skipped with a
+# warning, so the full list in ../data/heuristics.txt can be used.
+#
+# `run` writes all the histories and the summary to a JSON file and prints the
+# summary in csv format to the screen; see `python ttt.py run -h` for the
+# number of seeds, the runtime limit, the gaps, and extra MQLib flags (e.g.
+# --flags="-kr -pp" to benchmark the instance reductions). `compare` summarizes
+# two result files with common targets (the best objective found in either),
+# prints the summaries side by side in csv format, and exits with status 1 if
+# the second is worse on any heuristic and instance, so it can be used to
+# check a new build for performance regressions. `smoke` runs one heuristic
+# once with the default runtime limit on one instance and checks that the run
+# is parsed, so it is a quick check of the script itself.
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+INSTANCE_DIR = "ttt_instances"
+HISTORY_RE = re.compile(r"\[([^\]]*)\](,[^,]*)?\s*$")
+
+
+# Write a Max-Cut instance with the given 0-indexed edges
+def writeMaxCut(filename, n, edges):
+    with open(filename, "w") as fp:
+        fp.write("%d %d\n" % (n, len(edges)))
+        for x, y, w in edges:
+            fp.write("%d %d %d\n" % (x+1, y+1, w))
+
+
+# Erdos-Renyi graph with expected degree 5 and weights from {-1, 1}
+def erGraph(filename, n, rng):
+    p = 5.0 / (n-1)
+    edges = [(x, y, 2*rng.randint(0, 1)-1) for x in range(n-1)
+             for y in range(x+1, n) if rng.random() < p]
+    writeMaxCut(filename, n, edges)
+
+
+# Complete graph with weights from {-1, 1}
+def completeGraph(filename, n, rng):
+    edges = [(x, y, 2*rng.randint(0, 1)-1) for x in range(n-1)
+             for y in range(x+1, n)]
+    writeMaxCut(filename, n, edges)
+
+
+# Toroidal 2D grid with weights from {-1, 1} (a spin glass)
+def torusGraph(filename, side, rng):
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            node = r*side + c
+            edges.append((node, r*side + (c+1) % side, 2*rng.randint(0, 1)-1))
+            edges.append((node, ((r+1) % side)*side + c,
+                          2*rng.randint(0, 1)-1))
+    writeMaxCut(filename, side*side, [(min(x, y), max(x, y), w)
+                                       for x, y, w in edges])
+
+
+# Unweighted random graph with edge probability p (like the G-set graphs)
+def unweightedGraph(filename, n, p, rng):
+    edges = [(x, y, 1) for x in range(n-1) for y in range(x+1, n)
+             if rng.random() < p]
+    writeMaxCut(filename, n, edges)
+
+
+# QUBO instance with density p and integer entries from [-100, 100]
+def quboInstance(filename, n, p, rng):
+    entries = [(x, x, rng.randint(-100, 100)) for x in range(n)]
+    entries += [(x, y, rng.randint(-100, 100)) for x in range(n-1)
+                for y in range(x+1, n) if rng.random() < p]
+    with open(filename, "w") as fp:
+        fp.write("%d %d\n" % (n, len(entries)))
+        for x, y, w in entries:
+            fp.write("%d %d %d\n" % (x+1, y+1, w))
+
+
+# The benchmark instances: (name, MQLib file flag, generator). Each generator
+# gets its own seeded random number generator, so the instances don't depend
+# on which others are generated.
+INSTANCES = [
+    ("er500", "-fM", lambda f, rng: erGraph(f, 500, rng)),
+    ("complete150", "-fM", lambda f, rng: completeGraph(f, 150, rng)),
+    ("torus20", "-fM", lambda f, rng: torusGraph(f, 20, rng)),
+    ("unweighted800", "-fM", lambda f, rng: unweightedGraph(f, 800, 0.02, rng)),
+    ("qubo200", "-fQ", lambda f, rng: quboInstance(f, 200, 0.1, rng)),
+]
+
+
+# Generate any benchmark instances not already in the instance folder
+def createInstances():
+    if not os.path.exists(INSTANCE_DIR):
+        os.makedirs(INSTANCE_DIR)
+    files = {}
+    for index, (name, flag, generate) in enumerate(INSTANCES):
+        filename = os.path.join(INSTANCE_DIR, name + ".txt")
+        if not os.path.exists(filename):
+            generate(filename + ".tmp", random.Random(144 + index))
+            os.rename(filename + ".tmp", filename)
+        files[name] = (flag, filename)
+    return files
+
+
+# Run one heuristic on one instance, returning the record of the run (with
+# "history" None if the run failed)
+def runOne(heuristic, name, flag, filename, seed, runtime, flags):
+    torun = ["../bin/MQLib", flag, filename, "-h", heuristic, "-r",
+             str(runtime), "-s", str(seed), "-nv"] + flags
+    p = subprocess.Popen(torun, stdout=subprocess.PIPE,
+                         stderr=subprocess.STDOUT)
+    output = p.communicate()[0].decode("utf-8")
+    record = {"heuristic": heuristic, "instance": name, "seed": seed,
+              "history": None}
+    for line in output.split("\n"):
+        # The result line is
+        # runtime_limit,code,"file",best,runtime,[history],overshoot
+        # (the limit is printed by MQLib, so 5.0 comes out as 5)
+        match = HISTORY_RE.search(line)
+        fields = line.split(",")
+        if match and len(fields) >= 6 and fields[1] == heuristic:
+            record["final"] = float(fields[3])
+            record["runtime"] = float(fields[4])
+            record["history"] = [[float(x) for x in point.split(":")]
+                                 for point in match.group(1).split(";")
+                                 if point]
+    if record["history"] is None:
+        sys.stderr.write("Run failed: %s\n%s\n" % (" ".join(torun), output))
+    return record
+
+
+# Best objective found by any run on each instance
+def bestValues(runs):
+    best = {}
+    for run in runs:
+        if run["history"]:
+            value = max(v for v, t in run["history"])
+            if run["instance"] not in best or value > best[run["instance"]]:
+                best[run["instance"]] = value
+    return best
+
+
+# Target objective for a relative gap from the best objective
+def target(best, gap):
+    return best - gap * abs(best)
+
+
+# Time the run first reached the target (None if it never did)
+def timeToTarget(history, goal):
+    tolerance = 1e-9 * max(1.0, abs(goal))
+    for value, time in history:
+        if value >= goal - tolerance:
+            return time
+    return None
+
+
+# 1 minus the average relative gap to best over [0, runtime] (the gap is 1
+# before the first reported solution and is capped at 1)
+def anytimeScore(history, best, runtime):
+    scale = max(abs(best), 1e-9)
+    area = 0.0
+    last_time, last_gap = 0.0, 1.0
+    for value, time in history:
+        time = min(time, runtime)
+        area += last_gap * (time - last_time)
+        last_time = time
+        last_gap = min(1.0, max(0.0, (best - value) / scale))
+    area += last_gap * max(0.0, runtime - last_time)
+    return 1.0 - area / runtime
+
+
+# Median of the times to target, counting failures as infinite (None if at
+# least half the runs failed)
+def medianTime(times, runs):
+    ordered = sorted(times) + [None] * (runs - len(times))
+    middle = ordered[(runs-1) // 2]
+    if middle is None or runs % 2 == 1:
+        return middle
+    upper = ordered[runs // 2]
+    return None if upper is None else 0.5 * (middle + upper)
+
+
+# Summary row for each heuristic, instance and gap
+def summarize(runs, best, gaps, runtime):
+    groups = {}
+    for run in runs:
+        groups.setdefault((run["heuristic"], run["instance"]), []).append(run)
+    summary = []
+    for (heuristic, instance), group in sorted(groups.items()):
+        histories = [r["history"] for r in group if r["history"]]
+        for gap in gaps:
+            goal = target(best[instance], gap) if instance in best else None
+            times = [timeToTarget(h, goal) for h in histories] if histories \
+                else []
+            times = [t for t in times if t is not None]
+            scores = [anytimeScore(h, best[instance], runtime)
+                      for h in histories]
+            summary.append({
+                "heuristic": heuristic, "instance": instance, "gap": gap,
+                "target": goal, "runs": len(group), "successes": len(times),
+                "ttt_median": medianTime(times, len(group)),
+                "ttt_mean": sum(times) / len(times) if times else None,
+                "ttt": sorted(times),
+                "anytime": sum(scores) / len(group) if group else 0.0})
+    return summary
+
+
+def formatValue(x):
+    if x is None:
+        return "inf"
+    return "%.6g" % x
+
+
+# Heuristic codes listed by `MQLib -l` (the codes are the lines that aren't
+# indented, headers, or separators)
+def availableHeuristics():
+    output = subprocess.check_output(["../bin/MQLib", "-l"])
+    return set(line for line in output.decode("utf-8").split("\n")
+               if re.match(r"^[A-Za-z0-9]+$", line))
+
+
+def checkBinary():
+    if not os.path.exists("../bin"):
+        print("ttt.py must be run from the scripts folder")
+        exit(1)
+    if not os.path.exists("../bin/MQLib"):
+        print("You need to run `make` in the main folder before running ttt.py")
+        exit(1)
+
+
+def run(args):
+    checkBinary()
+    with open(args.heuristics, "r") as fp:
+        heuristics = [x.strip() for x in fp if x.strip()]
+    available = availableHeuristics()
+    for h in heuristics:
+        if h not in available:
+            sys.stderr.write("Skipping %s (not in this build of MQLib)\n" % h)
+    heuristics = [h for h in heuristics if h in available]
+    gaps = [float(x) for x in args.gaps.split(",")]
+    flags = args.flags.split()
+    files = createInstances()
+
+    tasks = [(h, name, files[name][0], files[name][1], seed, args.runtime,
+              flags)
+             for name, flag, generate in INSTANCES for h in heuristics
+             for seed in range(1, args.seeds+1)]
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        runs = list(pool.map(lambda task: runOne(*task), tasks))
+
+    best = bestValues(runs)
+    summary = summarize(runs, best, gaps, args.runtime)
+    try:
+        build = subprocess.check_output(["git", "describe", "--always",
+                                         "--dirty"],
+                                        stderr=subprocess.STDOUT)
+        build = build.decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        build = None
+    with open(args.output, "w") as fp:
+        json.dump({"build": build, "runtime": args.runtime, "gaps": gaps,
+                   "flags": args.flags, "best": best, "runs": runs,
+                   "summary": summary}, fp)
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["heuristic", "instance", "gap", "target", "successes",
+                     "runs", "ttt_median", "ttt_mean", "anytime"])
+    for row in summary:
+        writer.writerow([row["heuristic"], row["instance"], row["gap"],
+                         formatValue(row["target"]), row["successes"],
+                         row["runs"], formatValue(row["ttt_median"]),
+                         formatValue(row["ttt_mean"]),
+                         "%.4f" % row["anytime"]])
+
+
+# Whether the new summary row is worse than the old one: fewer successes, a
+# median time to target more than tolerance (relative) slower, or an anytime
+# score more than tolerance lower
+def isRegression(old, new, tolerance):
+    if new["successes"] * old["runs"] < old["successes"] * new["runs"]:
+        return True
+    if old["ttt_median"] is not None:
+        if new["ttt_median"] is None:
+            return True
+        slack = max(tolerance * old["ttt_median"], 0.01)  # Timer resolution
+        if new["ttt_median"] > old["ttt_median"] + slack:
+            return True
+    return new["anytime"] < old["anytime"] - tolerance
+
+
+def compare(args):
+    with open(args.old, "r") as fp:
+        old = json.load(fp)
+    with open(args.new, "r") as fp:
+        new = json.load(fp)
+    if old["runtime"] != new["runtime"]:
+        sys.stderr.write("Warning: runtime limits differ (%s and %s)\n" %
+                         (old["runtime"], new["runtime"]))
+
+    # Common targets, so times to target are comparable
+    best = bestValues(old["runs"] + new["runs"])
+    gaps = sorted(set(old["gaps"]) & set(new["gaps"]))
+    oldSummary = dict(((r["heuristic"], r["instance"], r["gap"]), r) for r in
+                      summarize(old["runs"], best, gaps, old["runtime"]))
+    newSummary = summarize(new["runs"], best, gaps, new["runtime"])
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["heuristic", "instance", "gap", "old_successes",
+                     "new_successes", "old_ttt_median", "new_ttt_median",
+                     "old_anytime", "new_anytime", "regression"])
+    regressions = 0
+    for row in newSummary:
+        key = (row["heuristic"], row["instance"], row["gap"])
+        if key not in oldSummary:
+            continue
+        prev = oldSummary[key]
+        regression = isRegression(prev, row, args.tolerance)
+        regressions += regression
+        writer.writerow([row["heuristic"], row["instance"], row["gap"],
+                         "%d/%d" % (prev["successes"], prev["runs"]),
+                         "%d/%d" % (row["successes"], row["runs"]),
+                         formatValue(prev["ttt_median"]),
+                         formatValue(row["ttt_median"]),
+                         "%.4f" % prev["anytime"], "%.4f" % row["anytime"],
+                         int(regression)])
+    if regressions > 0:
+        sys.stderr.write("%d regressions\n" % regressions)
+        exit(1)
+
+
+# Run one heuristic once on the first instance with the default settings,
+# checking that the run is parsed and summarized (so a change to the MQLib
+# output doesn't silently turn every run into a failure)
+def smoke(args):
+    checkBinary()
+    name, flag, generate = INSTANCES[0]
+    files = createInstances()
+    record = runOne(args.heuristic, name, flag, files[name][1], 1,
+                    args.runtime, [])
+    if not record["history"] or \
+       record["history"][-1][0] != record["final"]:
+        print("Smoke test failed: could not parse the run")
+        exit(1)
+    row = summarize([record], bestValues([record]), [0.0], args.runtime)[0]
+    if row["successes"] != 1 or row["ttt_median"] is None or \
+       not 0.0 < row["anytime"] <= 1.0:
+        print("Smoke test failed: bad summary %s" % row)
+        exit(1)
+    print("Smoke test passed: %s on %s reached %g at %g seconds" %
+          (args.heuristic, name, record["final"], row["ttt_median"]))
+
+
+##############################
+##############################
+DEFAULT_RUNTIME = 5.0
+parser = argparse.ArgumentParser(description="Time-to-target benchmark")
+subparsers = parser.add_subparsers(dest="command")
+runParser = subparsers.add_parser("run", help="Run the benchmark")
+runParser.add_argument("heuristics", help="File with one heuristic per line")
+runParser.add_argument("output", help="JSON file for the results")
+runParser.add_argument("--seeds", type=int, default=5,
+                       help="Runs per heuristic and instance (default 5)")
+runParser.add_argument("--runtime", type=float, default=DEFAULT_RUNTIME,
+                       help="Runtime limit of each run (seconds, default 5)")
+runParser.add_argument("--gaps", default="0,0.001,0.01",
+                       help="Relative gaps from the best objective to use as "
+                       "targets (default 0,0.001,0.01)")
+runParser.add_argument("--flags", default="",
+                       help="Extra MQLib flags for every run")
+runParser.add_argument("--jobs", type=int, default=1,
+                       help="Runs at a time (default 1; more runs at a time "
+                       "make the times less reliable)")
+compareParser = subparsers.add_parser("compare",
+                                      help="Compare two result files")
+compareParser.add_argument("old", help="Results of the reference build")
+compareParser.add_argument("new", help="Results of the build to check")
+compareParser.add_argument("--tolerance", type=float, default=0.1,
+                           help="Allowed relative slowdown of the median time "
+                           "to target and drop in anytime score (default 0.1)")
+smokeParser = subparsers.add_parser("smoke",
+                                    help="Check that runs are parsed")
+smokeParser.add_argument("heuristic", nargs="?", default="BURER2002",
+                         help="Heuristic to run (default BURER2002)")
+smokeParser.add_argument("--runtime", type=float, default=DEFAULT_RUNTIME,
+                         help="Runtime limit (seconds, default 5)")
+args = parser.parse_args()
+if args.command == "run":
+    run(args)
+elif args.command == "compare":
+    compare(args)
+elif args.command == "smoke":
+    smoke(args)
+else:
+    parser.print_help()
@@ -0,0 +1,158 @@
+#include <vector>
+#include "heuristics/elite_pool.h"
+
+namespace {
+// Pack the n assignments of x into words (one bit per variable), returning
+// the hash of the result
+uint64_t PackSolution(const BaseSolution& x, int n, int num_words,
+                      uint64_t* words) {
+  const std::vector<int>& assignments = x.get_assignments();
+  for (int w=0; w < num_words; ++w) {
+    words[w] = 0;
+  }
+  for (int i=0; i < n; ++i) {
+    if (assignments[i] == 1) {
+      words[i / 64] |= 1ULL << (i % 64);
+    }
+  }
+
+  // 64-bit FNV-1a over the words
+  uint64_t hash = 14695981039346656037ULL;
+  for (int w=0; w < num_words; ++w) {
+    hash = (hash ^ words[w]) * 1099511628211ULL;
+  }
+  return hash;
+}
+}
+
+ElitePool::ElitePool(int n, int capacity, const std::vector<double>* weights) :
+  n_(n),
+  capacity_(capacity),
+  words_((n + 63) / 64),
+  size_(0),
+  filled_(capacity, false),
+  bits_(capacity * words_, 0),
+  hash_(capacity, 0),
+  dist_(capacity * capacity, 0),
+  dist_sum_(0),
+  weights_(weights),
+  weighted_dist_(weights ? capacity * capacity : 0, 0.0),
+  scratch_(words_, 0) {}
+
+uint64_t ElitePool::Pack(const BaseSolution& x, uint64_t* words) const {
+  return PackSolution(x, n_, words_, words);
+}
+
+int ElitePool::PackedDistance(const uint64_t* a, const uint64_t* b) const {
+  int dist = 0;
+  for (int w=0; w < words_; ++w) {
+    dist += __builtin_popcountll(a[w] ^ b[w]);
+  }
+  return dist;
+}
+
+double ElitePool::PackedWeightedDistance(const uint64_t* a,
+                                         const uint64_t* b) const {
+  // Add up the weights in increasing order of variable index, as a loop over
+  // the variables would.
+  double dist = 0.0;
+  for (int w=0; w < words_; ++w) {
+    uint64_t diff = a[w] ^ b[w];
+    while (diff) {
+      dist += (*weights_)[w * 64 + __builtin_ctzll(diff)];
+      diff &= diff - 1;
+    }
+  }
+  return dist;
+}
+
+void ElitePool::Set(int slot, const BaseSolution& x) {
+  uint64_t* words = &bits_[slot * words_];
+  if (filled_[slot]) {
+    for (int other=0; other < capacity_; ++other) {
+      dist_sum_ -= filled_[other] ? dist_[slot * capacity_ + other] : 0;
+    }
+  } else {
+    filled_[slot] = true;
+    ++size_;
+  }
+  hash_[slot] = Pack(x, words);
+
+  // Update the row and column of slot in the distance matrices
+  for (int other=0; other < capacity_; ++other) {
+    if (other == slot || !filled_[other]) {
+      continue;
+    }
+    const uint64_t* other_words = &bits_[other * words_];
+    int dist = PackedDistance(words, other_words);
+    dist_[slot * capacity_ + other] = dist;
+    dist_[other * capacity_ + slot] = dist;
+    dist_sum_ += dist;
+    if (weights_) {
+      double weighted = PackedWeightedDistance(words, other_words);
+      weighted_dist_[slot * capacity_ + other] = weighted;
+      weighted_dist_[other * capacity_ + slot] = weighted;
+    }
+  }
+}
+
+void ElitePool::Distances(const BaseSolution& x, std::vector<int>* dist,
+                          std::vector<double>* weighted_dist) const {
+  Pack(x, &scratch_[0]);
+  dist->assign(capacity_, 0);
+  if (weighted_dist) {
+    weighted_dist->assign(capacity_, 0.0);
+  }
+  for (int slot=0; slot < capacity_; ++slot) {
+    if (filled_[slot]) {
+      const uint64_t* words = &bits_[slot * words_];
+      (*dist)[slot] = PackedDistance(&scratch_[0], words);
+      if (weighted_dist) {
+        (*weighted_dist)[slot] = PackedWeightedDistance(&scratch_[0], words);
+      }
+    }
+  }
+}
+
+int ElitePool::Find(const BaseSolution& x) const {
+  uint64_t hash = Pack(x, &scratch_[0]);
+  for (int slot=0; slot < capacity_; ++slot) {
+    if (filled_[slot] && hash_[slot] == hash &&
+        PackedDistance(&scratch_[0], &bits_[slot * words_]) == 0) {
+      return slot;
+    }
+  }
+  return -1;
+}
+
+EliteSet::EliteSet(int n) :
+  n_(n),
+  words_((n + 63) / 64),
+  scratch_(words_, 0) {}
+
+void EliteSet::Insert(const BaseSolution& x) {
+  uint64_t hash = PackSolution(x, n_, words_, &scratch_[0]);
+  members_.insert(std::make_pair(hash, scratch_));
+}
+
+void EliteSet::Erase(const BaseSolution& x) {
+  uint64_t hash = PackSolution(x, n_, words_, &scratch_[0]);
+  auto range = members_.equal_range(hash);
+  for (auto iter = range.first; iter != range.second; ++iter) {
+    if (iter->second == scratch_) {
+      members_.erase(iter);
+      return;
+    }
+  }
+}
+
+bool EliteSet::Contains(const BaseSolution& x) const {
+  uint64_t hash = PackSolution(x, n_, words_, &scratch_[0]);
+  auto range = members_.equal_range(hash);
+  for (auto iter = range.first; iter != range.second; ++iter) {
+    if (iter->second == scratch_) {
+      return true;
+    }
+  }
+  return false;
+}
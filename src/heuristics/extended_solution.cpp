@@ -17,6 +17,7 @@ void ExtendedSolution::AllBest1Swap(int startpos) {
 	best_pos = i;
       }
     }
+    Count(Profile::EVALUATIONS, N_ - startpos);
     if (best_pos < 0 || !ImprovingMove(best_pos)) {
       // No more profitable moves
       break;
@@ -33,13 +34,15 @@ void ExtendedSolution::AllFirst1Swap(int startpos) {
   bool move_made = true;
   while (move_made) {
     move_made = false;
-    for (int i=startpos; i < N_; ++i) {
+    int i;
+    for (i=startpos; i < N_; ++i) {
       if (ImprovingMove(i)) {
 	UpdateCutValues(i);
 	move_made = true;
 	break;
       }
     }
+    Count(Profile::EVALUATIONS, (move_made ? i + 1 : i) - startpos);
   }
 }
 
@@ -56,13 +59,16 @@ void ExtendedSolution::AllShuffle1Swap(int startpos) {
   bool move_made = true;
   while (move_made) {
     move_made = false;
-    for (auto iter=indices.begin(); iter != indices.end(); ++iter) {
+    auto iter = indices.begin();
+    for (; iter != indices.end(); ++iter) {
       if (ImprovingMove(*iter)) {
 	UpdateCutValues(*iter);
 	move_made = true;
 	break;
       }
     }
+    Count(Profile::EVALUATIONS,
+          (iter - indices.begin()) + (move_made ? 1 : 0));
   }
 }
 
@@ -0,0 +1,155 @@
+#include <math.h>
+#include <stdint.h>
+#include <vector>
+#include "heuristics/gain_index.h"
+
+GainIndex::GainIndex(int n) :
+  key_(n, 0.0),
+  priority_(n),
+  left_(n, -1),
+  right_(n, -1),
+  size_(n, 1),
+  in_(n, 0),
+  root_(-1) {
+  for (int i=0; i < n; ++i) {
+    // splitmix64 finalizer of the id
+    uint64_t z = (uint64_t)i * 0x9E3779B97F4A7C15ULL + 0x9E3779B97F4A7C15ULL;
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+    priority_[i] = (uint32_t)((z ^ (z >> 31)) >> 32);
+  }
+}
+
+void GainIndex::Insert(int id, double key) {
+  key_[id] = key;
+  left_[id] = -1;
+  right_[id] = -1;
+  size_[id] = 1;
+  in_[id] = 1;
+  int l, r;
+  Split(root_, id, &l, &r);
+  root_ = Merge(Merge(l, id), r);
+}
+
+void GainIndex::Erase(int id) {
+  root_ = Erase(root_, id);
+  in_[id] = 0;
+}
+
+void GainIndex::Update(int id, double key) {
+  if (!in_[id] || key_[id] == key) {
+    return;
+  }
+  root_ = Erase(root_, id);
+  Insert(id, key);
+}
+
+int GainIndex::Max() const {
+  int t = root_;
+  if (t < 0) {
+    return -1;
+  }
+  while (left_[t] >= 0) {
+    t = left_[t];
+  }
+  return t;
+}
+
+int GainIndex::Min() const {
+  int t = root_;
+  if (t < 0) {
+    return -1;
+  }
+  while (right_[t] >= 0) {
+    t = right_[t];
+  }
+  return t;
+}
+
+int GainIndex::CountAtLeast(double cutoff) const {
+  int count = 0;
+  int t = root_;
+  while (t >= 0) {
+    if (key_[t] >= cutoff) {
+      // t and its whole left subtree have key >= cutoff
+      count += 1 + (left_[t] < 0 ? 0 : size_[left_[t]]);
+      t = right_[t];
+    } else {
+      t = left_[t];
+    }
+  }
+  return count;
+}
+
+int GainIndex::Select(int k) const {
+  int t = root_;
+  while (t >= 0) {
+    int leftSize = left_[t] < 0 ? 0 : size_[left_[t]];
+    if (k < leftSize) {
+      t = left_[t];
+    } else if (k == leftSize) {
+      return t;
+    } else {
+      k -= leftSize + 1;
+      t = right_[t];
+    }
+  }
+  return -1;  // k out of range
+}
+
+bool GainIndex::Worthwhile(int n, int num_edges) {
+  // Each assignment costs about 2 * avg_degree key updates of O(log n) each
+  // with the index, against O(n) for the scans it replaces; the constant
+  // accounts for a treap update being much more expensive than a scan step.
+  if (n <= 1) {
+    return false;
+  }
+  double avgDegree = 2.0 * num_edges / n;
+  return 16.0 * avgDegree * log2((double)n) < n;
+}
+
+void GainIndex::Split(int t, int id, int* l, int* r) {
+  if (t < 0) {
+    *l = -1;
+    *r = -1;
+  } else if (Before(t, id)) {
+    Split(right_[t], id, &right_[t], r);
+    Resize(t);
+    *l = t;
+  } else {
+    Split(left_[t], id, l, &left_[t]);
+    Resize(t);
+    *r = t;
+  }
+}
+
+int GainIndex::Merge(int l, int r) {
+  if (l < 0) {
+    return r;
+  }
+  if (r < 0) {
+    return l;
+  }
+  if (priority_[l] > priority_[r]) {
+    right_[l] = Merge(right_[l], r);
+    Resize(l);
+    return l;
+  } else {
+    left_[r] = Merge(l, left_[r]);
+    Resize(r);
+    return r;
+  }
+}
+
+int GainIndex::Erase(int t, int id) {
+  if (t == id) {
+    return Merge(left_[t], right_[t]);
+  }
+  if (Before(id, t)) {
+    left_[t] = Erase(left_[t], id);
+  } else {
+    right_[t] = Erase(right_[t], id);
+  }
+  Resize(t);
+  return t;
+}
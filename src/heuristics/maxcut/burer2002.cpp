@@ -1,8 +1,11 @@
 #include <math.h>
+#include <stdlib.h>
 #include <string.h>
 #include <algorithm>
+#include <atomic>
 #include <iostream>
 #include <limits>
+#include <thread>
 #include <vector>
 #include "heuristics/maxcut/burer2002.h"
 #include "problem/heuristic.h"
@@ -48,36 +51,69 @@ void Burer2002Solution::All2Swap(double tolerance) {
 }
 
 
-// Given a new theta vector, compute the element-wise cosine and sine, as well
-// as weighted sum of the cosines of the angle differences between paired
-// nodes (returned through command-line arguments). Return objective.
-double Burer2002Solution::LoadNewTheta(const std::vector<double>& theta,
-				       std::vector<double>* cos_theta,
-				       std::vector<double>* sin_theta,
-				       std::vector<double>* dH) {
+Burer2002Kernel::Burer2002Kernel(const MaxCutInstance& mi) :
+  N_(mi.get_size()),
+  w1norm_(0.0),
+  cos_sin_(2 * mi.get_size()),
+  dH_g_(2 * mi.get_size()),
+  desc_(mi.get_size()),
+  new_theta_(mi.get_size()) {
+  edge_i_.reserve(mi.get_edge_count());
+  edge_j_.reserve(mi.get_edge_count());
+  edge_w_.reserve(mi.get_edge_count());
+  for (auto iter = mi.get_all_edges_begin(); iter != mi.get_all_edges_end();
+       ++iter) {
+    edge_i_.push_back(iter->first.first);
+    edge_j_.push_back(iter->first.second);
+    edge_w_.push_back(iter->second);
+    w1norm_ += 2.0 * fabs(iter->second);  // Count both directions of edge
+  }
+  angles_.reserve(N_ + 1);
+}
+
+double Burer2002Kernel::Evaluate(const std::vector<double>& theta) {
+  double* cs = cos_sin_.data();
+  double* dg = dH_g_.data();
+  const double* t = theta.data();
   for (int i=0; i < N_; ++i) {
-    (*cos_theta)[i] = cos(theta[i]);
-    (*sin_theta)[i] = sin(theta[i]);
-    (*dH)[i] = 0.0;
+#ifdef __GLIBC__
+    // One call computes both, which is most of the cost on sparse graphs
+    sincos(t[i], &cs[2*i+1], &cs[2*i]);
+#else
+    cs[2*i] = cos(t[i]);
+    cs[2*i+1] = sin(t[i]);
+#endif
+    dg[2*i] = 0.0;
+    dg[2*i+1] = 0.0;
   }
+
+  const int* ei = edge_i_.data();
+  const int* ej = edge_j_.data();
+  const double* ew = edge_w_.data();
+  const int num_edges = edge_w_.size();
   double objective = 0.0;
-  for (auto iter = mi_.get_all_edges_begin(); iter != mi_.get_all_edges_end();
-       ++iter) {
-    int i = iter->first.first;
-    int j = iter->first.second;
-    double w_ij = iter->second;
-    double scaled_cos_diff = w_ij *
-      ((*cos_theta)[i] * (*cos_theta)[j] + (*sin_theta)[i] * (*sin_theta)[j]);
+  for (int e=0; e < num_edges; ++e) {
+    int i = ei[e];
+    int j = ej[e];
+    double cos_i = cs[2*i];
+    double sin_i = cs[2*i+1];
+    double cos_j = cs[2*j];
+    double sin_j = cs[2*j+1];
+    double scaled_cos_diff = ew[e] * (cos_i * cos_j + sin_i * sin_j);
+    double scaled_sin_diff = ew[e] * (sin_j * cos_i - cos_j * sin_i);
     objective += scaled_cos_diff;
-    (*dH)[i] -= scaled_cos_diff;
-    (*dH)[j] -= scaled_cos_diff;
+    dg[2*i] -= scaled_cos_diff;
+    dg[2*j] -= scaled_cos_diff;
+    dg[2*i+1] += scaled_sin_diff;
+    // sin(theta[i] - theta[j]) = -sin(theta[j] - theta[i])
+    dg[2*j+1] -= scaled_sin_diff;
   }
   return objective;
 }
 
 // Run Procedure-CUT to generate a new solution
 Burer2002Solution::Burer2002Solution(const MaxCutInstance& mi,
-				     double w1norm,
+				     Burer2002Kernel* kernel,
 				     std::vector<double>* theta,
 				     MaxCutHeuristic *heuristic) :
   MaxCutSolution(mi, heuristic) {
@@ -107,65 +143,50 @@ Burer2002Solution::Burer2002Solution(const MaxCutInstance& mi,
   // *** Setup variables
   // The backtracking alpha value for each iteration's line search
   double bt_alpha = alpha_init;
-  // negative of cosine differences incident to each node
-  std::vector<double> dH(N_);
-  // element-wise cosine of the theta vector
-  std::vector<double> cos_theta(N_);
-  // element-wise sine of the theta vector
-  std::vector<double> sin_theta(N_);
+  // dH (even indices) and the gradient of f(theta) (odd indices), which the
+  // kernel computes along with the objective for each theta it evaluates
+  const double* dg = kernel->dH_g_.data();
+  // Descent direction
+  double* desc = kernel->desc_.data();
   // f: the current objective value of nonlinear optimization problem
-  double f = LoadNewTheta(*theta, &cos_theta, &sin_theta, &dH);
+  double f = kernel->Evaluate(*theta);
   for (int opt_iter = 0; opt_iter < max_opt_iter; ++opt_iter) {
-    // Compute the current gradient
-    std::vector<double> g(N_, 0.0);  // Gradient of f(theta)
-    for (auto iter = mi_.get_all_edges_begin();
-	 iter != mi_.get_all_edges_end(); ++iter) {
-      int i = iter->first.first;
-      int j = iter->first.second;
-      double w_ij = iter->second;
-      double scaled_sin_diff =
-	w_ij * (sin_theta[j]*cos_theta[i] - cos_theta[j]*sin_theta[i]);
-      g[i] += scaled_sin_diff;
-      // sin(theta[i] - theta[j]) = -sin(theta[j] - theta[i])
-      g[j] -= scaled_sin_diff;
-    }
-    
     // Stop the gradient descent if the gradient is too close to 0
     double norm_gradient = 0.0;
     for (int ct=0; ct < N_; ++ct) {
-      norm_gradient += g[ct] * g[ct];
+      norm_gradient += dg[2*ct+1] * dg[2*ct+1];
     }
-    if (norm_gradient / w1norm < g_tolerance) {
+    if (norm_gradient / kernel->get_w1norm() < g_tolerance) {
       break;
     }
     
     // Determine the descent direction via scaling; we determined this behavior
     // by actually looking at the circut code as this is not mentioned in the
     // Burer2002 paper
-    std::vector<double> desc(N_);  // Descent direction
     double g_times_desc = 0.0;
     double divisor = 1.0;
     for (int ct=0; ct < N_; ++ct) {
-      divisor = std::max(divisor, dH[ct]);
+      divisor = std::max(divisor, dg[2*ct]);
     }
     for (int ct=0; ct < N_; ++ct) {
-      desc[ct] = -g[ct] / divisor;
-      g_times_desc += desc[ct] * g[ct];
+      desc[ct] = -dg[2*ct+1] / divisor;
+      g_times_desc += desc[ct] * dg[2*ct+1];
     }
     
     // Use backtracking Armijo line-search to determine a good step size
-    std::vector<double> new_theta(N_);
+    const double* curr_theta = theta->data();
+    double* new_theta = kernel->new_theta_.data();
     int numback;
     double recent_f = -1.0;
     for (numback=1; numback <= maxback; ++numback) {
       // Compute the new theta with step size alpha
       for (int ct=0; ct < N_; ++ct) {
-	new_theta[ct] = (*theta)[ct] + bt_alpha * desc[ct];
+	new_theta[ct] = curr_theta[ct] + bt_alpha * desc[ct];
       }
       
-      // Update the cosine and sine vectors, as well as dH and the
+      // Update the cosine and sine vectors, dH, the gradient and the
       // objective. Exit on Armijo condition.
-      recent_f = LoadNewTheta(new_theta, &cos_theta, &sin_theta, &dH);
+      recent_f = kernel->Evaluate(kernel->new_theta_);
       if (recent_f <= f + gamma * bt_alpha * g_times_desc) {
 	break;
       }
@@ -175,7 +196,7 @@ Burer2002Solution::Burer2002Solution(const MaxCutInstance& mi,
     }
     double f_prev = f;
     f = recent_f;
-    *theta = new_theta;  // Copy over the current theta
+    theta->swap(kernel->new_theta_);  // The new theta is the current theta
     
     // Stop the gradient descent if there was not enough change in the
     // objective value
@@ -196,7 +217,8 @@ Burer2002Solution::Burer2002Solution(const MaxCutInstance& mi,
   
   // Modulo the angles to be between 0 and 2*PI, and add to a vector of
   // index/angle pairs. Sort on angle.
-  std::vector<std::pair<double, int> > angles;
+  std::vector<std::pair<double, int> >& angles = kernel->angles_;
+  angles.clear();
   for (int ct=0; ct < N_; ++ct) {
     (*theta)[ct] -= 2 * 3.14159265358979323846 * floor((*theta)[ct] / (2*3.14159265358979323846));
     angles.push_back(std::pair<double, int>((*theta)[ct], ct));
@@ -225,8 +247,10 @@ Burer2002Solution::Burer2002Solution(const MaxCutInstance& mi,
   // solution.
   PopulateFromAssignments();
   double curr_weight = weight_;
-  std::vector<int> curr_assignments(assignments_);
-  std::vector<double> curr_diff_weights(diff_weights_);
+  std::vector<int>& curr_assignments = kernel->curr_assignments_;
+  std::vector<double>& curr_diff_weights = kernel->curr_diff_weights_;
+  curr_assignments = assignments_;
+  curr_diff_weights = diff_weights_;
   
   // Compute the optimal cut by exhaustively searching through the possible cuts
   while (1) {
@@ -254,9 +278,94 @@ Burer2002Solution::Burer2002Solution(const MaxCutInstance& mi,
   }
 }
 
+// State shared by the threads of a multi-threaded Burer2002 run. Worker
+// threads publish improving solutions through a lock-free slot that the main
+// thread empties (taking ownership of the solution) each time it reports.
+struct Burer2002Shared {
+  Burer2002Shared() :
+    slot(NULL),
+    best_weight(0.0),
+    stop(false) {}
+
+  // Record that a solution with the passed weight was published or
+  // reported, returning whether it improves over all earlier ones.
+  bool RaiseBest(double weight) {
+    double best = best_weight.load();
+    do {
+      if (!BaseSolution::ImprovesOver(weight, best)) {
+        return false;
+      }
+    } while (!best_weight.compare_exchange_weak(best, weight));
+    return true;
+  }
+
+  // Publish a copy of x if it improves over every solution published or
+  // reported so far.
+  void Publish(const Burer2002Solution& x) {
+    double weight = x.get_weight();
+    if (!RaiseBest(weight)) {
+      return;
+    }
+
+    // Solutions are only dereferenced by the thread that took them out of the
+    // slot. If another thread published a better solution between our update
+    // of best_weight and our exchange, we take it out of the slot and put it
+    // back.
+    Burer2002Solution* keep = new Burer2002Solution(x);
+    while (keep) {
+      Burer2002Solution* old = slot.exchange(keep);
+      keep = NULL;
+      if (old && BaseSolution::ImprovesOver(old->get_weight(), weight)) {
+        weight = old->get_weight();
+        keep = old;
+      } else {
+        delete old;
+      }
+    }
+  }
+
+  // Take the most recently published solution (NULL if there is none); the
+  // caller is responsible for deleting it.
+  Burer2002Solution* Take() {
+    return slot.exchange(NULL);
+  }
+
+  std::atomic<Burer2002Solution*> slot;
+  std::atomic<double> best_weight;
+  std::atomic<bool> stop;
+};
+
 Burer2002::Burer2002(const MaxCutInstance& mi, double runtime_limit,
 		     bool validation, MaxCutCallback *mc) :
   MaxCutHeuristic(mi, runtime_limit, validation, mc) {
+  int num_threads = get_num_threads();
+  if (num_threads <= 1) {
+    Restarts(NULL, true, NULL);
+    return;
+  }
+
+  // Each thread gets its own random number stream, seeded from the main one,
+  // so with a fixed seed the sequence of cuts on each thread is reproducible.
+  std::vector<unsigned int> seeds(num_threads);
+  for (int t=0; t < num_threads; ++t) {
+    seeds[t] = rand();
+  }
+  Burer2002Shared shared;
+  std::vector<std::thread> workers;
+  for (int t=1; t < num_threads; ++t) {
+    workers.push_back(std::thread(&Burer2002::Restarts, this, &shared, false,
+				  &seeds[t]));
+  }
+  Restarts(&shared, true, &seeds[0]);
+  shared.stop = true;
+  for (int t=0; t < num_threads-1; ++t) {
+    workers[t].join();
+  }
+  delete shared.Take();  // Found after termination, so not reported
+}
+
+void Burer2002::Restarts(Burer2002Shared* shared, bool main_thread,
+			 unsigned int* rng) {
   // Parameters
   // Number of permitted non-improving perturbations to optimal theta before
   // search is stopped. This was set to a few different values in the
@@ -273,18 +382,17 @@ Burer2002::Burer2002(const MaxCutInstance& mi, double runtime_limit,
   // Perturbation in the range [-perturbation*PI, perturbation*PI]
   const double perturbation = 0.2;
 
-  // Compute 1-norm of vec(W), the vectorization of the weight matrix.
-  double w1norm = 0.0;
-  for (auto iter=mi.get_all_edges_begin(); iter != mi.get_all_edges_end();
-       ++iter) {
-    w1norm += 2.0 * fabs(iter->second);  // Count both directions of edge
-  }
+  // Edges and work buffers for the rank-2 relaxation, reused by every cut
+  Burer2002Kernel kernel(mi_);
+  std::vector<double> theta(mi_.get_size());
 
   for (int iter=0; ; ++iter) {  // Random restart until termination criterion
+    profile_.Count(Profile::RESTARTS);
+
     // Generate random starting set of angles
-    std::vector<double> theta(mi.get_size());
-    for (int ct=0; ct < mi.get_size(); ++ct) {
-      theta[ct] = Random::RandDouble() * 2 * 3.14159265358979323846;
+    for (int ct=0; ct < mi_.get_size(); ++ct) {
+      double r = rng ? Random::RandDouble(rng) : Random::RandDouble();
+      theta[ct] = r * 2 * 3.14159265358979323846;
     }
 
     // Algorithm 1 from Section 4
@@ -293,19 +401,43 @@ Burer2002::Burer2002(const MaxCutInstance& mi, double runtime_limit,
     while (k <= N) {
       // Rank2Cut minimizes f(theta) and then uses Procedure-CUT to get the
       // best cut associated with this theta.
-      Burer2002Solution x = Burer2002Solution::Rank2Cut(mi, w1norm, &theta,
+      ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
+      Burer2002Solution x = Burer2002Solution::Rank2Cut(mi_, &kernel, &theta,
 							this);
+      construction.Stop();
 
       // Perform local searches (all 1- and 2-moves better than the tolerance)
       if (local_search) {
+	ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
 	x.All1Swap(one_move_tolerance);
 	x.All2Swap(two_move_tolerance);
       }
 
-      // Check termination criterion (runtime on non-validation runs; iteration
-      // count on validation runs).
-      if (!Report(x, iter)) {
-	return;
+      if (!main_thread) {
+	// Hand improvements to the main thread, which does all the reporting
+	shared->Publish(x);
+	if (shared->stop) {
+	  return;
+	}
+      } else {
+	// Report the other threads' most recent improvement, if any
+	if (shared) {
+	  Burer2002Solution* published = shared->Take();
+	  if (published) {
+	    bool keep_going = Report(*published, iter);
+	    delete published;
+	    if (!keep_going) {
+	      return;
+	    }
+	  }
+	  shared->RaiseBest(x.get_weight());  // Spare others from publishing worse
+	}
+
+	// Check termination criterion (runtime on non-validation runs;
+	// iteration count on validation runs).
+	if (!Report(x, iter)) {
+	  return;
+	}
       }
       
       // Update counter keeping track of iterations without improvement
@@ -317,9 +449,11 @@ Burer2002::Burer2002(const MaxCutInstance& mi, double runtime_limit,
       }
 
       // Perturb the angles associated with the current solution
-      for (int ct=0; ct < mi.get_size(); ++ct) {
+      ProfilePhase phase(&profile_, Profile::PERTURBATION);
+      for (int ct=0; ct < mi_.get_size(); ++ct) {
+	double r = rng ? Random::RandDouble(rng) : Random::RandDouble();
 	theta[ct] = 3.14159265358979323846 / 2.0 * (1.0 - x.get_assignments()[ct]) +
-	  perturbation * (2 * 3.14159265358979323846 * Random::RandDouble() - 3.14159265358979323846);
+	  perturbation * (2 * 3.14159265358979323846 * r - 3.14159265358979323846);
       }
     }
   }
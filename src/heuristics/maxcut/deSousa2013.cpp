@@ -1,5 +1,6 @@
 #include <iostream>
 #include "heuristics/maxcut/deSousa2013.h"
+#include "heuristics/maxcut/max_cut_population.h"
 #include "heuristics/maxcut/max_cut_simple_solution.h"
 #include "problem/heuristic.h"
 #include "util/random.h"
@@ -13,6 +14,8 @@ void deSousa2013::AlgorithmIteration() {
 
   std::vector<double> p(mi_.get_size(), 0.5);
   MaxCutSimpleSolution best = MaxCutSimpleSolution::RandomSolution(mi_, p, this);
+  MaxCutPopulation population(mi_);
+  std::vector<int> assignments;
   for (int iter=0; iter < G; ++iter) {
     // Count of assignments in population
     std::vector<int> counts(mi_.get_size(), 0);
@@ -26,26 +29,23 @@ void deSousa2013::AlgorithmIteration() {
     }
 
     // Generate the population for this iteration.
+    population.Sample(p, Ssize);
     for (int ct=0; ct < Ssize; ++ct) {
-      MaxCutSimpleSolution x = MaxCutSimpleSolution::RandomSolution(mi_, p, this);
-
       // If new solution improves over best, replace the best with it.
-      if (x.ImprovesOver(best)) {
-        best = x;
+      if (BaseSolution::ImprovesOver(population.get_weight(ct),
+                                     best.get_weight())) {
+        population.GetAssignments(ct, &assignments);
+        best = MaxCutSimpleSolution(mi_, this, assignments,
+                                    population.get_weight(ct));
         if (!Report(best)) {
           return;
         }
       }
-
-      // Update counts using this solution's assignment
-      const std::vector<int>& assignments = x.get_assignments();
-      for (int i=0; i < mi_.get_size(); ++i) {
-        if (assignments[i] == 1) {
-          ++counts[i];
-        }
-      }
     }
 
+    // Update counts using the population's assignments
+    population.AddCounts(&counts);
+
     // Update p based on the counts. If the current p was already basically
     // converged then return (we'll do a random restart).
     bool converged = true;
@@ -110,8 +110,11 @@ Duarte2005::Duarte2005(const MaxCutInstance& mi, double runtime_limit,
 
   // Repeat until termination criterion is met
   for (int iter=0; MaxCutHeuristic::Report(iter); ++iter) {
+    profile_.Count(Profile::RESTARTS);
+
     // Generate random initial population
     // PAPER: gg=Intial_Population();
+    ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
     std::vector<Duarte2005Solution> population;
     for (int sol = 0; sol < init_pop_size; sol++) {
       population.push_back(Duarte2005Solution::RandomSolution(mi, this));
@@ -133,6 +136,7 @@ Duarte2005::Duarte2005(const MaxCutInstance& mi, double runtime_limit,
 	best_score = population_scores[sol];
       }
     }
+    construction.Stop();
 
     // PAPER: for i = 1 to MaxGen
     for (int gen = 0; gen < max_generations; gen++) {
@@ -150,11 +154,14 @@ Duarte2005::Duarte2005(const MaxCutInstance& mi, double runtime_limit,
 	  // PAPER: Criteria: Random Wheel
 	  int mother = Random::RouletteWheel(population_scores);
 	  // PAPER: Child=FixCross(Father,Mother)
+	  ProfilePhase crossover(&profile_, Profile::CROSSOVER);
 	  Duarte2005Solution child =
 	    Duarte2005Solution::FixCross(population[father],
 					 population[mother]);
+	  crossover.Stop();
 	  // PAPER: Apply(VNS(Child, pi))
 	  if (Random::RandDouble() < p_i) {
+	    ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
 	    child.VNS(k_max);
 	  }
 	  // PAPER: InsertInPopulation(Child)
@@ -189,6 +196,7 @@ Duarte2005::Duarte2005(const MaxCutInstance& mi, double runtime_limit,
       }
       
       // PAPER: Apply(Mutation(),pm)
+      ProfilePhase phase(&profile_, Profile::PERTURBATION);
       for (int sol = 0; sol < next_population.size(); sol++)
 	next_population[sol].Mutate(p_m);
     } // PAPER: end for
@@ -28,7 +28,7 @@ Festa2002Solution::Festa2002Solution(const Festa2002PartialSolution &x) :
 
 Festa2002PartialSolution::Festa2002PartialSolution(const MaxCutInstance& mi,
 						   double alpha,
-						   const std::vector<std::pair<std::pair<int, int>, double> >& sorted,
+						   const std::vector<Instance::InstanceTuple>& sorted,
 						   MaxCutHeuristic *heuristic) :
   MaxCutPartialSolution(mi, heuristic) {
   // Though it's not clear from Section 2.1, build.f shows that the adaptive
@@ -42,42 +42,67 @@ Festa2002PartialSolution::Festa2002PartialSolution(const MaxCutInstance& mi,
   UpdateCutValues(sorted[startEdge].first.second, -1);
   Sbar_.push_back(sorted[startEdge].first.second);
 
-  // Now, assign the remaining nodes.
+  // Now, assign the remaining nodes. On sparse graphs, the moves of the
+  // unassigned nodes are kept in a gain index so each step avoids scanning all
+  // the nodes; either way, the selected move is uniform over the restricted
+  // candidate list.
+  bool indexed = GainIndex::Worthwhile(N_, mi.get_edge_count());
+  if (indexed) {
+    IndexGains(std::vector<int>(2*N_, 0), 1);
+  }
+  std::vector<std::pair<int, bool> > made_cutoff;
   while (num_unassigned_ > 0) {
     // Determine the limits (w_min and w_max from paper)
     double this_best = -std::numeric_limits<double>::max();
     double this_worst = std::numeric_limits<double>::max();
-    for (int i=0; i < N_; ++i) {
-      if (assignments_[i] != 0) {
-	continue;  // i is already assigned
+    if (indexed) {
+      this_best = gain_index_[0].get_key(gain_index_[0].Max());
+      this_worst = gain_index_[0].get_key(gain_index_[0].Min());
+    } else {
+      for (int i=0; i < N_; ++i) {
+	if (assignments_[i] != 0) {
+	  continue;  // i is already assigned
+	}
+	this_worst = std::min<double>(this_worst, gainS_[i]);
+	this_worst = std::min<double>(this_worst, gainNS_[i]);
+	this_best = std::max<double>(this_best, gainS_[i]);
+	this_best = std::max<double>(this_best, gainNS_[i]);
       }
-      this_worst = std::min<double>(this_worst, gainS_[i]);
-      this_worst = std::min<double>(this_worst, gainNS_[i]);
-      this_best = std::max<double>(this_best, gainS_[i]);
-      this_best = std::max<double>(this_best, gainNS_[i]);
     }
 
-    // Determine cutoff (mu in paper) and find all uninserted nodes meeting
-    // cutoff. The bool value indicates if they're to be added to S.
+    // Determine cutoff (mu in paper) and randomly select one of the moves of
+    // uninserted nodes meeting cutoff (the restricted candidate list).
     double cutoff = this_worst + alpha * (this_best - this_worst) - 0.000001;
-    std::vector<std::pair<int, bool> > made_cutoff;
-    for (int i=0; i < N_; ++i) {
-      if (assignments_[i] == 0 && gainS_[i] >= cutoff) {
-	made_cutoff.push_back(std::pair<int, bool>(i, true));
-      }
-      if (assignments_[i] == 0 && gainNS_[i] >= cutoff) {
-	made_cutoff.push_back(std::pair<int, bool>(i, false));
+    int node;
+    bool toS;  // Is node to be added to S?
+    if (indexed) {
+      // The moves meeting the cutoff are the first ones in the index
+      int count = gain_index_[0].CountAtLeast(cutoff);
+      int m = gain_index_[0].Select(Random::RandInt(0, count-1));
+      node = m / 2;
+      toS = (m % 2 == 0);
+    } else {
+      made_cutoff.clear();
+      for (int i=0; i < N_; ++i) {
+	if (assignments_[i] == 0 && gainS_[i] >= cutoff) {
+	  made_cutoff.push_back(std::pair<int, bool>(i, true));
+	}
+	if (assignments_[i] == 0 && gainNS_[i] >= cutoff) {
+	  made_cutoff.push_back(std::pair<int, bool>(i, false));
+	}
       }
+      int selectId = Random::RandInt(0, made_cutoff.size()-1);
+      node = made_cutoff[selectId].first;
+      toS = made_cutoff[selectId].second;
     }
 
-    // Randomly select and add a valid node, updating sigma_S and sigma_NS
-    int selectId = Random::RandInt(0, made_cutoff.size()-1);
-    if (made_cutoff[selectId].second) {
-      UpdateCutValues(made_cutoff[selectId].first, 1);
-      S_.push_back(made_cutoff[selectId].first);
+    // Add the selected node, updating sigma_S and sigma_NS
+    if (toS) {
+      UpdateCutValues(node, 1);
+      S_.push_back(node);
     } else {
-      UpdateCutValues(made_cutoff[selectId].first, -1);
-      Sbar_.push_back(made_cutoff[selectId].first);
+      UpdateCutValues(node, -1);
+      Sbar_.push_back(node);
     }
   }
 }
@@ -383,7 +408,7 @@ Festa2002Heuristic::Festa2002Heuristic(const MaxCutInstance& mi,
   }
 
   // If we're using GRASP, get a list of edges, sorted by weight
-  std::vector<std::pair<std::pair<int, int>, double> > sorted;
+  std::vector<Instance::InstanceTuple> sorted;
   if (grasp) {
     mi.GetSortedEdges(&sorted);
   }
@@ -391,13 +416,19 @@ Festa2002Heuristic::Festa2002Heuristic(const MaxCutInstance& mi,
   std::vector<Festa2002Solution> elite;
   int first = 1;
   for (int i=0; ; ++i) {  // Iterate until termination criterion breaks loop
+    profile_.Count(Profile::RESTARTS);
+    ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
     Festa2002Solution solution = grasp ?
       Festa2002Solution(Festa2002PartialSolution::AdaptiveGreedySolution(mi, Random::RandDouble(), sorted, this)) :
       Festa2002Solution(MaxCutSolution::RandomSolution(mi, this));
-    if (!vns) {
-      solution.LocalSearch();
-    } else {
-      solution.VNS(kMax);
+    construction.Stop();
+    {
+      ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
+      if (!vns) {
+	solution.LocalSearch();
+      } else {
+	solution.VNS(kMax);
+      }
     }
     // If there is path relinking, do it now.
     if (pr) {
@@ -410,9 +441,11 @@ Festa2002Heuristic::Festa2002Heuristic(const MaxCutInstance& mi,
 	}
       } else {
 	int idx = Random::RandInt(0, elite.size() - 1);
+	ProfilePhase crossover(&profile_, Profile::CROSSOVER);
 	Festa2002Solution pr_solution =
 	  Festa2002Solution::PathRelinkingSolution(mi, solution, elite[idx],
 						   this);
+	crossover.Stop();
         // Terminate if runtime limit is reached (non-validation run) or the
         // iteration limit has been reached (validation run).
 	if (!Report(pr_solution, i)) {
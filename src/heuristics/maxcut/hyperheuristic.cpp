@@ -138,6 +138,7 @@ MaxCutHyperheuristic::MaxCutHyperheuristic(const MaxCutInstance&mi,
     // with the hyperheuristic, so no need to double validate)
     Heuristic *h = factory.RunMaxCutHeuristic(bestCode, mi, runtime_limit,
                                               false, &callback);
+    profile_.Add(h->get_profile());
     delete h;  // We don't need to keep around the pointer
   } else if (bestProblem == QUBO) {
     // Using a QUBO heuristic
@@ -147,6 +148,7 @@ MaxCutHyperheuristic::MaxCutHyperheuristic(const MaxCutInstance&mi,
     // with the hyperheuristic, so no need to double validate)
     Heuristic *h = factory.RunQUBOHeuristic(bestCode, qi, runtime_limit,
                                             false, &callback);
+    profile_.Add(h->get_profile());
     delete h;  // We don't need to keep around the pointer
   }
 }
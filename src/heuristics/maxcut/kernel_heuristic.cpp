@@ -0,0 +1,118 @@
+#include <algorithm>
+#include <vector>
+#include "heuristics/heuristic_factory.h"
+#include "heuristics/maxcut/kernel_heuristic.h"
+#include "heuristics/qubo/component_heuristic.h"
+#include "heuristics/qubo/presolve_heuristic.h"
+
+KernelMaxCutCallback::KernelMaxCutCallback(MaxCutKernelHeuristic* heuristic) :
+  heuristic_(heuristic) {}
+
+bool KernelMaxCutCallback::Report(const MaxCutSimpleSolution& solution,
+                                  bool newBest, double runtime) {
+  if (newBest) {
+    return heuristic_->ReportReduced(solution.get_assignments(),
+                                     solution.get_weight());
+  } else {
+    return heuristic_->Report();  // Not new best solution, so check term. crit.
+  }
+}
+
+bool KernelMaxCutCallback::Report(const MaxCutSimpleSolution& solution,
+                                  bool newBest, double runtime, int iter) {
+  if (newBest) {
+    return heuristic_->ReportReduced(solution.get_assignments(),
+                                     solution.get_weight(), iter);
+  } else {
+    return heuristic_->Report(iter);  // Not new best, so check term. crit.
+  }
+}
+
+KernelQUBOCallback::KernelQUBOCallback(MaxCutKernelHeuristic* heuristic,
+                                       const MaxCutInstance& reduced) :
+  heuristic_(heuristic),
+  reduced_(reduced) {}
+
+bool KernelQUBOCallback::Report(const QUBOSimpleSolution& solution,
+                                bool newBest, double runtime) {
+  if (newBest) {
+    MaxCutSimpleSolution sol(solution, reduced_, NULL);
+    return heuristic_->ReportReduced(sol.get_assignments(), sol.get_weight());
+  } else {
+    return heuristic_->Report();  // Not new best solution, so check term. crit.
+  }
+}
+
+bool KernelQUBOCallback::Report(const QUBOSimpleSolution& solution,
+                                bool newBest, double runtime, int iter) {
+  if (newBest) {
+    MaxCutSimpleSolution sol(solution, reduced_, NULL);
+    return heuristic_->ReportReduced(sol.get_assignments(), sol.get_weight(),
+                                     iter);
+  } else {
+    return heuristic_->Report(iter);  // Not new best, so check term. crit.
+  }
+}
+
+MaxCutKernelHeuristic::MaxCutKernelHeuristic(const MaxCutInstance& mi,
+                                             double runtime_limit,
+                                             bool validation,
+                                             MaxCutCallback *mc,
+                                             const std::string& code,
+                                             bool presolve, bool components) :
+  MaxCutHeuristic(mi, runtime_limit, validation, mc),
+  kernel_(mi) {
+  // Report the removed nodes placed around the remaining nodes all on one
+  // side, which is also the complete solution if every node was removed
+  std::vector<int> ones(kernel_.get_num_remaining(), 1);
+  if (!ReportReduced(ones, 0.0) || !kernel_.get_reduced()) {
+    return;
+  }
+
+  const MaxCutInstance& reduced = *kernel_.get_reduced();
+  HeuristicFactory factory;
+  double remaining = std::max(0.0, runtime_limit - Runtime());
+  if (presolve || components) {
+    // These only report new best solutions of the reduced instance
+    // converted to QUBO, and run for at most the given time
+    QUBOInstance qi(reduced);
+    KernelQUBOCallback callback(this, reduced);
+    if (presolve) {
+      Finish(new QUBOPresolveHeuristic(qi, remaining, false, &callback, code,
+                                       components));
+    } else {
+      Finish(new QUBOComponentHeuristic(qi, remaining, false, &callback,
+                                        code));
+    }
+  } else if (factory.ValidMaxCutHeuristicCode(code)) {
+    KernelMaxCutCallback callback(this);
+    Finish(factory.RunMaxCutHeuristic(code, reduced, remaining, false,
+                                      &callback));
+  } else if (factory.ValidQUBOHeuristicCode(code)) {
+    QUBOInstance qi(reduced);
+    KernelQUBOCallback callback(this, reduced);
+    Finish(factory.RunQUBOHeuristic(code, qi, remaining, false,
+                                    &callback));
+  }
+}
+
+void MaxCutKernelHeuristic::Finish(Heuristic *h) {
+  if (h) {
+    profile_.Add(h->get_profile());
+    delete h;  // We don't need to keep around the pointer
+  }
+}
+
+bool MaxCutKernelHeuristic::ReportReduced(const std::vector<int>& assignments,
+                                          double weight) {
+  kernel_.Lift(assignments, &lifted_);
+  return Report(MaxCutSimpleSolution(mi_, this, lifted_,
+                                     weight + kernel_.get_offset()));
+}
+
+bool MaxCutKernelHeuristic::ReportReduced(const std::vector<int>& assignments,
+                                          double weight, int iter) {
+  kernel_.Lift(assignments, &lifted_);
+  return Report(MaxCutSimpleSolution(mi_, this, lifted_,
+                                     weight + kernel_.get_offset()), iter);
+}
@@ -3,6 +3,7 @@
 #include <iostream>
 #include <vector>
 #include "heuristics/maxcut/laguna2009.h"
+#include "heuristics/maxcut/max_cut_population.h"
 #include "util/random.h"
 
 Laguna2009CE::Laguna2009CE(const MaxCutInstance& mi, double runtime_limit,
@@ -14,6 +15,10 @@ Laguna2009CE::Laguna2009CE(const MaxCutInstance& mi, double runtime_limit,
   double alpha = 1.0;
   int k = 10;
   int K = 1000;
+  int chunk = 256;  // Solutions sampled at a time
+
+  MaxCutPopulation population(mi);
+  std::vector<int> assignments;
 
   // Wrap the entire algorithm in a random restart (since p will eventually
   // converge, we don't expect to gain any benefit from running indefinitely).
@@ -29,35 +34,38 @@ Laguna2009CE::Laguna2009CE(const MaxCutInstance& mi, double runtime_limit,
     while (tprime < k && t < K) {
       // Alg 1 Step 4-5: Generate N random solutions using probabilities p,
       // keeping the best-performing rho*N. To do this in a memory-efficient way,
-      // we will use a min heap, discarding solutions that are not among the best.
+      // we sample them in chunks (which only store the assignments and
+      // weights), and we will use a min heap, discarding solutions that are not
+      // among the best. Only solutions that enter the heap are built as
+      // MaxCutSolution objects.
       int numKeep = std::max<int>(1, (int)(rho * N));
       std::vector<MaxCutSolution> X;
-      for (int ct=0; ct < numKeep; ++ct) {
-        X.push_back(MaxCutSolution::RandomSolution(mi, p, this));
+      for (int start=0; start < N; start += chunk) {
+        population.Sample(p, std::min<int>(chunk, N - start));
+        for (int ct=0; ct < population.get_size(); ++ct) {
+          if ((int)X.size() == numKeep) {
+            if (!BaseSolution::ImprovesOver(population.get_weight(ct),
+                                            X.front().get_weight())) {
+              continue;
+            }
+            // Remove the worst solution from the heap to make room for this one
+            std::pop_heap(X.begin(), X.end(), std::greater<MaxCutSolution>());
+            X.pop_back();
+          }
+          population.GetAssignments(ct, &assignments);
+          X.push_back(MaxCutSolution(assignments, mi, this));
 
-        // Report each solution, as it could be a new best
-        if (!Report(X[X.size()-1], iter)) {
-          return;  // Out of time
-        }
-      }
-      std::make_heap(X.begin(), X.end(), std::greater<MaxCutSolution>());
-      for (int ct=0; ct < N-numKeep; ++ct) {
-        MaxCutSolution newSolution = MaxCutSolution::RandomSolution(mi, p, this);
-        bool added = false;
-        if (newSolution.ImprovesOver(X.front())) {
-          // Remove the worst solution from the heap and add this one
-          std::pop_heap(X.begin(), X.end());
-          X.pop_back();
-          X.push_back(newSolution);
-          std::push_heap(X.begin(), X.end());
-          added = true;
-        }
-        // Report a solution if it was added (it could be a new best) and also
-        // periodically (since this loop can take a while)
-        if (added || ct % 10 == 0) {
-          if (!Report(newSolution, iter)) {
+          // Report each solution added to the heap, as it could be a new best
+          if (!Report(X.back(), iter)) {
             return;  // Out of time
           }
+          std::push_heap(X.begin(), X.end(), std::greater<MaxCutSolution>());
+        }
+
+        // Also check for termination after each chunk (since this loop can
+        // take a while)
+        if (!MaxCutHeuristic::Report(iter)) {
+          return;  // Out of time
         }
       }
 
@@ -133,6 +133,7 @@ void MaxCutPartialSolution::UpdateCutValues(int update_index, int new_value) {
       } else {
 	gainS_[j] += wij;
       }
+      ReindexGains(j);
     }
   } else if (assignments_[update_index] == 0 && new_value == 1) {
     for (auto iter = mi_.get_edges_begin(update_index);
@@ -144,6 +145,7 @@ void MaxCutPartialSolution::UpdateCutValues(int update_index, int new_value) {
       } else {
 	gainNS_[j] += wij;
       }
+      ReindexGains(j);
     }
   } else if (assignments_[update_index] == -1 && new_value == 1) {
     for (auto iter = mi_.get_edges_begin(update_index);
@@ -162,6 +164,7 @@ void MaxCutPartialSolution::UpdateCutValues(int update_index, int new_value) {
       default:  // j == 1
 	gainNS_[j] += 2.0 * wij;
       }
+      ReindexGains(j);
     }
   } else {
     for (auto iter = mi_.get_edges_begin(update_index);
@@ -180,6 +183,7 @@ void MaxCutPartialSolution::UpdateCutValues(int update_index, int new_value) {
       default:  // j == 1
 	gainNS_[j] -= 2.0 * wij;
       }
+      ReindexGains(j);
     }
   }
 
@@ -195,4 +199,42 @@ void MaxCutPartialSolution::UpdateCutValues(int update_index, int new_value) {
     gainNS_[update_index] -= gainS_[update_index];
     gainS_[update_index] = 0.0;
   }
+
+  // update_index is assigned now, so its moves leave the gain indices
+  if (!gain_group_.empty()) {
+    for (int m=2*update_index; m <= 2*update_index+1; ++m) {
+      if (gain_group_[m] >= 0 && gain_index_[gain_group_[m]].Contains(m)) {
+	gain_index_[gain_group_[m]].Erase(m);
+      }
+    }
+  }
+}
+
+void MaxCutPartialSolution::IndexGains(const std::vector<int>& group,
+				       int num_groups) {
+  gain_index_.assign(num_groups, GainIndex(2*N_));
+  gain_group_ = group;
+  for (int i=0; i < N_; ++i) {
+    if (assignments_[i] != 0) {
+      continue;  // Only unassigned nodes have moves
+    }
+    if (group[2*i] >= 0) {
+      gain_index_[group[2*i]].Insert(2*i, gainS_[i]);
+    }
+    if (group[2*i+1] >= 0) {
+      gain_index_[group[2*i+1]].Insert(2*i+1, gainNS_[i]);
+    }
+  }
+}
+
+void MaxCutPartialSolution::ReindexGains(int i) {
+  if (gain_group_.empty()) {
+    return;
+  }
+  if (gain_group_[2*i] >= 0) {
+    gain_index_[gain_group_[2*i]].Update(2*i, gainS_[i]);
+  }
+  if (gain_group_[2*i+1] >= 0) {
+    gain_index_[gain_group_[2*i+1]].Update(2*i+1, gainNS_[i]);
+  }
 }
@@ -0,0 +1,89 @@
+#include <vector>
+#include "heuristics/maxcut/max_cut_population.h"
+
+MaxCutPopulation::MaxCutPopulation(const MaxCutInstance& mi) :
+  mi_(mi),
+  size_(0),
+  blocks_(0) {}
+
+void MaxCutPopulation::Sample(const std::vector<double>& p, int size) {
+  int n = mi_.get_size();
+  size_ = size;
+  blocks_ = (size + 63) / 64;
+  bits_.assign(n * blocks_, 0);
+  weights_.assign(blocks_ * 64, 0.0);
+  uint64_t last_mask = (size % 64 == 0) ? ~0ULL : (1ULL << (size % 64)) - 1;
+
+  // Draw the bits of each vertex 64 solutions at a time. With p16 = p * 2^16,
+  // a solution's bit should be 1 when its 16-bit uniform number U is below
+  // p16. Working from the lowest bit of p16 to the highest, the running
+  // result r says whether U < p16 considering only the bits seen so far, and
+  // each step needs one random word for all 64 solutions: where p16 has a 1
+  // bit, r becomes 1 if U has a 0 bit there (and keeps its value otherwise),
+  // and where p16 has a 0 bit, r becomes 0 if U has a 1 bit there. Since the
+  // bits of U are uniform, "U has a 0 bit" is just another random word. The
+  // low 0 bits of p16 are skipped, as r starts (and would stay) at 0.
+  for (int i=0; i < n; ++i) {
+    uint32_t p16;
+    if (p[i] <= 0.0) {
+      p16 = 0;
+    } else if (p[i] >= 1.0) {
+      p16 = 65536;
+    } else {
+      p16 = (uint32_t)(p[i] * 65536.0 + 0.5);
+    }
+    uint64_t* row = &bits_[i * blocks_];
+    for (int b=0; b < blocks_; ++b) {
+      uint64_t r = 0;
+      if (p16 >= 65536) {
+        r = ~0ULL;
+      } else if (p16 > 0) {
+        for (int k=__builtin_ctz(p16); k < 16; ++k) {
+          if ((p16 >> k) & 1) {
+            r |= rng_.Next();
+          } else {
+            r &= rng_.Next();
+          }
+        }
+      }
+      row[b] = (b == blocks_ - 1) ? (r & last_mask) : r;
+    }
+  }
+
+  // Compute all the cut weights with one pass over the edges
+  for (auto it = mi_.get_all_edges_begin(); it != mi_.get_all_edges_end();
+       ++it) {
+    const uint64_t* row_i = &bits_[it->first.first * blocks_];
+    const uint64_t* row_j = &bits_[it->first.second * blocks_];
+    double w = it->second;
+    for (int b=0; b < blocks_; ++b) {
+      uint64_t cut = row_i[b] ^ row_j[b];
+      double* block_weights = &weights_[b * 64];
+      while (cut) {
+        block_weights[__builtin_ctzll(cut)] += w;
+        cut &= cut - 1;
+      }
+    }
+  }
+}
+
+void MaxCutPopulation::GetAssignments(int s,
+                                      std::vector<int>* assignments) const {
+  int n = mi_.get_size();
+  assignments->resize(n);
+  for (int i=0; i < n; ++i) {
+    (*assignments)[i] = get_assignment(s, i);
+  }
+}
+
+void MaxCutPopulation::AddCounts(std::vector<int>* counts) const {
+  int n = mi_.get_size();
+  for (int i=0; i < n; ++i) {
+    const uint64_t* row = &bits_[i * blocks_];
+    int ct = 0;
+    for (int b=0; b < blocks_; ++b) {
+      ct += __builtin_popcountll(row[b]);
+    }
+    (*counts)[i] += ct;
+  }
+}
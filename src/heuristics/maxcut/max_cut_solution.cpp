@@ -5,6 +5,7 @@
 #include <limits>
 #include <vector>
 #include "heuristics/maxcut/max_cut_solution.h"
+#include "util/dense_rows.h"
 #include "util/random.h"
 
 // Empty solution
@@ -67,10 +68,18 @@ MaxCutSolution::MaxCutSolution(const std::vector<int>& assignments,
 void MaxCutSolution::UpdateCutValues(int update_index, std::vector<int>* x,
 				     std::vector<double>* diff_weights,
 				     double *objective) const {
+  Count(Profile::FLIPS);
   *objective += (*diff_weights)[update_index];
   (*x)[update_index] = -(*x)[update_index];
   (*diff_weights)[update_index] = -(*diff_weights)[update_index];
 
+  if (mi_.is_dense()) {
+    // Update the whole row, which adds zero for non-neighbors (w_ii is zero)
+    DenseRows::MaxCutFlip(mi_.get_dense_row(update_index), &(*x)[0],
+                          (*x)[update_index], N_, &(*diff_weights)[0]);
+    return;
+  }
+
   // Iterate the set of all neighbors for node update_index
   for (auto iter = mi_.get_edges_begin(update_index);
        iter != mi_.get_edges_end(update_index); ++iter) {
@@ -105,6 +114,8 @@ void MaxCutSolution::AllBest2Swap(int startpos) {
 	best_j = j;
       }
     }
+    Count(Profile::EVALUATIONS,
+          mi_.get_all_edges_end() - mi_.get_all_edges_begin());
     if (best_i < 0 || !ImprovingMove(best_move)) {
       // No more profitable moves
       break;
@@ -122,8 +133,8 @@ void MaxCutSolution::AllFirst2Swap(int startpos) {
   bool move_made = true;
   while (move_made) {
     move_made = false;
-    for (auto iter = mi_.get_all_edges_begin();
-	 iter != mi_.get_all_edges_end(); ++iter) {
+    auto iter = mi_.get_all_edges_begin();
+    for (; iter != mi_.get_all_edges_end(); ++iter) {
       int i = iter->first.first;
       int j = iter->first.second;
       double w_ij = iter->second;
@@ -136,6 +147,8 @@ void MaxCutSolution::AllFirst2Swap(int startpos) {
 	break;
       }
     }
+    Count(Profile::EVALUATIONS,
+          (iter - mi_.get_all_edges_begin()) + (move_made ? 1 : 0));
   }
 }
 
@@ -155,6 +168,26 @@ void MaxCutSolution::PopulateFromAssignments() {
   weight_ = 0.0;
   diff_weights_.assign(N_, 0.0);
 
+  if (mi_.is_dense()) {
+    // Sum the rows of the nodes in each set: for a node j, A_j is its weight
+    // to the nodes set to 1 and B_j its weight to the nodes set to -1.
+    std::vector<double> A(N_, 0.0);
+    std::vector<double> B(N_, 0.0);
+    for (int i=0; i < N_; ++i) {
+      DenseRows::Add(mi_.get_dense_row(i), N_,
+                     assignments_[i] == 1 ? &A[0] : &B[0]);
+    }
+    for (int j=0; j < N_; ++j) {
+      if (assignments_[j] == 1) {
+        weight_ += B[j];  // Each cut edge is counted from its 1 endpoint
+        diff_weights_[j] = A[j] - B[j];
+      } else {
+        diff_weights_[j] = B[j] - A[j];
+      }
+    }
+    return;
+  }
+
   for (auto it = mi_.get_all_edges_begin(); it != mi_.get_all_edges_end();
        ++it) {
     if (assignments_[it->first.first] == assignments_[it->first.second]) {
@@ -4,7 +4,36 @@
 #include "heuristics/qubo/alkhamis1998.h"
 #include "util/random.h"
 
-void Alkhamis1998Solution::SA(double T_initial, int iteration) {
+double Alkhamis1998Solution::InitialTemperature(const QUBOInstance& qi, int m,
+						QUBOHeuristic *heuristic) {
+  // Parameters
+  double eta = 0.95;
+
+  // The parameters to be computed (m1, m2, DeltaBarNegative) are all computed
+  // with opposite sign from the paper, because the paper is minimizing but we
+  // are maximizing.
+  int m1 = 0;  // Variables with non-negative diff_weights_
+  int m2 = 0;  // Variables with negative diff_weights_
+  double DeltaBarNegativeSum = 0.0;  // Sum of negative diff_weights_ values
+
+  for (int iter=0; iter < m; ++iter) {
+    QUBOSolution x = QUBOSolution::RandomSolution(qi, heuristic);
+    const std::vector<double>& diff_weights = x.get_diff_weights();
+    for (int i=0; i < diff_weights.size(); ++i) {
+      if (x.NonDetrimentalMove(i)) {
+	++m1;
+      } else {
+	++m2;
+	DeltaBarNegativeSum += diff_weights[i];
+      }
+    }
+  }
+
+  // Finally, compute T_initial using formula (1)
+  return (-DeltaBarNegativeSum/m2) / log(m2 / (m2*eta - (1.0 - eta)*m1));
+}
+
+void Alkhamis1998Solution::SA(double T_initial, int iteration, Annealer* sa) {
   // Parameters
   double SFACTOR = 0.3;
   double TFACTOR = 0.007;
@@ -21,16 +50,17 @@ void Alkhamis1998Solution::SA(double T_initial, int iteration) {
   // Step 2: Loop until frozen (either temp too low or too many consecutive
   //         failures).
   while (T > T_final && ConsecFailure < ConsecFailureLimit) {
+    sa->set_temperature(T);
+
     // Step 2.1: Test a random 1-swap ITER times
     double changed = false;  // Did we change in the ITER tries?
     Alkhamis1998Solution best(*this);
     for (int i=0; i < ITER; ++i) {
       // Step 2.1.1: Randomly select a variable to test
-      int var = Random::RandInt(0, N_-1);
+      int var = sa->RandVariable();
 
       // Steps 2.1.2-2.1.3: Test if move is accepted, and do it if it is
-      if (NonDetrimentalMove(var) ||
-          Random::RandDouble() < exp(diff_weights_[var] / T)) {
+      if (sa->Accept(diff_weights_[var])) {
 	UpdateCutValues(var);
 	changed = true;
 
@@ -64,37 +94,11 @@ void Alkhamis1998Solution::SA(double T_initial, int iteration) {
 Alkhamis1998::Alkhamis1998(const QUBOInstance& qi, double runtime_limit,
 			   bool validation, QUBOCallback *qc) :
   QUBOHeuristic(qi, runtime_limit, validation, qc) {
-  // Parameters
-  double eta = 0.95;
-
   // Compute T_initial just once, since it's computationally intensive to compute
   // T_initial is computed by generating some undefined number "m" of trials.
   // We will set m=20 somewhat arbitrarily here.
-  int m = 20;
-
-  // The parameters to be computed (m1, m2, DeltaBarNegative) are all computed
-  // with opposite sign from the paper, because the paper is minimizing but we
-  // are maximizing.
-  int m1 = 0;  // Variables with non-negative diff_weights_
-  int m2 = 0;  // Variables with negative diff_weights_
-  double DeltaBarNegativeSum = 0.0;  // Sum of negative diff_weights_ values
-
-  for (int iter=0; iter < m; ++iter) {
-    QUBOSolution x = QUBOSolution::RandomSolution(qi, this);
-    const std::vector<double>& diff_weights = x.get_diff_weights();
-    for (int i=0; i < diff_weights.size(); ++i) {
-      if (x.NonDetrimentalMove(i)) {
-	++m1;
-      } else {
-	++m2;
-	DeltaBarNegativeSum += diff_weights[i];
-      }
-    }
-  }
-
-  // Finally, compute T_initial using formula (1)
-  double T_initial =
-    (-DeltaBarNegativeSum/m2) / log(m2 / (m2*eta - (1.0 - eta)*m1));
+  double T_initial = Alkhamis1998Solution::InitialTemperature(qi, 20, this);
+  Annealer sa(qi.get_size());
 
   // Random restart until termination criterion met
   for (int iter=0; QUBOHeuristic::Report(iter); ++iter) {
@@ -107,6 +111,6 @@ Alkhamis1998::Alkhamis1998(const QUBOInstance& qi, double runtime_limit,
     }
 
     // Step 2: Run the simulated annealing procedure
-    X.SA(T_initial, iter);
+    X.SA(T_initial, iter, &sa);
   }
 }
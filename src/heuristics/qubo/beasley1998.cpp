@@ -7,31 +7,28 @@
 Beasley1998Solution::Beasley1998Solution(const QUBOSolution &x) :
 QUBOSolution(x) {}
 
-void Beasley1998Solution::SA(double T) {
+void Beasley1998Solution::SA(Annealer* sa) {
   // PAPER: randomly select a variable k
-  int k = Random::RandInt(0, N_ - 1);
+  int k = sa->RandVariable();
   // PAPER: check if new solution better than current solution
   // NOTES: This captures two cases that were separated in the papers (where it
   //        improves over the best solution ever and when it doesn't do that but
   //        does improve over the current solution). We combine those steps here
   //        and handle updating the best solution ever in the main loop.
-  if (ImprovingMove(k)) {
-    // NOTES: If it's better, just take it
+  //        If it's better, sa->Accept just takes it.
+  // PAPER: V** is the solution value associated with the current solution
+  // NOTES: By current solution, its means the incumbent before any swap.
+  //        V is the value of a solution after the swap has been made for k
+  //        We never explicitly form this.
+  //        Therefore:
+  //          V** = weight_
+  //          V   = weight_ + diff_weights_[k]
+  //        So:
+  //          V** - V = diff_weights_[k]
+  //        and a worse solution is accepted with probability
+  //        exp(diff_weights_[k] / T).
+  if (sa->Accept(diff_weights_[k])) {
     UpdateCutValues(k);
-  } else {
-    // PAPER: V** is the solution value associated with the current solution
-    // NOTES: By current solution, its means the incumbent before any swap.
-    //        V is the value of a solution after the swap has been made for k
-    //        We never explicitly form this.
-    //        Therefore:
-    //          V** = weight_
-    //          V   = weight_ + diff_weights_[k]
-    //        So:
-    //          V** - V = diff_weights_[k]
-    if (Random::RandDouble() < exp(diff_weights_[k] / T)) {
-      // NOTES: Accept worse solution
-      UpdateCutValues(k);
-    }
   }
 }
 
@@ -52,48 +49,39 @@ void Beasley1998Solution::LocalSearch(int &t) {
   }
 }
 
-// L is the first iter where it's OK to use each vertex, iter is the current
-// iteration, vStar is the best solution found in this run of the algorithm,
-// and t is a reference to the operation count, which is used to terminate the
-// procedure.
-int  Beasley1998Solution::TS(std::vector<int> &L, int iter, double vStar,
-			     int &t) {
-  int K = -1;
-  
-  // PAPER: Initialise best neighbour value
-  double V_starstar = -1e10;
+// tabu holds the tabu list and the current iteration, vStar is the best
+// solution found in this run of the algorithm, and t is a reference to the
+// operation count, which is used to terminate the procedure.
+int Beasley1998Solution::TS(QUBOTabu* tabu, double vStar, int &t) {
   // PAPER: examine all non-tabu variables
-  for (int k = 0; k < N_; k++) {
-    if (L[k] > iter) continue;
-    t++;
-
-    // NOTES: V is what the objective value would be if we swapped k. We never
-    //        explictly form this solution.
-    double V = weight_ + diff_weights_[k];
-
-    // NOTES: If flipping k make this the best solution we have encountered,
-    //        then take the move and local search
-    if (ImprovesOver(V, vStar)) {
-      // NOTES: now we actually form the swapped solution
-      UpdateCutValues(k);
-      // PAPER: apply the local search procedure 
-      LocalSearch(t);
-      // PAPER: go to done (tabu update handled in main loop)
-      return k;
-    }
-
-    // NOTES: get here if doesn't improve on the best solution ever if we flip k. 
-    // PAPER: check for improved neighbouring solution
-    if (V > V_starstar) {
-      K = k;
-      V_starstar = V;
-    }
+  // NOTES: V = weight_ + diff_weights_[k] is what the objective value would be
+  //        if we swapped k. We never explictly form this solution. If flipping
+  //        k make this the best solution we have encountered, then take the
+  //        move and local search; the operation count includes the non-tabu
+  //        variables examined until then.
+  int examined;
+  int k = tabu->FirstNonTabuImprovingOver(vStar, &examined);
+  t += examined;
+  if (k >= 0) {
+    // NOTES: now we actually form the swapped solution
+    tabu->Flip(k);
+    // PAPER: apply the local search procedure 
+    LocalSearch(t);
+    tabu->Resync();
+    // PAPER: go to done (tabu update handled in main loop)
+    return k;
   }
 
-  if (K != -1) {
+  // NOTES: get here if no flip improves on the best solution ever.
+  // PAPER: Initialise best neighbour value and find the best neighbouring
+  //        solution
+  int K = tabu->BestNonTabu();
+  if (K != -1 && weight_ + diff_weights_[K] > -1e10) {
     // PAPER: make the move for chosen variable K
     // NOTES: and there is a move to make ()
-    UpdateCutValues(K);
+    tabu->Flip(K);
+  } else {
+    K = -1;
   }
   
   // PAPER: done:
@@ -119,12 +107,14 @@ Beasley1998SA::Beasley1998SA(const QUBOInstance& qi, double runtime_limit,
     const int T_star = std::max(500000, 5000 * qi.get_size());
     // PAPER: initialise iteration counter
     int t = 0;
+    Annealer sa(qi.get_size());
     // PAPER: T* iterations in all
     while (t < T_star) {
       // PAPER: increment iteration counter
       t++;
       // NOTES: All the SA step is done as function of solution
-      sol.SA(T);
+      sa.set_temperature(T);
+      sol.SA(&sa);
       // PAPER: reduce temperature
       T = alpha * T;
       // NOTES: Need to update best ever, which we'll apply local search on
@@ -165,7 +155,7 @@ Beasley1998TS::Beasley1998TS(const QUBOInstance& qi, double runtime_limit,
     double vStar = sol.get_weight();
     // PAPER: initialise tabu values (for efficiency, store the first iteration
     //        for which this vertex will be non-tabu)
-    std::vector<int> L(qi.get_size(), 0);
+    QUBOTabu tabu(&sol);
     // PAPER: set tabu tenure
     const int L_star = std::min(20, qi.get_size()/4);
     // PAPER: set maximum number of iterations
@@ -174,8 +164,8 @@ Beasley1998TS::Beasley1998TS(const QUBOInstance& qi, double runtime_limit,
     int t = 0;
     // PAPER: T* iterations in all (count inner iterations for efficient tabu
     //        search implementation)
-    for (int inner_iter = 0; t < T_star; ++inner_iter) {
-      int K = sol.TS(L, inner_iter, vStar, t);
+    for (; t < T_star; tabu.NextIteration()) {
+      int K = sol.TS(&tabu, vStar, t);
 
       // PAPER: record improved solution (moved out of local search step)
       if (sol.get_weight() > vStar) {
@@ -184,7 +174,7 @@ Beasley1998TS::Beasley1998TS(const QUBOInstance& qi, double runtime_limit,
 
       // PAPER: tabu the chosen variable (L stores next iter where it's OK to use)
       if (K != -1)
-        L[K] = inner_iter + L_star + 1;
+        tabu.MakeTabu(K, L_star + 1);
 
       if (!Report(sol, iter))
         return;  // Exit if termination criterion met
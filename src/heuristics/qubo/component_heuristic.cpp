@@ -0,0 +1,194 @@
+#include <algorithm>
+#include <thread>
+#include <vector>
+#include "heuristics/heuristic_factory.h"
+#include "heuristics/qubo/component_heuristic.h"
+
+ComponentQUBOCallback::ComponentQUBOCallback(QUBOComponentHeuristic* heuristic,
+                                             int c) :
+  heuristic_(heuristic),
+  c_(c) {}
+
+bool ComponentQUBOCallback::Report(const QUBOSimpleSolution& solution,
+                                   bool newBest, double runtime) {
+  if (newBest) {
+    return heuristic_->ReportComponent(c_, solution.get_assignments(),
+                                       solution.get_weight(), runtime);
+  } else {
+    return heuristic_->ComponentContinues(c_, runtime);
+  }
+}
+
+bool ComponentQUBOCallback::Report(const QUBOSimpleSolution& solution,
+                                   bool newBest, double runtime, int iter) {
+  // Iteration counts of different components can't be merged, so drop them
+  return Report(solution, newBest, runtime);
+}
+
+ComponentMaxCutCallback::ComponentMaxCutCallback(QUBOComponentHeuristic* heuristic,
+                                                 int c,
+                                                 const QUBOInstance& qi) :
+  heuristic_(heuristic),
+  c_(c),
+  qi_(qi) {}
+
+bool ComponentMaxCutCallback::Report(const MaxCutSimpleSolution& solution,
+                                     bool newBest, double runtime) {
+  if (newBest) {
+    QUBOSimpleSolution sol(solution, qi_, NULL);
+    return heuristic_->ReportComponent(c_, sol.get_assignments(),
+                                       sol.get_weight(), runtime);
+  } else {
+    return heuristic_->ComponentContinues(c_, runtime);
+  }
+}
+
+bool ComponentMaxCutCallback::Report(const MaxCutSimpleSolution& solution,
+                                     bool newBest, double runtime, int iter) {
+  // Iteration counts of different components can't be merged, so drop them
+  return Report(solution, newBest, runtime);
+}
+
+const double QUBOComponentHeuristic::kStallFraction = 0.25;
+const double QUBOComponentHeuristic::kExactFraction = 0.5;
+
+QUBOComponentHeuristic::QUBOComponentHeuristic(const QUBOInstance& qi,
+                                               double runtime_limit,
+                                               bool validation,
+                                               QUBOCallback *qc,
+                                               const std::string& code) :
+  QUBOHeuristic(qi, runtime_limit, validation, qc),
+  components_(qi, kExactFraction * runtime_limit),
+  code_(code),
+  num_threads_used_(1),
+  starts_(components_.get_num_components(), 0.0),
+  budgets_(components_.get_num_components(), 0.0),
+  last_best_(components_.get_num_components(), 0.0),
+  reported_(components_.get_num_components(), 0),
+  variables_left_(0),
+  first_time_per_variable_(0.0),
+  next_(0),
+  stop_(false),
+  current_(components_.get_exact()),
+  weights_(components_.get_num_components(), 0.0),
+  total_(components_.get_exact_weight()) {
+  // Report the exact solution of the acyclic and small components, with
+  // every variable of the other components set to 0
+  int num_components = components_.get_num_components();
+  if (!Report(QUBOSimpleSolution(qi, this, current_, total_)) ||
+      num_components == 0) {
+    return;
+  }
+
+  for (int c=0; c < num_components; ++c) {
+    variables_left_ += components_.get_variables(c).size();
+  }
+  int original_threads = get_num_threads();
+  num_threads_used_ = std::min(original_threads, num_components);
+  if (num_threads_used_ <= 1) {
+    RunComponents();
+    return;
+  }
+
+  set_num_threads(1);  // Already running a heuristic per thread
+  std::vector<std::thread> workers;
+  for (int t=1; t < num_threads_used_; ++t) {
+    workers.push_back(std::thread(&QUBOComponentHeuristic::RunComponents,
+                                  this));
+  }
+  RunComponents();
+  for (int t=0; t < num_threads_used_-1; ++t) {
+    workers[t].join();
+  }
+  set_num_threads(original_threads);
+}
+
+double QUBOComponentHeuristic::Budget(int c) {
+  // With T threads, the components not yet started share T times the
+  // runtime left, less the time the ones after c are expected to need for
+  // their first solution; c always gets the time it is expected to need.
+  double size = components_.get_variables(c).size();
+  double remaining = std::max(0.0, runtime_limit_ - starts_[c]);
+  double share = num_threads_used_ * remaining * size / variables_left_;
+  variables_left_ -= size;
+  double reserve = first_time_per_variable_ * variables_left_ /
+    num_threads_used_;
+  return std::max(first_time_per_variable_ * size,
+                  std::min(share, remaining - reserve));
+}
+
+void QUBOComponentHeuristic::RunComponents() {
+  // Every component is run, even once the run has been stopped, so each gets
+  // a first solution
+  HeuristicFactory factory;
+  while (true) {
+    int c;
+    {
+      std::lock_guard<std::mutex> lock(mutex_);
+      c = next_;
+      if (c >= components_.get_num_components()) {
+        return;
+      }
+      starts_[c] = Runtime();
+      budgets_[c] = Budget(c);
+      ++next_;
+    }
+    const QUBOInstance& ci = components_.get_instance(c);
+    Heuristic *h = NULL;
+    if (factory.ValidQUBOHeuristicCode(code_)) {
+      ComponentQUBOCallback callback(this, c);
+      h = factory.RunQUBOHeuristic(code_, ci, budgets_[c], false, &callback);
+    } else if (factory.ValidMaxCutHeuristicCode(code_)) {
+      MaxCutInstance mi(ci);
+      ComponentMaxCutCallback callback(this, c, ci);
+      h = factory.RunMaxCutHeuristic(code_, mi, budgets_[c], false,
+                                     &callback);
+    }
+    if (h) {
+      std::lock_guard<std::mutex> lock(mutex_);
+      profile_.Add(h->get_profile());
+      delete h;  // We don't need to keep around the pointer
+    }
+  }
+}
+
+bool QUBOComponentHeuristic::ComponentContinues(int c, double runtime) const {
+  if (!reported_[c]) {
+    // Until its first solution, a component runs to the end of its share or
+    // the runtime limit, whichever is later
+    return runtime < budgets_[c] || starts_[c] + runtime < runtime_limit_;
+  }
+  if (stop_) {
+    return false;
+  }
+  if (next_ >= components_.get_num_components()) {
+    return starts_[c] + runtime < runtime_limit_;  // No component waiting
+  }
+  return runtime < budgets_[c] && runtime - last_best_[c] <=
+    std::max(last_best_[c], kStallFraction * budgets_[c]);
+}
+
+bool QUBOComponentHeuristic::ReportComponent(int c,
+                                             const std::vector<int>& assignments,
+                                             double weight, double runtime) {
+  std::lock_guard<std::mutex> lock(mutex_);
+  const std::vector<int>& variables = components_.get_variables(c);
+  if (!reported_[c]) {
+    reported_[c] = 1;
+    first_time_per_variable_ = std::max(first_time_per_variable_,
+                                        runtime / variables.size());
+  }
+  if (BaseSolution::ImprovesOver(weight, weights_[c])) {
+    for (int k=0; k < variables.size(); ++k) {
+      current_[variables[k]] = assignments[k];
+    }
+    total_ += weight - weights_[c];
+    weights_[c] = weight;
+    last_best_[c] = runtime;
+    // Solutions found after the run was stopped are still stitched in
+    if (!Report(QUBOSimpleSolution(qi_, this, current_, total_))) {
+      stop_ = true;
+    }
+  }
+  return ComponentContinues(c, runtime);
+}
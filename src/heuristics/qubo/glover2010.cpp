@@ -5,6 +5,7 @@
 #include <limits>
 #include <vector>
 #include "heuristics/qubo/glover2010.h"
+#include "heuristics/qubo/qubo_tabu.h"
 #include "util/random.h"
 
 Glover2010QUBOSolution::Glover2010QUBOSolution(const QUBOSolution &x) :
@@ -62,9 +63,9 @@ void Glover2010QUBOSolution::TabuSearch(std::vector<int>* FlipFreq) {
   int randTenure = 10;  // Upper bound on random component of tabu tenure
   int alpha = 20 * N_;  // Improvement cutoff of TS
 
-  // NonTabuTimes is the vector of the first iteration when each variable will
-  // be non-tabu.
-  std::vector<int> NonTabuTimes(N_, 0);
+  // The tabu search engine tracks the first iteration when each variable will
+  // be non-tabu; its iteration count is the step count.
+  QUBOTabu tabu(this);
 
   // lastImprovement: step when we last improved
   int lastImprovement = 0;
@@ -76,36 +77,26 @@ void Glover2010QUBOSolution::TabuSearch(std::vector<int>* FlipFreq) {
   // We will store the best solution encountered during the search
   Glover2010QUBOSolution best(*this);
 
-  int step = 0;  // Iteration count
-  while (step - lastImprovement < alpha) {
+  while (tabu.get_iter() - lastImprovement < alpha) {
     // Find the best non-tabu move (allow tabu moves if they will improve on the
     // best solution so far.
-    double bestMove = -std::numeric_limits<double>::max();
-    int bestIdx = -1;
-    for (int i=0; i < N_; ++i) {
-      if (NonTabuTimes[i] <= step || ImprovesOverAfterMove(best, i)) {
-	if (diff_weights_[i] > bestMove) {
-	  bestMove = diff_weights_[i];
-	  bestIdx = i;
-	}
-      }
-    }
+    int bestIdx = tabu.BestMove(best.get_weight());
 
     // Perform the selected move, and increment the associated tabu tenure
     if (bestIdx >= 0) {
-      UpdateCutValues(bestIdx);
-      NonTabuTimes[bestIdx] = step + c + Random::RandInt(1, randTenure);
+      tabu.Flip(bestIdx);
+      tabu.MakeTabu(bestIdx, c + Random::RandInt(1, randTenure));
       ++((*FlipFreq)[bestIdx]);
     }
 
     // If we've improved the best solution, copy it and update lastImprovement
     if (ImprovesOver(best)) {
       best = *this;
-      lastImprovement = step;
+      lastImprovement = tabu.get_iter();
     }
 
     // Increment step count
-    ++step;
+    tabu.NextIteration();
   }
 
   // Copy over the best solution in the tabu search as the final one
@@ -115,6 +106,7 @@ void Glover2010QUBOSolution::TabuSearch(std::vector<int>* FlipFreq) {
 Glover2010Elite::Glover2010Elite(const QUBOInstance &qi, int R) :
   R_(R),
   N_(qi.get_size()),
+  members_(N_),
   EliteFreq_(N_, 0) {}
 
 void Glover2010Elite::AddSolution(const Glover2010QUBOSolution& x) {
@@ -127,10 +119,8 @@ void Glover2010Elite::AddSolution(const Glover2010QUBOSolution& x) {
   }
 
   // Reject the new solution if it matches one of the elite solutions
-  for (int idx=0; idx < EliteSol_.size(); ++idx) {
-    if (x == EliteSol_[idx]) {
-      return;
-    }
+  if (members_.Contains(x)) {
+    return;
   }
 
   // If we've made it to this point, we are going to add x to the elite set.
@@ -145,6 +135,7 @@ void Glover2010Elite::AddSolution(const Glover2010QUBOSolution& x) {
 	--EliteFreq_[j];  // We're removing this solution, so decrement freq
       }
     }
+    members_.Erase(EliteSol_[0]);
     std::pop_heap(EliteSol_.begin(), EliteSol_.end(),
 		  std::greater<Glover2010QUBOSolution>());
     EliteSol_.pop_back();
@@ -157,6 +148,7 @@ void Glover2010Elite::AddSolution(const Glover2010QUBOSolution& x) {
       ++EliteFreq_[j];
     }
   }
+  members_.Insert(x);
   EliteSol_.push_back(x);
   std::push_heap(EliteSol_.begin(), EliteSol_.end(),
 		 std::greater<Glover2010QUBOSolution>());
@@ -2,6 +2,7 @@
 #include <iostream>
 #include <limits>
 #include "heuristics/qubo/hasan2000.h"
+#include "heuristics/qubo/qubo_tabu.h"
 #include "util/random.h"
 
 Hasan2000Solution::Hasan2000Solution(const Hasan2000Solution& x1,
@@ -76,8 +77,12 @@ Hasan2000GA::Hasan2000GA(const QUBOInstance& qi, double runtime_limit,
   // Wrap the whole procedure in a random restart, restarting every time we have
   // seen at least nonDuplicateLimit number of non-duplicated children solutions.
   while (true) {
+    profile_.Count(Profile::RESTARTS);
+
     // Generate the initial population (Section 4.1.1)
+    ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
     Hasan2000Elite P(qi, POP, this);
+    construction.Stop();
     
     // Continue until we've seen a specified number of non-duplicate children
     // generated.
@@ -86,7 +91,9 @@ Hasan2000GA::Hasan2000GA(const QUBOInstance& qi, double runtime_limit,
     while (numNonDuplicate < nonDuplicateLimit) {
       // Section 4.1.2: Run numTournament tournaments, getting a child from each.
       // Binary tournaments are used, which is just rand selection of 2 parents.
+      // The crossover phase includes the occasional mutation of a child.
       std::vector<Hasan2000Solution> children;
+      ProfilePhase crossover(&profile_, Profile::CROSSOVER);
       for (int iter = 0; iter < numTournament; ++iter) {
         double i = Random::RandInt(0, POP-1);
         double j;
@@ -108,12 +115,16 @@ Hasan2000GA::Hasan2000GA(const QUBOInstance& qi, double runtime_limit,
           children[children.size() - 1].Mutate();
         }
       }
+      crossover.Stop();
       
       // The paper doesn't specify it, but almost certainly they want to do a
       // local search here -- it's what they do to the initial solutions and it
       // makes the algorithm competitive.
-      for (int i=0; i < children.size(); ++i) {
-        children[i].AllBest1Swap();
+      {
+        ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
+        for (int i=0; i < children.size(); ++i) {
+          children[i].AllBest1Swap();
+        }
       }
       
       // Identify the best child, adding each to the population if it doesn't
@@ -147,41 +158,27 @@ void Hasan2000Solution::TS() {
   int TLs = N_/2;
   int MAXI = 4 * N_;
 
-  // non-tabu if the iteration count exceeds the TABL value
-  std::vector<int> TABL(N_, -1);
+  // non-tabu once the iteration count exceeds the TABL value (the engine
+  // stores the first non-tabu iteration)
+  QUBOTabu tabu(this);
   // Keep track of best solution so we don't need to call Report in a tight loop
   Hasan2000Solution best(*this);
   int nonImproving = 0;  // Number of non-improving iterations
-  for (int t=0; nonImproving < MAXI; ++t) {
+  for (int t=0; nonImproving < MAXI; ++t, tabu.NextIteration()) {
     // Determine the best move to perform, limiting to non-tabu moves and
     // moves that meet the aspiration criterion (improving the best ever sln).
-    // We use the FA strategy, so if a move improves the current objective we
-    // select it without checking further.
-    int selectedMove = -1;
-    double selectedDW = -std::numeric_limits<double>::max();
-    for (int i=0; i < N_; ++i) {
-      if (t <= TABL[i]) {
-	// i is tabu
-	if (ImprovesOverAfterMove(best, i)) {
-	  selectedMove = i;
-	  break;
-	}
-      } else {
-	// i is not tabu
-        if (ImprovingMove(i)) {
-	  selectedMove = i;
-	  break;
-	} else if (diff_weights_[i] > selectedDW) {
-	  selectedMove = i;
-	  selectedDW = diff_weights_[i];
-	}	
-      }
+    // We use the FA strategy, so the first move that either meets the
+    // aspiration criterion or improves the current objective is selected
+    // without checking further; otherwise we take the best non-tabu move.
+    int selectedMove = tabu.FirstAspiratedOrImproving(best.get_weight());
+    if (selectedMove < 0) {
+      selectedMove = tabu.BestNonTabu();
     }
 
     // Perform our selected move, updating the tabu information for this var
     if (selectedMove >= 0) {
-      UpdateCutValues(selectedMove);
-      TABL[selectedMove] = t + TLs;
+      tabu.Flip(selectedMove);
+      tabu.MakeTabu(selectedMove, TLs + 1);
     }
 
     // Update the best solution but only report periodically to avoid reporting
@@ -2,6 +2,7 @@
 #include <iostream>
 #include <limits>
 #include "heuristics/qubo/katayama2000.h"
+#include "heuristics/qubo/qubo_kopt.h"
 #include "util/random.h"
 
 Katayama2000QUBOSolution::Katayama2000QUBOSolution(const Katayama2000QUBOSolution &x1,
@@ -47,73 +48,52 @@ Katayama2000QUBOSolution::Katayama2000QUBOSolution(const Katayama2000QUBOSolutio
 }
 
 void Katayama2000QUBOSolution::VariantKOpt() {
-  // best is the best solution found in the LS. At the end of each iteration,
-  // we will copy over this best solution to be the current solution.
-  Katayama2000QUBOSolution best(*this);
+  // The k-opt engine tracks the best solution found in each iteration, rolling
+  // back to it at the end of the iteration.
+  QUBOKOpt kopt(this);
 
   // Loop until no improvement during loop
   bool improved = true;
   while (improved) {
     // Initialize iteration variables (in terminology of Figure 1, improved
-    // becomes true when Gmax > 0).
+    // becomes true when Gmax > 0). All variables start in set C (not flipped).
     improved = false;
-    std::vector<bool> inC(N_, true);  // Is a variable in set C (not flipped)?
-    int numInC = N_;
+    kopt.StartPass();
 
     // Loop until no variables are in C
-    while (numInC > 0) {
+    while (kopt.get_num_in_C() > 0) {
       // Fig 1 Step 1.2.1: Generate random permutation of variables
-      std::vector<int> RP(N_, 0);
-      for (int i=0; i < N_; ++i) {
-	RP[i] = i;
-      }
-      std::random_shuffle(RP.begin(), RP.end());
+      const std::vector<int>& RP = kopt.RandomPermutation();
 
       // Fig 1 Step 1.2.2: Search all variables (regardless of whether they're
       // in C) in RP order, and flip a variable if doing so will improve best.
       for (int i=0; i < N_; ++i) {
-	if (ImprovesOverAfterMove(best, RP[i])) {
+	if (kopt.ImprovesOverBestAfterMove(RP[i])) {
 	  improved = true;
-	  UpdateCutValues(RP[i]);
-	  if (inC[RP[i]]) {
-	    inC[RP[i]] = false;
-	    --numInC;
-	  }
-	  best = *this;
+	  kopt.Flip(RP[i]);
+	  kopt.SetBest();
 	}
       }
 
       // Break out of loop if we've now exhausted C
-      if (numInC == 0) {
+      if (kopt.get_num_in_C() == 0) {
 	break;
       }
 
       // Fig 1 Steps 1.2.3: Find index j (j \in C) with best diff_weights_[j]
-      int j = -1;
-      double bestGain = -std::numeric_limits<double>::max();
-      for (int i=0; i < N_; ++i) {
-	if (inC[i] && diff_weights_[i] > bestGain) {
-	  j = i;
-	  bestGain = diff_weights_[i];
-	}
-      }
+      int j = kopt.BestInC();
 
-      // Fig 1 Steps 1.2.4, 1.2.6-1.2.7: Flip index j
-      UpdateCutValues(j);
+      // Fig 1 Steps 1.2.4, 1.2.6-1.2.8: Flip index j, removing it from set C
+      kopt.Flip(j);
 
-      // Fig 1 Step 1.2.5: If new solution improves on best, copy it over
-      if (ImprovesOver(best)) {
+      // Fig 1 Step 1.2.5: If new solution improves on best, it becomes best
+      if (kopt.UpdateBest()) {
 	improved = true;
-	best = *this;
       }
-
-      // Fig 1 Step 1.2.8: Remove j from set C
-      inC[j] = false;
-      --numInC;
     }
 
-    // Fig 1 Step 1.3: Copy over best to be the current solution
-    operator=(best);
+    // Fig 1 Step 1.3: Return to best as the current solution
+    kopt.RollBack();
   }
 }
 
@@ -223,9 +203,17 @@ void Katayama2000Elite::Diversify() {
     stepsSinceImprovement_ = 0;
 
     // Mutate and local search on each solution
+    Profile* profile = &heuristic_->get_profile();
+    profile->Count(Profile::RESTARTS);
     for (int i=1; i < P_.size(); ++i) {
-      P_[i].Mutate();
-      P_[i].VariantKOpt();
+      {
+        ProfilePhase phase(profile, Profile::PERTURBATION);
+        P_[i].Mutate();
+      }
+      {
+        ProfilePhase phase(profile, Profile::LOCAL_SEARCH);
+        P_[i].VariantKOpt();
+      }
 
       // This loop could take a while, so report solutions in the loop
       if (!heuristic_->Report(P_[i])) {
@@ -246,7 +234,10 @@ Katayama2000::Katayama2000(const QUBOInstance& qi, double runtime_limit,
 
   // Fig 2 Steps 1-2: Initialize a random population of size PS, and run
   // local search on each
+  profile_.Count(Profile::RESTARTS);
+  ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
   Katayama2000Elite P(qi, PS, this);
+  construction.Stop();
 
   // Exit if we're already out of time
   if (!Report(P.get_best())) {
@@ -277,11 +268,16 @@ Katayama2000::Katayama2000(const QUBOInstance& qi, double runtime_limit,
 
       // Fig 2 Step 3.2.2-3.2.3: Obtain offspring via crossover, performing
       // mutation if necessary.
+      ProfilePhase crossover(&profile_, Profile::CROSSOVER);
       offspring.push_back(Katayama2000QUBOSolution::Crossover(P.get_P()[a],
 							      P.get_P()[b]));
+      crossover.Stop();
 
       // Fig 2 Step 3.2.4: Perform local search on new offspring
-      offspring[ct].VariantKOpt();
+      {
+        ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
+        offspring[ct].VariantKOpt();
+      }
 
       // The variant k-opt is expensive, so we'll report each child
       if (!Report(P.get_best())) {
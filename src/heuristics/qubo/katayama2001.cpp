@@ -7,21 +7,19 @@
 Katayama2001Solution::Katayama2001Solution(const QUBOSolution &x) :
 QUBOSolution(x) {}
 
-bool Katayama2001Solution::SASwap(int k, double T) {
-  if (ImprovingMove(k)) {
-    // PAPER:   ...then set Counter = 0...    
-    // PAPER:   ...x_k = 1 - x_k (and update all gain g_i)...
+bool Katayama2001Solution::SASwap(int k, Annealer* sa) {
+  // PAPER:   If g_k > 0...
+  // PAPER:   ...then set Counter = 0...
+  // PAPER:   ...x_k = 1 - x_k (and update all gain g_i)...
+  // PAPER: SA: 3.3.3 Otherwise, set x_k = 1 - x_k with
+  //                  probability exp(g_k/T)
+  // NOTES: sa always accepts improving moves, so a single test covers both
+  //        cases.
+  bool improving = ImprovingMove(k);
+  if (sa->Accept(diff_weights_[k])) {
     UpdateCutValues(k);
-    // PAPER:   ...ignore rest
-    return true;
-  } else {
-    // PAPER: SA: 3.3.3 Otherwise, set x_k = 1 - x_k with
-    //                  probability exp(g_k/T)
-    if (Random::RandDouble() < exp(diff_weights_[k] / T)) {
-      UpdateCutValues(k);
-    }
-    return false;
   }
+  return improving;
 }
 
 Katayama2001::Katayama2001(const QUBOInstance& qi, double runtime_limit,
@@ -39,6 +37,7 @@ Katayama2001::Katayama2001(const QUBOInstance& qi, double runtime_limit,
   const int TERM_COUNT = 10;
   const int SA_COUNT = 2;
   const double START_T_FACTOR = 0.8;
+  Annealer sa(qi.get_size());
 
   // PAPER: 2 Generate an initial random solution x_best
   // NOTES: Loop until termination criterion met (only one loop for valdiation)
@@ -68,8 +67,8 @@ Katayama2001::Katayama2001(const QUBOInstance& qi, double runtime_limit,
           // PAPER: SA: 3.3.1 k = RP[j];
           int k = RP[j];
           // PAPER: SA: 3.3.2 
-          // PAPER:   If g_k > 0...
-          if (x_best.SASwap(k, T)) {
+          sa.set_temperature(T);
+          if (x_best.SASwap(k, &sa)) {
             counter = 0;
           }
           // PAPER: SA: 3.4 T = TFactor x T
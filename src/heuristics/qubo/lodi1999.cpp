@@ -171,6 +171,8 @@ Lodi1999Solution::Lodi1999Solution(const Lodi1999Solution &father,
                                    const Lodi1999Solution &mother,
                                    const Lodi1999MinRange& mr) :
   QUBOSolution(father) {
+  ProfilePhase crossover(get_profile(), Profile::CROSSOVER);
+
   // PAPER: 4. generate a new solution by applying a cross-over operator to 
   //        the parents
   //        We temporarily fix the variables with the same value in P1 
@@ -200,11 +202,13 @@ Lodi1999Solution::Lodi1999Solution(const Lodi1999Solution &father,
       UpdateCutValues(i);
     }
   }
+  crossover.Stop();
 
   // PAPER: "Post-optimization: Between the phases of mu-
   //         tation and insertion, a post-optimization of the
   //         current solution SON is performed by applying
   //         algorithm LS"
+  ProfilePhase phase(get_profile(), Profile::LOCAL_SEARCH);
   LS(fixed);
 }
 
@@ -264,10 +268,13 @@ Lodi1999::Lodi1999(const QUBOInstance& qi, double runtime_limit,
   }
 
   while (true) {
+    profile_.Count(Profile::RESTARTS);
+
     // PAPER: 1: generate an initial population of different solutions, of which
     //           SIZE_min - g are randomly generated and improved through LS
     //           and the remaining g elements are the best solutions found in
     //           previous restarts performed by the algorithm.
+    ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
     std::vector<Lodi1999Solution> population;
     for (int p = 0; p < SIZEmin - best_of_restarts.size(); p++) {
       population.push_back(Lodi1999Solution::RandomWithCF(mr.get_CF(), qi,
@@ -278,6 +285,7 @@ Lodi1999::Lodi1999(const QUBOInstance& qi, double runtime_limit,
     }
     std::sort(population.begin(), population.end(),
               std::greater<Lodi1999Solution>());
+    construction.Stop();
     // PAPER: 2: repeat
     double best_weight = population[0].get_weight();
     int iterations_without_improvement = 0;
@@ -4,6 +4,7 @@
 #include <limits>
 #include <vector>
 #include "heuristics/qubo/lu2010.h"
+#include "heuristics/qubo/qubo_tabu.h"
 #include "util/random.h"
 
 Lu2010QUBOSolution::Lu2010QUBOSolution(const QUBOSolution &x) :
@@ -17,32 +18,20 @@ void Lu2010QUBOSolution::TabuSearch() {
   int alpha = N_ * 5;  // Improvement cutoff for TS
 
   Lu2010QUBOSolution best = *this;  // Best solution yet encountered
-  std::vector<int> TabuIter(N_, 0);  // Iteration when each var is non-tabu
+  QUBOTabu tabu(this);  // Tabu list and move selection
+  std::vector<int> bests;  // All indices tied with best improvement
   int numWithoutImprovement = 0;  // Moves w/o improving best solution
-  for (int iter=0; numWithoutImprovement < alpha; ++iter) {
-    std::vector<int> bests;  // All indices tied with best improvement
-    double bestVal = -std::numeric_limits<double>::max();
-    for (int i=0; i < N_; ++i) {
-      // If var is either not on the tabu list or would improve on the best
-      // solution to date, update "bests" and "bestVal"
-      if (TabuIter[i] <= iter || ImprovesOverAfterMove(best, i)) {
-        if (BaseSolution::ImprovesOver(weight_ + diff_weights_[i], bestVal)) {
-	  bests.clear();
-	  bests.push_back(i);
-	  bestVal = weight_ + diff_weights_[i];
-	} else if (!BaseSolution::ImprovesOver(bestVal,
-                                               weight_ + diff_weights_[i])) {
-	  bests.push_back(i);
-	}
-      }
-    }
+  for (; numWithoutImprovement < alpha; tabu.NextIteration()) {
+    // Find the moves with the best improvement among the vars that are either
+    // not on the tabu list or would improve on the best solution to date
+    tabu.BestMoves(best.get_weight(), &bests);
 
     // Randomly select index to flip from bests and flip it, updating the
     // tabu tenure for that index
     if (bests.size() > 0) {
       int idx = bests[Random::RandInt(0, bests.size() - 1)];
-      UpdateCutValues(idx);
-      TabuIter[idx] = iter + tt + Random::RandInt(1, randTenure) + 1;
+      tabu.Flip(idx);
+      tabu.MakeTabu(idx, tt + Random::RandInt(1, randTenure) + 1);
     }
 
     // Check if we've improved on the best solution to date
@@ -101,35 +90,55 @@ Lu2010PartialSolution::Lu2010PartialSolution(const QUBOInstance& qi,
   }
   PopulateFromAssignments();
 
+  // On sparse instances, index the moves of the variables in NC towards xi
+  // (group 0) and towards xj (group 1), so each step avoids scanning NC.
+  bool indexed = GainIndex::Worthwhile(N_, qi.get_edge_count());
+  if (indexed) {
+    std::vector<int> group(2*N_, -1);
+    for (int idx=0; idx < NC.size(); ++idx) {
+      int i = NC[idx];
+      group[2*i + xi.get_assignments()[i]] = 0;
+      group[2*i + xj.get_assignments()[i]] = 1;
+    }
+    IndexGains(group, 2);
+  }
+
   // Iteratively assign the most promising move for each index.
   bool matchI = true;  // Are we matching to xi this round?
-  while (NC.size() > 0) {
-    // First, loop through the values in NC and pick the most promising
+  while (num_frac_ > 0) {
+    // Pick the most promising variable to move (the first one in NC in case
+    // of ties when scanning, the smallest index when indexed)
     int tomove = -1;  // The variable number to move
-    int tomove_idx = -1;  // The index in NC of the variable to move
-    double bestDiff = -std::numeric_limits<double>::max();
-    for (int idx=0; idx < NC.size(); ++idx) {
-      int i = NC[idx];
-      double thisMove;
-      if (matchI) {
-	thisMove = xi.get_assignments()[i] ? diff1_[i] : diff0_[i];
-      } else {
-	thisMove = xj.get_assignments()[i] ? diff1_[i] : diff0_[i];
-      }
-      if (thisMove > bestDiff) {
-	tomove = i;
-	tomove_idx = idx;
-	bestDiff = thisMove;
+    if (indexed) {
+      tomove = gain_index_[matchI ? 0 : 1].Max() / 2;
+    } else {
+      int tomove_idx = -1;  // The index in NC of the variable to move
+      double bestDiff = -std::numeric_limits<double>::max();
+      for (int idx=0; idx < NC.size(); ++idx) {
+	int i = NC[idx];
+	double thisMove;
+	if (matchI) {
+	  thisMove = xi.get_assignments()[i] ? diff1_[i] : diff0_[i];
+	} else {
+	  thisMove = xj.get_assignments()[i] ? diff1_[i] : diff0_[i];
+	}
+	if (thisMove > bestDiff) {
+	  tomove = i;
+	  tomove_idx = idx;
+	  bestDiff = thisMove;
+	}
       }
+
+      // Remove tomove from isNC and NC
+      isNC[tomove] = false;
+      NC[tomove_idx] = NC[NC.size()-1];
+      NC.resize(NC.size()-1);
     }
-    
-    // Assign tomove's variable value, updating isNC and NC.
+
+    // Assign tomove's variable value
     UpdateCutValues(tomove, matchI ? xi.get_assignments()[tomove] :
 		    xj.get_assignments()[tomove]);
-    isNC[tomove] = false;
-    NC[tomove_idx] = NC[NC.size()-1];
-    NC.resize(NC.size()-1);
-    
+
     // Flip whether xi or xj is matched
     matchI = !matchI;
   }
@@ -138,10 +147,9 @@ Lu2010PartialSolution::Lu2010PartialSolution(const QUBOInstance& qi,
 Lu2010Population::Lu2010Population(int p, const QUBOInstance& qi,
 				   QUBOHeuristic *heuristic) :
   p_(p),
-  HD_(p*p, 0),
-  NHD_(p*p, 0.0),
   min_NHD_(p, std::numeric_limits<double>::max()),
-  VI_(qi.get_size(), 0.0) {
+  VI_(qi.get_size(), 0.0),
+  pool_(qi.get_size(), p, &VI_) {
   // Parameters
   double phi = 0.2;  // Variable importance coefficient
 
@@ -166,23 +174,25 @@ Lu2010Population::Lu2010Population(int p, const QUBOInstance& qi,
     VI_[i] = sqrt(fabs(qi.get_lin()[i]) + phi * interactionSums[i]);
   }
 
-  // Compute the pairwise hamming distances (HD_), the pairwise non-hamming
-  // distances (NHD_), min NHD to other elements (min_NHD_), and average hamming
-  // distance (avg_HD_)
-  double HD_sum = 0.0;
+  // Compute the pairwise hamming and non-hamming distances (in pool_), min NHD
+  // to other elements (min_NHD_), and average hamming distance (avg_HD_)
   for (int i=0; i < p; ++i) {
-    for (int j=i+1; j < p; ++j) {
-      std::vector<int> diffs;
-      HD_[i*p + j] = P_[i].SymmetricDifference(P_[j], &diffs);
-      HD_sum += HD_[i*p + j];
-      for (int idx=0; idx < diffs.size(); ++idx) {
-	NHD_[i*p + j] += VI_[diffs[idx]];
-      }
-      min_NHD_[i] = std::min<double>(min_NHD_[i], NHD_[i*p + j]);
-      min_NHD_[j] = std::min<double>(min_NHD_[j], NHD_[i*p + j]);
+    pool_.Set(i, P_[i]);
+  }
+  UpdateDistanceSummaries();
+}
+
+void Lu2010Population::UpdateDistanceSummaries() {
+  for (int i=0; i < p_; ++i) {
+    min_NHD_[i] = std::numeric_limits<double>::max();
+  }
+  for (int i=0; i < p_; ++i) {
+    for (int j=i+1; j < p_; ++j) {
+      min_NHD_[i] = std::min<double>(min_NHD_[i], pool_.WeightedDistance(i, j));
+      min_NHD_[j] = std::min<double>(min_NHD_[j], pool_.WeightedDistance(i, j));
     }
   }
-  avg_HD_ = HD_sum * 2.0 / p / (p-1);
+  avg_HD_ = pool_.get_distance_sum() * 2.0 / p_ / (p_-1);
 }
 
 std::pair<const Lu2010QUBOSolution&, const Lu2010QUBOSolution&>
@@ -195,7 +205,7 @@ std::pair<const Lu2010QUBOSolution&, const Lu2010QUBOSolution&>
   bool constHD = true;
   for (int i=0; i < p_; ++i) {
     for (int j=0; j < p_; ++j) {
-      if (HD_[i*p_ + j] != HD_[0]) {
+      if (pool_.Distance(i, j) != pool_.Distance(0, 0)) {
         constHD = false;
         break;
       }
@@ -222,7 +232,7 @@ std::pair<const Lu2010QUBOSolution&, const Lu2010QUBOSolution&>
 
     // Return in success if the hamming distance of j and k exceeds the
     // average distance (or if all hamming distances are identical)
-    if (HD_[j*p_ + k] > avg_HD_ || constHD) {
+    if (pool_.Distance(j, k) > avg_HD_ || constHD) {
       return
 	std::pair<const Lu2010QUBOSolution&, const Lu2010QUBOSolution&>(P_[j],
 									P_[k]);
@@ -239,17 +249,13 @@ void Lu2010Population::UpdatePool(const Lu2010QUBOSolution& x0) {
   // importance from x0 to the other solutions in the population. We'll also
   // compute new_min_NHD, which is the min_NHD value for every current
   // element of the population, also including x0 in the computation.
-  std::vector<int> x0_HD(p_, 0);
-  std::vector<double> x0_NHD(p_, 0.0);
+  std::vector<int> x0_HD;
+  std::vector<double> x0_NHD;
+  pool_.Distances(x0, &x0_HD, &x0_NHD);
   std::vector<double> new_min_NHD = min_NHD_;
   // Min dist from x0 to an element in the population
   double x0_min_NHD = std::numeric_limits<double>::max();
   for (int i=0; i < p_; ++i) {
-    std::vector<int> diffs;
-    x0_HD[i] = x0.SymmetricDifference(P_[i], &diffs);
-    for (int idx=0; idx < diffs.size(); ++idx) {
-      x0_NHD[i] += VI_[diffs[idx]];
-    }
     new_min_NHD[i] = std::min<double>(new_min_NHD[i], x0_NHD[i]);
     x0_min_NHD = std::min<double>(x0_min_NHD, x0_NHD[i]);
   }
@@ -285,30 +291,13 @@ void Lu2010Population::UpdatePool(const Lu2010QUBOSolution& x0) {
   // If x0 is selected to be added to the population, update class values.
   if (!BaseSolution::ImprovesOver(worst_score, g_x0) ||
       Random::RandDouble() < wp) {
-    // Insert x0 into position w, updating P_, HD_, and NHD_.
+    // Insert x0 into position w, updating P_ and the distances in pool_
+    // (only row and column w change).
     P_[w] = x0;
-    for (int i=0; i < w; ++i) {
-      HD_[i*p_ + w] = x0_HD[i];
-      NHD_[i*p_ + w] = x0_NHD[i];
-    }
-    for (int i=w+1; i < p_; ++i) {
-      HD_[w*p_ + i] = x0_HD[i];
-      NHD_[w*p_ + i] = x0_NHD[i];
-    }
+    pool_.Set(w, x0);
 
     // Compute avg_HD_ and min_NHD_ for the new population
-    for (int i=0; i < p_; ++i) {
-      min_NHD_[i] = std::numeric_limits<double>::max();
-    }
-    double HD_sum = 0.0;
-    for (int i=0; i < p_; ++i) {
-      for (int j=i+1; j < p_; ++j) {
-	HD_sum += HD_[i*p_ + j];
-	min_NHD_[i] = std::min<double>(min_NHD_[i], NHD_[i*p_ + j]);
-	min_NHD_[j] = std::min<double>(min_NHD_[i], NHD_[i*p_ + j]);
-      }
-    }
-    avg_HD_ = HD_sum * 2.0 / p_ / (p_-1);
+    UpdateDistanceSummaries();
   }
 }
 
@@ -321,10 +310,13 @@ Lu2010::Lu2010(const QUBOInstance& qi, double runtime_limit, bool validation,
   // Outer iteration: once the population converges to being constant there's
   // little point in continuing, so we'll instead restart whenever that occurs.
   while (true) {
+    profile_.Count(Profile::RESTARTS);
     
     // Build the initial population, by randomly generating p solutions and
     // performing tabu search on each
+    ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
     Lu2010Population P(p, qi, this);
+    construction.Stop();
     // If we hit the termination criterion while generating the population, just
     // exit.
     if (!QUBOHeuristic::Report()) {
@@ -341,11 +333,16 @@ Lu2010::Lu2010(const QUBOInstance& qi, double runtime_limit, bool validation,
         P.RandomParents();
 
       // Alg 1, Step 10: Build x0 from xj and xk
+      ProfilePhase crossover(&profile_, Profile::CROSSOVER);
       Lu2010QUBOSolution x0 = Lu2010QUBOSolution::Combine(qi, parents.first,
                                                           parents.second, this);
+      crossover.Stop();
 
       // Alg 1, Step 11: Perform tabu search on x0
-      x0.TabuSearch();
+      {
+        ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
+        x0.TabuSearch();
+      }
 
       // Alg 1, Steps 12-14: Check if new best encountered (we'll also check our
       // termination criterion here)
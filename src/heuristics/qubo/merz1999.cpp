@@ -118,6 +118,8 @@ Merz1999::Merz1999(const QUBOInstance& qi, double runtime_limit, bool validation
 
   // PAPER:  begin
   // PAPER:  initialize population P;
+  profile_.Count(Profile::RESTARTS);
+  ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
   std::vector<Merz1999Solution> population;
   for (int i = 0; i < POP_SIZE; i++)
     population.push_back(QUBOSolution::RandomSolution(qi, this));
@@ -125,12 +127,16 @@ Merz1999::Merz1999(const QUBOInstance& qi, double runtime_limit, bool validation
     // PAPER:   foreach individual i \in P do i := Local-Search(i);
     for (int i = 0; i < POP_SIZE; i++)
       population[i].AllBest1Swap();  // ExtendedSolution::AllBest1Swap()
+  construction.Stop();
 
   // PAPER:  repeat
   int last_iteration_with_change = 1;
   for (int iteration=0; ; ++iteration) {
     // PAPER:  for i := 1 to #crossovers do
     int num_crossovers = static_cast<int>(population.size() * RECOMBINATION_RATE);
+    // The mutation-only version perturbs instead of crossing over
+    ProfilePhase offspring(&profile_, version == 2 ? Profile::PERTURBATION :
+                           Profile::CROSSOVER);
     for (int i = 0; i < num_crossovers; i++) {
       // PAPER:  select two parents i_a, i_b \in P randomly;
       int i_a = Random::RandInt(0, population.size()-1);
@@ -162,6 +168,7 @@ Merz1999::Merz1999(const QUBOInstance& qi, double runtime_limit, bool validation
       }
     // PAPER:  endfor
     }
+    offspring.Stop();
     // PAPER:  P := select(P);
     // NOTES:  Take best POP_SIZE of current solutions
     // Retrieve (weight, index) pairs
@@ -201,11 +208,18 @@ Merz1999::Merz1999(const QUBOInstance& qi, double runtime_limit, bool validation
     //std::cout << "  hamming_mean = " << hamming_mean << std::endl;
     if (hamming_mean <= 10 || (iteration - last_iteration_with_change) >= 30) {
       // PAPER:  foeach individual i \in P\{best} do i := LocalSearch(Mutate(i))
+      profile_.Count(Profile::RESTARTS);
       for (int i = 1; i < population.size(); i++) {  // Skip best
         // PAPER:  During the restarts, the individuals were mutated 
         //         by flipping a third of all the bits in the bit vector.
-        population[i].RestartMutate();
-        if (version == 0) population[i].AllBest1Swap();
+        {
+          ProfilePhase phase(&profile_, Profile::PERTURBATION);
+          population[i].RestartMutate();
+        }
+        if (version == 0) {
+          ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
+          population[i].AllBest1Swap();
+        }
         if (!Report(population[i])) {
           break;
         }
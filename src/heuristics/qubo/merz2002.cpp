@@ -2,6 +2,7 @@
 #include <iostream>
 #include <limits>
 #include "heuristics/qubo/merz2002.h"
+#include "heuristics/qubo/qubo_kopt.h"
 #include "util/random.h"
 
 Merz2002PartialSolution::Merz2002PartialSolution(const QUBOInstance& qi,
@@ -14,24 +15,43 @@ Merz2002PartialSolution::Merz2002PartialSolution(const QUBOInstance& qi,
   // Select random variable and randomly select value to either 0 or 1.
   UpdateCutValues(Random::RandInt(0, N_-1), Random::RandInt(0, 1));
 
+  // On sparse instances, index the moves to 0 (group 0) and to 1 (group 1) of
+  // the fractional variables, so each step avoids scanning all variables.
+  bool indexed = GainIndex::Worthwhile(N_, qi.get_edge_count());
+  if (indexed) {
+    std::vector<int> group(2*N_);
+    for (int m=0; m < 2*N_; ++m) {
+      group[m] = m % 2;
+    }
+    IndexGains(group, 2);
+  }
+
   // Iterate until no variables have fractional values
   while (num_frac_ > 0) {
-    // Identify the fractional vars with the best gain to 0 or 1
+    // Identify the fractional vars with the best gain to 0 or 1 (the first
+    // one in case of ties)
     double best0val = -std::numeric_limits<double>::max();
     int best0pos = -1;
     double best1val = -std::numeric_limits<double>::max();
     int best1pos = -1;
-    for (int i=0; i < N_; ++i) {
-      if (assignments_[i] == 0 || assignments_[i] == 1.0) {
-	continue;  // Not a fractional solution
-      }
-      if (diff0_[i] > best0val) {
-	best0val = diff0_[i];
-	best0pos = i;
-      }
-      if (diff1_[i] > best1val) {
-	best1val = diff1_[i];
-	best1pos = i;
+    if (indexed) {
+      best0pos = gain_index_[0].Max() / 2;
+      best0val = diff0_[best0pos];
+      best1pos = gain_index_[1].Max() / 2;
+      best1val = diff1_[best1pos];
+    } else {
+      for (int i=0; i < N_; ++i) {
+	if (assignments_[i] == 0 || assignments_[i] == 1.0) {
+	  continue;  // Not a fractional solution
+	}
+	if (diff0_[i] > best0val) {
+	  best0val = diff0_[i];
+	  best0pos = i;
+	}
+	if (diff1_[i] > best1val) {
+	  best1val = diff1_[i];
+	  best1pos = i;
+	}
       }
     }
 
@@ -61,41 +81,29 @@ Merz2002PartialSolution::Merz2002PartialSolution(const QUBOInstance& qi,
 }
 
 void Merz2002QUBOSolution::KOpt() {
-  // best is the best solution found in the k-opt. At the end of each iteration,
-  // we will copy over this best solution to be the current solution.
-  Merz2002QUBOSolution best(*this);
+  // The k-opt engine tracks the best solution found in each iteration, rolling
+  // back to it at the end of the iteration.
+  QUBOKOpt kopt(this);
 
   // Loop until no improvement during loop (we will break there)
   bool improved = true;
   while (improved) {
     // Initialize iteration variables (in terminology of Figure 6, improved
-    // becomes true when Gmax > 0.
+    // becomes true when Gmax > 0. All variables start in set C (not flipped).
     improved = false;
-    std::vector<bool> inC(N_, true);  // Is a variable in set C (not flipped)?
+    kopt.StartPass();
     for (int iter=0; iter < N_; ++iter) {
-      // Identify the best 1-flip to perform
-      int bestPos = -1;
-      double bestDW = -std::numeric_limits<double>::max();
-      for (int i=0; i < N_; ++i) {
-	if (inC[i] && diff_weights_[i] > bestDW) {
-	  bestPos = i;
-	  bestDW = diff_weights_[i];
-	}
-      }
-      
-      // Perform the 1-flip and update inC
-      UpdateCutValues(bestPos);
-      inC[bestPos] = false;
+      // Identify the best 1-flip to perform, perform it and update C
+      kopt.Flip(kopt.BestInC());
       
       // If we have improved over best with this flip, update best and improved.
-      if (ImprovesOver(best)) {
-	best = *this;
+      if (kopt.UpdateBest()) {
 	improved = true;
       }
     }
 
-    // Copy over the best solution to be the current solution
-    operator=(best);
+    // Return to the best solution as the current solution
+    kopt.RollBack();
   }
 }
 
@@ -2,6 +2,7 @@
 #include <iostream>
 #include <limits>
 #include "heuristics/qubo/merz2004.h"
+#include "heuristics/qubo/qubo_kopt.h"
 #include "util/random.h"
 
 // Crossover -- we'll start with x1 and just flip the variables that change
@@ -61,79 +62,58 @@ void Merz2004Solution::RandomizedKOpt() {
   // Parameters
   int m = 50;  // Number of inner loop iterations without improvement before exit
 
-  // best is the best solution found in the LS. At the end of each iteration,
-  // we will copy over this best solution to be the current solution.
-  Merz2004Solution best(*this);
+  // The k-opt engine tracks the best solution found in each iteration, rolling
+  // back to it at the end of the iteration.
+  QUBOKOpt kopt(this);
 
   // Loop until no improvement during loop
   bool improved = true;
   while (improved) {
     // Initialize iteration variables (in terminology of Figure 1, improved
-    // becomes true when Gmax > 0).
+    // becomes true when Gmax > 0). All variables start in set C (not flipped).
     improved = false;
-    std::vector<bool> inC(N_, true);  // Is a variable in set C (not flipped)?
-    int numInC = N_;
+    kopt.StartPass();
 
     // Loop until no variables are in C
     int stepsSinceImprovement = 0;
-    while (stepsSinceImprovement <= m && numInC > 0) {
+    while (stepsSinceImprovement <= m && kopt.get_num_in_C() > 0) {
       // Increment steps since improvement
       ++stepsSinceImprovement;
 
       // Fig 1 Step 1.2.1: Generate random permutation of variables
-      std::vector<int> RP;
-      for (int i=0; i < N_; ++i) {
-	RP.push_back(i);
-      }
-      std::random_shuffle(RP.begin(), RP.end());
+      const std::vector<int>& RP = kopt.RandomPermutation();
 
       // Fig 1 Step 1.2.2: Search all variables (regardless of whether they're
       // in C) in RP order, and flip a variable if doing so will improve best.
       for (int i=0; i < N_; ++i) {
-	if (ImprovesOverAfterMove(best, RP[i])) {
+	if (kopt.ImprovesOverBestAfterMove(RP[i])) {
 	  improved = true;
 	  stepsSinceImprovement = 0;
-	  UpdateCutValues(RP[i]);
-	  if (inC[RP[i]]) {
-	    inC[RP[i]] = false;
-	    --numInC;
-	  }
-	  best = *this;
+	  kopt.Flip(RP[i]);
+	  kopt.SetBest();
 	}
       }
 
       // Break out of loop if we've now exhausted C
-      if (numInC == 0) {
+      if (kopt.get_num_in_C() == 0) {
 	break;
       }
 
       // Fig 1 Steps 1.2.3: Find index j (j \in C) with best diff_weights_[j]
-      int j = -1;
-      double bestGain = -std::numeric_limits<double>::max();
-      for (int i=0; i < N_; ++i) {
-	if (inC[i] && diff_weights_[i] > bestGain) {
-	  j = i;
-	  bestGain = diff_weights_[i];
-	}
-      }
+      int j = kopt.BestInC();
 
-      // Fig 1 Steps 1.2.4, 1.2.6-1.2.7: Flip index j
-      UpdateCutValues(j);
+      // Fig 1 Steps 1.2.4, 1.2.6-1.2.8: Flip index j, removing it from set C
+      kopt.Flip(j);
 
-      // Fig 1 Step 1.2.5: If new solution improves on best, copy it over
-      if (ImprovesOver(best)) {
+      // Fig 1 Step 1.2.5: If new solution improves on best, it becomes best
+      if (kopt.UpdateBest()) {
 	improved = true;
 	stepsSinceImprovement = 0;
-	best = *this;
       }
-
-      // Fig 1 Step 1.2.8: Remove j from set C
-      inC[j] = false;
-      --numInC;
     }
 
-    // Fig 1 Step 1.3: Copy over best to be the current solution
-    operator=(best);
+    // Fig 1 Step 1.3: Return to best as the current solution
+    kopt.RollBack();
   }
 }
 
@@ -156,7 +136,9 @@ void Merz2004Solution::Mutate() {
 
 Merz2004Elite::Merz2004Elite(const QUBOInstance& qi, int PS,
 			     QUBOHeuristic *heuristic) :
-  PS_(PS) {
+  PS_(PS),
+  heuristic_(heuristic),
+  stepsSinceImprovement_(0) {
   // Initialize a random population of size pS, and run local search on each. Sort
   // by objective value.
   std::vector<Merz2004Solution> initial;
@@ -231,9 +213,17 @@ void Merz2004Elite::Diversify() {
     stepsSinceImprovement_ = 0;
 
     // Mutate and local search on each solution except the best (position 0)
+    Profile* profile = &heuristic_->get_profile();
+    profile->Count(Profile::RESTARTS);
     for (int i=1; i < P_.size(); ++i) {
-      P_[i].Mutate();
-      P_[i].RandomizedKOpt();
+      {
+        ProfilePhase phase(profile, Profile::PERTURBATION);
+        P_[i].Mutate();
+      }
+      {
+        ProfilePhase phase(profile, Profile::LOCAL_SEARCH);
+        P_[i].RandomizedKOpt();
+      }
     }
 
     // Re-sort population by objective
@@ -249,7 +239,10 @@ Merz2004::Merz2004(const QUBOInstance& qi, double runtime_limit,
   double crossoverRate = 0.5;
 
   // Fig 5 Steps 1-2: Initialize population and perform local search on each
+  profile_.Count(Profile::RESTARTS);
+  ProfilePhase construction(&profile_, Profile::CONSTRUCTION);
   Merz2004Elite P(qi, PS, this);
+  construction.Stop();
   if (!Report(P.get_best())) {
     return;
   }
@@ -274,9 +267,12 @@ Merz2004::Merz2004(const QUBOInstance& qi, double runtime_limit,
       }
 
       // Fig 5 Step 6: Generate new offspring via crossover
+      ProfilePhase crossover(&profile_, Profile::CROSSOVER);
       Pc.push_back(Merz2004Solution::Crossover(P.get_P()[a], P.get_P()[b]));
+      crossover.Stop();
 
       // Fig 5 Step 7: Perform local search on the new solution
+      ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
       Pc[idx].RandomizedKOpt();
     }
 
@@ -5,6 +5,7 @@
 #include <iostream>
 #include <limits>
 #include "heuristics/qubo/palubeckis2004b.h"
+#include "heuristics/qubo/qubo_tabu.h"
 #include "util/random.h"
 
 Palubeckis2004bSolution::Palubeckis2004bSolution(const QUBOSolution &x) :
@@ -20,43 +21,28 @@ void Palubeckis2004bSolution::STSMod(double *best_objective, int zmax,
 
   // Step 1: Initialize tabu list and operation counter
   // Tabu list -- for efficiency store next iteration where allowed
-  std::vector<int> TabuList(N_, 0);
+  QUBOTabu tabu(this);
   int z = 0;  // Operation counter
-  for (int iter=0; z < zmax; ++iter) {
-    // Step 2: Initialize some iteration variables
-    double V = -std::numeric_limits<double>::max();  // Best possible change
-    int r = -1;  // Best possible index
-    int rho = 0;  // Have we found a best ever solution?
-    for (int k=0; k < N_; ++k) {
-      // Step 3.1: Don't process things on the tabu list
-      if (TabuList[k] > iter) {
-	continue;
-      }
-
-      // Step 3.2: Increment operation counter
-      ++z;
-
-      // Step 3.3: Check if this move would make a best ever solution
-      if (ImprovesOverAfterMove(*best_objective, k)) {
-	r = k;
-	rho = 1;
-	break;
-      }
-
-      // Step 3.4: Check if this move is the best found this iteration
-      if (diff_weights_[k] > V) {
-	V = diff_weights_[k];
-	r = k;
-      }
+  for (; z < zmax; tabu.NextIteration()) {
+    // Steps 2-3: Look for a non-tabu move that would make a best ever solution
+    // (rho), incrementing the operation counter for each non-tabu move
+    // processed; otherwise select the best non-tabu move.
+    int examined;
+    int r = tabu.FirstNonTabuImprovingOver(*best_objective, &examined);
+    z += examined;
+    int rho = (r >= 0);  // Have we found a best ever solution?
+    if (!rho) {
+      r = tabu.BestNonTabu();
     }
 
     // Step 4: Take the selected move
-    UpdateCutValues(r);
+    tabu.Flip(r);
 
     // Step 5: If we just found the best ever solution, perform local search and
     // update the best ever record.
     if (rho) {
       LocalSearch(&z);
+      tabu.Resync();
       *best_objective = weight_;  // New best objective ever
       if (best != NULL) {
 	*best = *this;
@@ -122,7 +108,7 @@ void Palubeckis2004bSolution::STSMod(double *best_objective, int zmax,
     }
 
     // Step 6: Update the tabu list
-    TabuList[r] = iter + T + 1;
+    tabu.MakeTabu(r, T + 1);
   }
 }
 
@@ -167,6 +153,8 @@ Palubeckis2004bMST1::Palubeckis2004bMST1(const QUBOInstance& qi,
   double best_objective = 0.0;
   bool first = true;
   while (true) {
+    profile_.Count(Profile::RESTARTS);
+
     // Step 2: Randomly assign variables as 1 or 0. If this is the first run,
     // assign it as the best objective.
     Palubeckis2004bSolution solution = QUBOSolution::RandomSolution(qi, this);
@@ -176,7 +164,10 @@ Palubeckis2004bMST1::Palubeckis2004bMST1(const QUBOInstance& qi,
     }
     
     // Step 3: Run STS
-    solution.STS(&best_objective, zmax);
+    {
+      ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
+      solution.STS(&best_objective, zmax);
+    }
     
     // Check if out of time
     if (!Report(solution)) {
@@ -381,20 +372,26 @@ Palubeckis2004bMST2::Palubeckis2004bMST2(const QUBOInstance& qi,
 
   // Step 2: Improve this initial random solution with STS. If termination
   // criterion is met, stop execution.
-  x.STS(&best_objective, z1max);
+  {
+    ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
+    x.STS(&best_objective, z1max);
+  }
 
   // Step 3: Loop while termination criterion not met
   while (Report(x)) {
     // Step 4: Run SELECT_VARIABLES to select indices in I_star
+    ProfilePhase perturbation(&profile_, Profile::PERTURBATION);
     std::vector<int> I_star;
     x.SelectVariables(n_prime, &I_star);
 
     // Steps 5+6: Run STEEPEST_ASCENT to flip some subset of the indices in
     // I_star, updating the solution variables based on these flipped values.
     x.SteepestAscent(I_star);
+    perturbation.Stop();
 
     // Step 7: Run STS on x, maintaining x as the current solution as opposed
     // to taking the best solution encountered.
+    ProfilePhase phase(&profile_, Profile::LOCAL_SEARCH);
     x.STS(&best_objective, z2max);
   }
 }
@@ -598,28 +595,10 @@ Palubeckis2004bMST4::Palubeckis2004bMST4(const QUBOInstance& qi,
   }
 }
 
-Palubeckis2004bInstance::Palubeckis2004bInstance(const QUBOInstance& qi,
-						 const Palubeckis2004bSolution& x) :
+Palubeckis2004bInstance::Palubeckis2004bInstance(const QUBOInstance& qi) :
   QUBOInstance(qi) {
-  // Parameters
-  double psel = 0.4;
-  int delta = 1;
-  
-  // Let's start by perturbing the non-zero values from all_nonzero_
-  for (auto iter = get_mutable_all_nonzero_begin();
-       iter != get_mutable_all_nonzero_end(); ++iter) {
-    int i = iter->first.first;
-    int j = iter->first.second;
-    if (Random::RandDouble() <= psel) {
-      if (x.get_assignments()[i] == 1 && x.get_assignments()[j] == 1) {
-	iter->second -= Random::RandInt(0, delta) / 2.0;
-      } else {
-	iter->second += Random::RandInt(0, delta) / 2.0;
-      }
-    }
-  }
-
-  // Now, let's refresh the nonzero_ vectors
+  // Lay out the nonzero_ vectors in the order of all_nonzero_, recording
+  // where each entry lands so Perturb can update it in place.
   for (int ct=0; ct < nonzero_.size(); ++ct) {
     nonzero_[ct].clear();
   }
@@ -628,8 +607,40 @@ Palubeckis2004bInstance::Palubeckis2004bInstance(const QUBOInstance& qi,
     int i = iter->first.first;
     int j = iter->first.second;
     double q_ij = iter->second;
-    nonzero_[i].push_back(std::pair<int, double>(j, q_ij));
-    nonzero_[j].push_back(std::pair<int, double>(i, q_ij));
+    orig_weights_.push_back(q_ij);
+    pos_i_.push_back(nonzero_[i].size());
+    nonzero_[i].push_back(std::pair<int, Instance::Weight>(j, q_ij));
+    pos_j_.push_back(nonzero_[j].size());
+    nonzero_[j].push_back(std::pair<int, Instance::Weight>(i, q_ij));
+  }
+}
+
+void Palubeckis2004bInstance::Perturb(const Palubeckis2004bSolution& x) {
+  // Parameters
+  double psel = 0.4;
+  int delta = 1;
+
+  // The dense matrix sums repeated entries, so it is rebuilt from zero
+  int n = nonzero_.size();
+  std::fill(dense_.begin(), dense_.end(), 0.0);
+  for (int k=0; k < all_nonzero_.size(); ++k) {
+    int i = all_nonzero_[k].first.first;
+    int j = all_nonzero_[k].first.second;
+    double q_ij = orig_weights_[k];
+    if (Random::RandDouble() <= psel) {
+      if (x.get_assignments()[i] == 1 && x.get_assignments()[j] == 1) {
+	q_ij -= Random::RandInt(0, delta) / 2.0;
+      } else {
+	q_ij += Random::RandInt(0, delta) / 2.0;
+      }
+    }
+    all_nonzero_[k].second = q_ij;
+    nonzero_[i][pos_i_[k]].second = q_ij;
+    nonzero_[j][pos_j_[k]].second = q_ij;
+    if (is_dense()) {
+      dense_[(size_t)i * n + j] += q_ij;
+      dense_[(size_t)j * n + i] += q_ij;
+    }
   }
 }
 
@@ -643,7 +654,7 @@ Palubeckis2004bSolution::Palubeckis2004bSolution(const QUBOInstance& perturbed,
 }
 
 Palubeckis2004bSolution::Palubeckis2004bSolution(const Palubeckis2004bSolution& x,
-						 int ignored) :
+						 Palubeckis2004bInstance* perturbed) :
   QUBOSolution(x.qi_, x.heuristic_) {
   // Step 0: Assign parameters
   int Z3;
@@ -656,12 +667,12 @@ Palubeckis2004bSolution::Palubeckis2004bSolution(const Palubeckis2004bSolution&
   }
   int z3max = std::max(500000, qi_.get_size() * Z3);
 
-  // Step 2: Construct a perturbed problem instance
-  QUBOInstance perturbed = Palubeckis2004bInstance(qi_, x);
+  // Step 2: Perturb the problem instance
+  perturbed->Perturb(x);
 
   // Step 3: Use the perturbed instance for this solution. We achieve this by
   // actually constructing a new object with the perturbed instance.
-  Palubeckis2004bSolution y(perturbed, x);
+  Palubeckis2004bSolution y(*perturbed, x);
 
   // Step 4: Run STS on new instance, tracking the best solution obtained in
   // variable best but not reporting new best solutions (because they have
@@ -694,6 +705,9 @@ Palubeckis2004bMST5::Palubeckis2004bMST5(const QUBOInstance& qi,
   int z2max = std::max(500000, qi.get_size() * Z2);
   int tStar = 100;
 
+  // Reusable copy of the instance, perturbed in place by each PERTURB call
+  Palubeckis2004bInstance perturbed(qi);
+
   // Because this algorithm perturbs and then optimizes a single solution, we
   // will wrap it in random restarts.
   while (true) {
@@ -710,7 +724,8 @@ Palubeckis2004bMST5::Palubeckis2004bMST5(const QUBOInstance& qi,
     // Step 3: Loop until termination criterion reached
     for (int t=0; t < tStar; ++t) {
       // Steps 4-5: Obtain a solution with PERTURB
-      Palubeckis2004bSolution x = Palubeckis2004bSolution::Perturb(best);
+      Palubeckis2004bSolution x =
+	Palubeckis2004bSolution::Perturb(best, &perturbed);
       
       // Step 6: Apply STS, again updating the best-ever solution if improved
       x.STS(&best_objective, z2max, &best, true);
@@ -234,10 +234,9 @@ Pardalos2008Probs::Pardalos2008Probs(const std::vector<
   K_(K),
   mu_(mu),
   N_(slns[0].get_assignments().size()),
-  numerator0_((K_+1)*N_, 0.0),
-  numerator1_((K_+1)*N_, 0.0),
-  denominator0_((K_+1)*N_, 0.0),
-  denominator1_((K_+1)*N_, 0.0),
+  total_(2*(K_+1), 0.0),
+  ones_(2*(K_+1)*N_, 0.0),
+  stage_weights_(2*(K_+1)),
   freq1_(N_, 0),
   freq_(0) {
   AddSolutions(slns);
@@ -245,25 +244,29 @@ Pardalos2008Probs::Pardalos2008Probs(const std::vector<
 
 void Pardalos2008Probs::AddSolutions(const std::vector<
 				     Pardalos2008QUBOSolution>& slns) {
-  // Update frequency information
   freq_ += slns.size();
+  const int row = 2*(K_+1);
   for (int idx=0; idx < slns.size(); ++idx) {
-    for (int j=0; j < N_; ++j) {
-      freq1_[j] += (slns[idx].get_assignments()[j] == 1);
+    // The solution's contribution to the numerator and denominator at each
+    // stage, which is added to the totals and to the u=1 sums of each
+    // variable set to 1.
+    double weight = slns[idx].get_weight();
+    for (int k=0; k <= K_; ++k) {
+      double expWeight = exp(-mu_[k] * weight);
+      stage_weights_[2*k] = weight * expWeight;
+      stage_weights_[2*k+1] = expWeight;
+    }
+    for (int r=0; r < row; ++r) {
+      total_[r] += stage_weights_[r];
     }
-  }
 
-  // Update numerator and denominator information
-  for (int idx=0; idx < slns.size(); ++idx) {
-    for (int k=0; k <= K_; ++k) {
-      double expWeight = exp(-mu_[k] * slns[idx].get_weight());
-      for (int j=0; j < N_; ++j) {
-	if (slns[idx].get_assignments()[j]) {
-	  numerator1_[k*N_ + j] += slns[idx].get_weight() * expWeight;
-	  denominator1_[k*N_ + j] += expWeight;
-	} else {
-	  numerator0_[k*N_ + j] += slns[idx].get_weight() * expWeight;
-	  denominator0_[k*N_ + j] += expWeight;
+    const std::vector<int>& assignments = slns[idx].get_assignments();
+    for (int j=0; j < N_; ++j) {
+      if (assignments[j]) {
+	++freq1_[j];
+	double* ones = &ones_[j*row];
+	for (int r=0; r < row; ++r) {
+	  ones[r] += stage_weights_[r];
 	}
       }
     }
@@ -271,24 +274,29 @@ void Pardalos2008Probs::AddSolutions(const std::vector<
 }
 
 void Pardalos2008Probs::GetProbs(int k, std::vector<double>* probs) const {
-  probs->clear();
+  probs->resize(N_);
+  const int row = 2*(K_+1);
   for (int j=0; j < N_; ++j) {
     if (freq1_[j] == 0) {
-      probs->push_back(0.0);
+      (*probs)[j] = 0.0;
     } else if (freq1_[j] == freq_) {
-      probs->push_back(1.0);
+      (*probs)[j] = 1.0;
     } else {
-      // We have seen both a 1 and 0 in position j; compute the prob
+      // We have seen both a 1 and 0 in position j; compute the prob, with the
+      // trapezoid rule over stages 0..k of E_{ij}^0 - E_{ij}^1.
       double pj0 = ((double)freq1_[j]) / freq_;  // Prop of position j as 1
+      const double* ones = &ones_[j*row];
       double expval = 0.0;
-      for (int i=0; i < k; ++i) {
-	expval -= 0.5 * (mu_[i+1] - mu_[i]) *
-	  (numerator0_[i*N_ + j] / denominator0_[i*N_ + j] +
-	   numerator0_[(i+1)*N_ + j] / denominator0_[(i+1)*N_ + j] -
-	   numerator1_[i*N_ + j] / denominator1_[i*N_ + j] -
-	   numerator1_[(i+1)*N_ + j] / denominator1_[(i+1)*N_ + j]);
+      double prevDiff = 0.0;
+      for (int i=0; i <= k; ++i) {
+	double diff = (total_[2*i] - ones[2*i]) / (total_[2*i+1] - ones[2*i+1]) -
+	  ones[2*i] / ones[2*i+1];
+	if (i > 0) {
+	  expval -= 0.5 * (mu_[i] - mu_[i-1]) * (prevDiff + diff);
+	}
+	prevDiff = diff;
       }
-      probs->push_back(1.0 / (1.0 + (1.0 - pj0) / pj0 * exp(expval)));
+      (*probs)[j] = 1.0 / (1.0 + (1.0 - pj0) / pj0 * exp(expval));
     }
   }
 }
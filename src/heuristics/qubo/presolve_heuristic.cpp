@@ -0,0 +1,107 @@
+#include <algorithm>
+#include <vector>
+#include "heuristics/heuristic_factory.h"
+#include "heuristics/qubo/component_heuristic.h"
+#include "heuristics/qubo/presolve_heuristic.h"
+
+PresolveQUBOCallback::PresolveQUBOCallback(QUBOPresolveHeuristic* heuristic) :
+  heuristic_(heuristic) {}
+
+bool PresolveQUBOCallback::Report(const QUBOSimpleSolution& solution,
+                                  bool newBest, double runtime) {
+  if (newBest) {
+    return heuristic_->ReportReduced(solution.get_assignments(),
+                                     solution.get_weight());
+  } else {
+    return heuristic_->Report();  // Not new best solution, so check term. crit.
+  }
+}
+
+bool PresolveQUBOCallback::Report(const QUBOSimpleSolution& solution,
+                                  bool newBest, double runtime, int iter) {
+  if (newBest) {
+    return heuristic_->ReportReduced(solution.get_assignments(),
+                                     solution.get_weight(), iter);
+  } else {
+    return heuristic_->Report(iter);  // Not new best, so check term. crit.
+  }
+}
+
+PresolveMaxCutCallback::PresolveMaxCutCallback(QUBOPresolveHeuristic* heuristic,
+                                               const QUBOInstance& reduced) :
+  heuristic_(heuristic),
+  reduced_(reduced) {}
+
+bool PresolveMaxCutCallback::Report(const MaxCutSimpleSolution& solution,
+                                    bool newBest, double runtime) {
+  if (newBest) {
+    QUBOSimpleSolution sol(solution, reduced_, NULL);
+    return heuristic_->ReportReduced(sol.get_assignments(), sol.get_weight());
+  } else {
+    return heuristic_->Report();  // Not new best solution, so check term. crit.
+  }
+}
+
+bool PresolveMaxCutCallback::Report(const MaxCutSimpleSolution& solution,
+                                    bool newBest, double runtime, int iter) {
+  if (newBest) {
+    QUBOSimpleSolution sol(solution, reduced_, NULL);
+    return heuristic_->ReportReduced(sol.get_assignments(), sol.get_weight(),
+                                     iter);
+  } else {
+    return heuristic_->Report(iter);  // Not new best, so check term. crit.
+  }
+}
+
+const double QUBOPresolveHeuristic::kPresolveFraction = 0.2;
+
+QUBOPresolveHeuristic::QUBOPresolveHeuristic(const QUBOInstance& qi,
+                                             double runtime_limit,
+                                             bool validation, QUBOCallback *qc,
+                                             const std::string& code,
+                                             bool components) :
+  QUBOHeuristic(qi, runtime_limit, validation, qc),
+  presolve_(qi, kPresolveFraction * runtime_limit) {
+  // Report the fixed variables with every free variable set to 0, which is
+  // also the complete solution if every variable was fixed
+  std::vector<int> zeros(presolve_.get_num_free(), 0);
+  if (!ReportReduced(zeros, 0.0) || !presolve_.get_reduced()) {
+    return;
+  }
+
+  const QUBOInstance& reduced = *presolve_.get_reduced();
+  HeuristicFactory factory;
+  Heuristic *h = NULL;
+  double remaining = std::max(0.0, runtime_limit - Runtime());
+  if (components) {
+    // The component heuristic only reports new best solutions, so it must
+    // stop at our runtime limit by itself
+    PresolveQUBOCallback callback(this);
+    h = new QUBOComponentHeuristic(reduced, remaining, false, &callback, code);
+  } else if (factory.ValidQUBOHeuristicCode(code)) {
+    PresolveQUBOCallback callback(this);
+    h = factory.RunQUBOHeuristic(code, reduced, remaining, false, &callback);
+  } else if (factory.ValidMaxCutHeuristicCode(code)) {
+    MaxCutInstance mi(reduced);
+    PresolveMaxCutCallback callback(this, reduced);
+    h = factory.RunMaxCutHeuristic(code, mi, remaining, false, &callback);
+  }
+  if (h) {
+    profile_.Add(h->get_profile());
+    delete h;  // We don't need to keep around the pointer
+  }
+}
+
+bool QUBOPresolveHeuristic::ReportReduced(const std::vector<int>& assignments,
+                                          double weight) {
+  presolve_.Lift(assignments, &lifted_);
+  return Report(QUBOSimpleSolution(qi_, this, lifted_,
+                                   weight + presolve_.get_offset()));
+}
+
+bool QUBOPresolveHeuristic::ReportReduced(const std::vector<int>& assignments,
+                                          double weight, int iter) {
+  presolve_.Lift(assignments, &lifted_);
+  return Report(QUBOSimpleSolution(qi_, this, lifted_,
+                                   weight + presolve_.get_offset()), iter);
+}
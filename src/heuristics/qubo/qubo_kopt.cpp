@@ -0,0 +1,84 @@
+#include <algorithm>
+#include <limits>
+#include <vector>
+#include "heuristics/qubo/qubo_kopt.h"
+
+QUBOKOpt::QUBOKOpt(QUBOSolution* x) :
+  x_(x),
+  N_(x->N_),
+  best_weight_(x->weight_),
+  inC_(x->N_, 1),
+  numInC_(x->N_),
+  RP_(x->N_) {}
+
+void QUBOKOpt::StartPass() {
+  best_weight_ = x_->weight_;
+  std::fill(inC_.begin(), inC_.end(), 1);
+  numInC_ = N_;
+  flips_.clear();
+  old_diff_weights_.clear();
+}
+
+void QUBOKOpt::Flip(int i) {
+  // Log the diff_weights_ entries that UpdateCutValues will change
+  const std::vector<double>& diff_weights = x_->diff_weights_;
+  old_diff_weights_.push_back(std::pair<int, double>(i, diff_weights[i]));
+  for (auto iter = x_->qi_.get_nonzero_begin(i);
+       iter != x_->qi_.get_nonzero_end(i); ++iter) {
+    old_diff_weights_.push_back(std::pair<int, double>(iter->first,
+                                                       diff_weights[iter->first]));
+  }
+  flips_.push_back(i);
+
+  x_->UpdateCutValues(i);
+  if (inC_[i]) {
+    inC_[i] = 0;
+    --numInC_;
+  }
+}
+
+void QUBOKOpt::SetBest() {
+  best_weight_ = x_->weight_;
+  flips_.clear();
+  old_diff_weights_.clear();
+}
+
+bool QUBOKOpt::UpdateBest() {
+  if (x_->ImprovesOver(best_weight_)) {
+    SetBest();
+    return true;
+  }
+  return false;
+}
+
+void QUBOKOpt::RollBack() {
+  for (int k=old_diff_weights_.size()-1; k >= 0; --k) {
+    x_->diff_weights_[old_diff_weights_[k].first] = old_diff_weights_[k].second;
+  }
+  for (size_t k=0; k < flips_.size(); ++k) {
+    x_->assignments_[flips_[k]] = 1 - x_->assignments_[flips_[k]];
+  }
+  x_->weight_ = best_weight_;
+  flips_.clear();
+  old_diff_weights_.clear();
+}
+
+int QUBOKOpt::BestInC() const {
+  int j = -1;
+  double bestGain = -std::numeric_limits<double>::max();
+  for (int i=0; i < N_; ++i) {
+    if (inC_[i] && x_->diff_weights_[i] > bestGain) {
+      j = i;
+      bestGain = x_->diff_weights_[i];
+    }
+  }
+  return j;
+}
+
+const std::vector<int>& QUBOKOpt::RandomPermutation() {
+  for (int i=0; i < N_; ++i) {
+    RP_[i] = i;
+  }
+  std::random_shuffle(RP_.begin(), RP_.end());
+  return RP_;
+}
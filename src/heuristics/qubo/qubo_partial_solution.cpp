@@ -87,6 +87,7 @@ void QUBOPartialSolution::UpdateCutValues(int update_index, int new_value) {
       diff1_[j] +=
 	2.0*qij * (1.0 - assignments_[j]) * (1.0 - assignments_[update_index]);
     }
+    ReindexGains(j);
   }
 
   // Update weight_ as well as assignments_, diff0_ and diff1_ for update_index
@@ -101,4 +102,42 @@ void QUBOPartialSolution::UpdateCutValues(int update_index, int new_value) {
     diff0_[update_index] -= diff1_[update_index];
     diff1_[update_index] = 0.0;
   }
+
+  // update_index is no longer fractional, so its moves leave the gain indices
+  if (!gain_group_.empty()) {
+    for (int m=2*update_index; m <= 2*update_index+1; ++m) {
+      if (gain_group_[m] >= 0 && gain_index_[gain_group_[m]].Contains(m)) {
+	gain_index_[gain_group_[m]].Erase(m);
+      }
+    }
+  }
+}
+
+void QUBOPartialSolution::IndexGains(const std::vector<int>& group,
+				     int num_groups) {
+  gain_index_.assign(num_groups, GainIndex(2*N_));
+  gain_group_ = group;
+  for (int i=0; i < N_; ++i) {
+    if (assignments_[i] == 0.0 || assignments_[i] == 1.0) {
+      continue;  // Only fractional variables have moves
+    }
+    if (group[2*i] >= 0) {
+      gain_index_[group[2*i]].Insert(2*i, diff0_[i]);
+    }
+    if (group[2*i+1] >= 0) {
+      gain_index_[group[2*i+1]].Insert(2*i+1, diff1_[i]);
+    }
+  }
+}
+
+void QUBOPartialSolution::ReindexGains(int i) {
+  if (gain_group_.empty()) {
+    return;
+  }
+  if (gain_group_[2*i] >= 0) {
+    gain_index_[gain_group_[2*i]].Update(2*i, diff0_[i]);
+  }
+  if (gain_group_[2*i+1] >= 0) {
+    gain_index_[gain_group_[2*i+1]].Update(2*i+1, diff1_[i]);
+  }
 }
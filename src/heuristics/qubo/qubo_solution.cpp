@@ -6,6 +6,7 @@
 #include <vector>
 #include "heuristics/qubo/qubo_solution.h"
 #include "problem/qubo_instance.h"
+#include "util/dense_rows.h"
 #include "util/random.h"
 
 // Empty solution
@@ -74,10 +75,18 @@ QUBOSolution::QUBOSolution(const std::vector<int>& assignments,
 void QUBOSolution::UpdateCutValues(int update_index, std::vector<int>* x,
 				   std::vector<double>* diff_weights,
 				   double *objective) const {
+  Count(Profile::FLIPS);
   *objective += (*diff_weights)[update_index];
   (*x)[update_index] = 1 - (*x)[update_index];
   (*diff_weights)[update_index] = -(*diff_weights)[update_index];
 
+  if (qi_.is_dense()) {
+    // Update the whole row, which adds zero for non-neighbors (q_ii is zero)
+    DenseRows::QUBOFlip(qi_.get_dense_row(update_index), &(*x)[0],
+                        (*x)[update_index], N_, &(*diff_weights)[0]);
+    return;
+  }
+
   // Iterate the set of all neighbors for node update_index
   for (auto iter = qi_.get_nonzero_begin(update_index);
        iter != qi_.get_nonzero_end(update_index); ++iter) {
@@ -113,6 +122,8 @@ void QUBOSolution::AllBest2Swap() {
 	best_j = j;
       }
     }
+    Count(Profile::EVALUATIONS,
+          qi_.get_all_nonzero_end() - qi_.get_all_nonzero_begin());
     if (best_i < 0 || !ImprovingMove(best_move)) {
       // No more profitable moves
       break;
@@ -130,8 +141,8 @@ void QUBOSolution::AllFirst2Swap() {
   int move_made = 1;
   while (move_made) {
     move_made = 0;
-    for (auto iter = qi_.get_all_nonzero_begin();
-	 iter != qi_.get_all_nonzero_end(); ++iter) {
+    auto iter = qi_.get_all_nonzero_begin();
+    for (; iter != qi_.get_all_nonzero_end(); ++iter) {
       int i = iter->first.first;
       int j = iter->first.second;
       double q_ij = iter->second;
@@ -146,6 +157,8 @@ void QUBOSolution::AllFirst2Swap() {
 	break;
       }
     }
+    Count(Profile::EVALUATIONS,
+          (iter - qi_.get_all_nonzero_begin()) + (move_made ? 1 : 0));
   }
 }
 
@@ -164,6 +177,29 @@ void QUBOSolution::PopulateFromAssignments() {
   weight_ = 0.0;
   diff_weights_.assign(N_, 0.0);
 
+  if (qi_.is_dense()) {
+    // Sum the rows of the variables set to 1, so diff_weights_[j] holds
+    // S_j = sum of q_ij over those i, then flipping j changes the objective by
+    // lin_j + 2S_j (or its negation if j is set) and the objective is the sum
+    // of lin_j + S_j over the set j.
+    double* S = &diff_weights_[0];
+    for (int i=0; i < N_; ++i) {
+      if (assignments_[i]) {
+        DenseRows::Add(qi_.get_dense_row(i), N_, S);
+      }
+    }
+    const std::vector<double>& lin = qi_.get_lin();
+    for (int j=0; j < N_; ++j) {
+      if (assignments_[j]) {
+        weight_ += lin[j] + S[j];
+        S[j] = -(lin[j] + 2.0 * S[j]);
+      } else {
+        S[j] = lin[j] + 2.0 * S[j];
+      }
+    }
+    return;
+  }
+
   // First, deal with the linear terms based on the assignments
   for (int i=0; i < N_; ++i) {
     if (assignments_[i]) {
@@ -0,0 +1,314 @@
+#include <limits>
+#include <utility>
+#include <vector>
+#include "heuristics/gain_index.h"
+#include "heuristics/qubo/qubo_tabu.h"
+
+namespace {
+const double kNone = -std::numeric_limits<double>::infinity();
+}
+
+QUBOTabu::QUBOTabu(QUBOSolution* x) :
+  x_(x),
+  N_(x->N_),
+  indexed_(GainIndex::Worthwhile(x->N_, x->qi_.get_edge_count())),
+  iter_(0),
+  expiry_(x->N_, 0),
+  scannedBestNonTabu_(-2),
+  size_(1),
+  levels_(0) {
+  if (indexed_) {
+    while (size_ < N_) {
+      size_ *= 2;
+      ++levels_;
+    }
+    Node empty = {kNone, kNone, -1, -1, 0};
+    tree_.assign(2*size_, empty);
+    dirty_.assign(N_, 0);
+    Resync();
+  }
+}
+
+void QUBOTabu::MakeTabu(int i, int tenure) {
+  expiry_[i] = iter_ + tenure;
+  scannedBestNonTabu_ = -2;
+  if (indexed_) {
+    expiring_.push(std::pair<int, int>(expiry_[i], i));
+    MarkDirty(i);
+  }
+}
+
+void QUBOTabu::Flip(int i) {
+  x_->UpdateCutValues(i);
+  scannedBestNonTabu_ = -2;
+  if (indexed_) {
+    MarkDirty(i);
+    for (auto iter = x_->qi_.get_nonzero_begin(i);
+         iter != x_->qi_.get_nonzero_end(i); ++iter) {
+      MarkDirty(iter->first);
+    }
+  }
+}
+
+void QUBOTabu::Resync() {
+  scannedBestNonTabu_ = -2;
+  for (int i=0; i < N_; ++i) {
+    MarkDirty(i);
+  }
+}
+
+int QUBOTabu::BestNonTabu() {
+  if (indexed_) {
+    Refresh();
+    return tree_[1].freeId;
+  }
+
+  if (scannedBestNonTabu_ >= -1) {
+    return scannedBestNonTabu_;  // Found by the last (unsuccessful) First
+  }
+  const std::vector<double>& diff_weights = x_->diff_weights_;
+  int best = -1;
+  double bestVal = kNone;
+  for (int i=0; i < N_; ++i) {
+    if (!IsTabu(i) && (best < 0 || diff_weights[i] > bestVal)) {
+      best = i;
+      bestVal = diff_weights[i];
+    }
+  }
+  return best;
+}
+
+int QUBOTabu::BestMove(double aspiration) {
+  if (indexed_) {
+    Refresh();
+    const Node& root = tree_[1];
+    if (root.tabuId >= 0 &&
+        BaseSolution::ImprovesOver(x_->weight_ + root.tabu, aspiration) &&
+        (root.freeId < 0 || root.tabu > root.free ||
+         (root.tabu == root.free && root.tabuId < root.freeId))) {
+      return root.tabuId;  // Aspirated tabu move
+    }
+    return root.freeId;
+  }
+
+  const std::vector<double>& diff_weights = x_->diff_weights_;
+  int best = -1;
+  double bestVal = kNone;
+  for (int i=0; i < N_; ++i) {
+    if ((best < 0 || diff_weights[i] > bestVal) &&
+        (!IsTabu(i) || x_->ImprovesOverAfterMove(aspiration, i))) {
+      best = i;
+      bestVal = diff_weights[i];
+    }
+  }
+  return best;
+}
+
+void QUBOTabu::BestMoves(double aspiration, std::vector<int>* ties) {
+  ties->clear();
+  double weight = x_->weight_;
+  const std::vector<double>& diff_weights = x_->diff_weights_;
+
+  if (!indexed_) {
+    // One pass, keeping the moves tied with the best move so far (a move that
+    // is not tied with it is not tied with any better move either)
+    int best = -1;
+    for (int i=0; i < N_; ++i) {
+      if (IsTabu(i) && !x_->ImprovesOverAfterMove(aspiration, i)) {
+        continue;
+      }
+      if (best >= 0 && diff_weights[i] <= diff_weights[best]) {
+        if (!BaseSolution::ImprovesOver(weight + diff_weights[best],
+                                        weight + diff_weights[i])) {
+          ties->push_back(i);
+        }
+        continue;
+      }
+      best = i;
+      int kept = 0;
+      for (int k=0; k < ties->size(); ++k) {
+        if (!BaseSolution::ImprovesOver(weight + diff_weights[i],
+                                        weight + diff_weights[(*ties)[k]])) {
+          (*ties)[kept++] = (*ties)[k];
+        }
+      }
+      ties->resize(kept);
+      ties->push_back(i);
+    }
+    return;
+  }
+
+  int best = BestMove(aspiration);
+  if (best < 0) {
+    return;
+  }
+  double bestWeight = weight + diff_weights[best];
+
+  // Depth-first search in index order through the subtrees with a non-tabu
+  // move tied with the best or an aspirated tabu move tied with the best
+  stack_.assign(1, 1);
+  while (!stack_.empty()) {
+    int p = stack_.back();
+    stack_.pop_back();
+    const Node& node = tree_[p];
+    bool freeTie = node.freeId >= 0 &&
+      !BaseSolution::ImprovesOver(bestWeight, weight + node.free);
+    bool tabuTie = node.tabuId >= 0 &&
+      !BaseSolution::ImprovesOver(bestWeight, weight + node.tabu) &&
+      BaseSolution::ImprovesOver(weight + node.tabu, aspiration);
+    if (!freeTie && !tabuTie) {
+      continue;
+    }
+    if (p >= size_) {
+      ties->push_back(p - size_);
+    } else {
+      stack_.push_back(2*p+1);
+      stack_.push_back(2*p);
+    }
+  }
+}
+
+int QUBOTabu::FirstNonTabuImprovingOver(double weight, int* examined) {
+  return First(std::numeric_limits<double>::max(), weight, examined);
+}
+
+int QUBOTabu::FirstAspiratedOrImproving(double aspiration) {
+  int examined;
+  return First(aspiration, x_->weight_, &examined);
+}
+
+int QUBOTabu::First(double tabuWeight, double freeWeight, int* examined) {
+  double weight = x_->weight_;
+  if (!indexed_) {
+    // Also find the best non-tabu move on the way, in case it is asked for
+    // next
+    const std::vector<double>& diff_weights = x_->diff_weights_;
+    int count = 0;
+    int best = -1;
+    double bestVal = kNone;
+    for (int i=0; i < N_; ++i) {
+      if (IsTabu(i)) {
+        if (BaseSolution::ImprovesOver(weight + diff_weights[i], tabuWeight)) {
+          *examined = count;
+          return i;
+        }
+      } else {
+        ++count;
+        if (BaseSolution::ImprovesOver(weight + diff_weights[i], freeWeight)) {
+          *examined = count;
+          return i;
+        }
+        if (best < 0 || diff_weights[i] > bestVal) {
+          best = i;
+          bestVal = diff_weights[i];
+        }
+      }
+    }
+    *examined = count;
+    scannedBestNonTabu_ = best;
+    return -1;
+  }
+
+  Refresh();
+  int p = 1;
+  int count = 0;
+  while (true) {
+    const Node& node = tree_[p];
+    bool found = (node.tabuId >= 0 &&
+                  BaseSolution::ImprovesOver(weight + node.tabu, tabuWeight)) ||
+      (node.freeId >= 0 &&
+       BaseSolution::ImprovesOver(weight + node.free, freeWeight));
+    if (!found) {
+      // Only possible at the root (we only descend into matching subtrees)
+      *examined = node.numFree;
+      return -1;
+    }
+    if (p >= size_) {
+      *examined = count + node.numFree;
+      return p - size_;
+    }
+    const Node& left = tree_[2*p];
+    if ((left.tabuId >= 0 &&
+         BaseSolution::ImprovesOver(weight + left.tabu, tabuWeight)) ||
+        (left.freeId >= 0 &&
+         BaseSolution::ImprovesOver(weight + left.free, freeWeight))) {
+      p = 2*p;
+    } else {
+      count += left.numFree;
+      p = 2*p+1;
+    }
+  }
+}
+
+void QUBOTabu::Refresh() {
+  // Release the variables whose tabu tenure has expired
+  while (!expiring_.empty() && expiring_.top().first <= iter_) {
+    int i = expiring_.top().second;
+    if (expiry_[i] == expiring_.top().first) {
+      MarkDirty(i);
+    }
+    expiring_.pop();
+  }
+  if (dirtyList_.empty()) {
+    return;
+  }
+
+  for (int k=0; k < dirtyList_.size(); ++k) {
+    SetLeaf(dirtyList_[k]);
+  }
+  if ((long long)dirtyList_.size() * levels_ >= size_) {
+    // Rebuilding all the internal nodes is cheaper than the paths
+    for (int p=size_-1; p >= 1; --p) {
+      Combine(p);
+    }
+  } else {
+    for (int k=0; k < dirtyList_.size(); ++k) {
+      for (int p=(size_ + dirtyList_[k]) / 2; p >= 1; p /= 2) {
+        Combine(p);
+      }
+    }
+  }
+  for (int k=0; k < dirtyList_.size(); ++k) {
+    dirty_[dirtyList_[k]] = 0;
+  }
+  dirtyList_.clear();
+}
+
+void QUBOTabu::SetLeaf(int i) {
+  Node& leaf = tree_[size_ + i];
+  if (IsTabu(i)) {
+    leaf.free = kNone;
+    leaf.freeId = -1;
+    leaf.tabu = x_->diff_weights_[i];
+    leaf.tabuId = i;
+    leaf.numFree = 0;
+  } else {
+    leaf.free = x_->diff_weights_[i];
+    leaf.freeId = i;
+    leaf.tabu = kNone;
+    leaf.tabuId = -1;
+    leaf.numFree = 1;
+  }
+}
+
+void QUBOTabu::Combine(int p) {
+  // Ties go to the left child, which holds the smaller indices
+  const Node& left = tree_[2*p];
+  const Node& right = tree_[2*p+1];
+  Node& node = tree_[p];
+  if (right.freeId < 0 || (left.freeId >= 0 && left.free >= right.free)) {
+    node.free = left.free;
+    node.freeId = left.freeId;
+  } else {
+    node.free = right.free;
+    node.freeId = right.freeId;
+  }
+  if (right.tabuId < 0 || (left.tabuId >= 0 && left.tabu >= right.tabu)) {
+    node.tabu = left.tabu;
+    node.tabuId = left.tabuId;
+  } else {
+    node.tabu = right.tabu;
+    node.tabuId = right.tabuId;
+  }
+  node.numFree = left.numFree + right.numFree;
+}
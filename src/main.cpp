@@ -1,4 +1,6 @@
+#include <signal.h>
 #include <stdlib.h>
+#include <sys/time.h>
 #include <string.h>
 #include <iomanip>
 #include <iostream>
@@ -6,7 +8,11 @@
 
 #include "heuristics/heuristic_factory.h"
 #include "heuristics/maxcut/hyperheuristic.h"
+#include "heuristics/maxcut/kernel_heuristic.h"
+#include "heuristics/qubo/component_heuristic.h"
+#include "heuristics/qubo/presolve_heuristic.h"
 #include "metrics/max_cut_metrics.h"
+#include "problem/history_stream.h"
 #include "problem/max_cut_instance.h"
 #include "problem/qubo_instance.h"
 #include "util/ezOptionParser.h"
@@ -41,7 +47,7 @@ int main(int argc, const char* argv[]) {
   ez::ezOptionParser opt;
 
   opt.overview = "MQLib: Library of Max-Cut and QUBO heuristics";
-  opt.syntax = "\n# Run Max-Cut or QUBO heuristic\n./bin/MQlib -h heur_code | -hh -fM maxcut_file [-nv] [-ps] [-q | -r runtime_limit] [-s SEED]\n./bin/MQlib -h heur_code | -hh -fQ qubo_file [-nv] [-ps] [-q | -r runtime_limit] [-s SEED]\n\n# Compute metrics for an input file\n./bin/MQlib -fM maxcut_file [-mh] [-m]\n./bin/MQlib -fQ qubo_file [-mh] [-m]\n\n# List the available heuristics.\n./bin/MQlib -l";
+  opt.syntax = "\n# Run Max-Cut or QUBO heuristic\n./bin/MQlib -h heur_code | -hh -fM maxcut_file [-kr] [-pp] [-cc] [-nv] [-ps] [-pr] [-hs FD] [-q | -r runtime_limit] [-s SEED]\n./bin/MQlib -h heur_code | -hh -fQ qubo_file [-kr] [-pp] [-cc] [-nv] [-ps] [-pr] [-hs FD] [-q | -r runtime_limit] [-s SEED]\n\n# Compute metrics for an input file\n./bin/MQlib -fM maxcut_file [-mh] [-m]\n./bin/MQlib -fQ qubo_file [-mh] [-m]\n\n# List the available heuristics.\n./bin/MQlib -l";
   opt.example = "./bin/MQlib -h BURER2002 -fM bin/sampleMaxCut.txt -r 10\n";
 
   opt.add("",  // Default
@@ -66,7 +72,7 @@ int main(int argc, const char* argv[]) {
 	  0,  // Required?
 	  1,  // Number of args expected
 	  0,  // Delimiter if expecting multiple args
-	  "Filename for Max-Cut problem instance.",  // Help description
+	  "Filename for Max-Cut problem instance (- reads standard input).",  // Help description
 	  "-fM",  // Flag token
 	  "--fileMaxCut"
 	  );
@@ -75,7 +81,7 @@ int main(int argc, const char* argv[]) {
 	  0,  // Required?
 	  1,  // Number of args expected
 	  0,  // Delimiter if expecting multiple args
-	  "Filename for QUBO problem instance.",  // Help description
+	  "Filename for QUBO problem instance (- reads standard input).",  // Help description
 	  "-fQ",  // Flag token
 	  "--fileQUBO"
 	  );
@@ -92,6 +98,43 @@ int main(int argc, const char* argv[]) {
 	  vU2
 	  );
 
+  opt.add("1",  // Default
+	  0,  // Required?
+	  1,  // Number of args expected
+	  0,  // Delimiter if expecting multiple args
+	  "Number of threads for heuristics that support multi-threading (currently BURER2002, also when selected by -hh). With -s, the search on each thread is reproducible. Default 1.",  // Help description
+	  "-t",  // Flag token
+	  "--threads",
+	  vU2
+	  );
+
+  opt.add("",  // Default
+          0,  // Required?
+          0,  // Number of args expected
+          0,  // Delimiter if expecting multiple args
+          "Kernelize (with -h): remove the nodes of degree at most 2 from the Max-Cut form of the instance, run the heuristic on the reduced instance (with -pp and -cc applied to its QUBO form), and report solutions of the original instance.",  // Help description
+          "-kr",  // Flag token
+          "--kernelize"
+          );
+
+  opt.add("",  // Default
+          0,  // Required?
+          0,  // Number of args expected
+          0,  // Delimiter if expecting multiple args
+          "Presolve (with -h): fix variables of the QUBO form of the instance using first-order persistency and roof duality, run the heuristic on the reduced instance, and report solutions of the original instance.",  // Help description
+          "-pp",  // Flag token
+          "--presolve"
+          );
+
+  opt.add("",  // Default
+          0,  // Required?
+          0,  // Number of args expected
+          0,  // Delimiter if expecting multiple args
+          "Components (with -h): split the QUBO form of the instance (after presolve with -pp) into connected components, solve trees and components of at most 20 variables exactly, and run the heuristic on each other component, several at a time with -t. Runs with -t are not reproducible with -s.",  // Help description
+          "-cc",  // Flag token
+          "--components"
+          );
+
   opt.add("",  // Default
 	  0,  // Required?
 	  0,  // Number of args expected
@@ -128,6 +171,27 @@ int main(int argc, const char* argv[]) {
           "--printSolution"
           );
 
+  // File descriptor must be a non-negative integer
+  ez::ezOptionValidator* vFD = new ez::ezOptionValidator("u4");
+  opt.add("",  // Default
+          0,   // Required?
+          1,   // Number of args expected
+          0,   // Delimiter if expecting multiple args
+          "Stream each new best solution as it is found, as an NDJSON line {\"value\":V,\"time\":T[,\"iter\":I]}, to the given file descriptor (e.g. -hs 3 3>history.ndjson). If the stream has been closed, the run stops at the next new best solution.",  // Help description
+          "-hs",  // Flag token
+          "--historyStream",
+          vFD
+          );
+
+  opt.add("",  // Default
+          0,   // Required?
+          0,   // Number of args expected
+          0,   // Delimiter if expecting multiple args
+          "Print profiling counters (flips, evaluations, restarts, reports) and per-phase times as JSON on the line after the results. Counters and phases that the heuristic does not record are null. Restarts and phase times are recorded by BURER2002, DUARTE2005, the FESTA2002 heuristics, HASAN2000GA, KATAYAMA2000, LODI1999, LU2010, the MERZ1999 heuristics, MERZ2004 and PALUBECKIS2004bMST1 (PALUBECKIS2004bMST2 records phase times only).",  // Help description
+          "-pr",  // Flag token
+          "--profile"
+          );
+
   opt.add("",  // Default
 	  0,  // Required?
 	  0,  // Number of args expected
@@ -189,8 +253,10 @@ int main(int argc, const char* argv[]) {
   }
 
   // Check if any of the options for a heuristic run are set
-  bool heurSet = opt.isSet("-h") || opt.isSet("-hh") || opt.isSet("-nv") ||
-    opt.isSet("-ps") || opt.isSet("-q") || opt.isSet("-r") || opt.isSet("-s");
+  bool heurSet = opt.isSet("-h") || opt.isSet("-hh") || opt.isSet("-kr") ||
+    opt.isSet("-pp") || opt.isSet("-cc") || opt.isSet("-nv") ||
+    opt.isSet("-ps") || opt.isSet("-pr") || opt.isSet("-hs") || opt.isSet("-q") || opt.isSet("-r") || opt.isSet("-s") ||
+    opt.isSet("-t");
   bool metricSet = opt.isSet("-m") || opt.isSet("-mh");
   bool listSet = opt.isSet("-l");
   int numSet = ((int)heurSet) + ((int)metricSet) + ((int)listSet);
@@ -226,6 +292,13 @@ int main(int argc, const char* argv[]) {
     Usage(opt);
     return 1;
   }
+  if ((opt.isSet("-kr") || opt.isSet("-pp") || opt.isSet("-cc")) &&
+      !opt.isSet("-h")) {
+    std::cout << "ERROR: -kr, -pp and -cc can only be used with -h" <<
+      std::endl;
+    Usage(opt);
+    return 1;
+  }
 
   // Exactly one of -fM and -fQ required unless we are running with -mh alone
   // in which case you can run with neither set.
@@ -261,6 +334,18 @@ int main(int argc, const char* argv[]) {
       opt.get("-s")->getInt(seed);
     }
     srand(seed);
+
+    // Set the number of threads for heuristics that can use several
+    int num_threads = 1;
+    opt.get("-t")->getInt(num_threads);
+    if (num_threads < 1) {
+      std::cout << "Illegal number of threads: " << num_threads << std::endl;
+      return 1;
+    }
+    Heuristic::set_num_threads(num_threads);
+
+    // Turn on the profiling counters and timers if requested
+    Profile::set_enabled(opt.isSet("-pr"));
     
     // Compute the runtime limit
     double runtime_limit = RuntimeLimit(mi, qi);
@@ -275,6 +360,20 @@ int main(int argc, const char* argv[]) {
       }
     }
     
+    // Stream new best solutions if requested; a closed stream ends the run
+    // instead of raising SIGPIPE
+    HistoryStream* stream = NULL;
+    MaxCutCallback* mc = NULL;
+    QUBOCallback* qc = NULL;
+    if (opt.isSet("-hs")) {
+      int fd;
+      opt.get("-hs")->getInt(fd);
+      signal(SIGPIPE, SIG_IGN);
+      stream = new HistoryStream(fd);
+      mc = new StreamingMaxCutCallback(stream, runtime_limit);
+      qc = new StreamingQUBOCallback(stream, runtime_limit);
+    }
+
     // Run the heuristic
     bool validation = !opt.isSet("-nv");
     MaxCutHeuristic *mh = NULL;
@@ -285,19 +384,45 @@ int main(int argc, const char* argv[]) {
       // Run a specified heuristic
       opt.get("-h")->getString(heuristic_code);
       HeuristicFactory factory;
-      if (factory.ValidMaxCutHeuristicCode(heuristic_code)) {
+      if (opt.isSet("-kr") &&
+          (factory.ValidMaxCutHeuristicCode(heuristic_code) ||
+           factory.ValidQUBOHeuristicCode(heuristic_code))) {
+        // Kernelize the Max-Cut form of the instance
+        if (!mi) {
+          mi = new MaxCutInstance(*qi);
+        }
+        mh = new MaxCutKernelHeuristic(*mi, runtime_limit, validation, mc,
+                                       heuristic_code, opt.isSet("-pp"),
+                                       opt.isSet("-cc"));
+        heuristic = mh;
+      } else if ((opt.isSet("-pp") || opt.isSet("-cc")) &&
+          (factory.ValidMaxCutHeuristicCode(heuristic_code) ||
+           factory.ValidQUBOHeuristicCode(heuristic_code))) {
+        // Presolve and/or decompose the QUBO form of the instance
+        if (!qi) {
+          qi = new QUBOInstance(*mi);
+        }
+        if (opt.isSet("-pp")) {
+          qh = new QUBOPresolveHeuristic(*qi, runtime_limit, validation, qc,
+                                         heuristic_code, opt.isSet("-cc"));
+        } else {
+          qh = new QUBOComponentHeuristic(*qi, runtime_limit, validation, qc,
+                                          heuristic_code);
+        }
+        heuristic = qh;
+      } else if (factory.ValidMaxCutHeuristicCode(heuristic_code)) {
         if (!mi) {
           mi = new MaxCutInstance(*qi);
         }
         mh = factory.RunMaxCutHeuristic(heuristic_code, *mi, runtime_limit,
-                                        validation, NULL);
+                                        validation, mc);
         heuristic = mh;
       } else if (factory.ValidQUBOHeuristicCode(heuristic_code)) {
         if (!qi) {
           qi = new QUBOInstance(*mi);
         }
         qh = factory.RunQUBOHeuristic(heuristic_code, *qi, runtime_limit,
-                                      validation, NULL);
+                                      validation, qc);
         heuristic = qh;
       } else {
         std::cout << "Illegal heuristic code " << heuristic_code << std::endl;
@@ -311,7 +436,7 @@ int main(int argc, const char* argv[]) {
         mi = new MaxCutInstance(*qi);
       }
       std::string selected;
-      mh = new MaxCutHyperheuristic(*mi, runtime_limit, validation, NULL, seed,
+      mh = new MaxCutHyperheuristic(*mi, runtime_limit, validation, mc, seed,
                                     &selected);
       heuristic = mh;
       heuristic_code = "HH_" + selected;
@@ -328,7 +453,11 @@ int main(int argc, const char* argv[]) {
       // Common output whenever we're running heuristics
       std::cout << runtime_limit << "," << heuristic_code << ",\"" << filename <<
         "\"," << std::setprecision(15) << heuristic->get_best() << "," <<
-        final_runtime << "," << heuristic->History() << std::endl;
+        final_runtime << "," << heuristic->History() << "," <<
+        heuristic->get_profile().get_overshoot() << std::endl;
+      if (opt.isSet("-pr")) {
+        std::cout << heuristic->get_profile().ToJSON() << std::endl;
+      }
     }
     
     // Print out the final solution if requested
@@ -357,6 +486,11 @@ int main(int argc, const char* argv[]) {
       delete qh;
       qh = NULL;
     }
+    if (stream) {
+      delete mc;
+      delete qc;
+      delete stream;
+    }
   } else {
     /************* Handle metricSet case ****************/
     if (opt.isSet("-mh")) {
@@ -0,0 +1,40 @@
+#include <stdint.h>
+#include <vector>
+#include "problem/flip_history.h"
+
+FlipHistory::FlipHistory(const std::vector<int>& initial) :
+  initial_(initial) {
+  offsets_.push_back(0);
+  hashes_.push_back(Hash(initial));
+}
+
+uint64_t FlipHistory::Key(int i) {
+  // splitmix64 finalizer
+  uint64_t z = (uint64_t)i * 0x9E3779B97F4A7C15ULL + 0x9E3779B97F4A7C15ULL;
+  z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+  z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+  return z ^ (z >> 31);
+}
+
+uint64_t FlipHistory::Hash(const std::vector<int>& assignments) {
+  uint64_t hash = 0;
+  for (int i=0; i < assignments.size(); ++i) {
+    if (assignments[i] == 1) {
+      hash ^= Key(i);
+    }
+  }
+  return hash;
+}
+
+void FlipHistory::Append(const std::vector<int>& prev,
+                         const std::vector<int>& next) {
+  uint64_t hash = hashes_.back();
+  for (int i=0; i < next.size(); ++i) {
+    if (prev[i] != next[i]) {
+      flips_.push_back(i);
+      hash ^= Key(i);
+    }
+  }
+  offsets_.push_back(flips_.size());
+  hashes_.push_back(hash);
+}
@@ -1,23 +1,145 @@
+#include <math.h>
 #include <stdlib.h>
 #include <time.h>
 #include <iomanip>
+#include <algorithm>
 #include <iostream>
 #include <vector>
 #include "problem/heuristic.h"
 
+int Heuristic::num_threads_ = 1;
+
+const double Heuristic::kPreciseCheckPeriod = 0.0005;
+
+// Clock used by CoarseRuntime (the fast coarse clock is Linux-specific)
+#ifdef CLOCK_MONOTONIC_COARSE
+static const clockid_t kCoarseClock = CLOCK_MONOTONIC_COARSE;
+#else
+static const clockid_t kCoarseClock = CLOCK_MONOTONIC;
+#endif
+
+// Seconds from start to end, to the microsecond
+static double Elapsed(const struct timespec& start,
+                      const struct timespec& end) {
+  return (end.tv_sec - start.tv_sec) +
+    0.000001 * ((end.tv_nsec - start.tv_nsec) / 1000);
+}
+
+// Resolution of kCoarseClock as reported by the system (e.g. 4ms with a
+// 250Hz kernel tick), and never less than kPreciseCheckPeriod so that far
+// from the limit the clock is not read more often than near it
+static double MeasureCoarseResolution(double min_resolution) {
+  struct timespec res;
+  if (clock_getres(kCoarseClock, &res) != 0) {
+    return min_resolution;
+  }
+  return std::max(min_resolution, res.tv_sec + 1e-9 * res.tv_nsec);
+}
+
+void Heuristic::set_num_threads(int num_threads) {
+  num_threads_ = num_threads < 1 ? 1 : num_threads;
+}
+
 Heuristic::Heuristic(double runtime_limit, bool validation) :
   validation_(validation),
   best_(0.0),
-  runtime_limit_(runtime_limit) {
-  gettimeofday(&start_time_, 0);
+  runtime_limit_(runtime_limit),
+  check_interval_(1),
+  calls_until_check_(1),
+  calls_since_check_(1),
+  last_check_time_(0.0),
+  precise_(false),
+  limit_reached_(false),
+  overshoot_(0.0) {
+  clock_gettime(CLOCK_MONOTONIC, &start_time_);
 }
 
 double Heuristic::Runtime() {
-  struct timeval tv;
-  gettimeofday(&tv, 0);
-  double secs = (tv.tv_sec - start_time_.tv_sec) + 0.000001 *
-    (tv.tv_usec - start_time_.tv_usec);
-  return secs;
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return Elapsed(start_time_, ts);
+}
+
+double Heuristic::CoarseRuntime() const {
+  struct timespec ts;
+  clock_gettime(kCoarseClock, &ts);
+  return Elapsed(start_time_, ts);
+}
+
+double Heuristic::CoarseResolution() {
+  static const double resolution =
+    MeasureCoarseResolution(kPreciseCheckPeriod);
+  return resolution;
+}
+
+bool Heuristic::ShouldStop(double runtime) {
+  if (runtime < runtime_limit_) {
+    return false;
+  }
+  if (!limit_reached_) {
+    limit_reached_ = true;
+    overshoot_ = runtime - runtime_limit_;
+    profile_.set_overshoot(overshoot_);
+  }
+  calls_until_check_ = 1;  // Check again on the next call to ShouldStop()
+  return true;
+}
+
+bool Heuristic::CheckRuntimeLimit() {
+  // The coarse clock lags by up to one tick, so switch to the precise clock
+  // a few ticks before the limit
+  double now;
+  if (!precise_) {
+    now = CoarseRuntime();
+    precise_ = now >= runtime_limit_ - kPreciseTicks * CoarseResolution();
+  }
+  if (precise_) {
+    now = Runtime();
+  }
+  if (now >= runtime_limit_) {
+    return ShouldStop(now);
+  }
+
+  // Double the interval while clock reads come much more often than every
+  // period seconds (with the coarse clock the elapsed time is often 0), and
+  // scale it down to the recent time per call when they come much less often.
+  double period = precise_ ? kPreciseCheckPeriod : CoarseResolution();
+  double elapsed = now - last_check_time_;
+  if (elapsed < period / 2) {
+    check_interval_ = std::min(2 * check_interval_, kMaxCheckInterval);
+  } else if (elapsed > period * 2) {
+    check_interval_ = std::max(1, (int)(calls_since_check_ * period /
+                                        elapsed));
+  }
+
+  // Near the limit, shorten the interval so that (at the recent time per
+  // call) the next check comes soon after the limit is reached
+  int interval = check_interval_;
+  if (elapsed > 0.0) {
+    double calls_to_limit = (runtime_limit_ - now) / elapsed *
+      calls_since_check_ + 1;
+    if (calls_to_limit < interval) {
+      interval = (int)calls_to_limit;
+    }
+  }
+  last_check_time_ = now;
+  calls_until_check_ = interval;
+  calls_since_check_ = interval;
+  return false;
+}
+
+bool Heuristic::ValidObjective(double true_val, double reported_val) {
+  double true_abs = fabs(true_val);
+  double diff = fabs(true_val - reported_val);
+  if (diff != 0.0 && (true_abs == 0 || diff / true_abs >= 1e-8)) {
+    // Significant error (based on relative difference)
+    std::cout << std::endl << true_val
+              << std::endl << reported_val
+              << std::endl << diff
+              << std::endl;
+    return false;
+  }
+  return true;
 }
 
 std::string Heuristic::History() {
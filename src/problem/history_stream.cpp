@@ -0,0 +1,79 @@
+#include <errno.h>
+#include <stdio.h>
+#include <unistd.h>
+#include "problem/history_stream.h"
+
+HistoryStream::HistoryStream(int fd) :
+  fd_(fd) {}
+
+bool HistoryStream::Write(double value, double runtime) {
+  char line[128];
+  int len = snprintf(line, sizeof(line), "{\"value\":%.15g,\"time\":%.15g}\n",
+                     value, runtime);
+  return WriteLine(line, len);
+}
+
+bool HistoryStream::Write(double value, double runtime, int iter) {
+  char line[128];
+  int len = snprintf(line, sizeof(line),
+                     "{\"value\":%.15g,\"time\":%.15g,\"iter\":%d}\n", value,
+                     runtime, iter);
+  return WriteLine(line, len);
+}
+
+bool HistoryStream::WriteLine(const char* line, int len) {
+  while (len > 0) {
+    ssize_t written = write(fd_, line, len);
+    if (written < 0) {
+      if (errno == EINTR) {
+        continue;
+      }
+      return false;
+    }
+    line += written;
+    len -= written;
+  }
+  return true;
+}
+
+StreamingMaxCutCallback::StreamingMaxCutCallback(HistoryStream* stream,
+                                                 double runtime_limit) :
+  stream_(stream),
+  runtime_limit_(runtime_limit) {}
+
+bool StreamingMaxCutCallback::Report(const MaxCutSimpleSolution& solution,
+                                     bool newBest, double runtime) {
+  if (newBest && !stream_->Write(solution.get_weight(), runtime)) {
+    return false;
+  }
+  return runtime < runtime_limit_;
+}
+
+bool StreamingMaxCutCallback::Report(const MaxCutSimpleSolution& solution,
+                                     bool newBest, double runtime, int iter) {
+  if (newBest && !stream_->Write(solution.get_weight(), runtime, iter)) {
+    return false;
+  }
+  return runtime < runtime_limit_;
+}
+
+StreamingQUBOCallback::StreamingQUBOCallback(HistoryStream* stream,
+                                             double runtime_limit) :
+  stream_(stream),
+  runtime_limit_(runtime_limit) {}
+
+bool StreamingQUBOCallback::Report(const QUBOSimpleSolution& solution,
+                                   bool newBest, double runtime) {
+  if (newBest && !stream_->Write(solution.get_weight(), runtime)) {
+    return false;
+  }
+  return runtime < runtime_limit_;
+}
+
+bool StreamingQUBOCallback::Report(const QUBOSimpleSolution& solution,
+                                   bool newBest, double runtime, int iter) {
+  if (newBest && !stream_->Write(solution.get_weight(), runtime, iter)) {
+    return false;
+  }
+  return runtime < runtime_limit_;
+}
@@ -1,14 +1,22 @@
 #include <math.h>
 #include <stdlib.h>
 #include <string.h>
+#include <stdio.h>
 #include <fstream>
 #include <iostream>
+#include <sstream>
 #include <string>
 #include <vector>
 #include "problem/instance.h"
+#include "util/compressed_file.h"
+
+namespace {
+// Largest dense matrix kept, in bytes
+const double kDenseMaxBytes = 1 << 30;
+}
 
 void Instance::AddLink(int n1, int n2, double weight,
-		       std::vector<std::vector<std::pair<int, double> > >* links,
+		       std::vector<std::vector<std::pair<int, Weight> > >* links,
 		       std::vector<InstanceTuple>* all,
 		       std::vector<double>* selfLinks, bool selfLinkAsError) {
   if (n1 == n2) {
@@ -22,8 +30,8 @@ void Instance::AddLink(int n1, int n2, double weight,
     return;
   }
 
-  (*links)[n1].push_back(std::pair<int, double>(n2, weight));
-  (*links)[n2].push_back(std::pair<int, double>(n1, weight));
+  (*links)[n1].push_back(std::pair<int, Weight>(n2, weight));
+  (*links)[n2].push_back(std::pair<int, Weight>(n1, weight));
   if (n2 > n1) {
     all->push_back(InstanceTuple(std::make_pair(n1, n2), weight));
   } else {
@@ -33,7 +41,7 @@ void Instance::AddLink(int n1, int n2, double weight,
 
 void Instance::Load(int dimension,
                     const std::vector<InstanceTuple>& provided,
-                    std::vector<std::vector<std::pair<int, double> > >* links,
+                    std::vector<std::vector<std::pair<int, Weight> > >* links,
                     std::vector<InstanceTuple>* all,
                     std::vector<double>* selfLinks, bool selfLinkAsError) {
   if (!links || !all) {
@@ -52,7 +60,7 @@ void Instance::Load(int dimension,
 
   // Initialize state based on stated dimension
   for (int ct=0; ct < dimension; ++ct) {
-    links->push_back(std::vector<std::pair<int, double> >());
+    links->push_back(std::vector<std::pair<int, Weight> >());
     if (selfLinks) {
       selfLinks->push_back(0.0);
     }
@@ -75,7 +83,7 @@ void Instance::Load(int dimension,
 }
 
 void Instance::Load(const std::string& filename,
-		    std::vector<std::vector<std::pair<int, double> > >* links,
+		    std::vector<std::vector<std::pair<int, Weight> > >* links,
 		    std::vector<InstanceTuple>* all,
 		    std::vector<double>* selfLinks, bool selfLinkAsError) {
   if (!links || !all) {
@@ -87,16 +95,54 @@ void Instance::Load(const std::string& filename,
   if (selfLinks) {
     selfLinks->clear();
   }
-  std::ifstream file(filename.c_str());
-  if (!file.is_open()) {
-    std::cout << "File cannot be opened: " << filename << std::endl;
-    exit(1);    
+
+  if (filename == "-") {
+    // Read the instance text from standard input, so drivers can pipe in a
+    // decompressed archive without writing it to disk.
+    std::string contents;
+    std::vector<char> buf(1 << 17);
+    size_t num_read;
+    while ((num_read = fread(&buf[0], 1, buf.size(), stdin)) > 0) {
+      contents.append(&buf[0], num_read);
+    }
+    if (ferror(stdin)) {
+      std::cout << "IO error reading standard input" << std::endl;
+      exit(1);
+    }
+    std::istringstream file(contents);
+    LoadStream(file, "standard input", links, all, selfLinks,
+               selfLinkAsError);
+  } else if (CompressedFile::IsCompressed(filename)) {
+    // Decompress .gz files and .zip archives in memory
+    std::string contents;
+    std::string error;
+    if (!CompressedFile::Read(filename, &contents, &error)) {
+      std::cout << error << std::endl;
+      exit(1);
+    }
+    std::istringstream file(contents);
+    LoadStream(file, filename, links, all, selfLinks, selfLinkAsError);
+  } else {
+    std::ifstream file(filename.c_str());
+    if (!file.is_open()) {
+      std::cout << "File cannot be opened: " << filename << std::endl;
+      exit(1);    
+    }
+    LoadStream(file, filename, links, all, selfLinks, selfLinkAsError);
   }
+}
+
+void Instance::LoadStream(std::istream& file, const std::string& filename,
+                          std::vector<std::vector<std::pair<int, Weight> > >* links,
+                          std::vector<InstanceTuple>* all,
+                          std::vector<double>* selfLinks,
+                          bool selfLinkAsError) {
   std::string line;
   int dimension;
   int numLines;
   bool readDimension = false;
   int dataLinesRead = 0;
+  bool warnedPrecision = false;
   while (getline(file, line)) {
     if (line.length() == 0 || line.at(0) == '#') {
       continue;  // Ignore empty lines or comments
@@ -118,7 +164,7 @@ void Instance::Load(const std::string& filename,
 
       // Initialize state based on stated dimension
       for (int ct=0; ct < dimension; ++ct) {
-	links->push_back(std::vector<std::pair<int, double> >());
+	links->push_back(std::vector<std::pair<int, Weight> >());
 	if (selfLinks) {
 	  selfLinks->push_back(0.0);
 	}
@@ -145,6 +191,12 @@ void Instance::Load(const std::string& filename,
                   << line << std::endl;
         exit(1);
       }
+      if (n1 != n2 && (Weight)weight != weight && !warnedPrecision) {
+        // Only possible with USE_FLOAT_WEIGHTS
+        std::cerr << "Warning: weights in " << filename << " (such as " <<
+          weight << ") are rounded to single precision" << std::endl;
+        warnedPrecision = true;
+      }
       AddLink(n1-1, n2-1, weight, links, all, selfLinks, selfLinkAsError);
       ++dataLinesRead;
     }
@@ -158,3 +210,27 @@ void Instance::Load(const std::string& filename,
     exit(1);
   }
 }
+
+bool Instance::UseDense(int dimension, int num_links, double min_density) {
+  if (dimension <= 1) {
+    return false;
+  }
+  double n = dimension;
+  return 2.0 * num_links >= min_density * n * (n - 1) &&
+    n * n * sizeof(Weight) <= kDenseMaxBytes;
+}
+
+void Instance::LoadDense(int dimension, const std::vector<InstanceTuple>& all,
+                         double min_density, std::vector<Weight>* dense) {
+  dense->clear();
+  if (!UseDense(dimension, all.size(), min_density)) {
+    return;
+  }
+  dense->assign((size_t)dimension * dimension, 0.0);
+  for (auto iter = all.begin(); iter != all.end(); ++iter) {
+    int i = iter->first.first;
+    int j = iter->first.second;
+    (*dense)[(size_t)i * dimension + j] += iter->second;
+    (*dense)[(size_t)j * dimension + i] += iter->second;
+  }
+}
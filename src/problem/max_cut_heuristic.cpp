@@ -11,67 +11,70 @@ MaxCutHeuristic::MaxCutHeuristic(const MaxCutInstance& mi,
                                  MaxCutCallback *mc) :
   Heuristic(runtime_limit, validation),
   mi_(mi),
+  history_(std::vector<int>(mi.get_size(), -1)),
   mc_(mc) {
   // Store a new best solution with objective 0
-  past_solutions_.push_back(MaxCutSimpleSolution(mi, this, -1));
+  best_solution_.push_back(MaxCutSimpleSolution(mi, this, -1));
   past_solution_values_.push_back(0.0);
   past_solution_times_.push_back(Runtime());
 }
 
 bool MaxCutHeuristic::Report() {
-  double rt = Runtime();
+  profile_.Count(Profile::REPORTS);
   if (mc_) {
-    return mc_->Report(past_solutions_[past_solutions_.size()-1], false, rt);
+    return mc_->Report(best_solution_[0], false, CoarseRuntime());
   } else {
-    return rt < runtime_limit_;
+    return !ShouldStop();
   }
 }
 
 bool MaxCutHeuristic::Report(int iter) {
-  double rt = Runtime();
+  profile_.Count(Profile::REPORTS);
   if (mc_) {
-    return mc_->Report(past_solutions_[past_solutions_.size()-1], false, rt,
-                       iter);
+    return mc_->Report(best_solution_[0], false, CoarseRuntime(), iter);
   } else {
-    return rt < runtime_limit_;
+    return !ShouldStop();
   }
 }
 
 bool MaxCutHeuristic::Report(const BaseSolution& solution) {
-  double rt = Runtime();
-  bool newBest = NewBest(solution, rt);
+  profile_.Count(Profile::REPORTS);
+  bool newBest = NewBest(solution);
   if (mc_) {
-    return mc_->Report(past_solutions_[past_solutions_.size()-1], newBest, rt);
+    double rt = newBest ? past_solution_times_.back() : CoarseRuntime();
+    return mc_->Report(best_solution_[0], newBest, rt);
+  } else if (newBest) {
+    return !ShouldStop(past_solution_times_.back());
   } else {
-    return rt < runtime_limit_;
+    return !ShouldStop();
   }
 }
 
 bool MaxCutHeuristic::Report(const BaseSolution& solution, int iter) {
-  double rt = Runtime();
-  bool newBest = NewBest(solution, rt);
+  profile_.Count(Profile::REPORTS);
+  bool newBest = NewBest(solution);
   if (mc_) {
-    return mc_->Report(past_solutions_[past_solutions_.size()-1], newBest, rt,
-                       iter);
+    double rt = newBest ? past_solution_times_.back() : CoarseRuntime();
+    return mc_->Report(best_solution_[0], newBest, rt, iter);
+  } else if (newBest) {
+    return !ShouldStop(past_solution_times_.back());
   } else {
-    return rt < runtime_limit_;
+    return !ShouldStop();
   }
 }
 
-bool MaxCutHeuristic::NewBest(const BaseSolution& solution, double runtime) {
+bool MaxCutHeuristic::NewBest(const BaseSolution& solution) {
   if (solution.ImprovesOver(best_)) {
     best_ = solution.get_weight();
-    past_solution_times_.push_back(runtime);
+    past_solution_times_.push_back(Runtime());
     past_solution_values_.push_back(best_);
     if (validation_) {
-      past_solutions_.push_back(MaxCutSimpleSolution(mi_, this,
-                                                     solution.get_assignments(),
-                                                     solution.get_weight()));
-    } else {
-      past_solutions_[0] = MaxCutSimpleSolution(mi_, this,
-                                                solution.get_assignments(),
-                                                solution.get_weight());
+      history_.Append(best_solution_[0].get_assignments(),
+                      solution.get_assignments());
     }
+    best_solution_[0] = MaxCutSimpleSolution(mi_, this,
+                                             solution.get_assignments(),
+                                             solution.get_weight());
     return true;
   }
   return false;
@@ -81,28 +84,49 @@ bool MaxCutHeuristic::IsHistoryValid() {
   if (!validation_) {
     return true;  // Not keeping track of solutions, so can't validate anything
   }
-  if (past_solution_values_.size() != past_solutions_.size()) {
+  if (past_solution_values_.size() != history_.size()) {
     std::cout << "Error: past solution information not correctly stored." <<
       std::endl;
     exit(1);
   }
 
-  // Go through stored solutions, recalculate their solution values, and 
-  // thus confirm our results are accurate
-  for (int i = 0; i < past_solution_values_.size(); i++) {
-    // Recalculate...
-    past_solutions_[i].PopulateFromAssignments();
-    double trueVal = past_solutions_[i].get_weight();
-    double trueAbs = fabs(trueVal);
-    double diff = fabs(trueVal - past_solution_values_[i]);
-    if (diff != 0.0 && (trueAbs == 0 || diff / trueAbs >= 1e-8)) {
-      // Significant error (based on relative difference)
-      std::cout << std::endl << trueVal
-                << std::endl << past_solution_values_[i]
-                << std::endl << diff
-                << std::endl;
+  // Replay the chain of best solutions from the initial one, updating the
+  // objective incrementally, and thus confirm our results are accurate
+  MaxCutSimpleSolution initial(mi_, this, history_.get_initial(), 0.0);
+  initial.PopulateFromAssignments();
+  std::vector<int> x = history_.get_initial();
+  double objective = initial.get_weight();
+  uint64_t hash = FlipHistory::Hash(x);
+  for (int k = 0; k < past_solution_values_.size(); k++) {
+    if (k > 0) {
+      for (const int* it = history_.flips_begin(k);
+           it != history_.flips_end(k); ++it) {
+        // Switching i cuts the edges to nodes on its side and uncuts the others
+        int i = *it;
+        for (auto iter = mi_.get_edges_begin(i);
+             iter != mi_.get_edges_end(i); ++iter) {
+          objective += iter->second * x[i] * x[iter->first];
+        }
+        x[i] = -x[i];
+        hash ^= FlipHistory::Key(i);
+      }
+    }
+    if (hash != history_.get_hash(k)) {
+      std::cout << "Error: solution history chain is corrupted." << std::endl;
+      return false;
+    }
+    if (!ValidObjective(objective, past_solution_values_[k])) {
       return false;
     }
   }
-  return true;
+
+  // The chain should end at the best solution, and the best solution's
+  // objective should also hold when recomputed from scratch
+  if (x != best_solution_[0].get_assignments()) {
+    std::cout << "Error: solution history chain is corrupted." << std::endl;
+    return false;
+  }
+  MaxCutSimpleSolution best = best_solution_[0];
+  best.PopulateFromAssignments();
+  return ValidObjective(best.get_weight(), past_solution_values_.back());
 }
@@ -7,15 +7,26 @@
 #include "problem/max_cut_instance.h"
 #include "problem/qubo_instance.h"
 
+namespace {
+// Minimum density for the dense matrix: the vectorized row update of
+// bin/dense_bench overtakes the (branch-free) sparse gain update at density
+// 0.4 or so.
+const double kDenseMinDensity = 0.4;
+}
+
 // Load instance from file
 MaxCutInstance::MaxCutInstance(const std::string& filename) {
   Instance::Load(filename, &edges_, &all_edges_, NULL, false);
+  Instance::LoadDense(edges_.size(), all_edges_, kDenseMinDensity,
+                      &dense_);
 }
 
 // Load instance from edge list and dimension
 MaxCutInstance::MaxCutInstance(const std::vector<Instance::InstanceTuple>& edgeList,
                                int dimension) {
   Instance::Load(dimension, edgeList, &edges_, &all_edges_, NULL, false);
+  Instance::LoadDense(dimension, all_edges_, kDenseMinDensity,
+                      &dense_);
 }
 
 // Convert QUBOInstance to MaxCutInstance
@@ -23,7 +34,7 @@ MaxCutInstance::MaxCutInstance(const QUBOInstance& qi) {
   // Initialize class data structures based on size of qi and linear values
   std::vector<double> masterNodeWeights(qi.get_lin());  // Weights to added node
   for (int count=0; count < qi.get_size() + 1; ++count) {
-    edges_.push_back(std::vector<std::pair<int, double> >());
+    edges_.push_back(std::vector<std::pair<int, Instance::Weight> >());
   }
 
   // Process all non-zero entries of qi
@@ -37,36 +48,38 @@ MaxCutInstance::MaxCutInstance(const QUBOInstance& qi) {
   int master = qi.get_size();
   for (int count=0; count < qi.get_size(); ++count) {
     if (masterNodeWeights[count] != 0.0) {
-      edges_[count].push_back(std::pair<int, double>(master,
+      edges_[count].push_back(std::pair<int, Instance::Weight>(master,
 						     masterNodeWeights[count]));
-      edges_[master].push_back(std::pair<int, double>(count,
+      edges_[master].push_back(std::pair<int, Instance::Weight>(count,
 						      masterNodeWeights[count]));
-      all_edges_.push_back(std::pair<std::pair<int, int>, double>(std::pair<int, int>(count, master), masterNodeWeights[count]));
+      all_edges_.push_back(Instance::InstanceTuple(std::pair<int, int>(count, master), masterNodeWeights[count]));
     }
   }
+  Instance::LoadDense(edges_.size(), all_edges_, kDenseMinDensity,
+                      &dense_);
 }
 
 void MaxCutInstance::AddQUBONonzero(int i, int j, double q_ij,
 				    std::vector<double>* masterNodeWeights) {
   (*masterNodeWeights)[i] += q_ij;
   (*masterNodeWeights)[j] += q_ij;
-  edges_[i].push_back(std::pair<int, double>(j, -1.0 * q_ij));
-  edges_[j].push_back(std::pair<int, double>(i, -1.0 * q_ij));
-  all_edges_.push_back(std::pair<std::pair<int, int>, double>(std::pair<int, int>(i, j), -1.0 * q_ij));
+  edges_[i].push_back(std::pair<int, Instance::Weight>(j, -1.0 * q_ij));
+  edges_[j].push_back(std::pair<int, Instance::Weight>(i, -1.0 * q_ij));
+  all_edges_.push_back(Instance::InstanceTuple(std::pair<int, int>(i, j), -1.0 * q_ij));
 }
 
 // Shuffling the edge sets
-void MaxCutInstance::GetShuffledEdges(std::vector<std::pair<std::pair<int, int>, double> >* ret) const {
+void MaxCutInstance::GetShuffledEdges(std::vector<Instance::InstanceTuple>* ret) const {
   *ret = all_edges_;
   random_shuffle(ret->begin(), ret->end());
 }
 
-bool SortCompare(const std::pair<std::pair<int, int>, double>& i,
-		 const std::pair<std::pair<int, int>, double>& j) {
+bool SortCompare(const Instance::InstanceTuple& i,
+		 const Instance::InstanceTuple& j) {
   return (i.second > j.second);
 }
 
-void MaxCutInstance::GetSortedEdges(std::vector<std::pair<std::pair<int, int>, double> >* ret) const {
+void MaxCutInstance::GetSortedEdges(std::vector<Instance::InstanceTuple>* ret) const {
   *ret = all_edges_;
   sort(ret->begin(), ret->end(), SortCompare);
 }
@@ -74,12 +87,14 @@ void MaxCutInstance::GetSortedEdges(std::vector<std::pair<std::pair<int, int>, d
 // Copy constructor
 MaxCutInstance::MaxCutInstance(const MaxCutInstance& mi) :
   edges_(mi.edges_),
-  all_edges_(mi.all_edges_) {}
+  all_edges_(mi.all_edges_),
+  dense_(mi.dense_) {}
 
 // Copy assignment constructor
 MaxCutInstance& MaxCutInstance::operator=(const MaxCutInstance& mi) {
   edges_ = mi.edges_;
   all_edges_ = mi.all_edges_;
+  dense_ = mi.dense_;
   return *this;
 }
 
@@ -0,0 +1,131 @@
+#include <algorithm>
+#include <map>
+#include <vector>
+#include "problem/max_cut_kernel.h"
+
+namespace {
+typedef std::vector<std::map<int, double> > Adjacency;
+
+// Add weight w to edge (u, t), dropping the edge if its weight becomes 0
+void AddWeight(int u, int t, double w, Adjacency* adj) {
+  if (w == 0.0) {
+    return;
+  }
+  double merged = (*adj)[u][t] + w;
+  if (merged == 0.0) {
+    (*adj)[u].erase(t);
+    (*adj)[t].erase(u);
+  } else {
+    (*adj)[u][t] = merged;
+    (*adj)[t][u] = merged;
+  }
+}
+}
+
+MaxCutKernel::MaxCutKernel(const MaxCutInstance& mi) :
+  num_nodes_(mi.get_size()),
+  offset_(0.0),
+  reduced_(NULL) {
+  int n = mi.get_size();
+  Adjacency adj(n);
+  for (auto iter = mi.get_all_edges_begin(); iter != mi.get_all_edges_end();
+       ++iter) {
+    if (iter->first.first != iter->first.second) {
+      AddWeight(iter->first.first, iter->first.second, iter->second, &adj);
+    }
+  }
+
+  // Remove nodes of degree at most 2 until there are none left, revisiting
+  // the neighbors of each removed node since their degree may have dropped
+  std::vector<bool> removed(n, false);
+  std::vector<int> queue;
+  for (int v=n-1; v >= 0; --v) {
+    if (adj[v].size() <= 2) {
+      queue.push_back(v);
+    }
+  }
+  while (!queue.empty()) {
+    int v = queue.back();
+    queue.pop_back();
+    if (removed[v] || adj[v].size() > 2) {
+      continue;
+    }
+    Elimination e = {v, -1, -1, 0.0, 0.0};
+    std::map<int, double>::const_iterator iter = adj[v].begin();
+    if (adj[v].size() >= 1) {
+      e.u = iter->first;
+      e.a = iter->second;
+      ++iter;
+    }
+    if (adj[v].size() == 2) {
+      e.t = iter->first;
+      e.b = iter->second;
+    }
+    adj[v].clear();
+    removed[v] = true;
+    if (e.u >= 0) {
+      adj[e.u].erase(v);
+      queue.push_back(e.u);
+    }
+    if (e.t >= 0) {
+      adj[e.t].erase(v);
+      queue.push_back(e.t);
+      double same = std::max(0.0, e.a + e.b);
+      offset_ += same;
+      AddWeight(e.u, e.t, std::max(e.a, e.b) - same, &adj);
+    } else if (e.u >= 0) {
+      offset_ += std::max(0.0, e.a);
+    }
+    eliminations_.push_back(e);
+  }
+
+  // Build the reduced instance over the remaining nodes
+  std::vector<int> index(n, -1);
+  for (int v=0; v < n; ++v) {
+    if (!removed[v]) {
+      index[v] = remaining_.size();
+      remaining_.push_back(v);
+    }
+  }
+  std::vector<Instance::InstanceTuple> edgeList;
+  for (int v=0; v < n; ++v) {
+    for (auto iter = adj[v].begin(); iter != adj[v].end(); ++iter) {
+      if (iter->first > v) {
+        // Instance tuples are 1-indexed
+        edgeList.push_back(Instance::InstanceTuple(
+          std::make_pair(index[v] + 1, index[iter->first] + 1), iter->second));
+      }
+    }
+  }
+  if (!remaining_.empty()) {
+    reduced_ = new MaxCutInstance(edgeList, remaining_.size());
+  }
+}
+
+MaxCutKernel::~MaxCutKernel() {
+  delete reduced_;
+}
+
+void MaxCutKernel::Lift(const std::vector<int>& reduced,
+                        std::vector<int>* original) const {
+  std::vector<int>& x = *original;
+  x.assign(num_nodes_, 1);
+  for (int k=0; k < remaining_.size(); ++k) {
+    x[remaining_[k]] = reduced[k];
+  }
+
+  // Place the removed nodes in the reverse order of removal, so the
+  // neighbors of each are placed first
+  for (int k=eliminations_.size()-1; k >= 0; --k) {
+    const Elimination& e = eliminations_[k];
+    if (e.u < 0) {
+      x[e.v] = 1;
+    } else if (e.t < 0) {
+      x[e.v] = e.a > 0.0 ? -x[e.u] : x[e.u];
+    } else if (x[e.u] == x[e.t]) {
+      x[e.v] = e.a + e.b > 0.0 ? -x[e.u] : x[e.u];
+    } else {
+      x[e.v] = e.a >= e.b ? -x[e.u] : -x[e.t];  // Cut the heavier edge
+    }
+  }
+}
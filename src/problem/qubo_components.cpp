@@ -0,0 +1,196 @@
+#include <time.h>
+#include <algorithm>
+#include <vector>
+#include "problem/qubo_components.h"
+
+namespace {
+// Enumeration steps between checks of the deadline
+const long long kDeadlineCheckInterval = 1 << 14;
+
+// Seconds on the monotonic clock
+double Now() {
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return ts.tv_sec + 1e-9 * ts.tv_nsec;
+}
+
+bool LargerComponent(const std::vector<int>& a, const std::vector<int>& b) {
+  return a.size() > b.size();
+}
+
+// Objective of the given assignments of the variables of a component (with
+// index[i] the position of variable i in the component)
+double ComponentObjective(const QUBOInstance& qi,
+                          const std::vector<int>& variables,
+                          const std::vector<int>& index,
+                          const std::vector<int>& x) {
+  double objective = 0.0;
+  for (int k=0; k < variables.size(); ++k) {
+    if (x[k]) {
+      int i = variables[k];
+      objective += qi.get_lin()[i];
+      for (auto iter = qi.get_nonzero_begin(i); iter != qi.get_nonzero_end(i);
+           ++iter) {
+        objective += x[index[iter->first]] * iter->second;
+      }
+    }
+  }
+  return objective;
+}
+}
+
+QUBOComponents::QUBOComponents(const QUBOInstance& qi, double time_limit) :
+  exact_(qi.get_size(), 0),
+  exact_weight_(0.0) {
+  double deadline = Now() + time_limit;
+  int n = qi.get_size();
+  const std::vector<double>& lin = qi.get_lin();
+
+  // Breadth-first search from each unvisited variable, recording the tree of
+  // the search. For a tree component, value0[i] and value1[i] end up as the
+  // best objective of the subtree at i given x_i = 0 and x_i = 1.
+  std::vector<bool> visited(n, false);
+  std::vector<int> parent(n, -1);
+  std::vector<double> parent_q(n, 0.0);
+  std::vector<double> value0(n, 0.0);
+  std::vector<double> value1(lin);
+  std::vector<int> index(n, -1);  // Used (and reset) by SolveByEnumeration
+  for (int root=0; root < n; ++root) {
+    if (visited[root]) {
+      continue;
+    }
+    std::vector<int> order(1, root);
+    visited[root] = true;
+    long long degree_sum = 0;
+    for (int head=0; head < order.size(); ++head) {
+      int i = order[head];
+      for (auto iter = qi.get_nonzero_begin(i); iter != qi.get_nonzero_end(i);
+           ++iter) {
+        ++degree_sum;
+        int j = iter->first;
+        if (!visited[j]) {
+          visited[j] = true;
+          parent[j] = i;
+          parent_q[j] = iter->second;
+          order.push_back(j);
+        }
+      }
+    }
+    if (degree_sum / 2 != order.size() - 1) {
+      // Has a cycle, so left to a heuristic unless it is small enough to
+      // enumerate in the time left
+      if (order.size() > kMaxExactSize ||
+          !SolveByEnumeration(qi, order, deadline, &index)) {
+        variables_.push_back(order);
+      }
+      continue;
+    }
+
+    // Solve the tree bottom-up, then assign each variable top-down given the
+    // assignment of its parent
+    for (int k=order.size()-1; k > 0; --k) {
+      int i = order[k];
+      int p = parent[i];
+      value0[p] += std::max(value0[i], value1[i]);
+      value1[p] += std::max(value0[i], value1[i] + 2.0 * parent_q[i]);
+    }
+    exact_[root] = value1[root] > value0[root] ? 1 : 0;
+    exact_weight_ += std::max(value0[root], value1[root]);
+    for (int k=1; k < order.size(); ++k) {
+      int i = order[k];
+      double interaction = exact_[parent[i]] * 2.0 * parent_q[i];
+      exact_[i] = value1[i] + interaction > value0[i] ? 1 : 0;
+    }
+  }
+
+  // Build an instance for each remaining component, largest first
+  std::stable_sort(variables_.begin(), variables_.end(), LargerComponent);
+  std::vector<int> component(n, -1);
+  std::vector<std::vector<double> > mainDiag(variables_.size());
+  for (int c=0; c < variables_.size(); ++c) {
+    for (int k=0; k < variables_[c].size(); ++k) {
+      int i = variables_[c][k];
+      component[i] = c;
+      index[i] = k;
+      mainDiag[c].push_back(lin[i]);
+    }
+  }
+  std::vector<std::vector<Instance::InstanceTuple> > offDiag(variables_.size());
+  for (auto iter = qi.get_all_nonzero_begin(); iter != qi.get_all_nonzero_end();
+       ++iter) {
+    int i = iter->first.first;
+    int j = iter->first.second;
+    if (component[i] >= 0) {
+      // Instance tuples are 1-indexed
+      offDiag[component[i]].push_back(
+        Instance::InstanceTuple(std::make_pair(index[i] + 1, index[j] + 1),
+                                iter->second));
+    }
+  }
+  for (int c=0; c < variables_.size(); ++c) {
+    instances_.push_back(new QUBOInstance(offDiag[c], mainDiag[c],
+                                          variables_[c].size()));
+  }
+}
+
+QUBOComponents::~QUBOComponents() {
+  for (int c=0; c < instances_.size(); ++c) {
+    delete instances_[c];
+  }
+}
+
+bool QUBOComponents::SolveByEnumeration(const QUBOInstance& qi,
+                                        const std::vector<int>& variables,
+                                        double deadline,
+                                        std::vector<int>* index) {
+  if (Now() > deadline) {
+    return false;
+  }
+
+  // Visit every assignment in Gray code order, so consecutive assignments
+  // differ in one variable, keeping gain[k] = c_i + 2 sum_j q_ij x_j for each
+  // variable i = variables[k] to update the objective after each flip
+  int size = variables.size();
+  std::vector<double> gain(size);
+  for (int k=0; k < size; ++k) {
+    (*index)[variables[k]] = k;
+    gain[k] = qi.get_lin()[variables[k]];
+  }
+  std::vector<int> x(size, 0);
+  std::vector<int> best(x);
+  double objective = 0.0;
+  double best_objective = 0.0;
+  bool finished = true;
+  for (long long step=1; step < (1LL << size); ++step) {
+    if (step % kDeadlineCheckInterval == 0 && Now() > deadline) {
+      finished = false;
+      break;
+    }
+    int k = __builtin_ctzll(step);  // Flip the lowest set bit of step
+    int i = variables[k];
+    int change = 1 - 2 * x[k];
+    x[k] += change;
+    objective += change * gain[k];
+    for (auto iter = qi.get_nonzero_begin(i); iter != qi.get_nonzero_end(i);
+         ++iter) {
+      gain[(*index)[iter->first]] += 2.0 * change * iter->second;
+    }
+    if (objective > best_objective) {
+      best_objective = objective;
+      best = x;
+    }
+  }
+
+  // Recompute the objective of the best assignment, which the incremental
+  // updates may have left slightly off
+  if (finished) {
+    for (int k=0; k < size; ++k) {
+      exact_[variables[k]] = best[k];
+    }
+    exact_weight_ += ComponentObjective(qi, variables, *index, best);
+  }
+  for (int k=0; k < size; ++k) {
+    (*index)[variables[k]] = -1;
+  }
+  return finished;
+}
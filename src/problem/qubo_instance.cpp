@@ -3,9 +3,18 @@
 #include "problem/max_cut_instance.h"
 #include "problem/qubo_instance.h"
 
+namespace {
+// Minimum density for the dense matrix: the sparse gain update branches on
+// the assignments of the neighbors, so the vectorized row update of
+// bin/dense_bench is already faster at density 0.1 and about 6x faster at 0.5.
+const double kDenseMinDensity = 0.2;
+}
+
 // Load input matrix from provided file
 QUBOInstance::QUBOInstance(const std::string& filename) {
   Instance::Load(filename, &nonzero_, &all_nonzero_, &lin_, false);
+  Instance::LoadDense(nonzero_.size(), all_nonzero_, kDenseMinDensity,
+                      &dense_);
 }
 
 // Load input matrix from provided on- and off-diagonal entries
@@ -17,13 +26,15 @@ QUBOInstance::QUBOInstance(const std::vector<Instance::InstanceTuple>& offDiag,
     exit(1);
   }
   Instance::Load(dimension, offDiag, &nonzero_, &all_nonzero_, NULL, false);
+  Instance::LoadDense(dimension, all_nonzero_, kDenseMinDensity,
+                      &dense_);
 }
 
 
 QUBOInstance::QUBOInstance(const MaxCutInstance& mi) {
   // Initialize class data structures based on size of base graph
   for (int count=0; count < mi.get_size(); ++count) {
-    nonzero_.push_back(std::vector<std::pair<int, double> >());
+    nonzero_.push_back(std::vector<std::pair<int, Instance::Weight> >());
     lin_.push_back(0.0);
   }
 
@@ -32,6 +43,8 @@ QUBOInstance::QUBOInstance(const MaxCutInstance& mi) {
        ++iter) {
     AddMaxCutEdge(iter->first.first, iter->first.second, iter->second);
   }
+  Instance::LoadDense(nonzero_.size(), all_nonzero_, kDenseMinDensity,
+                      &dense_);
 }
 
 void QUBOInstance::AddMaxCutEdge(int i, int j, double w_ij) {
@@ -42,9 +55,9 @@ void QUBOInstance::AddMaxCutEdge(int i, int j, double w_ij) {
   if (i != j) {
     lin_[i] += w_ij;
     lin_[j] += w_ij;
-    nonzero_[i].push_back(std::pair<int, double>(j, -1.0 * w_ij));
-    nonzero_[j].push_back(std::pair<int, double>(i, -1.0 * w_ij));
-    all_nonzero_.push_back(std::pair<std::pair<int, int>, double>(std::pair<int, int>(i, j), -1.0 * w_ij));
+    nonzero_[i].push_back(std::pair<int, Instance::Weight>(j, -1.0 * w_ij));
+    nonzero_[j].push_back(std::pair<int, Instance::Weight>(i, -1.0 * w_ij));
+    all_nonzero_.push_back(Instance::InstanceTuple(std::pair<int, int>(i, j), -1.0 * w_ij));
   }
 }
 
@@ -52,12 +65,14 @@ void QUBOInstance::AddMaxCutEdge(int i, int j, double w_ij) {
 QUBOInstance::QUBOInstance(const QUBOInstance& qi) :
   nonzero_(qi.nonzero_),
   all_nonzero_(qi.all_nonzero_),
-  lin_(qi.lin_) {}
+  lin_(qi.lin_),
+  dense_(qi.dense_) {}
 
 // Copy assignment constructor
 QUBOInstance& QUBOInstance::operator=(const QUBOInstance& qi) {
   nonzero_ = qi.nonzero_;
   all_nonzero_ = qi.all_nonzero_;
   lin_ = qi.lin_;
+  dense_ = qi.dense_;
   return *this;
 }
@@ -0,0 +1,388 @@
+#include <time.h>
+#include <algorithm>
+#include <limits>
+#include <vector>
+#include "problem/qubo_presolve.h"
+
+namespace {
+// Bounds on the gain of a variable within this distance of 0 make it a
+// candidate for the first-order rule (the rule itself uses exact bounds)
+const double kCandidateTolerance = 1e-6;
+
+// Residual capacities below this fraction of the largest capacity are
+// treated as 0 by the max-flow computation
+const double kRelativeFlowTolerance = 1e-12;
+
+// Steps of the max-flow computation between checks of the deadline
+const int kDeadlineCheckInterval = 4096;
+
+// Seconds on the monotonic clock
+double Now() {
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return ts.tv_sec + 1e-9 * ts.tv_nsec;
+}
+
+// A flow network with real capacities, for computing a maximum flow with
+// Dinic's algorithm. Edge e and its reverse edge e^1 are stored together, and
+// the edges leaving each node are kept as a linked list.
+class FlowNetwork {
+ public:
+  explicit FlowNetwork(int num_nodes) :
+    first_(num_nodes, -1),
+    max_cap_(0.0),
+    tolerance_(0.0) {}
+
+  void AddEdge(int from, int to, double cap) {
+    AddArc(from, to, cap);
+    AddArc(to, from, 0.0);
+    max_cap_ = std::max(max_cap_, cap);
+  }
+
+  // Push a maximum flow from s to t, returning false (with the flow
+  // incomplete) if it could not be finished by the deadline (see Now)
+  bool MaxFlow(int s, int t, double deadline);
+
+  // Mark the nodes reachable from s in the residual network, which is the
+  // source side of a minimum cut after MaxFlow
+  void SourceSide(int s, std::vector<bool>* in_source);
+
+ private:
+  void AddArc(int from, int to, double cap) {
+    to_.push_back(to);
+    cap_.push_back(cap);
+    next_.push_back(first_[from]);
+    first_[from] = to_.size() - 1;
+  }
+
+  // Breadth-first distances from s in the residual network (-1 if
+  // unreachable), returning whether t is reachable
+  bool BuildLevels(int s, int t);
+
+  std::vector<int> to_;
+  std::vector<double> cap_;  // Residual capacity
+  std::vector<int> next_;  // Next edge leaving the same node
+  std::vector<int> first_;  // First edge leaving each node
+  std::vector<int> level_;
+  double max_cap_;
+  double tolerance_;
+};
+
+bool FlowNetwork::BuildLevels(int s, int t) {
+  level_.assign(first_.size(), -1);
+  std::vector<int> queue(1, s);
+  level_[s] = 0;
+  for (int head = 0; head < queue.size(); ++head) {
+    int u = queue[head];
+    for (int e = first_[u]; e != -1; e = next_[e]) {
+      if (cap_[e] > tolerance_ && level_[to_[e]] < 0) {
+        level_[to_[e]] = level_[u] + 1;
+        queue.push_back(to_[e]);
+      }
+    }
+  }
+  return level_[t] >= 0;
+}
+
+bool FlowNetwork::MaxFlow(int s, int t, double deadline) {
+  tolerance_ = kRelativeFlowTolerance * max_cap_;
+  std::vector<int> current;  // Next edge to try leaving each node
+  std::vector<int> path;  // Edges from s to u in the level network
+  int steps = 0;
+  while (BuildLevels(s, t)) {
+    current = first_;
+    path.clear();
+    int u = s;
+    while (true) {
+      if (++steps == kDeadlineCheckInterval) {
+        steps = 0;
+        if (Now() > deadline) {
+          return false;
+        }
+      }
+      if (u == t) {
+        // Augment along the path, and continue from the tail of the first
+        // edge it saturated
+        double push = std::numeric_limits<double>::max();
+        for (int k = 0; k < path.size(); ++k) {
+          push = std::min(push, cap_[path[k]]);
+        }
+        for (int k = 0; k < path.size(); ++k) {
+          cap_[path[k]] -= push;
+          cap_[path[k] ^ 1] += push;
+        }
+        int k = 0;
+        while (cap_[path[k]] > tolerance_) {
+          ++k;
+        }
+        path.resize(k);
+        u = k == 0 ? s : to_[path[k-1]];
+        continue;
+      }
+      int& e = current[u];
+      while (e != -1 && (cap_[e] <= tolerance_ ||
+                         level_[to_[e]] != level_[u] + 1)) {
+        e = next_[e];
+      }
+      if (e != -1) {
+        path.push_back(e);
+        u = to_[e];
+      } else {
+        // Dead end: remove u from the level network and retreat
+        level_[u] = -1;
+        if (path.empty()) {
+          break;
+        }
+        u = to_[path.back() ^ 1];
+        path.pop_back();
+      }
+    }
+    if (Now() > deadline) {
+      return false;
+    }
+  }
+  return true;
+}
+
+void FlowNetwork::SourceSide(int s, std::vector<bool>* in_source) {
+  in_source->assign(first_.size(), false);
+  std::vector<int> stack(1, s);
+  (*in_source)[s] = true;
+  while (!stack.empty()) {
+    int u = stack.back();
+    stack.pop_back();
+    for (int e = first_[u]; e != -1; e = next_[e]) {
+      if (cap_[e] > tolerance_ && !(*in_source)[to_[e]]) {
+        (*in_source)[to_[e]] = true;
+        stack.push_back(to_[e]);
+      }
+    }
+  }
+}
+}
+
+QUBOPresolve::QUBOPresolve(const QUBOInstance& qi, double time_limit) :
+  qi_(qi),
+  fixed_(qi.get_size(), -1),
+  num_fixed_(0),
+  lo_(qi.get_size()),
+  hi_(qi.get_size()),
+  queued_(qi.get_size(), true),
+  offset_(0.0),
+  reduced_(NULL) {
+  double deadline = Now() + time_limit;
+  int n = qi.get_size();
+  std::vector<int> candidates;
+  for (int i=0; i < n; ++i) {
+    double gain;
+    GainBounds(i, &gain, &lo_[i], &hi_[i]);
+    candidates.push_back(i);
+  }
+  FirstOrder(&candidates);
+  while (Now() < deadline && RoofDuality(deadline, &candidates) > 0) {
+    FirstOrder(&candidates);
+  }
+
+  // Build the reduced instance, moving the interactions with variables fixed
+  // to 1 into the linear terms and the objective offset
+  const std::vector<double>& lin = qi.get_lin();
+  std::vector<int> index(n, -1);
+  std::vector<double> mainDiag;
+  for (int i=0; i < n; ++i) {
+    if (fixed_[i] < 0) {
+      index[i] = free_.size();
+      free_.push_back(i);
+      mainDiag.push_back(lin[i]);
+    } else if (fixed_[i] == 1) {
+      offset_ += lin[i];
+    }
+  }
+  std::vector<Instance::InstanceTuple> offDiag;
+  for (auto iter = qi.get_all_nonzero_begin(); iter != qi.get_all_nonzero_end();
+       ++iter) {
+    int i = iter->first.first;
+    int j = iter->first.second;
+    if (fixed_[i] < 0 && fixed_[j] < 0) {
+      // Instance tuples are 1-indexed
+      offDiag.push_back(Instance::InstanceTuple(std::make_pair(index[i] + 1,
+                                                               index[j] + 1),
+                                                iter->second));
+    } else if (fixed_[i] < 0 && fixed_[j] == 1) {
+      mainDiag[index[i]] += 2.0 * iter->second;
+    } else if (fixed_[i] == 1 && fixed_[j] < 0) {
+      mainDiag[index[j]] += 2.0 * iter->second;
+    } else if (fixed_[i] == 1 && fixed_[j] == 1) {
+      offset_ += 2.0 * iter->second;
+    }
+  }
+  if (!free_.empty()) {
+    reduced_ = new QUBOInstance(offDiag, mainDiag, free_.size());
+  }
+}
+
+QUBOPresolve::~QUBOPresolve() {
+  delete reduced_;
+}
+
+void QUBOPresolve::Lift(const std::vector<int>& reduced,
+                        std::vector<int>* original) const {
+  original->resize(fixed_.size());
+  for (int i=0; i < fixed_.size(); ++i) {
+    (*original)[i] = fixed_[i] == 1 ? 1 : 0;
+  }
+  for (int k=0; k < free_.size(); ++k) {
+    (*original)[free_[k]] = reduced[k];
+  }
+}
+
+void QUBOPresolve::GainBounds(int i, double* gain, double* lo,
+                              double* hi) const {
+  *gain = qi_.get_lin()[i];
+  double negative = 0.0;
+  double positive = 0.0;
+  for (auto iter = qi_.get_nonzero_begin(i); iter != qi_.get_nonzero_end(i);
+       ++iter) {
+    int j = iter->first;
+    if (fixed_[j] == 1) {
+      *gain += 2.0 * iter->second;
+    } else if (fixed_[j] < 0) {
+      if (iter->second < 0.0) {
+        negative += 2.0 * iter->second;
+      } else {
+        positive += 2.0 * iter->second;
+      }
+    }
+  }
+  *lo = *gain + negative;
+  *hi = *gain + positive;
+}
+
+void QUBOPresolve::Fix(int i, int val, std::vector<int>* candidates) {
+  fixed_[i] = val;
+  ++num_fixed_;
+  for (auto iter = qi_.get_nonzero_begin(i); iter != qi_.get_nonzero_end(i);
+       ++iter) {
+    int j = iter->first;
+    if (fixed_[j] >= 0) {
+      continue;
+    }
+    // x_i no longer ranges over {0, 1}; if it is 1, it adds 2q_ij to the gain
+    // of x_j
+    double q_ij = iter->second;
+    if (q_ij < 0.0) {
+      lo_[j] -= 2.0 * q_ij;
+    } else {
+      hi_[j] -= 2.0 * q_ij;
+    }
+    if (val == 1) {
+      lo_[j] += 2.0 * q_ij;
+      hi_[j] += 2.0 * q_ij;
+    }
+    if (!queued_[j] && (lo_[j] > -kCandidateTolerance ||
+                        hi_[j] < kCandidateTolerance)) {
+      queued_[j] = true;
+      candidates->push_back(j);
+    }
+  }
+}
+
+void QUBOPresolve::FirstOrder(std::vector<int>* candidates) {
+  while (!candidates->empty()) {
+    int i = candidates->back();
+    candidates->pop_back();
+    queued_[i] = false;
+    if (fixed_[i] >= 0) {
+      continue;
+    }
+    double gain;
+    GainBounds(i, &gain, &lo_[i], &hi_[i]);
+    if (hi_[i] <= 0.0) {
+      Fix(i, 0, candidates);
+    } else if (lo_[i] >= 0.0) {
+      Fix(i, 1, candidates);
+    }
+  }
+}
+
+int QUBOPresolve::RoofDuality(double deadline,
+                              std::vector<int>* candidates) {
+  int n = qi_.get_size();
+  std::vector<int> index(n, -1);
+  std::vector<int> vars;
+  for (int i=0; i < n; ++i) {
+    if (fixed_[i] < 0) {
+      index[i] = vars.size();
+      vars.push_back(i);
+    }
+  }
+  int m = vars.size();
+  if (m == 0) {
+    return 0;
+  }
+
+  // We minimize sum_k a_k x_k + sum_{k<l} b_kl x_k x_l, the negated objective
+  // over the free variables. Node k of the network is x_k and node m+k is its
+  // complement; x_k = 0 if node k is on the source side of the cut (and its
+  // complement on the sink side). Each term adds a pair of symmetric edges
+  // whose capacities are the cost of the term on the assignments they cut.
+  int s = 2 * m;
+  int t = 2 * m + 1;
+  FlowNetwork network(2 * m + 2);
+  std::vector<double> a(m);
+  for (int k=0; k < m; ++k) {
+    double lo, hi;
+    GainBounds(vars[k], &a[k], &lo, &hi);
+    a[k] = -a[k];
+  }
+  for (int k=0; k < m; ++k) {
+    int i = vars[k];
+    for (auto iter = qi_.get_nonzero_begin(i); iter != qi_.get_nonzero_end(i);
+         ++iter) {
+      int j = iter->first;
+      if (j <= i || fixed_[j] >= 0) {
+        continue;  // Each pair of free variables once
+      }
+      int l = index[j];
+      double b = -2.0 * iter->second;
+      if (b < 0.0) {
+        // b x_k x_l = b x_k - b x_k (1 - x_l), costing -b if x_k=1, x_l=0
+        a[k] += b;
+        network.AddEdge(l, k, -b);
+        network.AddEdge(m + k, m + l, -b);
+      } else if (b > 0.0) {
+        // Costs b if x_k = x_l = 1
+        network.AddEdge(m + l, k, b);
+        network.AddEdge(m + k, l, b);
+      }
+    }
+  }
+  for (int k=0; k < m; ++k) {
+    if (a[k] > 0.0) {
+      network.AddEdge(s, k, a[k]);  // Costs a_k if x_k = 1
+      network.AddEdge(m + k, t, a[k]);
+    } else if (a[k] < 0.0) {
+      network.AddEdge(k, t, -a[k]);  // Costs -a_k if x_k = 0 (plus constant)
+      network.AddEdge(s, m + k, -a[k]);
+    }
+  }
+  if (!network.MaxFlow(s, t, deadline)) {
+    return 0;  // Out of time, and the cut of a partial flow labels nothing
+  }
+  std::vector<bool> in_source;
+  network.SourceSide(s, &in_source);
+
+  // Variables whose two nodes are on opposite sides of the cut are labeled;
+  // the labels are collected before fixing since Fix changes fixed_
+  std::vector<std::pair<int, int> > labels;
+  for (int k=0; k < m; ++k) {
+    if (in_source[k] && !in_source[m + k]) {
+      labels.push_back(std::make_pair(vars[k], 0));
+    } else if (!in_source[k] && in_source[m + k]) {
+      labels.push_back(std::make_pair(vars[k], 1));
+    }
+  }
+  for (int k=0; k < labels.size(); ++k) {
+    Fix(labels[k].first, labels[k].second, candidates);
+  }
+  return labels.size();
+}
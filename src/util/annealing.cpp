@@ -0,0 +1,33 @@
+#include <math.h>
+#include <vector>
+#include "util/annealing.h"
+
+Annealer::Annealer(int n) :
+  n_(n),
+  T_(1.0),
+  inv_T_(1.0),
+  exp_table_(ExpTable()),
+  block_pos_(kBlockSize),
+  trials_(0),
+  accepted_(0),
+  accepted_worse_(0) {}
+
+const double* Annealer::ExpTable() {
+  // Built once, on first use (thread-safe initialization of a local static)
+  static const std::vector<double> table = []() {
+    std::vector<double> values(kExpRange * kExpSteps + 1);
+    for (int i=0; i < (int)values.size(); ++i) {
+      values[i] = exp(-(double)i / kExpSteps);
+    }
+    return values;
+  }();
+  return &table[0];
+}
+
+void Annealer::RefillBlock() {
+  // Keep the high 32 bits of each word, which are the most random
+  for (int i=0; i < kBlockSize; ++i) {
+    block_[i] = (uint32_t)(rng_.Next() >> 32);
+  }
+  block_pos_ = 0;
+}
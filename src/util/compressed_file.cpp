@@ -0,0 +1,177 @@
+#include <stdio.h>
+#include <string>
+#include <vector>
+#include "util/compressed_file.h"
+
+#ifdef USE_ZLIB
+#include <zlib.h>
+#endif
+
+// Does str end with suffix?
+static bool EndsWith(const std::string& str, const std::string& suffix) {
+  return str.size() >= suffix.size() &&
+    str.compare(str.size() - suffix.size(), suffix.size(), suffix) == 0;
+}
+
+bool CompressedFile::IsCompressed(const std::string& filename) {
+  return EndsWith(filename, ".gz") || EndsWith(filename, ".zip");
+}
+
+bool CompressedFile::Read(const std::string& filename, std::string* contents,
+                          std::string* error) {
+  contents->clear();
+#ifdef USE_ZLIB
+  if (EndsWith(filename, ".gz")) {
+    return ReadGzip(filename, contents, error);
+  } else if (EndsWith(filename, ".zip")) {
+    return ReadZip(filename, contents, error);
+  }
+  *error = "Not a compressed file: " + filename;
+  return false;
+#else
+  *error = "Reading compressed file " + filename +
+    " requires building MQLib with USE_ZLIB=1";
+  return false;
+#endif
+}
+
+#ifdef USE_ZLIB
+
+bool CompressedFile::ReadGzip(const std::string& filename,
+                              std::string* contents, std::string* error) {
+  gzFile gz = gzopen(filename.c_str(), "rb");
+  if (!gz) {
+    *error = "File cannot be opened: " + filename;
+    return false;
+  }
+  gzbuffer(gz, 1 << 17);
+  std::vector<char> buf(1 << 17);
+  int num_read;
+  while ((num_read = gzread(gz, &buf[0], buf.size())) > 0) {
+    contents->append(&buf[0], num_read);
+  }
+  bool ok = (num_read == 0);
+  if (!ok) {
+    int errnum;
+    *error = "Error decompressing " + filename + ": " + gzerror(gz, &errnum);
+  }
+  gzclose(gz);
+  return ok;
+}
+
+// Little-endian readers for the zip format structures
+static unsigned int ReadU16(const std::string& buf, size_t pos) {
+  return (unsigned char)buf[pos] | ((unsigned char)buf[pos+1] << 8);
+}
+static unsigned int ReadU32(const std::string& buf, size_t pos) {
+  return ReadU16(buf, pos) | (ReadU16(buf, pos+2) << 16);
+}
+
+bool CompressedFile::ReadZip(const std::string& filename,
+                             std::string* contents, std::string* error) {
+  // Load the (compressed) archive into memory
+  FILE* fp = fopen(filename.c_str(), "rb");
+  if (!fp) {
+    *error = "File cannot be opened: " + filename;
+    return false;
+  }
+  std::string archive;
+  std::vector<char> buf(1 << 17);
+  size_t num_read;
+  while ((num_read = fread(&buf[0], 1, buf.size(), fp)) > 0) {
+    archive.append(&buf[0], num_read);
+  }
+  fclose(fp);
+
+  // Locate the end of central directory record (signature 0x06054b50), which
+  // is the last 22 bytes of the archive plus an optional comment.
+  const size_t kEOCDSize = 22;
+  if (archive.size() < kEOCDSize) {
+    *error = "Not a zip archive: " + filename;
+    return false;
+  }
+  size_t eocd = archive.size() - kEOCDSize;
+  while (ReadU32(archive, eocd) != 0x06054b50) {
+    if (eocd == 0 || archive.size() - eocd > kEOCDSize + 0xffff) {
+      *error = "Not a zip archive: " + filename;
+      return false;
+    }
+    --eocd;
+  }
+  unsigned int num_entries = ReadU16(archive, eocd + 10);
+  size_t central = ReadU32(archive, eocd + 16);
+
+  // Walk the central directory for the first non-directory member
+  for (unsigned int entry = 0; entry < num_entries; ++entry) {
+    if (central + 46 > archive.size() ||
+        ReadU32(archive, central) != 0x02014b50) {
+      *error = "Corrupt zip central directory in " + filename;
+      return false;
+    }
+    unsigned int method = ReadU16(archive, central + 10);
+    size_t comp_size = ReadU32(archive, central + 20);
+    size_t uncomp_size = ReadU32(archive, central + 24);
+    unsigned int name_len = ReadU16(archive, central + 28);
+    unsigned int extra_len = ReadU16(archive, central + 30);
+    unsigned int comment_len = ReadU16(archive, central + 32);
+    size_t local = ReadU32(archive, central + 42);
+    std::string name = archive.substr(central + 46, name_len);
+    central += 46 + name_len + extra_len + comment_len;
+    if (name.empty() || name[name.size()-1] == '/') {
+      continue;  // Directory entry
+    }
+    if (comp_size == 0xffffffff || uncomp_size == 0xffffffff) {
+      *error = "Zip64 archives are not supported: " + filename;
+      return false;
+    }
+
+    // The local header repeats the name and may have a different extra field
+    if (local + 30 > archive.size() ||
+        ReadU32(archive, local) != 0x04034b50) {
+      *error = "Corrupt zip local header in " + filename;
+      return false;
+    }
+    size_t data = local + 30 + ReadU16(archive, local + 26) +
+      ReadU16(archive, local + 28);
+    if (data + comp_size > archive.size()) {
+      *error = "Truncated zip member " + name + " in " + filename;
+      return false;
+    }
+
+    if (method == 0) {
+      // Stored without compression
+      contents->assign(archive, data, comp_size);
+      return true;
+    } else if (method != 8) {
+      *error = "Unsupported zip compression method in " + filename;
+      return false;
+    }
+
+    // Raw deflate stream (negative window bits: no zlib header)
+    contents->resize(uncomp_size);
+    z_stream strm;
+    strm.zalloc = Z_NULL;
+    strm.zfree = Z_NULL;
+    strm.opaque = Z_NULL;
+    strm.next_in = (Bytef*)&archive[data];
+    strm.avail_in = comp_size;
+    if (inflateInit2(&strm, -MAX_WBITS) != Z_OK) {
+      *error = "Could not initialize zlib for " + filename;
+      return false;
+    }
+    strm.next_out = (Bytef*)(uncomp_size > 0 ? &(*contents)[0] : NULL);
+    strm.avail_out = uncomp_size;
+    int ret = inflate(&strm, Z_FINISH);
+    inflateEnd(&strm);
+    if (ret != Z_STREAM_END || strm.total_out != uncomp_size) {
+      *error = "Error decompressing " + name + " in " + filename;
+      contents->clear();
+      return false;
+    }
+    return true;
+  }
+  *error = "No file found in zip archive " + filename;
+  return false;
+}
+
+#endif  // USE_ZLIB
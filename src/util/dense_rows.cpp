@@ -0,0 +1,78 @@
+#include "util/dense_rows.h"
+
+namespace {
+// The kernels for either precision of the rows
+template <typename T>
+void AddRow(const T* __restrict__ row, int n, double* __restrict__ sums) {
+  int j = 0;
+  for (; j + 4 <= n; j += 4) {
+    sums[j] += row[j];
+    sums[j+1] += row[j+1];
+    sums[j+2] += row[j+2];
+    sums[j+3] += row[j+3];
+  }
+  for (; j < n; ++j) {
+    sums[j] += row[j];
+  }
+}
+
+template <typename T>
+void QUBOFlipRow(const T* __restrict__ row, const int* __restrict__ x,
+                 int x_i, int n, double* __restrict__ diff_weights) {
+  // (2(x_j ^ x_i) - 1) is 1 if x_j != x_i and -1 otherwise
+  int j = 0;
+  for (; j + 4 <= n; j += 4) {
+    diff_weights[j] += (2 * (x[j] ^ x_i) - 1) * 2.0 * row[j];
+    diff_weights[j+1] += (2 * (x[j+1] ^ x_i) - 1) * 2.0 * row[j+1];
+    diff_weights[j+2] += (2 * (x[j+2] ^ x_i) - 1) * 2.0 * row[j+2];
+    diff_weights[j+3] += (2 * (x[j+3] ^ x_i) - 1) * 2.0 * row[j+3];
+  }
+  for (; j < n; ++j) {
+    diff_weights[j] += (2 * (x[j] ^ x_i) - 1) * 2.0 * row[j];
+  }
+}
+
+template <typename T>
+void MaxCutFlipRow(const T* __restrict__ row, const int* __restrict__ x,
+                   int x_i, int n, double* __restrict__ diff_weights) {
+  double scale = 2.0 * x_i;
+  int j = 0;
+  for (; j + 4 <= n; j += 4) {
+    diff_weights[j] += scale * x[j] * row[j];
+    diff_weights[j+1] += scale * x[j+1] * row[j+1];
+    diff_weights[j+2] += scale * x[j+2] * row[j+2];
+    diff_weights[j+3] += scale * x[j+3] * row[j+3];
+  }
+  for (; j < n; ++j) {
+    diff_weights[j] += scale * x[j] * row[j];
+  }
+}
+}
+
+void DenseRows::Add(const double* row, int n, double* sums) {
+  AddRow(row, n, sums);
+}
+
+void DenseRows::Add(const float* row, int n, double* sums) {
+  AddRow(row, n, sums);
+}
+
+void DenseRows::QUBOFlip(const double* row, const int* x, int x_i, int n,
+                         double* diff_weights) {
+  QUBOFlipRow(row, x, x_i, n, diff_weights);
+}
+
+void DenseRows::QUBOFlip(const float* row, const int* x, int x_i, int n,
+                         double* diff_weights) {
+  QUBOFlipRow(row, x, x_i, n, diff_weights);
+}
+
+void DenseRows::MaxCutFlip(const double* row, const int* x, int x_i, int n,
+                           double* diff_weights) {
+  MaxCutFlipRow(row, x, x_i, n, diff_weights);
+}
+
+void DenseRows::MaxCutFlip(const float* row, const int* x, int x_i, int n,
+                           double* diff_weights) {
+  MaxCutFlipRow(row, x, x_i, n, diff_weights);
+}
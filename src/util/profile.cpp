@@ -0,0 +1,78 @@
+#include <time.h>
+#include <algorithm>
+#include <sstream>
+#include <string>
+#include "util/profile.h"
+
+bool Profile::enabled_ = false;
+
+static long long MonotonicNanoseconds() {
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return ts.tv_sec * 1000000000LL + ts.tv_nsec;
+}
+
+Profile::Profile() :
+  overshoot_(0.0) {
+  for (int i=0; i < NUM_COUNTERS; ++i) {
+    counts_[i] = 0;
+    recorded_[i] = false;
+  }
+  for (int i=0; i < NUM_PHASES; ++i) {
+    phase_ns_[i] = 0;
+    phase_recorded_[i] = false;
+  }
+}
+
+void Profile::Add(const Profile& other) {
+  for (int i=0; i < NUM_COUNTERS; ++i) {
+    counts_[i] += other.counts_[i];
+    recorded_[i] = recorded_[i] || other.recorded_[i];
+  }
+  for (int i=0; i < NUM_PHASES; ++i) {
+    phase_ns_[i] += other.phase_ns_[i];
+    phase_recorded_[i] = phase_recorded_[i] || other.phase_recorded_[i];
+  }
+  overshoot_ = std::max(overshoot_, other.overshoot_);
+}
+
+std::string Profile::ToJSON() const {
+  static const char* counter_names[NUM_COUNTERS] =
+    {"flips", "evaluations", "restarts", "reports"};
+  static const char* phase_names[NUM_PHASES] =
+    {"construction", "local_search", "perturbation", "crossover"};
+  std::stringstream out_str;
+  out_str << "{";
+  for (int i=0; i < NUM_COUNTERS; ++i) {
+    out_str << "\"" << counter_names[i] << "\":";
+    if (recorded_[i]) {
+      out_str << counts_[i] << ",";
+    } else {
+      out_str << "null,";
+    }
+  }
+  out_str << "\"phase_seconds\":{";
+  for (int i=0; i < NUM_PHASES; ++i) {
+    if (i > 0) out_str << ",";
+    out_str << "\"" << phase_names[i] << "\":";
+    if (phase_recorded_[i]) {
+      out_str << get_phase_time((Phase)i);
+    } else {
+      out_str << "null";
+    }
+  }
+  out_str << "},\"overshoot_seconds\":" << overshoot_ << "}";
+  return out_str.str();
+}
+
+ProfilePhase::ProfilePhase(Profile* profile, Profile::Phase phase) :
+  profile_(Profile::enabled() ? profile : NULL),
+  phase_(phase),
+  start_ns_(profile_ ? MonotonicNanoseconds() : 0) {}
+
+void ProfilePhase::Stop() {
+  if (profile_) {
+    profile_->AddPhaseTime(phase_, MonotonicNanoseconds() - start_ns_);
+    profile_ = NULL;
+  }
+}